@@ -67,7 +67,7 @@ class FarmerContext(BaseModel):
     persona: Literal['farmer', 'doctor'] = Field(default='farmer', description="Resolved chat persona for this turn.")
 
     # Handle to the per-turn content-moderation task, which runs concurrently with
-    # the agent on the voice path (see app.services.voice). Side-effecting tools
+    # the agent on the voice and chat paths (see app.services.chat). Side-effecting tools
     # await it via ensure_in_scope() so a rejected query can never produce a write,
     # even though the agent executes optimistically before the verdict is known.
     _moderation_task: Optional["asyncio.Task"] = PrivateAttr(default=None)
@@ -79,10 +79,11 @@ class FarmerContext(BaseModel):
     async def ensure_in_scope(self) -> bool:
         """Block until the concurrent moderation verdict is known.
 
-        Returns False ONLY when moderation explicitly rejected the query, so
-        side-effecting tools (e.g. bookings) refuse instead of performing a write.
-        Fail-open (returns True) when no task is attached or moderation errored —
-        a flaky moderation check must never drop a real farmer booking.
+        Returns False when the verdict is a rejection, so side-effecting tools
+        (e.g. bookings) refuse instead of performing a write. On chat a
+        moderation error is reported as a rejection (the task never raises), so
+        these tools refuse then too. Fail-open (returns True) only when no task
+        is attached or the attached task itself raises.
         """
         task = self._moderation_task
         if task is None:
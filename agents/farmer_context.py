@@ -1,15 +1,14 @@
 import asyncio
 import json
 import os
-from types import CoroutineType
+from itertools import islice
 from typing import Any
 
-from agents.tools.animal import get_animal_data_by_tag
-from agents.tools.cvcc import get_cvcc_health_data_by_tag
+from agents.services import farmer_context_cache
+from agents.services.animal_context_cache import AnimalContextRequest, get_animal_contexts
 from agents.tools.farmer import get_farmer_data_by_mobile
 from agents.tools.farmer_animal_backends import (
     GetAITechniciansBySocietyQueryParams,
-    fetch_banas_operated_visit,
     get_ai_technicians_by_society_api,
     normalize_phone,
 )
@@ -49,6 +48,20 @@ SUPPORTED_SCHEME_CONTEXT_UNIONS = {
     UnionName.SURENDRANAGAR.value,
 }
 
+_SCHEME_DEPENDENCY_UNAVAILABLE = "Scheme cache dependency is unavailable."
+_SCHEME_CACHE_UNREADABLE = "Scheme cache could not be read."
+_SCHEME_LIST_UNAVAILABLE = "Scheme list is temporarily unavailable."
+_SCHEME_LIST_NOT_READY = "No cached scheme list is available yet."
+_AI_TECHNICIANS_UNAVAILABLE = "AI technician details could not be fetched right now."
+# A bundle showing any of these was built from a failed lookup and is not cached.
+_DEGRADED_MARKERS = (
+    _SCHEME_DEPENDENCY_UNAVAILABLE,
+    _SCHEME_CACHE_UNREADABLE,
+    _SCHEME_LIST_UNAVAILABLE,
+    _SCHEME_LIST_NOT_READY,
+    _AI_TECHNICIANS_UNAVAILABLE,
+)
+
 
 def _format_value(value: Any) -> str:
     if isinstance(value, float):
@@ -130,19 +143,19 @@ async def _append_union_scheme_summary_markdown(lines: list[str], farmer_unions:
             records = await get_cached_scheme_records_for_union(union_name)
         except SchemeDependencyError:
             logger.warning("Union scheme summary skipped because Redis dependency is unavailable union=%s", union_name)
-            lines.append(f"- **{union_name.title()}**: Scheme cache dependency is unavailable.")
+            lines.append(f"- **{union_name.title()}**: {_SCHEME_DEPENDENCY_UNAVAILABLE}")
             continue
         except SchemeCacheError:
             logger.warning("Union scheme summary skipped because scheme cache could not be read union=%s", union_name)
-            lines.append(f"- **{union_name.title()}**: Scheme cache could not be read.")
+            lines.append(f"- **{union_name.title()}**: {_SCHEME_CACHE_UNREADABLE}")
             continue
         except Exception as exc:
             logger.warning("Union scheme summary skipped because of unexpected error union=%s error=%s", union_name, exc)
-            lines.append(f"- **{union_name.title()}**: Scheme list is temporarily unavailable.")
+            lines.append(f"- **{union_name.title()}**: {_SCHEME_LIST_UNAVAILABLE}")
             continue
 
         if not records:
-            lines.append(f"- **{union_name.title()}**: No cached scheme list is available yet.")
+            lines.append(f"- **{union_name.title()}**: {_SCHEME_LIST_NOT_READY}")
             continue
 
         lines.append(f"- **{union_name.title()} union schemes:**")
@@ -214,7 +227,7 @@ async def _get_ai_technicians_for_farmer(
         os.getenv("PASHUGPT_TOKEN"),
     )
     if technicians is None:
-        return None, "AI technician details could not be fetched right now."
+        return None, _AI_TECHNICIANS_UNAVAILABLE
 
     if not technicians:
         return [], None
@@ -495,36 +508,6 @@ def _append_animal_markdown(
     _append_cvcc_health_markdown(lines, cvcc_health)
 
 
-async def _get_animal_context_bundle(
-    tag: str,
-    include_banas_visit: bool,
-    include_cvcc_health: bool,
-    union_name: str | None,
-) -> tuple[
-    str,
-    AnimalModel | None,
-    list[BanasOperatedVisitModel] | None,
-    CvccHealthResponseModel | None,
-]:
-    tasks: list[CoroutineType[Any, Any, AnimalModel | list[BanasOperatedVisitModel] | CvccHealthResponseModel | None]] = [get_animal_data_by_tag(tag)]
-    if include_banas_visit:
-        tasks.append(fetch_banas_operated_visit(tag))
-    if include_cvcc_health:
-        tasks.append(get_cvcc_health_data_by_tag(tag, union_name=union_name))
-
-    results = await asyncio.gather(*tasks)
-    animal = results[0]
-    result_index = 1
-    banas_visits = None
-    if include_banas_visit:
-        banas_visits = results[result_index]
-        result_index += 1
-    cvcc_health = None
-    if include_cvcc_health:
-        cvcc_health = results[result_index]
-    return tag, animal, banas_visits, cvcc_health  # ty: ignore
-
-
 async def get_farmer_context_bundle_by_mobile(
     mobile_number: str,
 ) -> tuple[str, list[str], dict[str, str]]:
@@ -533,6 +516,9 @@ async def get_farmer_context_bundle_by_mobile(
     The third element is {district, village, state} (possibly empty) and exists
     so tools can read the farmer's location. It is deliberately NOT parsed back
     out of the markdown: the markdown is a prompt, not an API.
+
+    The rendered bundle is reused across turns while its inputs are unchanged
+    (``agents.services.farmer_context_cache``).
     """
     farmers = await get_farmer_data_by_mobile(mobile_number)
     mobile = normalize_phone(mobile_number) or mobile_number
@@ -545,6 +531,34 @@ async def get_farmer_context_bundle_by_mobile(
             {},
         )
 
+    animal_requests = [
+        [
+            AnimalContextRequest(
+                tag,
+                include_banas_visit=is_from_union([farmer], UnionName.BANAS),
+                include_cvcc_health=is_from_union([farmer], UnionName.KAIRA),
+                union_name=farmer.union_name,
+            )
+            for tag in farmer.animal_tags or []
+        ]
+        for farmer in farmers
+    ]
+    all_requests = [request for requests in animal_requests for request in requests]
+    cached, stamp = await farmer_context_cache.lookup(mobile, farmers, all_requests)
+    if cached is not None:
+        return cached
+
+    bundle = await _build_farmer_context_bundle(mobile, farmers, animal_requests)
+    if stamp is not None and not any(marker in bundle[0] for marker in _DEGRADED_MARKERS):
+        await farmer_context_cache.store(mobile, stamp, bundle)
+    return bundle
+
+
+async def _build_farmer_context_bundle(
+    mobile: str,
+    farmers: list[FarmerModel],
+    animal_requests: list[list[AnimalContextRequest]],
+) -> tuple[str, list[str], dict[str, str]]:
     farmer_unions = _collect_farmer_unions(farmers)
     farmer_location = _collect_farmer_location(farmers)
 
@@ -556,34 +570,37 @@ async def get_farmer_context_bundle_by_mobile(
         f"- **Requested mobile number:** `{mobile}`",
         f"- **Matched farmer records:** {len(farmers)}",
     ]
-    await _append_union_scheme_summary_markdown(lines, farmer_unions)
 
-    for index, farmer in enumerate(farmers, start=1):
+    # Every lookup of every account runs at once: the scheme summary, each
+    # farmer's AI technicians and all animal tags. The per-host limits in
+    # farmer_animal_backends bound the fan-out; rendering keeps the order.
+    scheme_lines: list[str] = []
+    technician_sections = [[] for _ in farmers]
+    _, _, animal_contexts = await asyncio.gather(
+        _append_union_scheme_summary_markdown(scheme_lines, farmer_unions),
+        asyncio.gather(
+            *(
+                _append_ai_technicians_markdown(section, farmer)
+                for section, farmer in zip(technician_sections, farmers)
+            )
+        ),
+        get_animal_contexts([request for requests in animal_requests for request in requests]),
+    )
+    lines.extend(scheme_lines)
+    animal_context_iter = iter(animal_contexts)
+
+    for index, (farmer, requests) in enumerate(zip(farmers, animal_requests), start=1):
         _append_farmer_markdown(lines, farmer, index)
-        await _append_ai_technicians_markdown(lines, farmer)
+        lines.extend(technician_sections[index - 1])
 
-        tags = farmer.animal_tags or []
-        include_banas_visit = is_from_union([farmer], UnionName.BANAS)
-        include_cvcc_health = is_from_union([farmer], UnionName.KAIRA)
         lines.append("")
         lines.append("### Animal tags")
-        if not tags:
+        if not requests:
             lines.append("- No animal tags found for this farmer.")
             continue
 
-        lines.append(f"- **Animal tags:** {', '.join(tags)}")
-        animal_contexts = await asyncio.gather(
-            *(
-                _get_animal_context_bundle(
-                    tag,
-                    include_banas_visit,
-                    include_cvcc_health,
-                    farmer.union_name,
-                )
-                for tag in tags
-            )
-        )
-        for tag, animal, banas_visits, cvcc_health in animal_contexts:
+        lines.append(f"- **Animal tags:** {', '.join(request.tag for request in requests)}")
+        for tag, animal, banas_visits, cvcc_health in islice(animal_context_iter, len(requests)):
             _append_animal_markdown(lines, tag, animal, banas_visits, cvcc_health)
 
     return "\n".join(lines), farmer_unions, farmer_location
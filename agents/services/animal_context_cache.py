@@ -0,0 +1,254 @@
+"""
+Per-tag cache of the animal context rendered into the farmer-context prompt:
+the animal record, its Banas operated visits and its CVCC health details.
+
+Every turn used to re-read three API-response cache keys per tag (and re-fetch
+all three once those expired). Here each tag's results live under one key and
+are served stale-while-revalidate, like ``farmer_cache``:
+
+- all tags of a turn are read in one Redis round trip;
+- an entry is fresh for ANIMAL_CONTEXT_REFRESH_INTERVAL_SECONDS (default 6h).
+  A stale entry is served as-is and refreshed in the background, bypassing the
+  per-endpoint API caches; one refresher per tag across workers (SET NX lock);
+- a refresh that gets nothing back keeps the stored entry and only restamps
+  it, so a failing upstream is retried once per interval, not on every turn;
+  a part whose call failed (as opposed to answering "no data") keeps its
+  stored value, and a first fetch with a failed part is served but not cached;
+- entries are kept for ``farmer_animal_api_cache_ttl``, the retention of the
+  API-response caches they replace on this path;
+- each write also stores the entry's fetch stamp under a small version key, so
+  the rendered farmer context (``farmer_context_cache``) can tell whether any
+  tag changed without reading the entries.
+
+A tag never cached is fetched on the request path; the per-host limits in
+``farmer_animal_backends`` bound that fan-out.
+"""
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from agents.tools.animal import get_animal_data_by_tag
+from agents.tools.cvcc import get_cvcc_health_data_by_tag
+from agents.tools.farmer_animal_backends import fetch_banas_operated_visit
+from app.config import settings
+from app.core.cache import CacheBatch, build_cache_key, redis_client
+from app.models.animal import AnimalModel
+from app.models.banas_visit import BanasOperatedVisitModel
+from app.models.cvcc import CvccHealthResponseModel
+from helpers.utils import get_logger
+
+logger = get_logger(__name__)
+
+ANIMAL_CONTEXT_NAMESPACE = "animal-context"
+ANIMAL_CONTEXT_REFRESH_LOCK_NAMESPACE = "animal-context-refresh"
+ANIMAL_CONTEXT_VERSION_NAMESPACE = "animal-context-version"
+ANIMAL_CONTEXT_REFRESH_INTERVAL = settings.animal_context_refresh_interval_seconds
+ANIMAL_CONTEXT_TTL = settings.farmer_animal_api_cache_ttl
+ANIMAL_CONTEXT_REFRESH_LOCK_TTL = settings.farmer_refresh_lock_ttl_seconds
+
+# (tag, animal, banas visits, cvcc health) — the shape farmer_context renders.
+AnimalContext = tuple[
+    str,
+    Optional[AnimalModel],
+    Optional[list[BanasOperatedVisitModel]],
+    Optional[CvccHealthResponseModel],
+]
+
+
+@dataclass(frozen=True)
+class AnimalContextRequest:
+    tag: str
+    include_banas_visit: bool
+    include_cvcc_health: bool
+    union_name: Optional[str] = None
+
+    @property
+    def cache_key(self) -> str:
+        sources = "a" + ("b" if self.include_banas_visit else "") + ("c" if self.include_cvcc_health else "")
+        return f"{self.tag}:{sources}"
+
+
+# Background refreshes in flight in this process (strong refs + dedupe).
+_refresh_tasks: dict[str, asyncio.Task] = {}
+
+
+async def _fetch_parts(
+    request: AnimalContextRequest, *, skip_cache: bool = False
+) -> tuple[AnimalContext, frozenset[int]]:
+    """One tag's context, fetched concurrently, and the positions (1-3 in the
+    context tuple) of the parts whose call failed; those parts are None."""
+    calls: dict[int, Any] = {
+        1: get_animal_data_by_tag(request.tag, skip_cache=skip_cache, raise_errors=True),
+    }
+    if request.include_banas_visit:
+        calls[2] = fetch_banas_operated_visit(request.tag, skip_cache=skip_cache, raise_errors=True)
+    if request.include_cvcc_health:
+        calls[3] = get_cvcc_health_data_by_tag(
+            request.tag, union_name=request.union_name, skip_cache=skip_cache, raise_errors=True
+        )
+
+    parts: list[Any] = [request.tag, None, None, None]
+    failed = set()
+    for position, result in zip(calls, await asyncio.gather(*calls.values(), return_exceptions=True)):
+        if isinstance(result, Exception):
+            failed.add(position)
+        else:
+            parts[position] = result
+    return tuple(parts), frozenset(failed)  # type: ignore[return-value]
+
+
+async def fetch_animal_context(request: AnimalContextRequest, *, skip_cache: bool = False) -> AnimalContext:
+    """Fetch one tag's context from the upstream APIs, concurrently."""
+    context, _failed = await _fetch_parts(request, skip_cache=skip_cache)
+    return context
+
+
+def _merge_failed(context: AnimalContext, failed: frozenset[int], previous: AnimalContext) -> AnimalContext:
+    """``context`` with each failed part taken from ``previous``."""
+    return tuple(previous[i] if i in failed else part for i, part in enumerate(context))  # type: ignore[return-value]
+
+
+def _is_empty(context: AnimalContext) -> bool:
+    return all(part is None for part in context[1:])
+
+
+def _encode(context: AnimalContext, fetched_at: str) -> dict:
+    _, animal, banas_visits, cvcc_health = context
+    return {
+        "fetchedAt": fetched_at,
+        "animal": animal.model_dump(mode="json", by_alias=True) if animal is not None else None,
+        "banasVisits": (
+            [visit.model_dump(mode="json", by_alias=True) for visit in banas_visits]
+            if banas_visits is not None
+            else None
+        ),
+        "cvccHealth": cvcc_health.model_dump(mode="json", by_alias=True) if cvcc_health is not None else None,
+    }
+
+
+def _decode(tag: str, raw: Any) -> Optional[tuple[datetime, AnimalContext]]:
+    if not isinstance(raw, dict):
+        return None
+    try:
+        fetched_at = datetime.fromisoformat(raw["fetchedAt"])
+        animal = raw.get("animal")
+        visits = raw.get("banasVisits")
+        cvcc = raw.get("cvccHealth")
+        return fetched_at, (
+            tag,
+            AnimalModel.model_validate(animal, by_alias=True, by_name=True) if animal is not None else None,
+            (
+                [BanasOperatedVisitModel.model_validate(v, by_alias=True, by_name=True) for v in visits]
+                if visits is not None
+                else None
+            ),
+            CvccHealthResponseModel.model_validate(cvcc, by_alias=True, by_name=True) if cvcc is not None else None,
+        )
+    except Exception as e:
+        logger.warning("Discarding unreadable animal context cache entry for tag %s: %s", tag, e)
+        return None
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def _store(entries: dict[str, dict]) -> None:
+    if not entries:
+        return
+    batch = CacheBatch()
+    for key, entry in entries.items():
+        batch.set(key, entry, ttl=ANIMAL_CONTEXT_TTL, namespace=ANIMAL_CONTEXT_NAMESPACE)
+        batch.set(key, entry["fetchedAt"], ttl=ANIMAL_CONTEXT_TTL, namespace=ANIMAL_CONTEXT_VERSION_NAMESPACE)
+    try:
+        await batch.execute()
+    except Exception as e:
+        logger.warning("Failed to write %d animal context cache entries: %s", len(entries), e)
+
+
+async def refresh_animal_context(request: AnimalContextRequest, previous: Optional[AnimalContext] = None) -> None:
+    """Re-fetch one tag bypassing the API caches and store it. Deduped across
+    workers by a short NX lock; an empty result keeps ``previous``."""
+    lock_key = build_cache_key(request.cache_key, namespace=ANIMAL_CONTEXT_REFRESH_LOCK_NAMESPACE)
+    acquired = False
+    try:
+        acquired = await redis_client.set(lock_key, "1", ex=ANIMAL_CONTEXT_REFRESH_LOCK_TTL, nx=True)
+        if not acquired:
+            return
+        context, failed = await _fetch_parts(request, skip_cache=True)
+        if previous is not None:
+            if _is_empty(context):
+                logger.info("Animal context refresh for tag %s came back empty; keeping the cached entry", request.tag)
+                context = previous
+            elif failed:
+                logger.info(
+                    "Animal context refresh for tag %s: %d part(s) failed; keeping their cached values",
+                    request.tag,
+                    len(failed),
+                )
+                context = _merge_failed(context, failed, previous)
+        elif failed:
+            return
+        await _store({request.cache_key: _encode(context, _now().isoformat())})
+    except Exception as e:
+        logger.warning("Animal context refresh failed for tag %s: %s", request.tag, e)
+    finally:
+        if acquired:
+            try:
+                await redis_client.delete(lock_key)
+            except Exception:
+                pass
+
+
+def _schedule_refresh(request: AnimalContextRequest, previous: AnimalContext) -> None:
+    key = request.cache_key
+    if key in _refresh_tasks:
+        return
+    task = asyncio.create_task(refresh_animal_context(request, previous))
+    _refresh_tasks[key] = task
+    task.add_done_callback(lambda _t, k=key: _refresh_tasks.pop(k, None))
+
+
+async def get_animal_contexts(requests: list[AnimalContextRequest]) -> list[AnimalContext]:
+    """Context for every request, in order: cached entries (stale ones are
+    refreshed in the background) plus one concurrent fetch of the rest."""
+    unique = list({request.cache_key: request for request in requests}.values())
+    if not unique:
+        return []
+
+    cached: list[Any] = [None] * len(unique)
+    batch = CacheBatch()
+    for request in unique:
+        batch.get(request.cache_key, namespace=ANIMAL_CONTEXT_NAMESPACE)
+    try:
+        cached = await batch.execute()
+    except Exception as e:
+        logger.warning("Animal context cache read failed; fetching %d tags: %s", len(unique), e)
+
+    stale_before = _now() - timedelta(seconds=ANIMAL_CONTEXT_REFRESH_INTERVAL)
+    contexts: dict[str, AnimalContext] = {}
+    missing: list[AnimalContextRequest] = []
+    for request, raw in zip(unique, cached):
+        decoded = _decode(request.tag, raw)
+        if decoded is None:
+            missing.append(request)
+            continue
+        fetched_at, context = decoded
+        contexts[request.cache_key] = context
+        if fetched_at <= stale_before:
+            _schedule_refresh(request, context)
+
+    if missing:
+        fetched = await asyncio.gather(*(_fetch_parts(request) for request in missing))
+        fetched_at = _now().isoformat()
+        to_store: dict[str, dict] = {}
+        for request, (context, failed) in zip(missing, fetched):
+            contexts[request.cache_key] = context
+            # A context with a failed part is served for this turn only, and
+            # all-None is not cached either; the next turn fetches again.
+            if not failed and not _is_empty(context):
+                to_store[request.cache_key] = _encode(context, fetched_at)
+        await _store(to_store)
+
+    return [contexts[request.cache_key] for request in requests]
@@ -10,6 +10,12 @@ APIs never block a turn. Freshness is tracked separately from Redis key expiry:
 All three timers are config-driven (app.config.settings). chat (/user) and voice
 share the same Redis key per phone, so a farmer cached by one is visible to both.
 
+Pre-warming (FARMER_PREWARM_ENABLED): request-path reads record the phone as
+active, and a periodic pass queues refreshes for active phones whose record is
+about to go stale, within an hourly budget, so returning farmers find a fresh
+record instead of a stale or cold one. Every read is counted as hit/stale/cold
+(farmer_cache_lookups_total).
+
 KNOWN LIMITATION (logged, follow-up): a register-then-immediately-call flow can
 keep seeing "not_found" for up to the not_found interval (~2h) — the stale
 negative-cache entry is served and isn't re-checked until it crosses its refresh
@@ -21,10 +27,12 @@ cache key), which is cross-service and out of scope for the merge.
 import asyncio
 import hashlib
 import os
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from app.core.cache import cache, redis_client, build_cache_key
+from app import metrics as _metrics
+from app.core.cache import CacheBatch, cache, redis_client, build_cache_key
 from app.config import settings
 from app.observability import start_observation
 from app.models.farmer_transport import FarmerDataEnvelope, FarmerRecord
@@ -50,8 +58,19 @@ FARMER_MAX_SERVE_STALE_SECONDS = settings.farmer_max_serve_stale_seconds
 FARMER_CACHE_NAMESPACE = "farmer"
 FARMER_REFRESH_LOCK_NAMESPACE = "farmer-refresh"
 FARMER_REFRESH_QUEUE_NAMESPACE = "farmer-refresh-queue"
-# Single Redis set holding raw phone numbers awaiting a background refresh.
-FARMER_REFRESH_QUEUE_KEY = build_cache_key("pending", namespace=FARMER_REFRESH_QUEUE_NAMESPACE)
+# Sorted set of raw phone numbers awaiting a background refresh, lowest score
+# first (see _refresh_priority), and a companion sorted set of when each phone
+# was first queued, for the lag metric.
+FARMER_REFRESH_QUEUE_KEY = build_cache_key("priority", namespace=FARMER_REFRESH_QUEUE_NAMESPACE)
+FARMER_REFRESH_ENQUEUED_AT_KEY = build_cache_key("enqueued-at", namespace=FARMER_REFRESH_QUEUE_NAMESPACE)
+# The plain set the queue used to be; moved into the sorted set on worker start.
+FARMER_REFRESH_LEGACY_QUEUE_KEY = build_cache_key("pending", namespace=FARMER_REFRESH_QUEUE_NAMESPACE)
+# Pre-warming: phones read recently (sorted set, scored by last read), the
+# per-hour refresh budget counters, and the lock spacing passes across pods.
+FARMER_PREWARM_NAMESPACE = "farmer-prewarm"
+FARMER_ACTIVITY_KEY = build_cache_key("active", namespace=FARMER_PREWARM_NAMESPACE)
+FARMER_PREWARM_LOCK_KEY = build_cache_key("pass", namespace=FARMER_PREWARM_NAMESPACE)
+FARMER_PREWARM_SCAN_CHUNK = 200
 
 
 def _cache_key(phone: str) -> str:
@@ -102,21 +121,26 @@ def exceeds_max_serve_stale(envelope: Optional[FarmerDataEnvelope]) -> bool:
     return age > FARMER_MAX_SERVE_STALE_SECONDS
 
 
+def _envelope_from_cache(raw: object) -> Optional[FarmerDataEnvelope]:
+    """A cached entry as an envelope with its freshness filled in (None if absent)."""
+    if not raw or not isinstance(raw, dict):
+        return None
+    envelope = FarmerDataEnvelope.model_validate(raw)
+    envelope.source = "cache"
+    envelope.lookupStatus = envelope.lookupStatus or ("found" if envelope.farmers else "not_found")
+    envelope.stale, envelope.staleReason, envelope.refreshAfter = _compute_freshness(envelope)
+    if envelope.farmers and "aiTechnicians" not in raw:
+        envelope.stale = True
+        envelope.staleReason = "missing_ai_technicians"
+        envelope.refreshAfter = datetime.now(timezone.utc).isoformat()
+    return envelope
+
+
 async def get_cached_farmer_data(phone: str) -> Optional[FarmerDataEnvelope]:
     """Retrieve cached farmer data for a phone number."""
     key = _cache_key(phone)
     try:
-        raw = await cache.get(key, namespace=FARMER_CACHE_NAMESPACE)
-        if raw and isinstance(raw, dict):
-            envelope = FarmerDataEnvelope.model_validate(raw)
-            envelope.source = "cache"
-            envelope.lookupStatus = envelope.lookupStatus or ("found" if envelope.farmers else "not_found")
-            envelope.stale, envelope.staleReason, envelope.refreshAfter = _compute_freshness(envelope)
-            if envelope.farmers and "aiTechnicians" not in raw:
-                envelope.stale = True
-                envelope.staleReason = "missing_ai_technicians"
-                envelope.refreshAfter = datetime.now(timezone.utc).isoformat()
-            return envelope
+        return _envelope_from_cache(await cache.get(key, namespace=FARMER_CACHE_NAMESPACE))
     except Exception as e:
         logger.warning(f"Failed to read farmer cache for phone hash {key[:8]}...: {e}")
     return None
@@ -238,9 +262,23 @@ async def refresh_farmer_data(phone: str) -> Optional[FarmerDataEnvelope]:
                 pass
 
 
+async def note_farmer_read(phone: str, cached: Optional[FarmerDataEnvelope]) -> None:
+    """Record a request-path read: the hit/stale/cold lookup metric and, when
+    pre-warming is on, the phone's last-active time."""
+    _metrics.record_farmer_cache_lookup("cold" if cached is None else ("stale" if cached.stale else "hit"))
+    if not settings.farmer_prewarm_enabled or not phone:
+        return
+    try:
+        await redis_client.zadd(FARMER_ACTIVITY_KEY, {phone: time.time()})
+    except Exception as e:
+        logger.warning("Failed to record farmer activity: %s", e)
+
+
 async def get_farmer_data_cached_only(phone: str) -> Optional[FarmerDataEnvelope]:
     """Read farmer context from Redis only; never block on upstream APIs."""
-    return await get_cached_farmer_data(phone)
+    cached = await get_cached_farmer_data(phone)
+    await note_farmer_read(phone, cached)
+    return cached
 
 
 def should_refresh_farmer_data(envelope: Optional[FarmerDataEnvelope]) -> bool:
@@ -251,29 +289,208 @@ def should_refresh_farmer_data(envelope: Optional[FarmerDataEnvelope]) -> bool:
 
 async def get_or_fetch_farmer_data(phone: str) -> Optional[FarmerDataEnvelope]:
     """Cache-first retrieval used by the /user endpoint. Returns cached data if
-    present, else does a full refresh (raw fetch + AI-technician enrichment)."""
+    present (queueing a background refresh when it is stale), else does a full
+    refresh (raw fetch + AI-technician enrichment)."""
     cached = await get_cached_farmer_data(phone)
+    await note_farmer_read(phone, cached)
     if cached:
+        if should_refresh_farmer_data(cached):
+            await enqueue_farmer_refresh(phone, envelope=cached, active=True)
         return cached
 
     return await refresh_farmer_data(phone)
 
 
-async def enqueue_farmer_refresh(phone: str) -> None:
+def _refresh_priority(
+    envelope: Optional[FarmerDataEnvelope], *, active: bool, now: Optional[float] = None
+) -> float:
+    """Queue score; lower is refreshed first.
+
+    Starts from the enqueue time (FIFO among equals) and subtracts how stale
+    the record is (unknown age counts as maximally stale), capped at the cache
+    retention; a farmer active right now gets a further retention's worth, so
+    any active farmer goes ahead of every idle one.
+    """
+    now = time.time() if now is None else now
+    age = _envelope_age_seconds(envelope)
+    staleness = FARMER_CACHE_TTL if age is None else min(max(age, 0.0), FARMER_CACHE_TTL)
+    return now - staleness - (FARMER_CACHE_TTL if active else 0)
+
+
+async def enqueue_farmer_refresh(
+    phone: str, *, envelope: Optional[FarmerDataEnvelope] = None, active: bool = False
+) -> None:
     """Queue a phone for background refresh (stale-while-revalidate).
 
-    Pushes the raw phone onto a Redis set so a dedicated worker can refresh it
-    off the request path. The set dedupes naturally, and refresh_farmer_data
-    self-dedupes via its NX lock, so enqueuing the same phone repeatedly is safe.
+    Adds the raw phone to a Redis sorted set scored by _refresh_priority so the
+    worker pool refreshes it off the request path. Re-queuing a phone only ever
+    raises its priority (ZADD LT), and refresh_farmer_data self-dedupes via its
+    NX lock, so enqueuing the same phone repeatedly is safe. ``active`` marks a
+    farmer who is in a session right now.
     """
     if not phone:
         return
     try:
-        await redis_client.sadd(FARMER_REFRESH_QUEUE_KEY, phone)
+        async with redis_client.pipeline(transaction=False) as pipe:
+            _queue_refresh(pipe, phone, envelope, active=active, now=time.time())
+            await pipe.execute()
     except Exception as e:
         logger.warning("Failed to enqueue farmer refresh: %s", e)
 
 
+def _queue_refresh(
+    pipe, phone: str, envelope: Optional[FarmerDataEnvelope], *, active: bool, now: float
+) -> None:
+    pipe.zadd(FARMER_REFRESH_QUEUE_KEY, {phone: _refresh_priority(envelope, active=active, now=now)}, lt=True)
+    pipe.zadd(FARMER_REFRESH_ENQUEUED_AT_KEY, {phone: now}, nx=True)
+
+
+async def migrate_legacy_refresh_queue(batch: int = FARMER_REFRESH_QUEUE_BATCH_SIZE) -> int:
+    """Move phones left in the pre-priority plain set into the sorted queue.
+    Returns how many were moved."""
+    moved = 0
+    try:
+        while True:
+            members = await redis_client.spop(FARMER_REFRESH_LEGACY_QUEUE_KEY, batch)
+            if not members:
+                break
+            if isinstance(members, (str, bytes)):
+                members = [members]
+            for phone in members:
+                await enqueue_farmer_refresh(phone)
+            moved += len(members)
+    except Exception as e:
+        logger.warning("Failed to migrate the legacy farmer refresh queue: %s", e)
+    if moved:
+        logger.info("Moved %d phones from the legacy farmer refresh queue", moved)
+    return moved
+
+
+async def pop_farmer_refresh_batch(count: int, *, block_seconds: float = 0.0) -> list[str]:
+    """Take up to ``count`` highest-priority phones off the queue.
+
+    When the queue is empty and ``block_seconds`` > 0, blocks on it (BZPOPMIN)
+    for up to that long instead of returning straight away. Publishes the queue
+    depth and each taken phone's queue lag.
+    """
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.zpopmin(FARMER_REFRESH_QUEUE_KEY, count)
+        pipe.zcard(FARMER_REFRESH_QUEUE_KEY)
+        popped, depth = await pipe.execute()
+    phones = [member for member, _score in popped or []]
+    if not phones and block_seconds > 0:
+        item = await redis_client.bzpopmin(FARMER_REFRESH_QUEUE_KEY, timeout=block_seconds)
+        if item:
+            phones = [item[1]]
+            depth = await redis_client.zcard(FARMER_REFRESH_QUEUE_KEY)
+    _metrics.set_farmer_refresh_queue_depth(depth or 0)
+    if not phones:
+        return []
+
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.zmscore(FARMER_REFRESH_ENQUEUED_AT_KEY, phones)
+        pipe.zrem(FARMER_REFRESH_ENQUEUED_AT_KEY, *phones)
+        enqueued_at, _ = await pipe.execute()
+    now = time.time()
+    for queued in enqueued_at or []:
+        if queued is not None:
+            _metrics.observe_farmer_refresh_lag(max(now - float(queued), 0.0))
+    return [phone.decode() if isinstance(phone, bytes) else phone for phone in phones]
+
+
+def _due_for_prewarm(envelope: Optional[FarmerDataEnvelope], due_before: datetime) -> bool:
+    if envelope is None or envelope.stale or not envelope.refreshAfter:
+        return True
+    try:
+        return datetime.fromisoformat(envelope.refreshAfter) <= due_before
+    except ValueError:
+        return True
+
+
+async def prewarm_farmer_cache_once(now: Optional[float] = None) -> int:
+    """Queue background refreshes for recently active phones whose record is
+    missing, stale, or goes stale within FARMER_PREWARM_LEAD_SECONDS, most
+    recently active first, within the hour's FARMER_PREWARM_HOURLY_BUDGET.
+
+    One pass per FARMER_PREWARM_INTERVAL_SECONDS across all pods (NX lock left
+    to expire). Phones already queued are skipped and do not use the budget.
+    Returns how many phones were queued.
+    """
+    now = time.time() if now is None else now
+    if not await redis_client.set(
+        FARMER_PREWARM_LOCK_KEY, "1", ex=settings.farmer_prewarm_interval_seconds, nx=True
+    ):
+        return 0
+
+    budget_key = build_cache_key(f"budget:{int(now // 3600)}", namespace=FARMER_PREWARM_NAMESPACE)
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.zremrangebyscore(FARMER_ACTIVITY_KEY, "-inf", now - settings.farmer_prewarm_activity_window_seconds)
+        pipe.get(budget_key)
+        _, used = await pipe.execute()
+    remaining = settings.farmer_prewarm_hourly_budget - int(used or 0)
+    due_before = datetime.fromtimestamp(now + settings.farmer_prewarm_lead_seconds, tz=timezone.utc)
+
+    queued = 0
+    offset = 0
+    while queued < remaining:
+        phones = await redis_client.zrevrange(FARMER_ACTIVITY_KEY, offset, offset + FARMER_PREWARM_SCAN_CHUNK - 1)
+        if not phones:
+            break
+        offset += len(phones)
+        batch = CacheBatch()
+        for phone in phones:
+            batch.get(_cache_key(phone), namespace=FARMER_CACHE_NAMESPACE)
+        entries = await batch.execute()
+        queue_scores = await redis_client.zmscore(FARMER_REFRESH_QUEUE_KEY, phones)
+
+        due: list[tuple[str, Optional[FarmerDataEnvelope]]] = []
+        for phone, raw, queue_score in zip(phones, entries, queue_scores):
+            if queue_score is not None:
+                continue
+            try:
+                envelope = _envelope_from_cache(raw)
+            except Exception:
+                envelope = None
+            if _due_for_prewarm(envelope, due_before):
+                due.append((phone, envelope))
+        due = due[: remaining - queued]
+        if not due:
+            continue
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for phone, envelope in due:
+                _queue_refresh(pipe, phone, envelope, active=False, now=now)
+            pipe.incrby(budget_key, len(due))
+            pipe.expire(budget_key, 2 * 3600)
+            await pipe.execute()
+        queued += len(due)
+
+    if queued:
+        logger.info("Pre-warm queued %d farmer refreshes (%d left this hour)", queued, remaining - queued)
+    return queued
+
+
+async def refresh_queued_farmer(phone: str) -> bool:
+    """Background refresh of one queued phone. Returns True if it refreshed."""
+    try:
+        # Root span so the nested API-call observations have a parent and
+        # are queryable in Langfuse (background refreshes aren't tied to a
+        # voice session); fetch_reason tags them as background_refresh (which
+        # also puts them under the per-host background rate limit).
+        with start_observation(
+            "farmer_background_refresh",
+            input={"phone_hash": _cache_key(phone)[:12]},
+            metadata={"reason": "background_refresh"},
+        ):
+            with fetch_reason("background_refresh"):
+                envelope = await refresh_farmer_data(phone)
+    except Exception:
+        logger.exception("Background farmer refresh failed for a queued phone")
+        _metrics.record_farmer_refresh("error")
+        return False
+    _metrics.record_farmer_refresh("refreshed" if envelope is not None else "unavailable")
+    return envelope is not None
+
+
 async def refresh_farmer_data_bounded(
     phone: str, timeout: float = FARMER_COLD_FETCH_TIMEOUT
 ) -> Optional[FarmerDataEnvelope]:
@@ -292,40 +509,10 @@ async def refresh_farmer_data_bounded(
             timeout,
             _cache_key(phone)[:8],
         )
-        await enqueue_farmer_refresh(phone)
+        await enqueue_farmer_refresh(phone, active=True)
         return None
 
 
-async def drain_farmer_refresh_queue_once(batch: int = FARMER_REFRESH_QUEUE_BATCH_SIZE) -> int:
-    """Pop up to `batch` queued phones and refresh each. Returns count processed."""
-    try:
-        members = await redis_client.spop(FARMER_REFRESH_QUEUE_KEY, batch)
-    except Exception as e:
-        logger.warning("Failed to read farmer refresh queue: %s", e)
-        return 0
-    if not members:
-        return 0
-    if isinstance(members, (str, bytes)):
-        members = [members]
-    processed = 0
-    for phone in members:
-        try:
-            # Root span so the nested API-call observations have a parent and
-            # are queryable in Langfuse (background refreshes aren't tied to a
-            # voice session); fetch_reason tags them as background_refresh.
-            with start_observation(
-                "farmer_background_refresh",
-                input={"phone_hash": _cache_key(phone)[:12]},
-                metadata={"reason": "background_refresh"},
-            ):
-                with fetch_reason("background_refresh"):
-                    await refresh_farmer_data(phone)
-            processed += 1
-        except Exception:
-            logger.exception("Background farmer refresh failed for a queued phone")
-    return processed
-
-
 async def _fetch_ai_technicians(records: list[FarmerRecord]) -> list[dict]:
     token = os.getenv("PASHUGPT_TOKEN")
     if not token or not records:
@@ -0,0 +1,98 @@
+"""
+Rendered farmer context per phone.
+
+Building the ``# Farmer Context`` markdown reads the union scheme titles, each
+account's AI technicians (an upstream call per account) and every animal tag,
+then formats all of it. On a warm session none of that changes between turns,
+so the rendered bundle (markdown, unions, location) is stored per phone with
+the stamp of the inputs it was built from:
+
+- a fingerprint of the farmer records (the records the turn has just read);
+- the fetch stamp of every animal tag (``animal_context_cache`` version keys);
+- :data:`BUNDLE_FORMAT`, bumped whenever the rendering itself changes.
+
+A turn reads the bundle and the tag versions in one round trip and reuses the
+bundle when the stamp matches; anything else rebuilds it. Inputs that carry no
+version (AI technicians, scheme titles) are bounded by
+FARMER_CONTEXT_CACHE_TTL_SECONDS instead.
+
+Nothing is stored while a tag has no cached animal context yet (a cold or
+failed fetch), and the caller skips storing bundles rendered from a degraded
+lookup, so a transient failure is never replayed from the cache.
+"""
+import hashlib
+import json
+from typing import Any, Optional
+
+from agents.services.animal_context_cache import ANIMAL_CONTEXT_VERSION_NAMESPACE, AnimalContextRequest
+from app.config import settings
+from app.core.cache import CacheBatch
+from app.models.farmer import FarmerModel
+from helpers.utils import get_logger
+
+logger = get_logger(__name__)
+
+FARMER_CONTEXT_NAMESPACE = "farmer-context"
+BUNDLE_FORMAT = 1
+
+# (prompt markdown, union names, structured location)
+FarmerContextBundle = tuple[str, list[str], dict[str, str]]
+
+
+def _phone_key(mobile: str) -> str:
+    return hashlib.sha256(mobile.encode()).hexdigest()
+
+
+def fingerprint_farmers(farmers: list[FarmerModel]) -> str:
+    payload = json.dumps([farmer.model_dump(mode="json") for farmer in farmers], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _stamp(farmers: list[FarmerModel], versions: list[Any]) -> str:
+    payload = json.dumps([BUNDLE_FORMAT, fingerprint_farmers(farmers), versions])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def lookup(
+    mobile: str,
+    farmers: list[FarmerModel],
+    animal_requests: list[AnimalContextRequest],
+) -> tuple[Optional[FarmerContextBundle], Optional[str]]:
+    """``(bundle, stamp)``: the cached bundle if its inputs are unchanged, and
+    the stamp a rebuilt bundle should be stored under (None: do not store)."""
+    if settings.farmer_context_cache_ttl_seconds <= 0:
+        return None, None
+    batch = CacheBatch()
+    batch.get(_phone_key(mobile), namespace=FARMER_CONTEXT_NAMESPACE)
+    for request in animal_requests:
+        batch.get(request.cache_key, namespace=ANIMAL_CONTEXT_VERSION_NAMESPACE)
+    try:
+        entry, *versions = await batch.execute()
+    except Exception as e:
+        logger.warning("Farmer context cache read failed: %s", e)
+        return None, None
+
+    if any(version is None for version in versions):
+        return None, None
+    stamp = _stamp(farmers, versions)
+    if isinstance(entry, dict) and entry.get("stamp") == stamp:
+        try:
+            return (str(entry["markdown"]), list(entry["unions"]), dict(entry["location"])), stamp
+        except (KeyError, TypeError, ValueError):
+            logger.warning("Discarding unreadable farmer context cache entry")
+    return None, stamp
+
+
+async def store(mobile: str, stamp: str, bundle: FarmerContextBundle) -> None:
+    markdown, unions, location = bundle
+    batch = CacheBatch()
+    batch.set(
+        _phone_key(mobile),
+        {"stamp": stamp, "markdown": markdown, "unions": unions, "location": location},
+        ttl=settings.farmer_context_cache_ttl_seconds,
+        namespace=FARMER_CONTEXT_NAMESPACE,
+    )
+    try:
+        await batch.execute()
+    except Exception as e:
+        logger.warning("Farmer context cache write failed: %s", e)
@@ -0,0 +1,154 @@
+"""
+Result cache for ``search_documents``.
+
+The same veterinary questions (mastitis, FMD, milk yield, feed ration) arrive
+thousands of times a day, and each one ran a full Marqo search plus the rerank
+and per-document diversity pass. The served hits are cached in Redis under a
+key built from:
+
+- the normalized, synonym-expanded query (whitespace collapsed, lower-cased);
+- the index name, search mode and final top_k;
+- every other retrieval setting that changes the result (the Marqo request
+  minus its query text, the rerank mode, the per-document cap).
+
+Entries live SEARCH_CACHE_TTL_SECONDS (0 disables the cache). Each entry
+records the generation of its index; :func:`invalidate_search_cache` bumps that
+generation, which retires every entry of the index at once. Lookups read the
+generation and the entry in one round trip.
+
+With SEARCH_CACHE_NEAR_DUPLICATES a second key is derived from the query's
+token set (function words dropped, order ignored), so paraphrases such as
+"treatment of mastitis in cow" and "cow mastitis treatment" share an entry.
+
+Hits, near-duplicate hits and misses are counted in
+``search_cache_lookups_total``; ``search_cache_saved_seconds`` records the
+search time each hit avoided.
+"""
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from app import metrics as _metrics
+from app.config import settings
+from app.core.cache import CacheBatch, build_cache_key, redis_client
+from helpers.utils import get_logger
+
+logger = get_logger(__name__)
+
+SEARCH_CACHE_NAMESPACE = "search-results"
+SEARCH_CACHE_GENERATION_NAMESPACE = "search-results-generation"
+ENTRY_FORMAT = 1
+
+_TOKEN_RE = re.compile(r"[\w\-]+", re.UNICODE)
+_STOPWORDS = frozenset(
+    "a an the of for in on at to and or with without from by about is are was be "
+    "how what which when why do does can my our your their its this that these those".split()
+)
+
+
+@dataclass(frozen=True)
+class SearchCacheKeys:
+    exact: str
+    near: Optional[str] = None
+
+
+def _normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", (query or "").strip().lower())
+
+
+def _token_set(query: str) -> str:
+    tokens = {token for token in _TOKEN_RE.findall(_normalize_query(query)) if token not in _STOPWORDS}
+    return " ".join(sorted(tokens))
+
+
+def _digest(*parts: Any) -> str:
+    payload = json.dumps([ENTRY_FORMAT, *parts], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def search_cache_keys(
+    query: str,
+    *,
+    index_name: str,
+    search_mode: str,
+    top_k: int,
+    retrieval: dict[str, Any],
+) -> Optional[SearchCacheKeys]:
+    """Keys for one search, or None when the cache is disabled. ``retrieval``
+    holds every other setting the served hits depend on (JSON-serializable)."""
+    if settings.search_cache_ttl_seconds <= 0:
+        return None
+    scope = [index_name, search_mode, top_k, retrieval]
+    exact = _digest("exact", _normalize_query(query), *scope)
+    near = None
+    if settings.search_cache_near_duplicates:
+        tokens = _token_set(query)
+        if tokens:
+            near = _digest("near", tokens, *scope)
+    return SearchCacheKeys(exact, near if near != exact else None)
+
+
+async def lookup(
+    index_name: str, keys: Optional[SearchCacheKeys]
+) -> tuple[Optional[list[dict[str, Any]]], Optional[int]]:
+    """``(hits, generation)``: the cached hits if present in the index's current
+    generation, and the generation a fresh result should be stored under
+    (None: do not store)."""
+    if keys is None:
+        return None, None
+    batch = CacheBatch()
+    batch.get(index_name, namespace=SEARCH_CACHE_GENERATION_NAMESPACE)
+    batch.get(keys.exact, namespace=SEARCH_CACHE_NAMESPACE)
+    if keys.near:
+        batch.get(keys.near, namespace=SEARCH_CACHE_NAMESPACE)
+    try:
+        generation, exact, *near = await batch.execute()
+    except Exception as e:
+        logger.warning("Search cache read failed: %s", e)
+        return None, None
+
+    generation = generation or 0
+    for result, entry in (("hit", exact), ("near_hit", near[0] if near else None)):
+        if not isinstance(entry, dict) or entry.get("generation") != generation:
+            continue
+        hits = entry.get("hits")
+        if isinstance(hits, list):
+            _metrics.record_search_cache_lookup(result)
+            _metrics.observe_search_cache_saved(entry.get("seconds", 0.0))
+            return hits, generation
+    _metrics.record_search_cache_lookup("miss")
+    return None, generation
+
+
+async def store(
+    keys: Optional[SearchCacheKeys],
+    generation: Optional[int],
+    hits: list[dict[str, Any]],
+    *,
+    seconds: float,
+) -> None:
+    """Cache ``hits`` (JSON-serializable) that took ``seconds`` to produce,
+    under the generation :func:`lookup` returned. An invalidation in between
+    leaves the entry already retired."""
+    if keys is None or generation is None:
+        return
+    entry = {"generation": generation, "seconds": round(seconds, 4), "hits": hits}
+    batch = CacheBatch()
+    for key in (keys.exact, keys.near):
+        if key:
+            batch.set(key, entry, ttl=settings.search_cache_ttl_seconds, namespace=SEARCH_CACHE_NAMESPACE)
+    try:
+        await batch.execute()
+    except Exception as e:
+        logger.warning("Search cache write failed: %s", e)
+
+
+async def invalidate_search_cache(index_name: str) -> None:
+    """Retire every cached result of ``index_name`` (e.g. after re-indexing)."""
+    try:
+        generation = await redis_client.incr(build_cache_key(index_name, namespace=SEARCH_CACHE_GENERATION_NAMESPACE))
+        logger.info("Search cache for index %s invalidated (generation %s)", index_name, generation)
+    except Exception as e:
+        logger.warning("Search cache invalidation failed for index %s: %s", index_name, e)
@@ -177,9 +177,9 @@ async def create_ai_call(
     # this point, silently voiding both.
 
     # A booking is IRREVERSIBLE, so block on the moderation verdict before writing.
-    # On the voice path moderation runs concurrently with the agent; this refuses
-    # the booking if the query was rejected. No-op on the chat path (no moderation
-    # task attached → returns True), so chat behaviour is unchanged.
+    # On both voice and chat moderation runs concurrently with the agent; this
+    # refuses the booking if the query was rejected (or, on chat, if moderation
+    # itself failed — chat is fail-closed).
     if not await ctx.deps.ensure_in_scope():
         logger.info("AI call blocked: query failed moderation; session=%s", session_id)
         return OUT_OF_SCOPE_MESSAGE
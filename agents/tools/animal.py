@@ -21,12 +21,16 @@ from agents.tools.farmer_animal_backends import fetch_animal_amulpashudhan
 logger = get_logger(__name__)
 
 
-async def get_animal_data_by_tag(tag: str) -> AnimalModel | None:
+async def get_animal_data_by_tag(
+    tag: str, *, skip_cache: bool = False, raise_errors: bool = False
+) -> AnimalModel | None:
     """
     Fetch structured animal data by tag number.
 
     Args:
         tag: The tag number of the animal.
+        skip_cache: Bypass the cached API response and fetch fresh.
+        raise_errors: Re-raise a failed request instead of returning None.
 
     Returns:
         A normalized animal record dict, or None if no data is found.
@@ -40,9 +44,11 @@ async def get_animal_data_by_tag(tag: str) -> AnimalModel | None:
         return None
 
     try:
-        return await fetch_animal_amulpashudhan(tag, token1)
+        return await fetch_animal_amulpashudhan(tag, token1, skip_cache=skip_cache, raise_errors=raise_errors)
     except Exception as e:
         logger.warning(f"amulpashudhan animal API error for tag {tag}: {e}")
+        if raise_errors:
+            raise
 
     return None
 
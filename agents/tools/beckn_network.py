@@ -28,10 +28,9 @@ import uuid
 from dataclasses import dataclass
 from typing import Any, Optional
 
-import httpx
-
 from agents.tools.scheme_codes import resolve_scheme_code
 from app.config import settings
+from app.core.http_clients import upstream_client
 from helpers.utils import get_logger
 
 logger = get_logger(__name__)
@@ -84,7 +83,7 @@ async def _seeker_search_legs(
     payload: dict[str, Any] = {"query": query, "legs": legs}
     if user_id:
         payload["user_id"] = user_id
-    async with httpx.AsyncClient(timeout=settings.amul_network_timeout_s) as client:
+    async with upstream_client("amul_network", timeout=settings.amul_network_timeout_s) as client:
         r = await client.post(url, json=payload)
         r.raise_for_status()
         data = r.json()
@@ -292,7 +291,7 @@ async def network_create_ai_call_result(
         "timestamp": "1970-01-01T00:00:00.000Z",
     }
     url = f"{settings.amul_booking_bpp_url.rstrip('/')}/confirm"
-    async with httpx.AsyncClient(timeout=settings.amul_network_timeout_s) as client:
+    async with upstream_client("amul_network", timeout=settings.amul_network_timeout_s) as client:
         r = await client.post(url, json={"context": context, "message": {"order": order}})
         r.raise_for_status()
         body = r.json()
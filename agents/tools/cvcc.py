@@ -18,6 +18,9 @@ async def get_cvcc_health_data_by_tag(
     token_no: Optional[str] = None,
     vendor_no: str = "9999999",
     union_name: Optional[str] = None,
+    *,
+    skip_cache: bool = False,
+    raise_errors: bool = False,
 ):
     if not tag_no:
         return None
@@ -33,9 +36,13 @@ async def get_cvcc_health_data_by_tag(
         return None
 
     try:
-        return await fetch_cvcc_health_details(tag_no, token_no, vendor_no)
+        return await fetch_cvcc_health_details(
+            tag_no, token_no, vendor_no, skip_cache=skip_cache, raise_errors=raise_errors
+        )
     except Exception as e:
         logger.warning(f"cvcc API error for tag {tag_no}: {e}")
+        if raise_errors:
+            raise
         return None
 
 
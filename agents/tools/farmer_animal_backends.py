@@ -5,12 +5,14 @@ Internal backends for farmer and animal data from multiple APIs.
 
 Used by farmer.py and animal.py to provide cohesive tools with fallback and merged output.
 """
-from contextlib import contextmanager
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
 from contextvars import ContextVar
 from beartype.typing import TypeVar
 import json
 import re
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 import httpx
 from pydantic import ValidationError, BaseModel, ConfigDict, Field
@@ -27,6 +29,7 @@ from app.models.milk_collection import (
     FarmerMilkCollectionResponseModel,
 )
 from app.config import settings
+from app.core.http_clients import upstream_client
 from app.models.animal import AnimalModel
 from app.models.banas_visit import BanasOperatedVisitModel
 from app.models.cvcc import CvccHealthResponseModel
@@ -42,6 +45,95 @@ BASE_BANAS_MOBILE = settings.banas_mobile_base_url
 BASE_CVCC = settings.cvcc_base_url
 FARMER_BACKEND_HTTP_TIMEOUT_SECONDS = settings.farmer_backend_http_timeout_seconds
 
+# Requests in flight per upstream host (FARMER_UPSTREAM_HOST_CONCURRENCY). A
+# farmer context fans out to every animal tag of every account at once; this
+# keeps that fan-out from opening dozens of simultaneous calls to one host.
+# Semaphores are rebound per running loop (see app/services/fallback.py).
+_host_semaphores: dict[str, tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = {}
+
+
+def _host_semaphore(host: str) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    entry = _host_semaphores.get(host)
+    if entry is None or entry[0] is not loop:
+        entry = _host_semaphores[host] = (loop, asyncio.Semaphore(settings.farmer_upstream_host_concurrency))
+    return entry[1]
+
+
+class _TokenBucket:
+    """Requests/second limiter; a caller over the budget reserves the next
+    token and sleeps until it is due, so waiters are served in arrival order."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self.burst = max(rate, 1.0)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take one token; returns the seconds to wait before using it."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1.0
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+# Background refreshes (fetch_reason "background_refresh") draw from a per-host
+# token bucket so a worker pool draining a backlog cannot burst PashuGPT /
+# herdman; request-path calls are never throttled. The budget is per process.
+_refresh_buckets: dict[str, _TokenBucket] = {}
+
+
+def _refresh_rate_overrides() -> dict[str, float]:
+    out: dict[str, float] = {}
+    for part in (settings.farmer_refresh_rate_limits or "").split(","):
+        host, sep, value = part.partition("=")
+        if not sep:
+            continue
+        try:
+            rate = float(value.strip())
+        except ValueError:
+            logger.warning("Ignoring malformed FARMER_REFRESH_RATE_LIMITS entry %r", part)
+            continue
+        if rate >= 0:
+            out[host.strip()] = rate
+    return out
+
+
+def _refresh_bucket(host: str) -> Optional[_TokenBucket]:
+    rate = _refresh_rate_overrides().get(host, settings.farmer_refresh_rate_per_host)
+    if rate <= 0:
+        return None
+    bucket = _refresh_buckets.get(host)
+    if bucket is None or bucket.rate != rate:
+        bucket = _refresh_buckets[host] = _TokenBucket(rate)
+    return bucket
+
+
+async def _throttle_background_refresh(host: str) -> None:
+    if current_fetch_reason() != "background_refresh":
+        return
+    bucket = _refresh_bucket(host)
+    if bucket is None:
+        return
+    delay = bucket.reserve()
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+
+@asynccontextmanager
+async def _backend_client(url: str) -> AsyncIterator[httpx.AsyncClient]:
+    """The shared farmer-backends client, holding one of ``url``'s host slots
+    (after the host's rate limit, for background refreshes)."""
+    host = httpx.URL(url).host
+    await _throttle_background_refresh(host)
+    async with _host_semaphore(host):
+        async with upstream_client("farmer_backends", timeout=FARMER_BACKEND_HTTP_TIMEOUT_SECONDS) as client:
+            yield client
+
 
 def normalize_phone(mobile: str) -> str:
     """Strip non-digits; for Indian numbers optionally strip leading 91."""
@@ -91,7 +183,7 @@ async def _fetch_farmer_amulpashudhan_raw(
             input={"mobile": mobile},
             metadata={"provider": "amulpashudhan", "url": url},
         ) as observation:
-            async with httpx.AsyncClient(timeout=FARMER_BACKEND_HTTP_TIMEOUT_SECONDS) as client:
+            async with _backend_client(url) as client:
                 response = await client.get(
                     url,
                     headers={
@@ -200,7 +292,7 @@ async def fetch_farmer_herdman(mobile: str, token: str) -> list[FarmerModel] | N
             input={"mobile": mobile},
             metadata={"provider": "herdman", "url": url},
         ) as observation:
-            async with httpx.AsyncClient(timeout=FARMER_BACKEND_HTTP_TIMEOUT_SECONDS) as client:
+            async with _backend_client(url) as client:
                 response = await client.get(
                     url,
                     params={"mobileno": mobile},
@@ -283,7 +375,7 @@ async def _fetch_farmer_herdman_raw(
             input={"mobile": mobile},
             metadata={"provider": "herdman", "url": url},
         ) as observation:
-            async with httpx.AsyncClient(timeout=FARMER_BACKEND_HTTP_TIMEOUT_SECONDS) as client:
+            async with _backend_client(url) as client:
                 response = await client.get(
                     url,
                     params={"mobileno": mobile},
@@ -343,10 +435,14 @@ def merge_farmer_records(records: list[dict]) -> list[dict]:
 # --- Animal ---
 
 
-async def fetch_animal_amulpashudhan(tag_no: str, token: str) -> AnimalModel | None:
-    """Returns a validated animal model or None on 204/error/empty."""
+async def fetch_animal_amulpashudhan(
+    tag_no: str, token: str, *, skip_cache: bool = False, raise_errors: bool = False
+) -> AnimalModel | None:
+    """Returns a validated animal model or None on 204/error/empty. skip_cache
+    forces a fresh HTTP fetch (the response is still written to the cache);
+    raise_errors re-raises a failed request instead of returning None."""
     cache_key = build_api_cache_key("amulpashudhan_animal", tag_no)
-    cache_hit, cached_payload = await get_cached_api_response(cache_key)
+    cache_hit, cached_payload = (False, None) if skip_cache else await get_cached_api_response(cache_key)
     if cache_hit:
         if cached_payload is None:
             return None
@@ -382,7 +478,7 @@ async def fetch_animal_amulpashudhan(tag_no: str, token: str) -> AnimalModel | N
             input={"tag_no": tag_no},
             metadata={"provider": "amulpashudhan", "url": url},
         ) as observation:
-            async with httpx.AsyncClient(timeout=FARMER_BACKEND_HTTP_TIMEOUT_SECONDS) as client:
+            async with _backend_client(url) as client:
                 response = await client.get(
                     url,
                     headers={
@@ -414,29 +510,37 @@ async def fetch_animal_amulpashudhan(tag_no: str, token: str) -> AnimalModel | N
             f"[AmulPashudhan({tag_no})] :: Request failed with status code {e.response.status_code}, and message = {e.response.text}",
             exc_info=True,
         )
+        if raise_errors:
+            raise
     except json.JSONDecodeError as e:
         logger.error(
             f"[AmulPashudhan({tag_no})] :: Response didn't gave a valid json, failed due to decoding error {str(e)}",
             exc_info=True,
         )
+        if raise_errors:
+            raise
     except Exception as e:
         logger.error(
             f"[AmulPashudhan({tag_no})] :: Request failed, due to error {str(e)}",
             exc_info=True,
         )
+        if raise_errors:
+            raise
 
 
 async def fetch_banas_operated_visit(
-    tag_no: str,
+    tag_no: str, *, skip_cache: bool = False, raise_errors: bool = False
 ) -> list[BanasOperatedVisitModel] | None:
-    """Returns operated visit list for a Banas animal tag or None on 204/error/empty."""
+    """Returns operated visit list for a Banas animal tag or None on 204/error/empty.
+    skip_cache forces a fresh HTTP fetch (the response is still written to the cache);
+    raise_errors re-raises a failed request instead of returning None."""
     api_key = settings.banas_mobile_api_key
     if not api_key:
         logger.warning("BANAS_MOBILE_API_KEY is not set")
         return None
 
     cache_key = build_api_cache_key("banas_operated_visit", tag_no)
-    cache_hit, cached_payload = await get_cached_api_response(cache_key)
+    cache_hit, cached_payload = (False, None) if skip_cache else await get_cached_api_response(cache_key)
     if cache_hit:
         if cached_payload is None:
             return None
@@ -462,7 +566,7 @@ async def fetch_banas_operated_visit(
 
     url = f"{BASE_BANAS_MOBILE}/GetOperatedVisit"
     try:
-        async with httpx.AsyncClient(timeout=FARMER_BACKEND_HTTP_TIMEOUT_SECONDS) as client:
+        async with _backend_client(url) as client:
             response = await client.post(
                 url,
                 headers={"Content-Type": "application/json"},
@@ -488,26 +592,37 @@ async def fetch_banas_operated_visit(
             f"[BanasOperatedVisit({tag_no})] :: Request failed with status code {e.response.status_code}, and message = {e.response.text}",
             exc_info=True,
         )
+        if raise_errors:
+            raise
     except json.JSONDecodeError as e:
         logger.error(
             f"[BanasOperatedVisit({tag_no})] :: Response didn't gave a valid json, failed due to decoding error {str(e)}",
             exc_info=True,
         )
+        if raise_errors:
+            raise
     except Exception as e:
         logger.error(
             f"[BanasOperatedVisit({tag_no})] :: Request failed, due to error {str(e)}",
             exc_info=True,
         )
+        if raise_errors:
+            raise
 
 
 async def fetch_cvcc_health_details(
     tag_no: str,
     token: str,
     vendor_no: str = "9999999",
+    *,
+    skip_cache: bool = False,
+    raise_errors: bool = False,
 ) -> CvccHealthResponseModel | None:
-    """Returns validated CVCC health details or None on 204/error/empty."""
+    """Returns validated CVCC health details or None on 204/error/empty.
+    skip_cache forces a fresh HTTP fetch (the response is still written to the cache);
+    raise_errors re-raises a failed request instead of returning None."""
     cache_key = build_api_cache_key("cvcc_health", tag_no)
-    cache_hit, cached_payload = await get_cached_api_response(cache_key)
+    cache_hit, cached_payload = (False, None) if skip_cache else await get_cached_api_response(cache_key)
     if cache_hit:
         if cached_payload is None:
             return None
@@ -529,7 +644,7 @@ async def fetch_cvcc_health_details(
                 )
 
     try:
-        async with httpx.AsyncClient(timeout=FARMER_BACKEND_HTTP_TIMEOUT_SECONDS) as client:
+        async with _backend_client(BASE_CVCC) as client:
             response = await client.post(
                 BASE_CVCC,
                 headers={"Content-Type": "application/json"},
@@ -556,16 +671,22 @@ async def fetch_cvcc_health_details(
             f"[CVCC({tag_no})] :: Request failed with status code {e.response.status_code}, and message = {e.response.text}",
             exc_info=True,
         )
+        if raise_errors:
+            raise
     except json.JSONDecodeError as e:
         logger.error(
             f"[CVCC({tag_no})] :: Response didn't gave a valid json, failed due to decoding error {str(e)}",
             exc_info=True,
         )
+        if raise_errors:
+            raise
     except Exception as e:
         logger.error(
             f"[CVCC({tag_no})] :: Request failed, due to error {str(e)}",
             exc_info=True,
         )
+        if raise_errors:
+            raise
 
 
 async def create_ai_call_api(
@@ -589,7 +710,7 @@ async def create_ai_call_api(
             input=_ai_obs_input,
             metadata={"tool_backend": "amulpashudhan", "endpoint": "CreateAICall"},
         ) as ai_obs:
-            async with httpx.AsyncClient(timeout=FARMER_BACKEND_HTTP_TIMEOUT_SECONDS) as client:
+            async with _backend_client(api_url) as client:
                 response = await client.post(
                     api_url,
                     params=request.to_query_params(),
@@ -676,7 +797,7 @@ async def create_health_call_api(
             input=_health_obs_input,
             metadata={"tool_backend": "amulpashudhan", "endpoint": "CreateHealthCall"},
         ) as health_obs:
-            async with httpx.AsyncClient(timeout=FARMER_BACKEND_HTTP_TIMEOUT_SECONDS) as client:
+            async with _backend_client(api_url) as client:
                 response = await client.post(
                     api_url,
                     params=request.to_query_params(),
@@ -747,7 +868,7 @@ async def get_farmer_milk_collection_details_api(
             input=request.to_query_params(),
             metadata={"provider": "amulpashudhan", "url": api_url},
         ) as observation:
-            async with httpx.AsyncClient(timeout=FARMER_BACKEND_HTTP_TIMEOUT_SECONDS) as client:
+            async with _backend_client(api_url) as client:
                 response = await client.get(
                     api_url,
                     params=request.to_query_params(),
@@ -834,7 +955,7 @@ async def fetch_animal_herdman(tag_no: str, token: str) -> Optional[Dict[str, An
             input={"tag_no": tag_no},
             metadata={"provider": "herdman", "url": url},
         ) as observation:
-            async with httpx.AsyncClient(timeout=FARMER_BACKEND_HTTP_TIMEOUT_SECONDS) as client:
+            async with _backend_client(url) as client:
                 r = await client.get(
                     url,
                     params={"TagID": tag_no},
@@ -1017,7 +1138,7 @@ async def get_ai_technicians_by_society_api(
             input=query.to_query_params(),
             metadata={"provider": "amulpashudhan", "url": api_url},
         ) as observation:
-            async with httpx.AsyncClient(timeout=FARMER_BACKEND_HTTP_TIMEOUT_SECONDS) as client:
+            async with _backend_client(api_url) as client:
                 response = await client.get(
                     api_url,
                     params=query.to_query_params(),
@@ -25,6 +25,8 @@ logger = get_logger(__name__)
 # amul-oan-api (chat) overrides this to "chat".
 LOAN_CHANNEL = "chat"
 
+OUT_OF_SCOPE_MESSAGE = "This helpline only handles dairy farming and animal husbandry questions."
+
 
 async def prepare_check_loan_eligibility(
     ctx: RunContext[FarmerContext], tool_def: ToolDefinition
@@ -130,6 +132,13 @@ async def check_loan_eligibility(ctx: RunContext[FarmerContext], confirmed: bool
         confirmed: Set true ONLY after the farmer has explicitly agreed to avail the
             loan (their yes to the offer). Leave false for the initial eligibility/offer.
     """
+    # Issuing a code + SMS is IRREVERSIBLE. Chat starts the agent before the
+    # moderation verdict is known (as voice does), so block on it before the
+    # confirmed write. The offer step (confirmed=false) writes nothing.
+    if confirmed and not await ctx.deps.ensure_in_scope():
+        logger.info("Loan issue blocked: query failed moderation; session=%s", ctx.deps.session_id)
+        return OUT_OF_SCOPE_MESSAGE
+
     accounts = await _resolve_accounts(ctx)
     name: Optional[str] = None
     for acct in accounts:
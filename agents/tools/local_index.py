@@ -0,0 +1,515 @@
+"""
+In-process retrieval engine for ``search_documents`` (SEARCH_BACKEND=local).
+
+An alternative to the remote Marqo index: the vet KB is loaded from a snapshot
+on local disk and searched in the worker process, with no network hop. It
+serves the same three MARQO_SEARCH_MODE methods with the same request shape
+(``q``, ``limit``, ``search_method``, ``hybrid_parameters``, ``filter_string``)
+and returns Marqo-shaped hits, so everything after retrieval (rerank, diversity,
+result cache, formatting) is unchanged.
+
+A snapshot is a directory:
+
+- ``manifest.json``: format, embedding model, dimension, document count,
+  lexical fields, IVF list count;
+- ``documents.jsonl``: one hit per line (the fields Marqo would return);
+- ``embeddings.npy``: float32 ``[n, dim]``, L2-normalized, memory-mapped;
+- ``ivf_centroids.npy`` / ``ivf_assign.npy``: the ANN index, an inverted file
+  (k-means lists; a query scans the ``LOCAL_INDEX_NPROBE`` closest lists).
+  Small corpora get no lists and are scanned exactly;
+- ``postings_indptr.npy`` / ``postings_doc_idx.npy`` / ``postings_tf.npy`` /
+  ``doc_len.npy`` + ``vocab.json``: the BM25 inverted index (CSR: per term, the
+  documents containing it and their term frequencies), memory-mapped.
+
+Searches:
+
+- tensor: cosine similarity of the query embedding to the IVF candidates;
+- lexical: BM25 (k1/b and tokenization as ``search_rerank``) over the postings
+  of the query terms; only documents containing a term are returned;
+- hybrid: both, each to ``limit``, fused like Marqo's ``disjunction`` + ``rrf``:
+  ``alpha / (rrfK + tensor rank) + (1 - alpha) / (rrfK + lexical rank)``.
+
+``filter_string`` supports ``field:value`` terms joined by ``AND`` (all this
+service sends is ``is_reference:false``); anything else raises
+:class:`LocalIndexError`.
+
+LOCAL_INDEX_PATH holds the snapshot directories and a ``CURRENT`` file naming
+the live one. :func:`publish_snapshot` rewrites ``CURRENT`` atomically; every
+worker running :func:`start_local_index` (FastAPI lifespan) polls it each
+LOCAL_INDEX_RELOAD_SECONDS, loads a new snapshot (and its query model) off the
+event loop and swaps it in with one reference assignment. Searches already
+running finish on the snapshot they started with. Nothing is loaded on first
+use: until a snapshot is live, :func:`active_index` raises.
+
+Query embeddings come from the snapshot's model through the optional
+``sentence-transformers`` package, or from an embedder installed with
+:func:`set_query_embedder`. Without either, hybrid searches run lexical-only
+(logged once) and tensor searches fail. Embedding and scoring run in a worker
+thread: encoding a query is milliseconds of CPU the event loop must not wait on.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import json
+import os
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from agents.tools.search_rerank import B, K1, tokenize
+from app.config import settings
+from helpers.utils import get_logger
+
+logger = get_logger(__name__)
+
+SNAPSHOT_FORMAT = 2
+CURRENT_POINTER = "CURRENT"
+# Corpora smaller than this are scanned exactly (no IVF lists).
+IVF_MIN_DOCS = 2048
+_KMEANS_ITERATIONS = 20
+
+QueryEmbedder = Callable[[str], np.ndarray]
+
+
+class LocalIndexError(RuntimeError):
+    """The local index cannot serve a search (no snapshot, bad request)."""
+
+
+@dataclass(frozen=True)
+class _Postings:
+    vocab: Dict[str, int]
+    indptr: np.ndarray
+    doc_idx: np.ndarray
+    tf: np.ndarray
+    doc_len: np.ndarray
+    avg_len: float
+
+
+def _l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+def _top(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores, best first (ties by index)."""
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.size:
+        part = np.argpartition(-scores, k - 1)[:k]
+    else:
+        part = np.arange(scores.size)
+    return part[np.lexsort((part, -scores[part]))]
+
+
+class LocalIndex:
+    """One loaded snapshot. Immutable once built; safe to share between tasks."""
+
+    def __init__(
+        self,
+        snapshot_id: str,
+        manifest: Dict[str, Any],
+        documents: List[Dict[str, Any]],
+        embeddings: np.ndarray,
+        centroids: Optional[np.ndarray],
+        lists: List[np.ndarray],
+        postings: _Postings,
+    ):
+        self.snapshot_id = snapshot_id
+        self.manifest = manifest
+        self.documents = documents
+        self.embeddings = embeddings
+        self.centroids = centroids
+        self.lists = lists
+        self.postings = postings
+        self.field_names = sorted({key for doc in documents for key in doc})
+        self._masks: Dict[str, Optional[np.ndarray]] = {}
+
+    @property
+    def model(self) -> str:
+        return str(self.manifest.get("model") or "")
+
+    def capabilities(self) -> Dict[str, Any]:
+        """Same shape as ``search._capabilities_from_settings``."""
+        return {
+            "exists": True,
+            "tensor_fields": ["text"],
+            "has_text_tensor": True,
+            "has_text_for_embedding_tensor": False,
+            "has_is_reference_filter": "is_reference" in self.field_names,
+            "field_names": self.field_names,
+        }
+
+    # -- filters ---------------------------------------------------------
+
+    def _mask(self, filter_string: Optional[str]) -> Optional[np.ndarray]:
+        if not filter_string:
+            return None
+        if filter_string not in self._masks:
+            mask = np.ones(len(self.documents), dtype=bool)
+            for term in re.split(r"\s+AND\s+", filter_string.strip()):
+                field, sep, value = term.partition(":")
+                if not sep or not field or any(c in term for c in "()[]") or " " in field.strip():
+                    raise LocalIndexError(f"Unsupported filter for the local index: {filter_string!r}")
+                field, value = field.strip(), value.strip()
+                mask &= np.array([_filter_match(doc.get(field), value) for doc in self.documents], dtype=bool)
+            self._masks[filter_string] = mask
+        return self._masks[filter_string]
+
+    # -- retrieval -------------------------------------------------------
+
+    def tensor(self, query_vector: np.ndarray, limit: int, mask: Optional[np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+        query_vector = _l2_normalize(np.asarray(query_vector, dtype=np.float32).reshape(-1))
+        if self.centroids is not None and self.lists:
+            nprobe = min(max(1, settings.local_index_nprobe), len(self.lists))
+            probe = _top(self.centroids @ query_vector, nprobe)
+            candidates = np.concatenate([self.lists[i] for i in probe])
+        else:
+            candidates = np.arange(len(self.documents))
+        if mask is not None:
+            candidates = candidates[mask[candidates]]
+        scores = np.asarray(self.embeddings[candidates] @ query_vector, dtype=np.float64)
+        best = _top(scores, limit)
+        return candidates[best], scores[best]
+
+    def lexical(self, query: str, limit: int, mask: Optional[np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+        p = self.postings
+        n = len(self.documents)
+        scores = np.zeros(n, dtype=np.float64)
+        matched = np.zeros(n, dtype=bool)
+        norm = K1 * (1.0 - B + B * p.doc_len / (p.avg_len or 1.0))
+        for term in set(tokenize(query)):
+            term_id = p.vocab.get(term)
+            if term_id is None:
+                continue
+            start, end = int(p.indptr[term_id]), int(p.indptr[term_id + 1])
+            docs = p.doc_idx[start:end]
+            tf = p.tf[start:end].astype(np.float64)
+            idf = np.log1p((n - (end - start) + 0.5) / ((end - start) + 0.5))
+            scores[docs] += idf * tf * (K1 + 1.0) / (tf + norm[docs])
+            matched[docs] = True
+        if mask is not None:
+            matched &= mask
+        candidates = np.flatnonzero(matched)
+        best = _top(scores[candidates], limit)
+        return candidates[best], scores[candidates][best]
+
+    def search(self, params: Dict[str, Any], embed: Optional[QueryEmbedder]) -> List[Dict[str, Any]]:
+        """Run one search; ``params`` as sent to Marqo (client kwarg names)."""
+        query = str(params.get("q") or "")
+        limit = max(1, int(params.get("limit") or 10))
+        method = str(params.get("search_method") or "tensor").lower()
+        mask = self._mask(params.get("filter_string"))
+
+        if method == "lexical":
+            idx, scores = self.lexical(query, limit, mask)
+            return self._hits(idx, scores, {"_lexical_score": scores})
+        if method == "tensor":
+            if embed is None:
+                raise LocalIndexError("No query embedder for the local index; tensor search unavailable")
+            idx, scores = self.tensor(embed(query), limit, mask)
+            return self._hits(idx, scores, {"_tensor_score": scores})
+        if method != "hybrid":
+            raise LocalIndexError(f"Unsupported search method for the local index: {method}")
+
+        hybrid = params.get("hybrid_parameters") or {}
+        alpha = float(hybrid.get("alpha", 0.5))
+        rrf_k = float(hybrid.get("rrfK", 60))
+        lex_idx, lex_scores = self.lexical(query, limit, mask)
+        if embed is None:
+            _warn_lexical_only()
+            return self._hits(lex_idx, lex_scores, {"_lexical_score": lex_scores})
+        ten_idx, ten_scores = self.tensor(embed(query), limit, mask)
+
+        fused: Dict[int, float] = {}
+        extra: Dict[int, Dict[str, float]] = {}
+        for rank, (i, score) in enumerate(zip(ten_idx.tolist(), ten_scores.tolist()), start=1):
+            fused[i] = fused.get(i, 0.0) + alpha / (rrf_k + rank)
+            extra.setdefault(i, {})["_tensor_score"] = score
+        for rank, (i, score) in enumerate(zip(lex_idx.tolist(), lex_scores.tolist()), start=1):
+            fused[i] = fused.get(i, 0.0) + (1.0 - alpha) / (rrf_k + rank)
+            extra.setdefault(i, {})["_lexical_score"] = score
+        order = sorted(fused, key=lambda i: (-fused[i], i))[:limit]
+        hits = []
+        for i in order:
+            hit = dict(self.documents[i])
+            hit["_score"] = fused[i]
+            hit.update(extra[i])
+            hits.append(hit)
+        return hits
+
+    def _hits(self, idx: np.ndarray, scores: np.ndarray, extra: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+        hits = []
+        for pos, i in enumerate(idx.tolist()):
+            hit = dict(self.documents[i])
+            hit["_score"] = float(scores[pos])
+            for key, values in extra.items():
+                hit[key] = float(values[pos])
+            hits.append(hit)
+        return hits
+
+
+def _filter_match(value: Any, expected: str) -> bool:
+    if isinstance(value, bool):
+        return value is (expected.lower() == "true")
+    if value is None:
+        # Marqo treats a missing boolean as false for ``field:false``.
+        return expected.lower() == "false"
+    return str(value) == expected
+
+
+_lexical_only_warned = False
+
+
+def _warn_lexical_only() -> None:
+    global _lexical_only_warned
+    if not _lexical_only_warned:
+        _lexical_only_warned = True
+        logger.warning("Local index has no query embedder; hybrid searches run lexical-only")
+
+
+# -- snapshots ----------------------------------------------------------------
+
+
+def _kmeans(vectors: np.ndarray, k: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Spherical k-means: (centroids [k, dim], assignment [n])."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    assign = np.zeros(len(vectors), dtype=np.int32)
+    for _ in range(_KMEANS_ITERATIONS):
+        assign = np.argmax(vectors @ centroids.T, axis=1).astype(np.int32)
+        for c in range(k):
+            members = vectors[assign == c]
+            if len(members):
+                centroids[c] = members.mean(axis=0)
+        centroids = _l2_normalize(centroids)
+    return centroids, assign
+
+
+def build_snapshot(
+    root: Path | str,
+    documents: Sequence[Dict[str, Any]],
+    embeddings: np.ndarray,
+    *,
+    model: str,
+    lexical_fields: Iterable[str] = ("text",),
+    nlist: Optional[int] = None,
+    name: Optional[str] = None,
+) -> Path:
+    """Write a snapshot directory under ``root`` (not yet live; see
+    :func:`publish_snapshot`). ``nlist`` IVF lists; default ~sqrt(n), none
+    below IVF_MIN_DOCS documents."""
+    embeddings = _l2_normalize(np.asarray(embeddings, dtype=np.float32))
+    if embeddings.ndim != 2 or len(embeddings) != len(documents):
+        raise ValueError("embeddings must be [len(documents), dim]")
+    lexical_fields = list(lexical_fields)
+    n = len(documents)
+    if nlist is None:
+        nlist = int(round(n ** 0.5)) if n >= IVF_MIN_DOCS else 0
+    nlist = max(0, min(nlist, n))
+
+    name = name or f"snapshot-{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    path = Path(root) / name
+    tmp = Path(root) / f".{name}.tmp"
+    tmp.mkdir(parents=True)
+
+    with open(tmp / "documents.jsonl", "w", encoding="utf-8") as f:
+        for doc in documents:
+            f.write(json.dumps(doc, ensure_ascii=False) + "\n")
+    np.save(tmp / "embeddings.npy", embeddings)
+    if nlist:
+        centroids, assign = _kmeans(embeddings, nlist)
+        np.save(tmp / "ivf_centroids.npy", centroids.astype(np.float32))
+        np.save(tmp / "ivf_assign.npy", assign)
+
+    vocab: Dict[str, int] = {}
+    rows: List[tuple[int, int, int]] = []
+    doc_len = np.zeros(n, dtype=np.int32)
+    for i, doc in enumerate(documents):
+        tokens = tokenize(" ".join(str(doc.get(field) or "") for field in lexical_fields))
+        doc_len[i] = len(tokens)
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, count in counts.items():
+            rows.append((vocab.setdefault(token, len(vocab)), i, count))
+    rows.sort()
+    term_ids = np.array([r[0] for r in rows], dtype=np.int64)
+    indptr = np.searchsorted(term_ids, np.arange(len(vocab) + 1)).astype(np.int64)
+    # Separate .npy files: np.load memory-maps those, but not .npz members.
+    np.save(tmp / "postings_indptr.npy", indptr)
+    np.save(tmp / "postings_doc_idx.npy", np.array([r[1] for r in rows], dtype=np.int32))
+    np.save(tmp / "postings_tf.npy", np.array([r[2] for r in rows], dtype=np.int32))
+    np.save(tmp / "doc_len.npy", doc_len)
+    (tmp / "vocab.json").write_text(json.dumps(vocab, ensure_ascii=False), encoding="utf-8")
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "model": model,
+        "dim": int(embeddings.shape[1]),
+        "n_docs": n,
+        "lexical_fields": lexical_fields,
+        "nlist": nlist,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    (tmp / "manifest.json").write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def publish_snapshot(root: Path | str, name: str) -> None:
+    """Make snapshot ``name`` the live one (atomic ``CURRENT`` rewrite)."""
+    root = Path(root)
+    if not (root / name / "manifest.json").exists():
+        raise LocalIndexError(f"No snapshot {name!r} under {root}")
+    tmp = root / f".{CURRENT_POINTER}.{uuid.uuid4().hex[:8]}"
+    tmp.write_text(name + "\n", encoding="utf-8")
+    os.replace(tmp, root / CURRENT_POINTER)
+
+
+def current_snapshot_name(root: Path | str) -> Optional[str]:
+    try:
+        return (Path(root) / CURRENT_POINTER).read_text(encoding="utf-8").strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def load_snapshot(path: Path | str) -> LocalIndex:
+    """Load a snapshot directory; the large arrays stay memory-mapped."""
+    path = Path(path)
+    manifest = json.loads((path / "manifest.json").read_text(encoding="utf-8"))
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise LocalIndexError(f"Unsupported local index snapshot format {manifest.get('format')!r} in {path}")
+    with open(path / "documents.jsonl", encoding="utf-8") as f:
+        documents = [json.loads(line) for line in f if line.strip()]
+    embeddings = np.load(path / "embeddings.npy", mmap_mode="r")
+    centroids, lists = None, []
+    if (path / "ivf_centroids.npy").exists():
+        centroids = np.load(path / "ivf_centroids.npy")
+        assign = np.load(path / "ivf_assign.npy")
+        order = np.argsort(assign, kind="stable")
+        bounds = np.searchsorted(assign[order], np.arange(len(centroids) + 1))
+        lists = [order[bounds[c]:bounds[c + 1]] for c in range(len(centroids))]
+    doc_len = np.load(path / "doc_len.npy").astype(np.float64)
+    postings = _Postings(
+        vocab=json.loads((path / "vocab.json").read_text(encoding="utf-8")),
+        indptr=np.load(path / "postings_indptr.npy", mmap_mode="r"),
+        doc_idx=np.load(path / "postings_doc_idx.npy", mmap_mode="r"),
+        tf=np.load(path / "postings_tf.npy", mmap_mode="r"),
+        doc_len=doc_len,
+        avg_len=float(doc_len.mean()) if len(doc_len) else 0.0,
+    )
+    if len(documents) != len(embeddings) or len(documents) != len(doc_len):
+        raise LocalIndexError(f"Local index snapshot {path} is inconsistent")
+    return LocalIndex(path.name, manifest, documents, embeddings, centroids, lists, postings)
+
+
+# -- live index ---------------------------------------------------------------
+
+_active: Optional[LocalIndex] = None
+_reload_task: Optional[asyncio.Task] = None
+_embedder: Optional[QueryEmbedder] = None
+_model_embedders: Dict[str, Optional[QueryEmbedder]] = {}
+
+
+def set_query_embedder(embedder: Optional[QueryEmbedder]) -> None:
+    """Use ``embedder`` for query vectors instead of the snapshot's model."""
+    global _embedder
+    _embedder = embedder
+
+
+def _sentence_transformers_embedder(model: str) -> Optional[QueryEmbedder]:
+    """The query embedder for ``model``, built on first call. Blocking (the
+    model loads from disk): call it off the event loop."""
+    if model not in _model_embedders:
+        embedder = None
+        if model and importlib.util.find_spec("sentence_transformers") is not None:
+            try:
+                from sentence_transformers import SentenceTransformer
+
+                encoder = SentenceTransformer(model)
+                embedder = lambda text: encoder.encode(text, normalize_embeddings=True)  # noqa: E731
+            except Exception as e:
+                logger.warning("Local index: could not load query model %s: %s", model, e)
+        _model_embedders[model] = embedder
+    return _model_embedders[model]
+
+
+def activate(index: Optional[LocalIndex]) -> None:
+    """Swap the live index (one reference assignment)."""
+    global _active
+    _active = index
+    if index is not None:
+        logger.info("Local index: serving snapshot %s (%d documents)", index.snapshot_id, len(index.documents))
+
+
+def active_index() -> LocalIndex:
+    """The live index. Raises until :func:`reload_local_index` (run by the
+    lifespan) has loaded one; it is never loaded on the event loop."""
+    if _active is None:
+        raise LocalIndexError("No local index snapshot loaded (LOCAL_INDEX_PATH/CURRENT)")
+    return _active
+
+
+def _search_sync(params: Dict[str, Any], index: LocalIndex) -> List[Dict[str, Any]]:
+    embed = _embedder or _sentence_transformers_embedder(index.model)
+    return index.search(params, embed)
+
+
+async def search(params: Dict[str, Any], index: Optional[LocalIndex] = None) -> List[Dict[str, Any]]:
+    """Search ``index`` (default: the live one) in a worker thread."""
+    return await asyncio.to_thread(_search_sync, params, index or active_index())
+
+
+async def reload_local_index() -> bool:
+    """Load and swap in the snapshot ``CURRENT`` names, if it changed."""
+    root = settings.local_index_path
+    name = current_snapshot_name(root) if root else None
+    if not name or (_active is not None and _active.snapshot_id == name):
+        return False
+    index = await asyncio.to_thread(load_snapshot, Path(root) / name)
+    if _embedder is None:
+        # Load the query model before the swap, so no search waits on it.
+        await asyncio.to_thread(_sentence_transformers_embedder, index.model)
+    activate(index)
+    return True
+
+
+async def _reload_loop() -> None:
+    while True:
+        await asyncio.sleep(settings.local_index_reload_seconds)
+        try:
+            await reload_local_index()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Local index reload failed; keeping the current snapshot: %s", e)
+
+
+async def start_local_index() -> None:
+    """Load the live snapshot and watch for new ones (FastAPI lifespan).
+    A no-op unless SEARCH_BACKEND=local."""
+    global _reload_task
+    if (settings.search_backend or "").strip().lower() != "local" or _reload_task is not None:
+        return
+    try:
+        await reload_local_index()
+    except Exception as e:
+        logger.error("Local index: initial snapshot load failed: %s", e)
+    _reload_task = asyncio.create_task(_reload_loop())
+
+
+async def stop_local_index() -> None:
+    global _reload_task
+    task, _reload_task = _reload_task, None
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        pass
@@ -1,22 +1,49 @@
 """
 Marqo client implementation for vector search.
-The Marqo Python client is synchronous; we run it in asyncio.to_thread() to avoid
-blocking the event loop when serving many concurrent requests.
+Searches go straight to Marqo's REST API on the shared keep-alive "marqo"
+upstream pool (app/core/http_clients.py): no thread-pool hop and no new HTTP
+session per call. Index capabilities (tensor fields, whether is_reference can
+be filtered on) are probed on the same pool at startup and refreshed in the
+background, so no search waits on the probe.
+With SEARCH_BACKEND=local the same searches run in-process against a local
+snapshot instead (agents/tools/local_index.py).
 """
 import asyncio
 import re
-import marqo
-from typing import Any, Dict, List, Literal, Optional
+import time
+from typing import Any, Dict, List, Literal, Optional, Tuple
 from pydantic import BaseModel, Field
 from pydantic_ai import ModelRetry
 from helpers.utils import get_logger
+from app import metrics as _metrics
+from app.core.http_clients import upstream_client
 from app.observability import start_observation
 from app.config import settings
 # NOTE: This is a hack to add Gujarati terms to the search results.
 from agents.tools.terms import normalize_text_with_glossary
+from agents.services import search_cache
+from agents.tools import local_index
+from agents.tools.search_rerank import bm25_rerank
 
 logger = get_logger(__name__)
-_index_capabilities_cache: Dict[str, Dict[str, Any]] = {}
+# "endpoint::index" -> (capabilities, time.monotonic() they expire at)
+_index_capabilities_cache: Dict[str, Tuple[Dict[str, Any], float]] = {}
+_capability_probes: Dict[str, asyncio.Task] = {}
+_capability_refresh_task: Optional[asyncio.Task] = None
+# How long startup waits for the first probe before leaving it to finish in
+# the background (the first search then shares it).
+_CAPABILITY_WARMUP_TIMEOUT_SECONDS = 5.0
+MARQO_UPSTREAM = "marqo"
+# search_params use the Marqo Python client's search() kwarg names; these are
+# the REST body keys that client sends for them.
+_SEARCH_BODY_KEYS = {
+    "q": "q",
+    "limit": "limit",
+    "search_method": "searchMethod",
+    "hybrid_parameters": "hybridParameters",
+    "filter_string": "filter",
+}
+_marqo_searches_in_flight = 0
 _TOKEN_RE = re.compile(r"[\w\-]+", re.UNICODE)
 _GUJARATI_CHAR_RE = re.compile(r"[\u0A80-\u0AFF]")
 _REFUSAL_OR_META_PATTERNS = [
@@ -88,37 +115,80 @@ def _validate_search_query(query: str) -> str:
     return normalized
 
 
-def _marqo_search_sync(endpoint_url: str, index_name: str, search_params: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Synchronous Marqo search; call via asyncio.to_thread() from async code."""
-    client = marqo.Client(url=endpoint_url)
-    result = client.index(index_name).search(**search_params)
-    return result.get("hits", [])
+async def _marqo_search(endpoint_url: str, index_name: str, search_params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """POST one search to Marqo on the pooled client and return its hits.
 
-
-def _get_index_capabilities_sync(endpoint_url: str, index_name: str) -> Dict[str, Any]:
-    """
-    Fetch and cache index capabilities once per endpoint/index pair.
-    Useful for startup-like compatibility checks across index schema changes.
+    Sends the body ``marqo.Client(...).index(...).search(**search_params)``
+    would; any non-2xx response raises ``httpx.HTTPStatusError``. Latency (by
+    search method and outcome) and in-flight count go to ``app.metrics``.
     """
-    cache_key = f"{endpoint_url}::{index_name}"
-    cached = _index_capabilities_cache.get(cache_key)
-    if cached is not None:
-        return cached
+    global _marqo_searches_in_flight
+    body: Dict[str, Any] = {"showHighlights": True}
+    for key, value in search_params.items():
+        body[_SEARCH_BODY_KEYS.get(key, key)] = value
+    url = f"{endpoint_url.rstrip('/')}/indexes/{index_name}/search"
+    mode = search_params.get("search_method", "tensor")
+
+    outcome = "error"
+    started = time.perf_counter()
+    _marqo_searches_in_flight += 1
+    _metrics.set_marqo_search_in_flight(_marqo_searches_in_flight)
+    try:
+        async with upstream_client(MARQO_UPSTREAM, timeout=settings.marqo_http_timeout_seconds) as client:
+            response = await client.post(url, json=body)
+        response.raise_for_status()
+        hits = response.json().get("hits", [])
+        outcome = "ok"
+        return hits
+    finally:
+        _marqo_searches_in_flight -= 1
+        _metrics.set_marqo_search_in_flight(_marqo_searches_in_flight)
+        _metrics.observe_marqo_search(mode, outcome, time.perf_counter() - started)
+
 
-    client = marqo.Client(url=endpoint_url)
+async def _backend_search(
+    local: Optional[local_index.LocalIndex],
+    endpoint_url: str,
+    index_name: str,
+    search_params: Dict[str, Any],
+) -> List[Dict[str, Any]]:
+    if local is not None:
+        return await local_index.search(search_params, local)
+    return await _marqo_search(endpoint_url, index_name, search_params)
+
+
+def _capabilities_from_settings(index_settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Capabilities from ``GET /indexes/{name}/settings``.
+
+    Structured indexes list their fields; unstructured ones do not, so their
+    ``is_reference`` filter is left off rather than assumed.
+    """
+    tensor_fields = set(index_settings.get("tensorFields") or [])
+    all_fields = index_settings.get("allFields") or []
+    field_names = {f.get("name") for f in all_fields if isinstance(f, dict) and f.get("name")}
+    return {
+        "exists": True,
+        "index_type": index_settings.get("type", "unstructured"),
+        "tensor_fields": sorted(tensor_fields),
+        "has_text_tensor": "text" in tensor_fields,
+        "has_text_for_embedding_tensor": "text_for_embedding" in tensor_fields,
+        "has_is_reference_filter": "is_reference" in field_names,
+        "field_names": sorted(field_names),
+    }
+
+
+async def _probe_index_capabilities(endpoint_url: str, index_name: str) -> Dict[str, Any]:
+    """Fetch an index's capabilities on the pooled client. Never raises: a
+    failed probe returns ``exists: False`` with the error."""
+    url = f"{endpoint_url.rstrip('/')}/indexes/{index_name}/settings"
+    outcome = "error"
+    started = time.perf_counter()
     try:
-        index_info = client.get_index(index_name)
-        tensor_fields = set(index_info.get("tensorFields", []) if isinstance(index_info, dict) else [])
-        all_fields = index_info.get("allFields", []) if isinstance(index_info, dict) else []
-        field_names = {f.get("name") for f in all_fields if isinstance(f, dict) and f.get("name")}
-        capabilities = {
-            "exists": True,
-            "tensor_fields": sorted(tensor_fields),
-            "has_text_tensor": "text" in tensor_fields,
-            "has_text_for_embedding_tensor": "text_for_embedding" in tensor_fields,
-            "has_is_reference_filter": "is_reference" in field_names,
-            "field_names": sorted(field_names),
-        }
+        async with upstream_client(MARQO_UPSTREAM, timeout=settings.marqo_http_timeout_seconds) as client:
+            response = await client.get(url)
+        response.raise_for_status()
+        capabilities = _capabilities_from_settings(response.json())
+        outcome = "ok"
     except Exception as e:
         capabilities = {
             "exists": False,
@@ -129,11 +199,101 @@ def _get_index_capabilities_sync(endpoint_url: str, index_name: str) -> Dict[str
             "has_is_reference_filter": False,
             "field_names": [],
         }
+    finally:
+        _metrics.observe_marqo_capabilities_probe(outcome, time.perf_counter() - started)
+    return capabilities
+
+
+def _capabilities_ttl(capabilities: Dict[str, Any]) -> float:
+    if capabilities.get("exists"):
+        return float(settings.marqo_capabilities_ttl_seconds)
+    return float(settings.marqo_capabilities_negative_ttl_seconds)
 
-    _index_capabilities_cache[cache_key] = capabilities
+
+async def refresh_index_capabilities(endpoint_url: str, index_name: str) -> Dict[str, Any]:
+    """Probe an index now and cache the result: MARQO_CAPABILITIES_TTL_SECONDS
+    if it was found, MARQO_CAPABILITIES_NEGATIVE_TTL_SECONDS if not. A changed
+    schema also retires the index's cached search results."""
+    cache_key = f"{endpoint_url}::{index_name}"
+    capabilities = await _probe_index_capabilities(endpoint_url, index_name)
+    previous = _index_capabilities_cache.get(cache_key)
+    _index_capabilities_cache[cache_key] = (capabilities, time.monotonic() + _capabilities_ttl(capabilities))
+    if not capabilities.get("exists"):
+        logger.warning("Could not inspect index '%s': %s", index_name, capabilities.get("error"))
+    elif previous is not None and previous[0].get("exists") and previous[0] != capabilities:
+        logger.info("Index '%s' capabilities changed; retiring its cached search results", index_name)
+        await search_cache.invalidate_search_cache(index_name)
     return capabilities
 
 
+def _refresh_index_capabilities_once(endpoint_url: str, index_name: str) -> asyncio.Task:
+    """The in-flight probe of this index, started if there is none."""
+    cache_key = f"{endpoint_url}::{index_name}"
+    task = _capability_probes.get(cache_key)
+    if task is None or task.done():
+        task = _capability_probes[cache_key] = asyncio.create_task(refresh_index_capabilities(endpoint_url, index_name))
+    return task
+
+
+async def _index_capabilities(endpoint_url: str, index_name: str) -> Dict[str, Any]:
+    """Cached capabilities of an index. An expired entry is served while a
+    background probe refreshes it; only a worker with no entry at all (the
+    startup warmup has not finished) waits for a probe."""
+    entry = _index_capabilities_cache.get(f"{endpoint_url}::{index_name}")
+    if entry is None:
+        return await asyncio.shield(_refresh_index_capabilities_once(endpoint_url, index_name))
+    capabilities, expires_at = entry
+    if time.monotonic() >= expires_at:
+        _refresh_index_capabilities_once(endpoint_url, index_name)
+    return capabilities
+
+
+async def _capability_refresh_loop(endpoint_url: str, index_name: str) -> None:
+    cache_key = f"{endpoint_url}::{index_name}"
+    while True:
+        entry = _index_capabilities_cache.get(cache_key)
+        delay = entry[1] - time.monotonic() if entry else settings.marqo_capabilities_negative_ttl_seconds
+        await asyncio.sleep(max(delay, 0.1))
+        try:
+            await asyncio.shield(_refresh_index_capabilities_once(endpoint_url, index_name))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Index capability refresh failed for '%s': %s", index_name, e)
+
+
+async def start_index_capability_refresher() -> None:
+    """Probe the configured Marqo index and keep its capabilities fresh
+    (FastAPI lifespan). A no-op when searches do not go to Marqo."""
+    global _capability_refresh_task
+    if _capability_refresh_task is not None or settings.enable_network:
+        return
+    if (settings.search_backend or "marqo").strip().lower() == "local" or not settings.marqo_endpoint_url:
+        return
+    endpoint_url = settings.marqo_endpoint_url
+    index_name = settings.marqo_index_name or "amul-veterinary-index"
+    warmup = _refresh_index_capabilities_once(endpoint_url, index_name)
+    try:
+        await asyncio.wait_for(asyncio.shield(warmup), timeout=_CAPABILITY_WARMUP_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.warning("Index capability warmup for '%s' still running; continuing startup", index_name)
+    _capability_refresh_task = asyncio.create_task(_capability_refresh_loop(endpoint_url, index_name))
+
+
+async def stop_index_capability_refresher() -> None:
+    global _capability_refresh_task
+    task, _capability_refresh_task = _capability_refresh_task, None
+    pending = [t for t in [task, *_capability_probes.values()] if t is not None and not t.done()]
+    _capability_probes.clear()
+    for t in pending:
+        t.cancel()
+    for t in pending:
+        try:
+            await t
+        except (asyncio.CancelledError, Exception):
+            pass
+
+
 def _prepare_query_for_e5(query: str) -> str:
     cleaned = query.strip()
     if cleaned.lower().startswith("query:"):
@@ -293,7 +453,8 @@ def _metadata_blob(hit: Dict[str, Any]) -> str:
     )
 
 
-def _rerank_hits(query: str, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def _overlap_rerank_hits(query: str, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The original token-overlap reranker (MARQO_RERANK_MODE=overlap)."""
     if not hits:
         return hits
 
@@ -322,6 +483,11 @@ def _rerank_hits(query: str, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]
     rescored.sort(key=lambda x: float(x.get("_rerank_score", 0.0)), reverse=True)
     return rescored
 
+
+def _rerank_hits(query: str, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """BM25 rerank of the Marqo candidates (see agents.tools.search_rerank)."""
+    return bm25_rerank(query, hits)
+
 DocumentType = Literal['video', 'document']
 
 class SearchHit(BaseModel):
@@ -355,6 +521,27 @@ class SearchHit(BaseModel):
         return f"**{self.name}**\n" + "```\n" + self.processed_text +  "\n```\n"
 
 
+def _served_hit(hit: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a Marqo hit to the SearchHit fields that are served (and cached)."""
+    return {
+        "name": hit.get("name") or hit.get("name_en") or hit.get("name_gu") or hit.get("filename", ""),
+        "text": hit.get("text", ""),
+        "doc_id": hit.get("doc_id", hit.get("_id", "")),
+        "type": hit.get("type", "document"),
+        "source": hit.get("source", ""),
+        "score": hit.get("_rerank_score", hit.get("_score", hit.get("score", 0.0))),
+        "id": hit.get("_id", hit.get("id", "")),
+    }
+
+
+def _format_search_results(query: str, served_hits: List[Dict[str, Any]]) -> str:
+    if len(served_hits) == 0:
+        return f"No results found for `{query}`"
+    search_hits = [SearchHit(**hit) for hit in served_hits]
+    document_string = '\n\n----\n\n'.join([str(document) for document in search_hits])
+    return "> Search Results for `" + query + "`\n\n" + document_string
+
+
 async def search_documents(
     query: str,
     top_k: int = 8,
@@ -392,14 +579,22 @@ async def search_documents(
             from agents.tools.beckn_network import network_search_documents
             logger.info("enable_network=on → vet-KB search via Beckn network query=%s", query)
             return await network_search_documents(query, top_k)
-        endpoint_url = settings.marqo_endpoint_url
-        if not endpoint_url:
-            raise ValueError("Marqo endpoint URL is required")
-        index_name = settings.marqo_index_name or "amul-veterinary-index"
-        if not index_name:
-            raise ValueError("Marqo index name is required")
-
-        capabilities = await asyncio.to_thread(_get_index_capabilities_sync, endpoint_url, index_name)
+        local = None
+        if (settings.search_backend or "marqo").strip().lower() == "local":
+            # One snapshot for the whole search, even if a new one is swapped in.
+            local = local_index.active_index()
+            endpoint_url = f"local://{settings.local_index_path}"
+            index_name = f"local:{local.snapshot_id}"
+            capabilities = local.capabilities()
+        else:
+            endpoint_url = settings.marqo_endpoint_url
+            if not endpoint_url:
+                raise ValueError("Marqo endpoint URL is required")
+            index_name = settings.marqo_index_name or "amul-veterinary-index"
+            if not index_name:
+                raise ValueError("Marqo index name is required")
+
+            capabilities = await _index_capabilities(endpoint_url, index_name)
         if capabilities.get("exists"):
             logger.info(
                 "Index capabilities: tensor_fields=%s, text_tensor=%s, text_for_embedding_tensor=%s, has_is_reference=%s",
@@ -452,7 +647,34 @@ async def search_documents(
         if exclude_reference_chunks and capabilities.get("has_is_reference_filter", False):
             search_params["filter_string"] = "is_reference:false"
 
-        # Marqo client is sync; run in thread pool to avoid blocking the event loop.
+        rerank_mode = (settings.marqo_rerank_mode or "bm25lite").strip().lower()
+        cache_keys = search_cache.search_cache_keys(
+            expanded_query,
+            index_name=index_name,
+            search_mode=search_mode,
+            top_k=final_top_k,
+            retrieval={
+                "search_params": {k: v for k, v in search_params.items() if k != "q"},
+                "e5_prefix": use_e5_query_prefix,
+                "expansion_profile": query_expansion_profile,
+                "rerank_mode": rerank_mode,
+                "rerank_idf_path": settings.marqo_rerank_idf_path,
+                "max_per_doc": max_per_doc,
+            },
+        )
+        cached_hits, cache_generation = await search_cache.lookup(index_name, cache_keys)
+        if cached_hits is not None:
+            logger.info(
+                "Search served from cache: query=%s mode=%s top_k=%s hits=%s",
+                query,
+                search_mode,
+                final_top_k,
+                len(cached_hits),
+            )
+            return _format_search_results(query, cached_hits)
+
+        started = time.perf_counter()
+        fell_back = False
         # Wrapped in start_observation (bucket C central span) — no-op when Langfuse off.
         with start_observation(
             "marqo_search",
@@ -466,12 +688,11 @@ async def search_documents(
             },
         ) as observation:
             try:
-                results = await asyncio.to_thread(
-                    _marqo_search_sync, endpoint_url, index_name, search_params
-                )
+                results = await _backend_search(local, endpoint_url, index_name, search_params)
             except Exception as e:
                 if search_mode == "hybrid":
                     logger.warning("Hybrid search failed, retrying with tensor search for query '%s'", query)
+                    fell_back = True
                     fallback_params = {
                         "q": effective_query,
                         "limit": search_limit,
@@ -490,9 +711,7 @@ async def search_documents(
                                 "tool": "search_documents",
                             }
                         )
-                    results = await asyncio.to_thread(
-                        _marqo_search_sync, endpoint_url, index_name, fallback_params
-                    )
+                    results = await _backend_search(local, endpoint_url, index_name, fallback_params)
                 else:
                     if observation is not None:
                         observation.update(
@@ -518,10 +737,12 @@ async def search_documents(
                     },
                 )
 
-        rerank_mode = (settings.marqo_rerank_mode or "bm25lite").strip().lower()
-        if rerank_mode not in {"off", "none", "disabled"}:
+        if rerank_mode == "overlap":
+            results = _overlap_rerank_hits(query, results)
+        elif rerank_mode not in {"off", "none", "disabled"}:
             results = _rerank_hits(query, results)
         results = _apply_doc_diversity(results, top_k=final_top_k, max_per_doc=max_per_doc)
+        served_hits = [_served_hit(hit) for hit in results]
 
         logger.info(
             "Search completed: query=%s expanded_query=%s mode=%s top_k=%s hits=%s profile=%s",
@@ -533,26 +754,13 @@ async def search_documents(
             query_expansion_profile,
         )
 
-        if len(results) == 0:
-            return f"No results found for `{query}`"
-        else:
-            # Process hits and handle missing fields
-            search_hits = []
-            for hit in results:
-                # Map Marqo fields to our model
-                processed_hit = {
-                    "name": hit.get("name") or hit.get("name_en") or hit.get("name_gu") or hit.get("filename", ""),
-                    "text": hit.get("text", ""),
-                    "doc_id": hit.get("doc_id", hit.get("_id", "")),
-                    "type": hit.get("type", "document"),
-                    "source": hit.get("source", ""),
-                    "score": hit.get("_rerank_score", hit.get("_score", hit.get("score", 0.0))),
-                    "id": hit.get("_id", hit.get("id", ""))
-                }
-                search_hits.append(SearchHit(**processed_hit))            
-            # Convert back to dict format for compatibility
-            document_string = '\n\n----\n\n'.join([str(document) for document in search_hits])
-            return "> Search Results for `" + query + "`\n\n" + document_string
+        # Empty and fallback (tensor instead of hybrid) results are not cached,
+        # so a transient index or Marqo problem is never replayed from the cache.
+        if served_hits and not fell_back:
+            await search_cache.store(
+                cache_keys, cache_generation, served_hits, seconds=time.perf_counter() - started
+            )
+        return _format_search_results(query, served_hits)
     except Exception as e:
         logger.error(f"Error searching documents: {e} for query: {query}")
         raise ModelRetry(f"Error searching documents, please try again")
@@ -0,0 +1,248 @@
+"""
+BM25 reranking of Marqo candidates for ``search_documents``.
+
+The first reranker scored every candidate with the share of query tokens found
+in its text and in a blob of ten metadata fields, re-tokenizing both with a
+regex per hit on every search (up to ``MARQO_CANDIDATE_CAP`` hits). Here:
+
+- each document's term frequencies and lengths (text and metadata) are
+  computed once and kept in a bounded LRU keyed by Marqo ``_id`` plus a hash of
+  the indexed fields, so an edited chunk is never scored from stale stats;
+- BM25 (k1=1.2, b=0.75) is computed for all candidates at once with NumPy:
+  a candidates x query-terms frequency matrix, saturated and IDF-weighted;
+- IDF comes from a corpus snapshot (MARQO_RERANK_IDF_PATH, see
+  :class:`IdfSnapshot`) when one is configured, and otherwise from the
+  candidate pool itself.
+
+The final score keeps the first reranker's blend: 0.62 semantic (Marqo score,
+min-max over the candidates) + 0.30 lexical + 0.08 metadata, minus 0.12 for
+reference chunks. Lexical scores are BM25 divided by the larger of the best
+candidate's score and the sum of the query's IDFs (an average-length document
+containing every query term once), so they stay within [0, 1] without
+inflating a pool of weak matches.
+"""
+from __future__ import annotations
+
+import json
+import re
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.config import settings
+from helpers.utils import get_logger
+
+logger = get_logger(__name__)
+
+K1 = 1.2
+B = 0.75
+SEMANTIC_WEIGHT = 0.62
+LEXICAL_WEIGHT = 0.30
+METADATA_WEIGHT = 0.08
+REFERENCE_PENALTY = -0.12
+
+# Same tokens as search._tokenize (which also collapses whitespace first; the
+# token regex never matches whitespace, so that step is skipped here).
+_TOKEN_RE = re.compile(r"[\w\-]+", re.UNICODE)
+METADATA_FIELDS = (
+    "name",
+    "name_en",
+    "name_gu",
+    "filename",
+    "title_en",
+    "title_gu",
+    "category_tags",
+    "description",
+    "doc_short_description",
+    "doc_llm_description",
+)
+
+
+def tokenize(value: str) -> List[str]:
+    return _TOKEN_RE.findall((value or "").lower())
+
+
+@dataclass(frozen=True)
+class DocStats:
+    text_tf: Dict[str, int]
+    text_len: int
+    meta_tf: Dict[str, int]
+    meta_len: int
+
+
+def _fields(hit: Dict[str, Any]) -> tuple[str, str]:
+    text = str(hit.get("text") or "")
+    metadata = " ".join(str(hit.get(k) or "") for k in METADATA_FIELDS)
+    return text, metadata
+
+
+def _compute_stats(text: str, metadata: str) -> DocStats:
+    text_tokens = tokenize(text)
+    meta_tokens = tokenize(metadata)
+    return DocStats(Counter(text_tokens), len(text_tokens), Counter(meta_tokens), len(meta_tokens))
+
+
+_doc_stats: "OrderedDict[tuple[str, int], DocStats]" = OrderedDict()
+
+
+def doc_stats(hit: Dict[str, Any]) -> DocStats:
+    """Token statistics of one hit, cached by ``_id`` and field contents."""
+    text, metadata = _fields(hit)
+    doc_id = str(hit.get("_id") or "")
+    limit = settings.marqo_rerank_doc_cache_size
+    if not doc_id or limit <= 0:
+        return _compute_stats(text, metadata)
+    key = (doc_id, hash((text, metadata)))
+    stats = _doc_stats.get(key)
+    if stats is not None:
+        _doc_stats.move_to_end(key)
+        return stats
+    stats = _doc_stats[key] = _compute_stats(text, metadata)
+    while len(_doc_stats) > limit:
+        _doc_stats.popitem(last=False)
+    return stats
+
+
+def clear_doc_stats() -> None:
+    _doc_stats.clear()
+
+
+@dataclass(frozen=True)
+class IdfSnapshot:
+    """Corpus-level document frequencies for IDF, per field.
+
+    Stored as JSON: ``{"n_docs": N, "avg_text_len": ..., "avg_meta_len": ...,
+    "text_df": {term: df}, "meta_df": {term: df}}``.
+    """
+
+    n_docs: int
+    avg_text_len: float
+    avg_meta_len: float
+    text_df: Dict[str, int]
+    meta_df: Dict[str, int]
+
+    @classmethod
+    def from_documents(cls, docs: Iterable[Dict[str, Any]]) -> "IdfSnapshot":
+        n = 0
+        text_len = meta_len = 0
+        text_df: Counter = Counter()
+        meta_df: Counter = Counter()
+        for doc in docs:
+            stats = _compute_stats(*_fields(doc))
+            n += 1
+            text_len += stats.text_len
+            meta_len += stats.meta_len
+            text_df.update(stats.text_tf.keys())
+            meta_df.update(stats.meta_tf.keys())
+        return cls(n, text_len / max(n, 1), meta_len / max(n, 1), dict(text_df), dict(meta_df))
+
+    def to_json(self) -> dict:
+        return {
+            "n_docs": self.n_docs,
+            "avg_text_len": self.avg_text_len,
+            "avg_meta_len": self.avg_meta_len,
+            "text_df": self.text_df,
+            "meta_df": self.meta_df,
+        }
+
+
+@lru_cache(maxsize=4)
+def load_idf_snapshot(path: str) -> Optional[IdfSnapshot]:
+    """The snapshot at ``path``; None (candidate-pool IDF) if it is unreadable."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+        return IdfSnapshot(
+            int(raw["n_docs"]),
+            float(raw["avg_text_len"]),
+            float(raw["avg_meta_len"]),
+            {str(k): int(v) for k, v in raw["text_df"].items()},
+            {str(k): int(v) for k, v in raw["meta_df"].items()},
+        )
+    except Exception as e:
+        logger.warning("Ignoring unreadable rerank IDF snapshot %s: %s", path, e)
+        return None
+
+
+def _idf(n_docs: int, df: np.ndarray) -> np.ndarray:
+    # Lucene's non-negative BM25 IDF.
+    return np.log1p((n_docs - df + 0.5) / (df + 0.5))
+
+
+def _bm25(tf: np.ndarray, lengths: np.ndarray, avg_len: float, idf: np.ndarray) -> np.ndarray:
+    norm = K1 * (1.0 - B + B * lengths / (avg_len or 1.0))
+    return ((tf * (K1 + 1.0)) / (tf + norm[:, None])) @ idf
+
+
+def _field_scores(
+    terms: List[str],
+    tfs: List[Dict[str, int]],
+    lengths: List[int],
+    snapshot_df: Optional[Dict[str, int]],
+    snapshot_n: int,
+    snapshot_avg: float,
+) -> np.ndarray:
+    tf = np.array([[doc.get(term, 0) for term in terms] for doc in tfs], dtype=np.float64)
+    length = np.asarray(lengths, dtype=np.float64)
+    if snapshot_df is not None:
+        df = np.array([snapshot_df.get(term, 0) for term in terms], dtype=np.float64)
+        idf = _idf(snapshot_n, df)
+        avg_len = snapshot_avg
+    else:
+        idf = _idf(len(tfs), (tf > 0).sum(axis=0).astype(np.float64))
+        avg_len = float(length.mean()) if len(tfs) else 0.0
+    scores = _bm25(tf, length, avg_len, idf)
+    scale = max(float(scores.max(initial=0.0)), float(idf.sum()))
+    return scores / scale if scale > 0 else scores
+
+
+def bm25_rerank(query: str, hits: List[Dict[str, Any]], snapshot: Optional[IdfSnapshot] = None) -> List[Dict[str, Any]]:
+    """``hits`` re-sorted by the blended score, each copied with ``_rerank_score``."""
+    if not hits:
+        return hits
+    if snapshot is None and settings.marqo_rerank_idf_path:
+        snapshot = load_idf_snapshot(settings.marqo_rerank_idf_path)
+
+    raw = np.array([float(h.get("_score", h.get("score", 0.0)) or 0.0) for h in hits], dtype=np.float64)
+    spread = float(raw.max() - raw.min())
+    semantic = (raw - raw.min()) / (spread if spread > 0 else 1.0)
+
+    terms = sorted(set(tokenize(query)))
+    if terms:
+        stats = [doc_stats(hit) for hit in hits]
+        lexical_text = _field_scores(
+            terms,
+            [s.text_tf for s in stats],
+            [s.text_len for s in stats],
+            snapshot.text_df if snapshot else None,
+            snapshot.n_docs if snapshot else 0,
+            snapshot.avg_text_len if snapshot else 0.0,
+        )
+        lexical_meta = _field_scores(
+            terms,
+            [s.meta_tf for s in stats],
+            [s.meta_len for s in stats],
+            snapshot.meta_df if snapshot else None,
+            snapshot.n_docs if snapshot else 0,
+            snapshot.avg_meta_len if snapshot else 0.0,
+        )
+    else:
+        lexical_text = lexical_meta = np.zeros(len(hits))
+    reference = np.array([bool(h.get("is_reference", False)) for h in hits])
+
+    scores = (
+        SEMANTIC_WEIGHT * semantic
+        + LEXICAL_WEIGHT * np.maximum(lexical_text, lexical_meta)
+        + METADATA_WEIGHT * lexical_meta
+        + np.where(reference, REFERENCE_PENALTY, 0.0)
+    )
+    rescored: List[Dict[str, Any]] = []
+    for i in np.argsort(-scores, kind="stable"):
+        enriched = dict(hits[i])
+        enriched["_rerank_score"] = float(scores[i])
+        rescored.append(enriched)
+    return rescored
+
@@ -2,6 +2,8 @@ import json
 from pathlib import Path
 from enum import Enum
 from pydantic import BaseModel, Field, field_validator
+from dataclasses import dataclass
+from functools import lru_cache
 from rapidfuzz import fuzz
 import re
 from helpers.utils import get_logger
@@ -231,6 +233,94 @@ CANONICAL_TERMS, ALIAS_TO_CANONICAL_EN = _build_canonical_alias_map()
 CANONICAL_ALIAS_TERMS = list(ALIAS_TO_CANONICAL_EN.keys())
 
 
+class _RatioIndex:
+    """Prebuilt index answering ``process.extractOne(query, terms,
+    scorer=fuzz.ratio, score_cutoff=c)`` without scoring every term.
+
+    ``fuzz.ratio`` is the normalized InDel similarity, so a cutoff caps the edit
+    distance ``d`` between query and term: their lengths differ by at most ``d``
+    and, since each edit destroys at most two character bigrams, they share at
+    least ``max(len) - 1 - 2*d`` bigrams. A term sharing that many must contain
+    one of the query's ``len(query) - 1 - need + 1`` *rarest* bigrams (prefix
+    filtering), so only those bigrams' short posting lists are read. Survivors,
+    kept in glossary order so ties resolve exactly as before, go to rapidfuzz;
+    an exact hit skips scoring. Queries too short for the bound to prune fall
+    back to the full scan. Results are memoized per ``(query, cutoff)``: the
+    same phrases recur across batches and turns.
+    """
+
+    def __init__(self, terms: list[str]):
+        self.terms = list(terms)
+        self._exact: dict[str, int] = {}
+        self._postings: dict[str, list[int]] = {}
+        self._need_cache: dict[tuple[int, float], int] = {}
+        self._min_len = min((len(t) for t in self.terms), default=0)
+        self._max_len = max((len(t) for t in self.terms), default=0)
+        for i, term in enumerate(self.terms):
+            self._exact.setdefault(term, i)
+            for gram in set(_bigrams(term)):
+                self._postings.setdefault(gram, []).append(i)
+        self._rarity = {gram: len(ids) for gram, ids in self._postings.items()}
+        self.extract_one = lru_cache(maxsize=4096)(self._extract_one)
+
+    def _min_shared_bigrams(self, n: int, score_cutoff: float) -> int:
+        """Fewest bigrams any term that can reach ``score_cutoff`` shares with
+        a length-``n`` query (<= 0: the bound cannot prune)."""
+        key = (n, score_cutoff)
+        cached = self._need_cache.get(key)
+        if cached is not None:
+            return cached
+        slack = (100.0 - score_cutoff) / 100.0
+        need = None
+        for m in range(max(self._min_len, 0), self._max_len + 1):
+            # The epsilon keeps float rounding from ever pruning a boundary match.
+            d = int((n + m) * slack + 1e-6)
+            if abs(n - m) > d:
+                continue
+            bound = max(n, m) - 1 - 2 * d
+            need = bound if need is None else min(need, bound)
+        need = 0 if need is None else need
+        self._need_cache[key] = need
+        return need
+
+    def _extract_one(self, query: str, score_cutoff: float):
+        """Same ``(term, score, index)`` / ``None`` as the full ``extractOne`` scan."""
+        hit = self._exact.get(query)
+        if hit is not None:
+            return (query, 100.0, hit)
+        need = self._min_shared_bigrams(len(query), score_cutoff)
+        if need <= 0:
+            return process.extractOne(query, self.terms, score_cutoff=score_cutoff, scorer=fuzz.ratio)
+        grams = _bigrams(query)
+        postings = self._postings
+        rarity = self._rarity
+        grams.sort(key=lambda g: rarity.get(g, 0))
+        candidates: set[int] = set()
+        for gram in grams[: len(grams) - need + 1]:
+            candidates.update(postings.get(gram, ()))
+        if not candidates:
+            return None
+        ordered = sorted(candidates)
+        match = process.extractOne(
+            query,
+            [self.terms[i] for i in ordered],
+            score_cutoff=score_cutoff,
+            scorer=fuzz.ratio,
+        )
+        if not match:
+            return None
+        return (match[0], match[1], ordered[match[2]])
+
+
+def _bigrams(text: str) -> list[str]:
+    return [text[i:i + 2] for i in range(len(text) - 1)]
+
+
+EN_TERMS_INDEX = _RatioIndex(EN_TERMS)
+HI_EN_TERMS_INDEX = _RatioIndex(HI_EN_TERMS)
+CANONICAL_ALIAS_INDEX = _RatioIndex(CANONICAL_ALIAS_TERMS)
+
+
 def _tokenize_lookup_key(text: str) -> list[str]:
     return [token for token in re.split(r"[\s/\-().&]+", _normalize_lookup_key(text)) if token]
 
@@ -268,6 +358,8 @@ def normalize_text_with_glossary(text: str, threshold=97):
     """
     Append Gujarati term in brackets next to English glossary terms. Preserves formatting & avoids spacing issues.
     NOTE: Adds about 100ms of latency to the search results. Can it be optimized?
+    (The fuzz.ratio fallback now goes through EN_TERMS_INDEX; the WRatio alias
+    scan is still a full pass over CANONICAL_ALIAS_TERMS.)
     """
 
     def replacer(match):
@@ -284,8 +376,8 @@ def normalize_text_with_glossary(text: str, threshold=97):
             if alias_match and alias_match[0]:
                 gujarati = CANONICAL_TERMS[ALIAS_TO_CANONICAL_EN[alias_match[0]]][1]
             else:
-                match_term, score, _ = process.extractOne(
-                    lw, EN_TERMS, score_cutoff=threshold, scorer=fuzz.ratio
+                match_term, score, _ = EN_TERMS_INDEX.extract_one(
+                    lw, score_cutoff=threshold
                 ) or (None, 0, None)
                 if not match_term:
                     return word
@@ -313,6 +405,8 @@ def get_mini_glossary_for_text(
 
     Uses word and multi-word phrase spans (1–4 words) from the text, fuzzy-matched
     against the target glossary index, so Gemma can use consistent terminology.
+    Fuzzy lookups go through the prebuilt ``_RatioIndex``es, which score only the
+    handful of terms that can clear the cutoff (same result as a full scan).
 
     Args:
         text: The sentence or batch to be translated (English).
@@ -330,10 +424,12 @@ def get_mini_glossary_for_text(
     if normalized_target == "hi":
         target_en_index = HI_EN_INDEX
         target_en_terms = HI_EN_TERMS
+        target_terms_index = HI_EN_TERMS_INDEX
         target_value_field = "hi"
     else:
         target_en_index = EN_INDEX
         target_en_terms = EN_TERMS
+        target_terms_index = EN_TERMS_INDEX
         target_value_field = "gu"
     if not target_en_terms:
         return ""
@@ -359,11 +455,8 @@ def get_mini_glossary_for_text(
             if not canonical_en or canonical_en not in target_en_index:
                 alias_match = None
                 if n >= 2 and len(normalized_phrase) >= 6:
-                    alias_match = process.extractOne(
-                        normalized_phrase,
-                        CANONICAL_ALIAS_TERMS,
-                        score_cutoff=score_cutoff,
-                        scorer=fuzz.ratio,
+                    alias_match = CANONICAL_ALIAS_INDEX.extract_one(
+                        normalized_phrase, score_cutoff=score_cutoff,
                     )
                 if alias_match and _has_meaningful_token_overlap(normalized_phrase, alias_match[0]):
                     canonical_en = ALIAS_TO_CANONICAL_EN.get(alias_match[0])
@@ -385,11 +478,8 @@ def get_mini_glossary_for_text(
                         continue
                     match = (exact_term.en.lower(), 100, None)
                 else:
-                    match = process.extractOne(
-                        normalized_phrase,
-                        target_en_terms,
-                        score_cutoff=score_cutoff,
-                        scorer=fuzz.ratio,
+                    match = target_terms_index.extract_one(
+                        normalized_phrase, score_cutoff=score_cutoff,
                     )
                     if match and not _has_meaningful_token_overlap(normalized_phrase, match[0]):
                         match = None
@@ -437,6 +527,73 @@ def _load_ambiguity_terms() -> list:
 _AMBIGUITY_TERMS = _load_ambiguity_terms()
 
 
+@dataclass(frozen=True)
+class _AmbiguityIndex:
+    """``ambiguity_terms.json`` flattened once: every lowered/stripped trigger
+    with the entry it belongs to, so a lookup is one literal pass plus one
+    rapidfuzz batch call instead of a Python loop of ``partial_ratio`` calls."""
+
+    rules: tuple[str, ...]
+    is_ask: tuple[bool, ...]
+    triggers: tuple[str, ...]
+    owners: tuple[int, ...]
+
+
+def _compile_ambiguity_terms(raw: list) -> _AmbiguityIndex:
+    rules, is_ask, triggers, owners = [], [], [], []
+    for entry in raw:
+        gu_terms = entry.get("gu_terms", [])
+        rule = entry.get("rule", "").strip()
+        if not rule or not gu_terms:
+            continue
+        for term in gu_terms:
+            text = term.lower().strip()
+            if text:
+                triggers.append(text)
+                owners.append(len(rules))
+        rules.append(rule)
+        is_ask.append(entry.get("type") == "ask")
+    return _AmbiguityIndex(tuple(rules), tuple(is_ask), tuple(triggers), tuple(owners))
+
+
+_AMBIGUITY_INDEX = _compile_ambiguity_terms(_AMBIGUITY_TERMS)
+
+
+@lru_cache(maxsize=1024)
+def _ambiguity_hints(query_lower: str, score_cutoff: int, include_ask: bool) -> str:
+    index = _AMBIGUITY_INDEX
+    skip = set() if include_ask else {i for i, ask in enumerate(index.is_ask) if ask}
+    # Literal pass: an entry whose trigger occurs verbatim needs no scoring.
+    matched = {
+        owner for text, owner in zip(index.triggers, index.owners)
+        if owner not in skip and text in query_lower
+    }
+    # Fuzzy pass over the remaining entries' triggers in one rapidfuzz call
+    # (partial_ratio's score does not depend on argument order).
+    pending = [
+        (text, owner) for text, owner in zip(index.triggers, index.owners)
+        if owner not in skip and owner not in matched
+    ]
+    if pending:
+        hits = process.extract(
+            query_lower,
+            [text for text, _ in pending],
+            scorer=fuzz.partial_ratio,
+            score_cutoff=score_cutoff,
+            limit=None,
+        )
+        matched.update(pending[i][1] for _, _, i in hits)
+
+    matched_rules = []
+    seen = set()
+    for i in sorted(matched):
+        rule = index.rules[i]
+        if rule not in seen:
+            matched_rules.append(f"- {rule}")
+            seen.add(rule)
+    return "\n".join(matched_rules)
+
+
 def get_ambiguity_hints_for_query(query: str, threshold: float | None = None, include_ask: bool = True) -> str:
     """
     Fuzzy-match incoming query (any language) against ambiguity_terms.json.
@@ -458,6 +615,9 @@ def get_ambiguity_hints_for_query(query: str, threshold: float | None = None, in
         Formatted rules string, e.g.:
           "- 'ઉથલા' always means repeat breeder, NOT vomiting."
         or "" if no terms matched.
+
+    The agent's instructions re-render on every model request of a run, so
+    results are memoized per (query, cutoff, include_ask): repeats are a lookup.
     """
     if not query or not _AMBIGUITY_TERMS:
         return ""
@@ -470,37 +630,4 @@ def get_ambiguity_hints_for_query(query: str, threshold: float | None = None, in
         except Exception:
             threshold = 0.80
 
-    score_cutoff = int(threshold * 100)
-    matched_rules = []
-    seen = set()
-
-    query_lower = query.lower().strip()
-
-    for entry in _AMBIGUITY_TERMS:
-        gu_terms = entry.get("gu_terms", [])
-        rule = entry.get("rule", "").strip()
-        if not rule or not gu_terms:
-            continue
-        if not include_ask and entry.get("type") == "ask":
-            continue
-
-        # Check each trigger term against the query using substring + fuzzy
-        for term in gu_terms:
-            term_lower = term.lower().strip()
-            if not term_lower:
-                continue
-            # Substring match first (fast path)
-            if term_lower in query_lower:
-                if rule not in seen:
-                    matched_rules.append(f"- {rule}")
-                    seen.add(rule)
-                break
-            # Fuzzy match fallback
-            score = fuzz.partial_ratio(term_lower, query_lower)
-            if score >= score_cutoff:
-                if rule not in seen:
-                    matched_rules.append(f"- {rule}")
-                    seen.add(rule)
-                break
-
-    return "\n".join(matched_rules)
+    return _ambiguity_hints(query.lower().strip(), int(threshold * 100), include_ask)
@@ -18,7 +18,6 @@ from dataclasses import dataclass
 from datetime import date, datetime, timedelta, timezone
 from typing import Any, Callable, Optional
 
-import httpx
 from pydantic_ai import RunContext
 
 from agents.deps import FarmerContext
@@ -42,6 +41,7 @@ from agents.tools.scheme_codes import (
     scheme_names_sentence,
 )
 from app.config import settings
+from app.core.http_clients import upstream_client
 from helpers.utils import get_logger
 
 logger = get_logger(__name__)
@@ -151,7 +151,7 @@ async def _vistaar_search(intent: dict) -> list[dict]:
     `results.<leg>` and dropped `errors` on the floor, so a dead leg returned
     `[]` and every caller announced "none found".
     """
-    async with httpx.AsyncClient(timeout=settings.amul_network_timeout_s) as client:
+    async with upstream_client("amul_network", timeout=settings.amul_network_timeout_s) as client:
         if VISTAAR_SEEKER_URL:
             # Canonical Beckn path: hand the raw intent to the seeker, which
             # signs + routes it to BH and returns the on_search it gets back
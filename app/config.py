@@ -165,8 +165,8 @@ class Settings(BaseSettings):
     # Cache Configuration
     default_cache_ttl: int = 60 * 60 * 24  # 24 hours
     # Conversation-history retention in Redis (app/utils.py DEFAULT_CACHE_TTL).
-    # Rolling inactivity window: update_message_history rewrites the key with this
-    # TTL every turn, so history expires this long after the LAST turn. session_id
+    # Rolling inactivity window: update_message_history refreshes the history keys
+    # with this TTL every turn, so history expires this long after the LAST turn. session_id
     # is client-supplied and the backend enforces no session/call length, so the
     # only requirement is TTL > the gap between turns — exact value is
     # non-load-bearing (2h is generous slack; voice's old 24h was incidental).
@@ -240,6 +240,15 @@ class Settings(BaseSettings):
     # authoritative when disabled.
     chat_persona_override_enabled: bool = _get_bool_env("CHAT_PERSONA_OVERRIDE_ENABLED", default=False)
     openai_pretranslation_timeout_seconds: float = float(os.getenv("OPENAI_PRETRANSLATION_TIMEOUT_SECONDS", "10.0"))
+    # Start the chat agent concurrently with moderation (output held until the
+    # verdict; a decline discards it and cancels the run). Off restores the
+    # strict moderate-then-answer sequence at the cost of one round-trip of TTFT.
+    chat_speculative_agent_enabled: bool = _get_bool_env("CHAT_SPECULATIVE_AGENT_ENABLED", default=True)
+    # Output translation is pipelined against agent generation: sentence batches
+    # keep being cut from the agent stream while earlier batches are still being
+    # translated. Caps how many post-translation requests one turn keeps in flight
+    # (1 = serial translation, still overlapped with generation).
+    chat_translation_max_in_flight: int = Field(default=3, validation_alias="CHAT_TRANSLATION_MAX_IN_FLIGHT")
     # RETRIEVAL_AUDIT_LOG: log intent/retrieval_called/query per turn for replay analysis
     retrieval_audit_log: bool = _get_bool_env("RETRIEVAL_AUDIT_LOG", default=False)
 
@@ -282,6 +291,36 @@ class Settings(BaseSettings):
     marqo_hybrid_rrfk: int = Field(default=60, validation_alias="MARQO_HYBRID_RRFK")
     marqo_search_mode: str = os.getenv("MARQO_SEARCH_MODE", "hybrid")
     marqo_rerank_mode: str = os.getenv("MARQO_RERANK_MODE", "bm25lite")
+    # BM25 reranker (agents/tools/search_rerank.py): optional corpus IDF
+    # snapshot (JSON; unset = IDF from the candidate pool) and how many
+    # per-document token statistics are kept in memory (0 = no cache).
+    marqo_rerank_idf_path: str = Field(default="", validation_alias="MARQO_RERANK_IDF_PATH")
+    marqo_rerank_doc_cache_size: int = Field(default=4096, validation_alias="MARQO_RERANK_DOC_CACHE_SIZE")
+    # search_documents calls Marqo's REST API on the shared "marqo" upstream pool
+    # (app/core/http_clients.py); this is that pool's request timeout.
+    marqo_http_timeout_seconds: float = Field(default=15.0, validation_alias="MARQO_HTTP_TIMEOUT_SECONDS")
+    # Index capabilities are probed at startup and re-probed in the background
+    # after this long; a failed probe (index missing, Marqo down) is retried
+    # sooner, after the negative TTL.
+    marqo_capabilities_ttl_seconds: int = Field(default=300, validation_alias="MARQO_CAPABILITIES_TTL_SECONDS")
+    marqo_capabilities_negative_ttl_seconds: int = Field(
+        default=15, validation_alias="MARQO_CAPABILITIES_NEGATIVE_TTL_SECONDS"
+    )
+    # Served search_documents hits cached in Redis per normalized query, index,
+    # mode and top_k (agents/services/search_cache.py); 0 disables the cache.
+    # SEARCH_CACHE_NEAR_DUPLICATES also keys entries on the query's token set
+    # so reworded queries share one entry.
+    search_cache_ttl_seconds: int = Field(default=3600, validation_alias="SEARCH_CACHE_TTL_SECONDS")
+    search_cache_near_duplicates: bool = Field(default=False, validation_alias="SEARCH_CACHE_NEAR_DUPLICATES")
+    # Retrieval backend for search_documents: "marqo" (remote index) or "local"
+    # (in-process snapshot, agents/tools/local_index.py). The local index reads
+    # LOCAL_INDEX_PATH/CURRENT, scans LOCAL_INDEX_NPROBE IVF lists per tensor
+    # query and checks for a newly published snapshot every
+    # LOCAL_INDEX_RELOAD_SECONDS. MARQO_SEARCH_MODE applies to both backends.
+    search_backend: str = Field(default="marqo", validation_alias="SEARCH_BACKEND")
+    local_index_path: str = Field(default="", validation_alias="LOCAL_INDEX_PATH")
+    local_index_nprobe: int = Field(default=8, validation_alias="LOCAL_INDEX_NPROBE")
+    local_index_reload_seconds: float = Field(default=60.0, validation_alias="LOCAL_INDEX_RELOAD_SECONDS")
 
     # OSS pipeline %-split, sticky TTL and OSS model/endpoint are no longer read
     # via `settings`: they map to llm_core's weighted-profile config, synthesized
@@ -381,6 +420,16 @@ class Settings(BaseSettings):
     scheme_ocr_max_output_tokens: int = Field(default=12284, validation_alias="SCHEME_OCR_MAX_OUTPUT_TOKENS")
     scheme_ocr_max_failed_page_ratio: float = Field(default=0.15, validation_alias="SCHEME_OCR_MAX_FAILED_PAGE_RATIO")
     scheme_banas_min_record_coverage_ratio: float = Field(default=0.85, validation_alias="SCHEME_BANAS_MIN_RECORD_COVERAGE_RATIO")
+    # Ingestion parallelism: PDFs built at once per source, OCR requests in flight
+    # per process, pages sent per OCR request, and rasterizer worker processes
+    # (0 renders on a thread instead).
+    scheme_pdf_concurrency: int = Field(default=3, validation_alias="SCHEME_PDF_CONCURRENCY")
+    scheme_ocr_concurrency: int = Field(default=4, validation_alias="SCHEME_OCR_CONCURRENCY")
+    scheme_ocr_batch_size: int = Field(default=1, validation_alias="SCHEME_OCR_BATCH_SIZE")
+    scheme_pdf_render_processes: int = Field(default=2, validation_alias="SCHEME_PDF_RENDER_PROCESSES")
+    # How long a scheme PDF's validators, content hash and OCR text are kept for
+    # incremental refreshes (0 re-downloads and re-OCRs every PDF).
+    scheme_pdf_cache_ttl_seconds: int = Field(default=60 * 60 * 24 * 30, validation_alias="SCHEME_PDF_CACHE_TTL_SECONDS")
 
     # Ambiguity-term fuzzy-match cutoff (0-1) for get_ambiguity_hints_for_query.
     # Overridable via env; defaults to 0.80 (prior hard-coded behaviour).
@@ -495,6 +544,55 @@ class Settings(BaseSettings):
     farmer_refresh_lock_ttl_seconds: int = Field(default=60 * 5, validation_alias="FARMER_REFRESH_LOCK_TTL_SECONDS")
     farmer_cold_fetch_timeout_seconds: float = Field(default=4.0, validation_alias="FARMER_COLD_FETCH_TIMEOUT_SECONDS")
     farmer_refresh_queue_batch_size: int = Field(default=20, validation_alias="FARMER_REFRESH_QUEUE_BATCH_SIZE")
+    # Refresh worker pool (app/tasks/farmer_refresh_worker.py): refreshes in
+    # flight per pod, and how long an idle worker blocks on the queue (kept
+    # below REDIS_SOCKET_TIMEOUT). Background refreshes draw from a per-host
+    # token bucket of FARMER_REFRESH_RATE_PER_HOST requests/second (0 disables);
+    # FARMER_REFRESH_RATE_LIMITS overrides it per host, e.g.
+    # "api.amulpashudhan.com=10,herdman.live=2".
+    farmer_refresh_worker_concurrency: int = Field(default=8, validation_alias="FARMER_REFRESH_WORKER_CONCURRENCY")
+    farmer_refresh_queue_block_seconds: float = Field(default=5.0, validation_alias="FARMER_REFRESH_QUEUE_BLOCK_SECONDS")
+    farmer_refresh_rate_per_host: float = Field(default=5.0, validation_alias="FARMER_REFRESH_RATE_PER_HOST")
+    farmer_refresh_rate_limits: str = Field(default="", validation_alias="FARMER_REFRESH_RATE_LIMITS")
+    # Farmer cache pre-warming (agents/services/farmer_cache.py): every
+    # FARMER_PREWARM_INTERVAL_SECONDS, phones read within the activity window
+    # whose record goes stale within FARMER_PREWARM_LEAD_SECONDS are queued for
+    # a background refresh, at most FARMER_PREWARM_HOURLY_BUDGET per hour.
+    farmer_prewarm_enabled: bool = Field(default=False, validation_alias="FARMER_PREWARM_ENABLED")
+    farmer_prewarm_interval_seconds: int = Field(default=60 * 5, validation_alias="FARMER_PREWARM_INTERVAL_SECONDS")
+    farmer_prewarm_lead_seconds: int = Field(default=60 * 60, validation_alias="FARMER_PREWARM_LEAD_SECONDS")
+    farmer_prewarm_activity_window_seconds: int = Field(
+        default=60 * 60 * 48, validation_alias="FARMER_PREWARM_ACTIVITY_WINDOW_SECONDS"
+    )
+    farmer_prewarm_hourly_budget: int = Field(default=600, validation_alias="FARMER_PREWARM_HOURLY_BUDGET")
+    # Farmer-context fan-out (agents/farmer_context.py): requests in flight per
+    # upstream host, and how long a cached per-tag animal context stays fresh
+    # before it is served stale and refreshed in the background.
+    farmer_upstream_host_concurrency: int = Field(default=16, validation_alias="FARMER_UPSTREAM_HOST_CONCURRENCY")
+    animal_context_refresh_interval_seconds: int = Field(
+        default=60 * 60 * 6, validation_alias="ANIMAL_CONTEXT_REFRESH_INTERVAL_SECONDS"
+    )
+    # Rendered farmer-context markdown per phone (agents/services/farmer_context_cache.py).
+    # Reused while the farmer records and animal data are unchanged, for at most
+    # this long (AI technicians and scheme titles carry no version). 0 disables.
+    farmer_context_cache_ttl_seconds: int = Field(default=60 * 15, validation_alias="FARMER_CONTEXT_CACHE_TTL_SECONDS")
+
+    # Shared upstream HTTP pools (app/core/http_clients.py): one long-lived
+    # keep-alive client per upstream for the app's lifetime instead of a new
+    # TCP+TLS handshake per PashuGPT / Bhashini / Beckn request.
+    # HTTP_POOL_UPSTREAM_LIMITS overrides max connections per upstream, e.g.
+    # "farmer_backends=64,bhashini_asr=16".
+    http_pool_max_connections: int = Field(default=100, validation_alias="HTTP_POOL_MAX_CONNECTIONS")
+    http_pool_max_keepalive: int = Field(default=20, validation_alias="HTTP_POOL_MAX_KEEPALIVE")
+    http_pool_keepalive_expiry_seconds: float = Field(default=30.0, validation_alias="HTTP_POOL_KEEPALIVE_EXPIRY_SECONDS")
+    http_pool_http2_enabled: bool = Field(default=True, validation_alias="HTTP_POOL_HTTP2_ENABLED")
+    http_pool_upstream_limits: str = Field(default="", validation_alias="HTTP_POOL_UPSTREAM_LIMITS")
+
+    # In-process near-cache in front of Redis for hot keys (app/core/near_cache.py).
+    # NEAR_CACHE_LIMITS overrides a namespace's TTL and size, e.g.
+    # "concurrency=0.5:64,scheme_records=600:32" (ttl seconds:max entries).
+    near_cache_enabled: bool = Field(default=True, validation_alias="NEAR_CACHE_ENABLED")
+    near_cache_limits: str = Field(default="", validation_alias="NEAR_CACHE_LIMITS")
 
     # Config hardening policy: malformed numeric env values warn and fall back to
     # defaults; parseable but out-of-range values are clamped to safe bounds.
@@ -505,16 +603,39 @@ class Settings(BaseSettings):
         "marqo_candidate_multiplier": ("MARQO_CANDIDATE_MULTIPLIER", 10, 1, None),
         "marqo_candidate_cap": ("MARQO_CANDIDATE_CAP", 120, 1, None),
         "marqo_hybrid_rrfk": ("MARQO_HYBRID_RRFK", 60, 1, None),
+        "search_cache_ttl_seconds": ("SEARCH_CACHE_TTL_SECONDS", 3600, 0, None),
+        "marqo_rerank_doc_cache_size": ("MARQO_RERANK_DOC_CACHE_SIZE", 4096, 0, None),
+        "local_index_nprobe": ("LOCAL_INDEX_NPROBE", 8, 1, None),
+        "marqo_capabilities_ttl_seconds": ("MARQO_CAPABILITIES_TTL_SECONDS", 300, 1, None),
+        "marqo_capabilities_negative_ttl_seconds": ("MARQO_CAPABILITIES_NEGATIVE_TTL_SECONDS", 15, 1, None),
         "scheme_lock_ttl_seconds": ("SCHEME_LOCK_TTL_SECONDS", 60 * 60, 1, None),
         "scheme_pdf_max_render_pages": ("SCHEME_PDF_MAX_RENDER_PAGES", 30, 1, None),
         "scheme_ocr_max_output_tokens": ("SCHEME_OCR_MAX_OUTPUT_TOKENS", 12284, 1, None),
+        "scheme_pdf_concurrency": ("SCHEME_PDF_CONCURRENCY", 3, 1, 16),
+        "scheme_ocr_concurrency": ("SCHEME_OCR_CONCURRENCY", 4, 1, 32),
+        "scheme_ocr_batch_size": ("SCHEME_OCR_BATCH_SIZE", 1, 1, 16),
+        "scheme_pdf_render_processes": ("SCHEME_PDF_RENDER_PROCESSES", 2, 0, 16),
+        "scheme_pdf_cache_ttl_seconds": ("SCHEME_PDF_CACHE_TTL_SECONDS", 60 * 60 * 24 * 30, 0, None),
         "health_call_cooldown_ttl_seconds": ("HEALTH_CALL_COOLDOWN_TTL_SECONDS", 60 * 30, 1, None),
         "vistaar_max_items": ("VISTAAR_MAX_ITEMS", 20, 1, None),
         "farmer_refresh_lock_ttl_seconds": ("FARMER_REFRESH_LOCK_TTL_SECONDS", 60 * 5, 1, None),
         "farmer_refresh_queue_batch_size": ("FARMER_REFRESH_QUEUE_BATCH_SIZE", 20, 1, None),
+        "farmer_refresh_worker_concurrency": ("FARMER_REFRESH_WORKER_CONCURRENCY", 8, 1, 64),
+        "farmer_prewarm_interval_seconds": ("FARMER_PREWARM_INTERVAL_SECONDS", 60 * 5, 10, None),
+        "farmer_prewarm_lead_seconds": ("FARMER_PREWARM_LEAD_SECONDS", 60 * 60, 0, None),
+        "farmer_prewarm_activity_window_seconds": ("FARMER_PREWARM_ACTIVITY_WINDOW_SECONDS", 60 * 60 * 48, 60, None),
+        "farmer_prewarm_hourly_budget": ("FARMER_PREWARM_HOURLY_BUDGET", 600, 0, None),
+        "farmer_upstream_host_concurrency": ("FARMER_UPSTREAM_HOST_CONCURRENCY", 16, 1, None),
+        "animal_context_refresh_interval_seconds": ("ANIMAL_CONTEXT_REFRESH_INTERVAL_SECONDS", 60 * 60 * 6, 1, None),
+        "farmer_context_cache_ttl_seconds": ("FARMER_CONTEXT_CACHE_TTL_SECONDS", 60 * 15, 0, None),
+        "chat_translation_max_in_flight": ("CHAT_TRANSLATION_MAX_IN_FLIGHT", 3, 1, 16),
+        "http_pool_max_connections": ("HTTP_POOL_MAX_CONNECTIONS", 100, 1, None),
+        "http_pool_max_keepalive": ("HTTP_POOL_MAX_KEEPALIVE", 20, 0, None),
     }
     _SAFE_FLOAT_FIELDS: ClassVar[dict[str, tuple[str, float, float | None, float | None]]] = {
         "marqo_hybrid_alpha": ("MARQO_HYBRID_ALPHA", 0.6, 0.0, 1.0),
+        "marqo_http_timeout_seconds": ("MARQO_HTTP_TIMEOUT_SECONDS", 15.0, 0.001, None),
+        "local_index_reload_seconds": ("LOCAL_INDEX_RELOAD_SECONDS", 60.0, 1.0, None),
         "scheme_http_timeout_seconds": ("SCHEME_HTTP_TIMEOUT_SECONDS", 30.0, 0.001, None),
         "scheme_ocr_max_failed_page_ratio": ("SCHEME_OCR_MAX_FAILED_PAGE_RATIO", 0.15, 0.0, 1.0),
         "scheme_banas_min_record_coverage_ratio": ("SCHEME_BANAS_MIN_RECORD_COVERAGE_RATIO", 0.85, 0.0, 1.0),
@@ -522,15 +643,26 @@ class Settings(BaseSettings):
         "vistaar_default_lon": ("VISTAAR_DEFAULT_LON", 72.93, -180.0, 180.0),
         "farmer_backend_http_timeout_seconds": ("FARMER_BACKEND_HTTP_TIMEOUT_SECONDS", 30.0, 0.001, None),
         "farmer_cold_fetch_timeout_seconds": ("FARMER_COLD_FETCH_TIMEOUT_SECONDS", 4.0, 0.001, None),
+        "farmer_refresh_queue_block_seconds": ("FARMER_REFRESH_QUEUE_BLOCK_SECONDS", 5.0, 0.1, None),
+        "farmer_refresh_rate_per_host": ("FARMER_REFRESH_RATE_PER_HOST", 5.0, 0.0, None),
+        "http_pool_keepalive_expiry_seconds": ("HTTP_POOL_KEEPALIVE_EXPIRY_SECONDS", 30.0, 0.0, None),
     }
     _SAFE_BOOL_FIELDS: ClassVar[dict[str, tuple[str, bool]]] = {
         "marqo_use_e5_query_prefix": ("MARQO_USE_E5_QUERY_PREFIX", True),
         "marqo_exclude_reference": ("MARQO_EXCLUDE_REFERENCE", True),
+        "search_cache_near_duplicates": ("SEARCH_CACHE_NEAR_DUPLICATES", False),
+        "http_pool_http2_enabled": ("HTTP_POOL_HTTP2_ENABLED", True),
+        "near_cache_enabled": ("NEAR_CACHE_ENABLED", True),
+        "farmer_prewarm_enabled": ("FARMER_PREWARM_ENABLED", False),
     }
 
     @field_validator(
         "marqo_use_e5_query_prefix",
         "marqo_exclude_reference",
+        "search_cache_near_duplicates",
+        "http_pool_http2_enabled",
+        "near_cache_enabled",
+        "farmer_prewarm_enabled",
         mode="before",
     )
     @classmethod
@@ -545,13 +677,34 @@ class Settings(BaseSettings):
         "marqo_candidate_multiplier",
         "marqo_candidate_cap",
         "marqo_hybrid_rrfk",
+        "search_cache_ttl_seconds",
+        "marqo_rerank_doc_cache_size",
+        "local_index_nprobe",
+        "marqo_capabilities_ttl_seconds",
+        "marqo_capabilities_negative_ttl_seconds",
         "scheme_lock_ttl_seconds",
         "scheme_pdf_max_render_pages",
         "scheme_ocr_max_output_tokens",
+        "scheme_pdf_concurrency",
+        "scheme_ocr_concurrency",
+        "scheme_ocr_batch_size",
+        "scheme_pdf_render_processes",
+        "scheme_pdf_cache_ttl_seconds",
         "health_call_cooldown_ttl_seconds",
         "vistaar_max_items",
         "farmer_refresh_lock_ttl_seconds",
         "farmer_refresh_queue_batch_size",
+        "farmer_refresh_worker_concurrency",
+        "farmer_prewarm_interval_seconds",
+        "farmer_prewarm_lead_seconds",
+        "farmer_prewarm_activity_window_seconds",
+        "farmer_prewarm_hourly_budget",
+        "farmer_upstream_host_concurrency",
+        "animal_context_refresh_interval_seconds",
+        "farmer_context_cache_ttl_seconds",
+        "chat_translation_max_in_flight",
+        "http_pool_max_connections",
+        "http_pool_max_keepalive",
         mode="before",
     )
     @classmethod
@@ -567,6 +720,8 @@ class Settings(BaseSettings):
 
     @field_validator(
         "marqo_hybrid_alpha",
+        "marqo_http_timeout_seconds",
+        "local_index_reload_seconds",
         "scheme_http_timeout_seconds",
         "scheme_ocr_max_failed_page_ratio",
         "scheme_banas_min_record_coverage_ratio",
@@ -574,6 +729,9 @@ class Settings(BaseSettings):
         "vistaar_default_lon",
         "farmer_backend_http_timeout_seconds",
         "farmer_cold_fetch_timeout_seconds",
+        "farmer_refresh_queue_block_seconds",
+        "farmer_refresh_rate_per_host",
+        "http_pool_keepalive_expiry_seconds",
         mode="before",
     )
     @classmethod
@@ -4,12 +4,16 @@ Core cache instance configuration using Redis and aiocache.
 This module provides the cache instance that other parts of the application can use.
 Uses enhanced Redis configuration with connection pooling and timeouts.
 """
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
 from enum import Enum
-from typing import Any
+from typing import Any, Iterator, Optional
 
 from aiocache import Cache
 from aiocache.serializers import JsonSerializer
 from redis.asyncio import Redis
+from redis.asyncio.connection import Connection
 from app.config import settings
 from helpers.utils import get_logger
 
@@ -47,6 +51,20 @@ redis_client = Redis(
     decode_responses=True,
 )
 
+# Same instance, raw bytes in and out: for binary payloads (the compressed
+# conversation-history entries in app/core/history_store.py).
+redis_binary_client = Redis(
+    host=settings.redis_host,
+    port=settings.redis_port,
+    db=settings.redis_db,
+    password=settings.redis_password,
+    socket_connect_timeout=settings.redis_socket_connect_timeout,
+    socket_timeout=settings.redis_socket_timeout,
+    max_connections=settings.redis_max_connections,
+    retry_on_timeout=settings.redis_retry_on_timeout,
+    decode_responses=False,
+)
+
 
 def build_cache_key(key: str, namespace: str | None = None) -> str:
     if namespace:
@@ -54,6 +72,128 @@ def build_cache_key(key: str, namespace: str | None = None) -> str:
     return f"{settings.redis_key_prefix}{key}"
 
 
+class RoundTripCounter:
+    """Redis round trips made while this counter was active (see
+    :func:`count_redis_round_trips`). A pipeline or a script is one."""
+
+    __slots__ = ("count", "parent")
+
+    def __init__(self, parent: "Optional[RoundTripCounter]" = None):
+        self.count = 0
+        self.parent = parent
+
+
+_round_trips: ContextVar[Optional[RoundTripCounter]] = ContextVar("redis_round_trips", default=None)
+
+
+@contextmanager
+def count_redis_round_trips() -> Iterator[RoundTripCounter]:
+    """Count the Redis round trips made in this context (and in tasks it spawns).
+
+    Nested counters each see their own trips and their parent's count includes
+    them. Only clients wired with :func:`_count_round_trips_on` are counted:
+    ``cache``, ``redis_client`` and ``redis_binary_client``.
+    """
+    counter = RoundTripCounter(_round_trips.get())
+    token = _round_trips.set(counter)
+    try:
+        yield counter
+    finally:
+        try:
+            _round_trips.reset(token)
+        except ValueError:
+            # Exited from another context (an async generator closed elsewhere).
+            _round_trips.set(counter.parent)
+
+
+class _CountingConnection(Connection):
+    # Every command, pipeline and script goes out through one
+    # send_packed_command call, and gets its replies back before the next.
+    async def send_packed_command(self, command, check_health: bool = True) -> None:
+        counter = _round_trips.get()
+        while counter is not None:
+            counter.count += 1
+            counter = counter.parent
+        await super().send_packed_command(command, check_health)
+
+
+def _count_round_trips_on(client: Any) -> None:
+    pool = getattr(client, "connection_pool", None)
+    # Only plain TCP pools: SSL / unix-socket connection classes are left alone.
+    if pool is not None and pool.connection_class is Connection:
+        pool.connection_class = _CountingConnection
+
+
+for _client in (redis_client, redis_binary_client, getattr(cache, "client", None)):
+    _count_round_trips_on(_client)
+
+
+class CacheBatch:
+    """Several ``cache`` operations in one Redis round trip.
+
+    Keys and values are read and written exactly as ``cache`` does (same key
+    prefix, JSON values), so a batched write is readable with ``cache.get``
+    and vice versa::
+
+        batch = CacheBatch()
+        batch.set(status_key, True, ttl=60)
+        batch.delete(result_key)
+        await batch.execute()
+
+    Not a transaction: the operations are sent together and applied in order,
+    but another client's commands may land between them.
+    """
+
+    def __init__(self, client: Optional[Redis] = None):
+        self._client = client if client is not None else redis_client
+        self._ops: list[tuple[str, str, Any, Optional[int]]] = []
+
+    def __len__(self) -> int:
+        return len(self._ops)
+
+    def get(self, key: str, namespace: str | None = None) -> "CacheBatch":
+        self._ops.append(("get", build_cache_key(key, namespace), None, None))
+        return self
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, namespace: str | None = None) -> "CacheBatch":
+        ttl = settings.default_cache_ttl if ttl is None else ttl
+        self._ops.append(("set", build_cache_key(key, namespace), json.dumps(value), ttl))
+        return self
+
+    def delete(self, key: str, namespace: str | None = None) -> "CacheBatch":
+        self._ops.append(("delete", build_cache_key(key, namespace), None, None))
+        return self
+
+    async def execute(self) -> list[Any]:
+        """Run the queued operations; one result per operation, in order:
+        the decoded value for ``get``, True for ``set``, the deleted count
+        for ``delete``."""
+        ops, self._ops = self._ops, []
+        if not ops:
+            return []
+        async with self._client.pipeline(transaction=False) as pipe:
+            for op, key, value, ttl in ops:
+                if op == "get":
+                    pipe.get(key)
+                elif op == "set":
+                    if ttl:
+                        pipe.set(key, value, ex=ttl)
+                    else:
+                        pipe.set(key, value)
+                else:
+                    pipe.delete(key)
+            raw = await pipe.execute()
+        results: list[Any] = []
+        for (op, *_), result in zip(ops, raw):
+            if op == "get":
+                results.append(json.loads(result) if result is not None else None)
+            elif op == "set":
+                results.append(bool(result))
+            else:
+                results.append(result)
+        return results
+
+
 logger.info(
     f"Cache configured with Redis at {settings.redis_host}:{settings.redis_port} "
     f"(DB: {settings.redis_db}, Prefix: {settings.redis_key_prefix}, "
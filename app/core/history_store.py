@@ -0,0 +1,211 @@
+"""
+Append-only conversation history in Redis.
+
+History used to be one JSON blob per session, rewritten whole every turn and
+re-downloaded and re-validated whole every turn. Here each turn's new messages
+are one entry of a Redis list, next to a message counter:
+
+    <prefix><session>__SVA:turns   list of encoded turns (oldest first)
+    <prefix><session>__SVA:count   number of messages across all entries
+
+* :func:`load_history` returns a :class:`LoadedHistory`: the messages plus the
+  stored count they were read at. The turn hands it back to :func:`save_history`,
+  which appends only the messages past it, compare-and-append in one Lua round
+  trip (:data:`_APPEND_SCRIPT`). No loaded history, a count mismatch (another
+  turn got there first) or history shorter than what was loaded falls back to a
+  full rewrite — the old last-writer-wins behaviour, never a duplicated turn.
+  A rewrite stores one entry per turn (:func:`split_turns`), so tail reads stay
+  tail reads after a legacy migration or a rewrite.
+* Reads can take just the last ``max_turns`` entries, and validate only those.
+  A write after such a read appends without the count check: a rewrite would
+  drop the turns that were never read.
+* Entries are ``pydantic-ai`` JSON, zlib-compressed above a small size, behind a
+  one-byte tag so the encoding can change without a migration.
+* A session still holding a legacy blob is read from it, and rewritten into
+  the list format (deleting the blob) on its next write.
+* Every write refreshes the TTL of both keys: the same rolling inactivity window
+  as before.
+"""
+from __future__ import annotations
+
+import json
+import zlib
+from dataclasses import dataclass
+from typing import List, Optional
+
+from pydantic_ai.messages import ModelMessage, ModelMessagesTypeAdapter, ModelRequest, UserPromptPart
+
+from app.core.cache import build_cache_key, redis_binary_client
+from helpers.utils import get_logger
+
+logger = get_logger(__name__)
+
+_TAG_JSON = b"j"
+_TAG_ZLIB = b"z"
+# Below this a turn is stored as plain JSON: zlib gains little on short turns.
+_COMPRESS_MIN_BYTES = 512
+_ZLIB_LEVEL = 1
+
+# KEYS[1] turns list, KEYS[2] counter.
+# ARGV[1] expected stored count (-1: append unconditionally), ARGV[2] messages
+# added, ARGV[3] ttl, ARGV[4] entry.
+# Returns the new count, or -1 if the stored count was not the expected one.
+_APPEND_SCRIPT = """
+local n = tonumber(redis.call('get', KEYS[2]) or '0')
+local expected = tonumber(ARGV[1])
+if expected >= 0 and n ~= expected then
+    return -1
+end
+redis.call('rpush', KEYS[1], ARGV[4])
+redis.call('set', KEYS[2], n + tonumber(ARGV[2]), 'EX', tonumber(ARGV[3]))
+redis.call('expire', KEYS[1], tonumber(ARGV[3]))
+return n + tonumber(ARGV[2])
+"""
+
+
+def _turns_key(history_key: str) -> str:
+    return build_cache_key(f"{history_key}:turns")
+
+
+def _count_key(history_key: str) -> str:
+    return build_cache_key(f"{history_key}:count")
+
+
+@dataclass(frozen=True)
+class LoadedHistory:
+    """What :func:`load_history` read, to be handed back to :func:`save_history`.
+
+    ``stored_count`` is the number of stored messages the read saw, or None if
+    the next write must rewrite (legacy blob, inconsistent counter). ``complete``
+    is False when only the tail was read.
+    """
+
+    messages: List[ModelMessage]
+    stored_count: Optional[int] = None
+    complete: bool = True
+
+
+def encode_turn(messages: List[ModelMessage]) -> bytes:
+    """One list entry for ``messages``."""
+    payload = ModelMessagesTypeAdapter.dump_json(messages)
+    if len(payload) < _COMPRESS_MIN_BYTES:
+        return _TAG_JSON + payload
+    return _TAG_ZLIB + zlib.compress(payload, _ZLIB_LEVEL)
+
+
+def split_turns(messages: List[ModelMessage]) -> List[List[ModelMessage]]:
+    """``messages`` cut into turns, each starting at a request carrying a user
+    prompt (anything before the first such request stays with the first turn)."""
+    turns: List[List[ModelMessage]] = []
+    seen_prompt = False
+    for message in messages:
+        is_prompt = isinstance(message, ModelRequest) and any(
+            isinstance(part, UserPromptPart) for part in message.parts
+        )
+        if not turns or (is_prompt and seen_prompt):
+            turns.append([])
+        turns[-1].append(message)
+        seen_prompt = seen_prompt or is_prompt
+    return turns
+
+
+def _entry_json(entry: bytes) -> bytes:
+    tag, payload = entry[:1], entry[1:]
+    if tag == _TAG_ZLIB:
+        return zlib.decompress(payload)
+    if tag == _TAG_JSON:
+        return payload
+    raise ValueError(f"unknown history entry tag {tag!r}")
+
+
+def decode_turns(entries: List[bytes], sanitize) -> List[ModelMessage]:
+    """Messages of ``entries`` in order. ``sanitize`` repairs legacy usage nulls
+    and is only used if an entry does not validate as stored."""
+    # Each entry is a JSON array; splice their items into one array so the
+    # whole tail validates in a single pass.
+    items = [body for body in (_entry_json(e)[1:-1] for e in entries) if body]
+    if not items:
+        return []
+    raw = b"[" + b",".join(items) + b"]"
+    try:
+        return ModelMessagesTypeAdapter.validate_json(raw)
+    except Exception:
+        return ModelMessagesTypeAdapter.validate_python(sanitize(json.loads(raw)))
+
+
+async def load_history(
+    history_key: str,
+    legacy_key: str,
+    *,
+    sanitize,
+    max_turns: Optional[int] = None,
+) -> LoadedHistory:
+    """Stored messages for ``history_key`` (the last ``max_turns`` entries if
+    given). Falls back to the legacy blob under ``legacy_key``. Raises on
+    unreadable data; the caller decides how to degrade."""
+    start = -max_turns if max_turns else 0
+    async with redis_binary_client.pipeline(transaction=False) as pipe:
+        pipe.lrange(_turns_key(history_key), start, -1)
+        pipe.get(_count_key(history_key))
+        pipe.get(legacy_key)
+        entries, count, legacy = await pipe.execute()
+
+    if entries:
+        messages = decode_turns(entries, sanitize)
+        if not max_turns or len(entries) < max_turns:
+            consistent = count is not None and int(count) == len(messages)
+            return LoadedHistory(messages, len(messages) if consistent else None)
+        return LoadedHistory(messages, complete=False)
+    if legacy:
+        # No stored count: the next write rewrites it into the list format.
+        return LoadedHistory(ModelMessagesTypeAdapter.validate_python(sanitize(json.loads(legacy))))
+    if count is None or int(count) == 0:
+        return LoadedHistory([], 0)
+    return LoadedHistory([])
+
+
+async def _rewrite(history_key: str, legacy_key: str, messages: List[ModelMessage], ttl: int) -> None:
+    turns_key, count_key = _turns_key(history_key), _count_key(history_key)
+    async with redis_binary_client.pipeline(transaction=True) as pipe:
+        pipe.delete(turns_key, legacy_key)
+        if messages:
+            pipe.rpush(turns_key, *(encode_turn(turn) for turn in split_turns(messages)))
+            pipe.expire(turns_key, ttl)
+        pipe.set(count_key, len(messages), ex=ttl)
+        await pipe.execute()
+
+
+async def save_history(
+    history_key: str,
+    legacy_key: str,
+    messages: List[ModelMessage],
+    ttl: int,
+    loaded: Optional[LoadedHistory] = None,
+) -> None:
+    """Store ``messages`` (``loaded.messages`` plus this turn's messages),
+    appending only what is new when possible."""
+    base = len(loaded.messages) if loaded is not None else 0
+    if loaded is None or base > len(messages) or (loaded.complete and loaded.stored_count is None):
+        await _rewrite(history_key, legacy_key, messages, ttl)
+        return
+    added = messages[base:]
+    if not added:
+        async with redis_binary_client.pipeline(transaction=False) as pipe:
+            pipe.expire(_turns_key(history_key), ttl)
+            pipe.expire(_count_key(history_key), ttl)
+            await pipe.execute()
+        return
+    expected = loaded.stored_count if loaded.complete else -1
+    count = await redis_binary_client.eval(
+        _APPEND_SCRIPT,
+        2,
+        _turns_key(history_key),
+        _count_key(history_key),
+        expected,
+        len(added),
+        ttl,
+        encode_turn(added),
+    )
+    if int(count) < 0:
+        logger.info("History for %s changed since it was loaded; rewriting", history_key)
+        await _rewrite(history_key, legacy_key, messages, ttl)
@@ -0,0 +1,197 @@
+"""Shared, long-lived HTTP clients for upstream integrations.
+
+Every PashuGPT / Bhashini / Raya / Beckn call used to open its own
+``httpx.AsyncClient`` and close it again, paying a fresh TCP+TLS handshake per
+request. This registry keeps ONE keep-alive client per upstream for the app's
+lifetime (started/stopped from the FastAPI lifespan, like the background
+workers), with per-upstream connection limits, HTTP/2 where the ``h2`` package
+is installed, and the upstream's own timeout.
+
+Call sites borrow a client instead of constructing one::
+
+    async with upstream_client("farmer_backends", timeout=FARMER_BACKEND_HTTP_TIMEOUT_SECONDS) as client:
+        r = await client.get(url)
+
+Outside the lifespan (scripts, one-off jobs, unit tests) the registry is not
+started and ``upstream_client`` degrades to exactly the old behaviour: a fresh
+``httpx.AsyncClient(timeout=...)`` closed on exit. So nothing that runs without
+the app changes.
+
+Pool stats (connections in use / idle, requests in flight, wait-for-connection
+time) are published to ``app.metrics`` after every request and on each
+``/metrics`` scrape via :func:`publish_pool_stats`.
+"""
+from __future__ import annotations
+
+import importlib.util
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import httpx
+
+from app import metrics as _metrics
+from app.config import settings
+from helpers.utils import get_logger
+
+logger = get_logger(__name__)
+
+_started = False
+_clients: dict[str, httpx.AsyncClient] = {}
+_transports: dict[str, "_PoolTransport"] = {}
+
+
+def _h2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _upstream_limit_overrides() -> dict[str, int]:
+    """Parse ``HTTP_POOL_UPSTREAM_LIMITS`` ("name=N,name=N"); bad entries are skipped."""
+    out: dict[str, int] = {}
+    for part in (settings.http_pool_upstream_limits or "").split(","):
+        name, sep, value = part.partition("=")
+        if not sep:
+            continue
+        try:
+            limit = int(value.strip())
+        except ValueError:
+            logger.warning("Ignoring malformed HTTP_POOL_UPSTREAM_LIMITS entry %r", part)
+            continue
+        if limit >= 1:
+            out[name.strip()] = limit
+    return out
+
+
+def _limits_for(upstream: str) -> httpx.Limits:
+    max_connections = _upstream_limit_overrides().get(upstream, settings.http_pool_max_connections)
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=min(settings.http_pool_max_keepalive, max_connections),
+        keepalive_expiry=settings.http_pool_keepalive_expiry_seconds,
+    )
+
+
+class _PoolTransport(httpx.AsyncBaseTransport):
+    """``AsyncHTTPTransport`` plus the pool stats httpx does not expose.
+
+    Wait-for-connection time is measured with httpcore's ``trace`` request
+    extension: the first trace event fires once the pool has handed the request
+    a connection (new or reused), so start -> first event is the pool wait.
+    """
+
+    def __init__(self, upstream: str, inner: httpx.AsyncHTTPTransport):
+        self.upstream = upstream
+        self._inner = inner
+        self.in_flight = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        acquired: list[float] = []
+        prior_trace = request.extensions.get("trace")
+
+        async def _trace(event_name, info):
+            if not acquired:
+                acquired.append(time.perf_counter())
+            if prior_trace is not None:
+                await prior_trace(event_name, info)
+
+        request.extensions["trace"] = _trace
+        self.in_flight += 1
+        _metrics.set_http_pool_in_flight(self.upstream, self.in_flight)
+        try:
+            return await self._inner.handle_async_request(request)
+        finally:
+            self.in_flight -= 1
+            if acquired:
+                _metrics.observe_http_pool_wait(self.upstream, acquired[0] - started)
+            self.publish()
+
+    def stats(self) -> dict[str, int]:
+        """Connections in use / idle and requests in flight (best-effort)."""
+        in_use = idle = 0
+        try:
+            for conn in self._inner._pool.connections:
+                if conn.is_closed():
+                    continue
+                if conn.is_idle():
+                    idle += 1
+                else:
+                    in_use += 1
+        except Exception:  # private httpcore surface; stats must never break a call
+            pass
+        return {"in_use": in_use, "idle": idle, "in_flight": self.in_flight}
+
+    def publish(self) -> None:
+        s = self.stats()
+        _metrics.set_http_pool_connections(self.upstream, s["in_use"], s["idle"])
+        _metrics.set_http_pool_in_flight(self.upstream, s["in_flight"])
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+def _build_client(upstream: str, timeout: float) -> httpx.AsyncClient:
+    http2 = bool(settings.http_pool_http2_enabled) and _h2_available()
+    limits = _limits_for(upstream)
+    transport = _PoolTransport(upstream, httpx.AsyncHTTPTransport(limits=limits, http2=http2))
+    _transports[upstream] = transport
+    logger.info(
+        "http_pool upstream=%s created max_connections=%s http2=%s timeout_s=%s",
+        upstream, limits.max_connections, http2, timeout,
+    )
+    return httpx.AsyncClient(timeout=timeout, transport=transport)
+
+
+@asynccontextmanager
+async def upstream_client(upstream: str, *, timeout: float) -> AsyncIterator[httpx.AsyncClient]:
+    """Borrow the shared client for ``upstream`` (created on first use).
+
+    ``timeout`` is the upstream's timeout; it is fixed when the pooled client is
+    first created, so every call site of one upstream must pass the same value.
+    When the registry is not started this yields a private client closed on exit.
+    """
+    if not _started:
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            yield client
+        return
+    client = _clients.get(upstream)
+    if client is None or client.is_closed:
+        client = _clients[upstream] = _build_client(upstream, timeout)
+    yield client
+
+
+def pool_stats() -> dict[str, dict[str, int]]:
+    """``{upstream: {"in_use", "idle", "in_flight"}}`` for every live pool."""
+    return {name: t.stats() for name, t in _transports.items()}
+
+
+def publish_pool_stats() -> None:
+    """Push current pool stats to ``app.metrics`` (called on each /metrics scrape)."""
+    for transport in list(_transports.values()):
+        try:
+            transport.publish()
+        except Exception:
+            pass
+
+
+async def start_http_clients() -> None:
+    """Enable pooled clients for this process (FastAPI lifespan startup)."""
+    global _started
+    _started = True
+    if settings.http_pool_http2_enabled and not _h2_available():
+        logger.info("http_pool: h2 not installed; upstream pools use HTTP/1.1")
+
+
+async def stop_http_clients() -> None:
+    """Close every pooled client (FastAPI lifespan shutdown)."""
+    global _started
+    _started = False
+    clients = list(_clients.items())
+    _clients.clear()
+    _transports.clear()
+    for name, client in clients:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning("http_pool upstream=%s close failed: %s", name, e)
+
@@ -0,0 +1,246 @@
+"""In-process near-cache in front of Redis for hot, rarely-changing keys.
+
+Some values are read from Redis on (almost) every turn but change seldom: the
+vLLM concurrency gauge (re-read by every gated call), the union scheme records
+(one large JSON document, rewritten once a day). Each read was a network round
+trip plus a JSON decode. This module keeps a small bounded LRU per namespace in
+the worker process, in front of the Redis read:
+
+    records = await near_cache.cached("scheme_records", source_key, _load_from_redis)
+
+* Each namespace has its own TTL and size limit (:data:`DEFAULT_POLICIES`,
+  overridable with ``NEAR_CACHE_LIMITS="name=ttl_seconds:max_entries,..."``).
+  Only namespaces with a policy are cached; anything else passes straight to
+  the loader.
+* Writers call :func:`publish_invalidation` after changing the Redis value. It
+  drops the local entry immediately and publishes on a Redis pub/sub channel;
+  every worker running :func:`start_near_cache_listener` (from the FastAPI
+  lifespan) drops it too. Pub/sub rather than keyspace notifications, which
+  need server-side ``notify-keyspace-events`` configuration this service does
+  not control. A worker whose listener is down or reconnecting clears the
+  whole cache, and in any case no entry outlives its TTL.
+* A load that races an invalidation is returned but not stored, so a stale
+  value can never be cached after the invalidation that should have removed it.
+* Hits, misses, evictions and invalidations are counted per namespace
+  (``app.metrics.record_near_cache_event`` and :func:`stats`).
+
+Cached values are shared between callers and must be treated as read-only.
+``NEAR_CACHE_ENABLED=false`` turns every lookup into a pass-through.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from app import metrics as _metrics
+from app.config import settings
+from app.core.cache import build_cache_key, redis_client
+from helpers.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class NearCachePolicy:
+    ttl_seconds: float
+    max_entries: int
+
+
+DEFAULT_POLICIES: dict[str, NearCachePolicy] = {
+    # The Redis copy itself lives CONCURRENCY_METRICS_CACHE_TTL_S (2s); a 1s local
+    # copy still takes the gauge read off the per-call path.
+    "concurrency": NearCachePolicy(ttl_seconds=1.0, max_entries=64),
+    # Rewritten by the daily scheme refresh, which publishes an invalidation.
+    "scheme_records": NearCachePolicy(ttl_seconds=300.0, max_entries=32),
+}
+
+INVALIDATION_CHANNEL_SUFFIX = "near-cache:invalidate"
+_LISTENER_RETRY_SECONDS = 5.0
+_ORIGIN = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class _Namespace:
+    def __init__(self, name: str, policy: NearCachePolicy):
+        self.name = name
+        self.policy = policy
+        self.entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        # Bumped on every invalidation; a load that saw an older generation is not stored.
+        self.generation = 0
+        self.counts = {"hit": 0, "miss": 0, "eviction": 0, "invalidation": 0}
+
+    def count(self, event: str) -> None:
+        self.counts[event] += 1
+        _metrics.record_near_cache_event(self.name, event)
+
+
+_namespaces: dict[str, _Namespace] = {}
+_listener_task: Optional[asyncio.Task] = None
+_MISSING = object()
+
+
+def _limit_overrides() -> dict[str, NearCachePolicy]:
+    """Parse ``NEAR_CACHE_LIMITS`` ("name=ttl:max,..."); bad entries are skipped."""
+    out: dict[str, NearCachePolicy] = {}
+    for part in (settings.near_cache_limits or "").split(","):
+        name, sep, value = part.partition("=")
+        ttl, colon, size = value.partition(":")
+        if not sep or not colon:
+            continue
+        try:
+            policy = NearCachePolicy(float(ttl), int(size))
+        except ValueError:
+            logger.warning("Ignoring malformed NEAR_CACHE_LIMITS entry %r", part)
+            continue
+        if policy.ttl_seconds >= 0 and policy.max_entries >= 0:
+            out[name.strip()] = policy
+    return out
+
+
+def _namespace(name: str) -> Optional[_Namespace]:
+    ns = _namespaces.get(name)
+    if ns is None:
+        policy = {**DEFAULT_POLICIES, **_limit_overrides()}.get(name)
+        if policy is None or policy.ttl_seconds <= 0 or policy.max_entries <= 0:
+            return None
+        ns = _namespaces[name] = _Namespace(name, policy)
+    return ns
+
+
+def get(namespace: str, key: str, default: Any = None) -> Any:
+    """The live local value for ``key``, or ``default``."""
+    ns = _namespace(namespace) if settings.near_cache_enabled else None
+    if ns is None:
+        return default
+    entry = ns.entries.get(key)
+    if entry is None or entry[0] <= time.monotonic():
+        if entry is not None:
+            del ns.entries[key]
+        ns.count("miss")
+        return default
+    ns.entries.move_to_end(key)
+    ns.count("hit")
+    return entry[1]
+
+
+def put(namespace: str, key: str, value: Any, *, generation: Optional[int] = None) -> None:
+    """Store ``value`` locally (unless an invalidation happened since ``generation``)."""
+    ns = _namespace(namespace) if settings.near_cache_enabled else None
+    if ns is None or (generation is not None and generation != ns.generation):
+        return
+    ns.entries[key] = (time.monotonic() + ns.policy.ttl_seconds, value)
+    ns.entries.move_to_end(key)
+    while len(ns.entries) > ns.policy.max_entries:
+        ns.entries.popitem(last=False)
+        ns.count("eviction")
+
+
+async def cached(namespace: str, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+    """``get`` or ``await load()`` and ``put``. ``None`` results are not cached."""
+    value = get(namespace, key, _MISSING)
+    if value is not _MISSING:
+        return value
+    ns = _namespaces.get(namespace)
+    generation = ns.generation if ns is not None else None
+    value = await load()
+    if value is not None:
+        put(namespace, key, value, generation=generation)
+    return value
+
+
+def invalidate(namespace: str, key: Optional[str] = None) -> None:
+    """Drop ``key`` (or the whole namespace) from this worker only."""
+    ns = _namespaces.get(namespace)
+    if ns is None:
+        return
+    ns.generation += 1
+    if key is None:
+        ns.entries.clear()
+    else:
+        ns.entries.pop(key, None)
+    ns.count("invalidation")
+
+
+def clear() -> None:
+    """Drop everything from this worker (listener reconnects, tests)."""
+    for name in list(_namespaces):
+        invalidate(name)
+
+
+def stats() -> dict[str, dict[str, int]]:
+    """Per-namespace event counts and current size."""
+    return {name: {**ns.counts, "entries": len(ns.entries)} for name, ns in _namespaces.items()}
+
+
+def _channel() -> str:
+    return build_cache_key(INVALIDATION_CHANNEL_SUFFIX)
+
+
+async def publish_invalidation(namespace: str, key: Optional[str] = None) -> None:
+    """Invalidate locally and tell the other workers. Best-effort: a publish
+    failure only leaves other workers on their TTL."""
+    invalidate(namespace, key)
+    try:
+        await redis_client.publish(_channel(), json.dumps({"ns": namespace, "key": key, "origin": _ORIGIN}))
+    except Exception as e:
+        logger.warning("near-cache: invalidation publish failed for %s:%s: %s", namespace, key, e)
+
+
+def _handle_message(data: Any) -> None:
+    try:
+        message = json.loads(data)
+    except (TypeError, ValueError):
+        return
+    if not isinstance(message, dict) or message.get("origin") == _ORIGIN:
+        return
+    invalidate(str(message.get("ns")), message.get("key"))
+
+
+async def _listen() -> None:
+    while True:
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(_channel())
+            # Anything published while we were not subscribed was missed.
+            clear()
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    _handle_message(message.get("data"))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("near-cache: invalidation listener error: %s; retrying", e)
+            clear()
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+        await asyncio.sleep(_LISTENER_RETRY_SECONDS)
+
+
+async def start_near_cache_listener() -> None:
+    """Subscribe this worker to cross-worker invalidations (FastAPI lifespan)."""
+    global _listener_task
+    if not settings.near_cache_enabled or _listener_task is not None:
+        return
+    _listener_task = asyncio.create_task(_listen())
+    logger.info("near-cache: invalidation listener started")
+
+
+async def stop_near_cache_listener() -> None:
+    global _listener_task
+    task, _listener_task = _listener_task, None
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        pass
+    clear()
@@ -70,6 +70,7 @@ from typing import Optional
 
 from app import metrics
 from app.config import settings
+from app.core import near_cache
 from app.core.cache import cache
 from app.llm_core.config_model import ConcurrencyGate, Provider, Step
 from helpers.utils import get_logger
@@ -81,6 +82,7 @@ logger = get_logger(__name__)
 # independent boxes / the fleet aggregate cache independently). Short TTL, shared
 # across workers.
 _CACHE_KEY_PREFIX = "llm_core_concurrency:"
+_NEAR_CACHE_NAMESPACE = "concurrency"
 
 # Default Prometheus aggregate query: the summed fleet in-flight request count.
 _DEFAULT_PROM_QUERY = "sum(vllm:num_requests_running + vllm:num_requests_waiting)"
@@ -192,17 +194,24 @@ async def get_concurrency(metrics_url: str) -> Optional[int]:
             return await _fetch_concurrency(metrics_url)
 
     key = f"{_CACHE_KEY_PREFIX}{cache_source}"
+    # Every gated call reads the gauge; a sub-second in-process copy keeps that
+    # off the network (app.core.near_cache).
+    cached = near_cache.get(_NEAR_CACHE_NAMESPACE, key)
+    if cached is not None:
+        return cached
     try:
         cached = await cache.get(key)
     except Exception as e:  # Redis down -> direct fetch, don't break routing
         logger.warning("concurrency: cache read failed for %s: %s", cache_source, e)
         cached = None
     if cached is not None:
+        near_cache.put(_NEAR_CACHE_NAMESPACE, key, cached)
         return cached
 
     value = await _do_fetch()
     if value is not None:
         metrics.set_inflight(inflight_label, value)  # no-op if prom lib absent; never raises
+        near_cache.put(_NEAR_CACHE_NAMESPACE, key, value)
         try:
             await cache.set(key, value, ttl=settings.concurrency_metrics_cache_ttl_s)
         except Exception as e:  # persistence best-effort
@@ -26,18 +26,22 @@ will reconcile last.
 
 from __future__ import annotations
 
+import asyncio
 import json
 import os
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from functools import lru_cache
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Optional
 
+import aiohttp
 import httpx
 from openai import AsyncOpenAI, AsyncAzureOpenAI
 from pydantic_ai.models.anthropic import AnthropicModel
 from pydantic_ai.providers.openai import OpenAIProvider
 
 from helpers.utils import get_logger
+from app.config import settings
 from app.llm_core.config_model import Provider, Tier, StepClientKind
 
 # Version-tolerant OpenAI model class: the deploy target pins pydantic-ai 1.x
@@ -120,16 +124,75 @@ def _build_openai_compatible_model(
     )
 
 
+# Keep-alive aiohttp sessions for TranslateGemma, one per endpoint, bound to the
+# loop that created them. Only used between start_tg_sessions()/close_tg_sessions()
+# (the FastAPI lifespan); outside it every call opens and closes its own session,
+# exactly as before, so scripts and unit tests are unaffected.
+_tg_sessions_started = False
+_tg_sessions: dict[str, aiohttp.ClientSession] = {}
+
+
+def _new_tg_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=settings.http_pool_max_connections,
+        keepalive_timeout=settings.http_pool_keepalive_expiry_seconds,
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+def _shared_tg_session(endpoint: str) -> aiohttp.ClientSession:
+    session = _tg_sessions.get(endpoint)
+    loop = asyncio.get_running_loop()
+    if session is None or session.closed or getattr(session, "_loop", loop) is not loop:
+        session = _tg_sessions[endpoint] = _new_tg_session()
+        logger.info("tg_session endpoint=%s created", endpoint)
+    return session
+
+
+async def start_tg_sessions() -> None:
+    """Enable the per-endpoint keep-alive sessions (FastAPI lifespan startup)."""
+    global _tg_sessions_started
+    _tg_sessions_started = True
+
+
+async def close_tg_sessions() -> None:
+    """Close every TranslateGemma session (FastAPI lifespan shutdown)."""
+    global _tg_sessions_started
+    _tg_sessions_started = False
+    sessions = list(_tg_sessions.items())
+    _tg_sessions.clear()
+    for endpoint, session in sessions:
+        try:
+            await session.close()
+        except Exception as e:
+            logger.warning("tg_session endpoint=%s close failed: %s", endpoint, e)
+
+
 @dataclass(frozen=True)
 class TGDescriptor:
     """TranslateGemma is ``/completions``-over-aiohttp, not an OpenAI client —
     so it materializes to an inert descriptor the translation service consumes
-    directly, never a client object."""
+    directly, never a client object.
+
+    The descriptor owns its endpoint's HTTP session: :meth:`session` lends the
+    shared keep-alive ``aiohttp.ClientSession`` for ``endpoint`` while the app is
+    running, so consecutive sentence batches reuse warm connections instead of
+    paying a TCP (+TLS) handshake each."""
 
     completions_url: str
     model_id: str
     endpoint: str
 
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """Borrow the endpoint's session (a private one, closed on exit, when the
+        shared sessions are not started)."""
+        if not _tg_sessions_started:
+            async with aiohttp.ClientSession() as session:
+                yield session
+            return
+        yield _shared_tg_session(self.endpoint)
+
 
 def _key(tier: Tier) -> Optional[str]:
     """Read the named secret env var at materialize time (never stored)."""
@@ -87,6 +87,10 @@ class PipelineTrace:
     profile_weight: Optional[int] = None
     steps: dict[str, StepRecord] = field(default_factory=dict)
     flags: dict = field(default_factory=dict)
+    # Wall time (ms) of each turn-preamble step (history, farmer_context,
+    # pretranslation, ...) plus "preamble" for the whole graph — the steps run
+    # concurrently, so the critical path is the slowest chain, not the sum.
+    timings: dict[str, int] = field(default_factory=dict)
 
     def step(self, name: str) -> StepRecord:
         """Get-or-create the record for a step (health/concurrency may touch it
@@ -102,11 +106,14 @@ class PipelineTrace:
         profile = None
         if self.profile_name is not None:
             profile = {"name": self.profile_name, "weight": self.profile_weight}
-        return {
+        out = {
             "profile": profile,
             "flags": self.flags,
             "steps": {name: rec.to_dict() for name, rec in self.steps.items()},
         }
+        if self.timings:
+            out["timings_ms"] = dict(self.timings)
+        return out
 
 
 _CTX: contextvars.ContextVar[Optional[PipelineTrace]] = contextvars.ContextVar(
@@ -191,6 +198,13 @@ def set_step_primary(pt: Optional[PipelineTrace], step: Any, tier: Any) -> None:
         rec.tier_served_index = 0
 
 
+def record_step_timing(pt: Optional[PipelineTrace], name: str, wall_ms: float) -> None:
+    """Record one preamble step's wall time on an EXPLICIT pt (contextvar-independent)."""
+    if pt is None:
+        return
+    pt.timings[name] = int(round(wall_ms))
+
+
 def populate(
     pt: Optional[PipelineTrace],
     pipeline: Any,
@@ -467,3 +481,20 @@ def served_summary(pt: Optional[PipelineTrace]) -> Optional[str]:
     except Exception as e:  # pragma: no cover - defensive
         logger.debug("llm_core.trace: served_summary failed: %s", e)
         return None
+
+
+def timings_summary(pt: Optional[PipelineTrace]) -> Optional[str]:
+    """Compact per-step wall times, e.g. ``"farmer_context=340,history=12,preamble=820"``.
+
+    Recorded by the turn preamble via :func:`record_step_timing` after the
+    request path has already snapshotted its metadata, so — like
+    :func:`served_summary` — it is emitted on its own. Returns None when nothing
+    was recorded.
+    """
+    if pt is None or not pt.timings:
+        return None
+    try:
+        return ",".join(f"{name}={ms}" for name, ms in sorted(pt.timings.items()))[:_ATTR_CAP]
+    except Exception as e:  # pragma: no cover - defensive
+        logger.debug("llm_core.trace: timings_summary failed: %s", e)
+        return None
@@ -36,6 +36,7 @@ try:  # optional dependency — the pipeline runs fine without it (no-op mode)
         CollectorRegistry,
         Counter,
         Gauge,
+        Histogram,
         generate_latest,
         CONTENT_TYPE_LATEST,
     )
@@ -114,6 +115,135 @@ if _ENABLED:
         **_reg_kw,
     )
 
+    # Shared upstream HTTP pools (app/core/http_clients.py). state = in_use | idle.
+    _http_pool_connections = Gauge(
+        "http_pool_connections",
+        "Open connections in a shared upstream HTTP pool, by state.",
+        ["upstream", "state"],
+        multiprocess_mode="livesum",
+        **_reg_kw,
+    )
+    _http_pool_in_flight = Gauge(
+        "http_pool_requests_in_flight",
+        "Requests currently in flight (including those waiting for a connection) per upstream pool.",
+        ["upstream"],
+        multiprocess_mode="livesum",
+        **_reg_kw,
+    )
+    _http_pool_wait = Histogram(
+        "http_pool_wait_seconds",
+        "Time a request waited for a pooled connection (connect time of a new one excluded).",
+        ["upstream"],
+        buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+        **_reg_kw,
+    )
+
+    # In-process near-cache in front of Redis (app/core/near_cache.py).
+    # event = hit | miss | eviction | invalidation.
+    _near_cache_events = Counter(
+        "near_cache_events_total",
+        "Near-cache lookups and evictions by namespace and event.",
+        ["namespace", "event"],
+        **_reg_kw,
+    )
+
+    # Redis round trips per chat turn (app.core.cache.count_redis_round_trips);
+    # a pipeline or script counts once. outcome = success | cancelled | error.
+    _redis_round_trips = Histogram(
+        "redis_round_trips_per_turn",
+        "Redis round trips made by one chat turn.",
+        ["outcome"],
+        buckets=(1, 2, 3, 4, 6, 8, 10, 15, 20, 30, 50),
+        **_reg_kw,
+    )
+
+    # Farmer refresh queue (agents/services/farmer_cache.py, drained by
+    # app/tasks/farmer_refresh_worker.py). Depth is the shared Redis queue as last
+    # seen by a worker; lag is enqueue -> picked up; throughput is the rate of
+    # the processed counter. outcome = refreshed | unavailable | error.
+    _farmer_refresh_queue_depth = Gauge(
+        "farmer_refresh_queue_depth",
+        "Phones waiting in the farmer refresh queue, as last seen by a worker.",
+        multiprocess_mode="max",
+        **_reg_kw,
+    )
+    _farmer_refresh_lag = Histogram(
+        "farmer_refresh_queue_lag_seconds",
+        "Time a phone waited in the farmer refresh queue before a worker took it.",
+        buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 900.0, 1800.0, 3600.0),
+        **_reg_kw,
+    )
+    _farmer_refresh_processed = Counter(
+        "farmer_refresh_processed_total",
+        "Background farmer refreshes completed, by outcome.",
+        ["outcome"],
+        **_reg_kw,
+    )
+    # Request-path farmer cache reads. result = hit (fresh) | stale | cold.
+    _farmer_cache_lookups = Counter(
+        "farmer_cache_lookups_total",
+        "Request-path farmer cache reads, by whether the record was fresh, stale or missing.",
+        ["result"],
+        **_reg_kw,
+    )
+    # Scheme source refreshes (app/services/scheme_ingestion.py), lock holder only.
+    # outcome = refreshed | empty | error.
+    _scheme_refresh_seconds = Histogram(
+        "scheme_refresh_seconds",
+        "Wall time of one scheme source refresh, by source and outcome.",
+        ["source", "outcome"],
+        buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600),
+        **_reg_kw,
+    )
+    # Scheme PDFs per refresh, by whether OCR ran: extracted (new or changed
+    # bytes) | unchanged (same SHA-256) | not_modified (HTTP 304).
+    _scheme_pdfs = Counter(
+        "scheme_pdfs_total",
+        "Scheme PDFs processed by ingestion, by whether they had to be OCR'd.",
+        ["result"],
+        **_reg_kw,
+    )
+    # Marqo searches from search_documents (agents/tools/search.py).
+    # mode = hybrid | tensor | lexical (the method actually sent, so a hybrid
+    # failure retried as tensor shows up under both); outcome = ok | error.
+    _marqo_search_seconds = Histogram(
+        "marqo_search_seconds",
+        "Latency of one Marqo search call, by search method and outcome.",
+        ["mode", "outcome"],
+        buckets=(0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0),
+        **_reg_kw,
+    )
+    _marqo_search_in_flight = Gauge(
+        "marqo_search_in_flight",
+        "Marqo search calls currently in flight.",
+        multiprocess_mode="livesum",
+        **_reg_kw,
+    )
+    # Marqo index capability probes (agents/tools/search.py): the startup
+    # warmup and the background refreshes. outcome = ok | error.
+    _marqo_capabilities_probe_seconds = Histogram(
+        "marqo_capabilities_probe_seconds",
+        "Latency of one Marqo index capability probe, by outcome.",
+        ["outcome"],
+        buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0),
+        **_reg_kw,
+    )
+    # search_documents result cache (agents/services/search_cache.py).
+    # result = hit | near_hit (token-set match) | miss; saved = the search time
+    # the served entry originally took.
+    _search_cache_lookups = Counter(
+        "search_cache_lookups_total",
+        "search_documents result cache lookups, by result.",
+        ["result"],
+        **_reg_kw,
+    )
+    _search_cache_saved = Histogram(
+        "search_cache_saved_seconds",
+        "Search time avoided by a search_documents result cache hit.",
+        buckets=(0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0),
+        **_reg_kw,
+    )
+
 _BREAKER_STATE_CODES = {"closed": 0, "half_open": 1, "half-open": 1, "open": 2}
 
 
@@ -174,6 +304,167 @@ def set_inflight(endpoint: object, value: object) -> None:
         pass
 
 
+def set_http_pool_connections(upstream: object, in_use: object, idle: object) -> None:
+    """Publish a shared HTTP pool's open connections (in use vs idle keep-alive)."""
+    if not _ENABLED:
+        return
+    try:
+        _http_pool_connections.labels(_s(upstream), "in_use").set(float(in_use))
+        _http_pool_connections.labels(_s(upstream), "idle").set(float(idle))
+    except Exception:
+        pass
+
+
+def set_http_pool_in_flight(upstream: object, value: object) -> None:
+    """Publish the number of requests in flight on a shared HTTP pool."""
+    if not _ENABLED:
+        return
+    try:
+        _http_pool_in_flight.labels(_s(upstream)).set(float(value))
+    except Exception:
+        pass
+
+
+def observe_http_pool_wait(upstream: object, seconds: object) -> None:
+    """A request on a shared HTTP pool waited ``seconds`` for its connection."""
+    if not _ENABLED:
+        return
+    try:
+        _http_pool_wait.labels(_s(upstream)).observe(float(seconds))
+    except Exception:
+        pass
+
+
+def record_near_cache_event(namespace: object, event: object) -> None:
+    """A near-cache ``event`` (hit/miss/eviction/invalidation) in ``namespace``."""
+    if not _ENABLED:
+        return
+    try:
+        _near_cache_events.labels(_s(namespace), _s(event)).inc()
+    except Exception:
+        pass
+
+
+def observe_redis_round_trips(outcome: object, count: object) -> None:
+    """A chat turn ended with ``outcome`` after ``count`` Redis round trips."""
+    if not _ENABLED:
+        return
+    try:
+        _redis_round_trips.labels(_s(outcome)).observe(float(count))
+    except Exception:
+        pass
+
+
+def set_farmer_refresh_queue_depth(depth: object) -> None:
+    """Publish the farmer refresh queue depth seen by a worker."""
+    if not _ENABLED:
+        return
+    try:
+        _farmer_refresh_queue_depth.set(float(depth))
+    except Exception:
+        pass
+
+
+def observe_farmer_refresh_lag(seconds: object) -> None:
+    """A queued phone was picked up ``seconds`` after it was enqueued."""
+    if not _ENABLED:
+        return
+    try:
+        _farmer_refresh_lag.observe(float(seconds))
+    except Exception:
+        pass
+
+
+def record_farmer_refresh(outcome: object) -> None:
+    """A background farmer refresh finished with ``outcome``."""
+    if not _ENABLED:
+        return
+    try:
+        _farmer_refresh_processed.labels(_s(outcome)).inc()
+    except Exception:
+        pass
+
+
+def record_farmer_cache_lookup(result: object) -> None:
+    """A request-path farmer cache read found a ``result`` (hit/stale/cold) record."""
+    if not _ENABLED:
+        return
+    try:
+        _farmer_cache_lookups.labels(_s(result)).inc()
+    except Exception:
+        pass
+
+
+def observe_scheme_refresh(source: object, outcome: object, seconds: object) -> None:
+    """A scheme source refresh for ``source`` ended with ``outcome`` after ``seconds``."""
+    if not _ENABLED:
+        return
+    try:
+        _scheme_refresh_seconds.labels(_s(source), _s(outcome)).observe(float(seconds))
+    except Exception:
+        pass
+
+
+def record_scheme_pdf(result: object) -> None:
+    """Scheme ingestion handled a PDF with ``result`` (extracted/unchanged/not_modified)."""
+    if not _ENABLED:
+        return
+    try:
+        _scheme_pdfs.labels(_s(result)).inc()
+    except Exception:
+        pass
+
+
+def observe_marqo_search(mode: object, outcome: object, seconds: object) -> None:
+    """One Marqo search call with method ``mode`` took ``seconds`` (ok/error)."""
+    if not _ENABLED:
+        return
+    try:
+        _marqo_search_seconds.labels(_s(mode), _s(outcome)).observe(float(seconds))
+    except Exception:
+        pass
+
+
+def set_marqo_search_in_flight(value: object) -> None:
+    """Publish the number of Marqo search calls in flight in this process."""
+    if not _ENABLED:
+        return
+    try:
+        _marqo_search_in_flight.set(float(value))
+    except Exception:
+        pass
+
+
+def observe_marqo_capabilities_probe(outcome: object, seconds: object) -> None:
+    """One Marqo index capability probe took ``seconds`` (ok/error)."""
+    if not _ENABLED:
+        return
+    try:
+        _marqo_capabilities_probe_seconds.labels(_s(outcome)).observe(float(seconds))
+    except Exception:
+        pass
+
+
+def record_search_cache_lookup(result: object) -> None:
+    """A search_documents cache lookup ended in ``result`` (hit/near_hit/miss)."""
+    if not _ENABLED:
+        return
+    try:
+        _search_cache_lookups.labels(_s(result)).inc()
+    except Exception:
+        pass
+
+
+def observe_search_cache_saved(seconds: object) -> None:
+    """A search cache hit avoided a search that took ``seconds``."""
+    if not _ENABLED:
+        return
+    try:
+        _search_cache_saved.observe(float(seconds))
+    except Exception:
+        pass
+
+
 def render() -> tuple[bytes, str]:
     """(_body_, _content_type_) for the ``GET /metrics`` endpoint."""
     if not _ENABLED:
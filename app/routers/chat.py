@@ -4,7 +4,6 @@ from app.auth.jwt_auth import get_chat_user
 from app.services.chat import stream_chat_messages
 from app.llm_core import split as _llm_split
 from app.config import settings
-from app.utils import _get_message_history
 from app.models.requests import ChatRequest
 from app.personas import history_session_id_for_persona, resolve_chat_persona
 from helpers.utils import get_logger
@@ -37,9 +36,6 @@ async def chat_endpoint(
     
     resolved_persona = resolve_chat_persona(user_info, request.persona)
     history_session_id = history_session_id_for_persona(session_id, resolved_persona)
-    history = await _get_message_history(history_session_id)
-    logger.debug(f"Retrieved message history for session {session_id} - length: {len(history)}")
-
     # Sticky per-session routing via the unified weighted named-profile split
     # (the only path). The routing token is the actual profile NAME (N-way), threaded
     # downstream and served DIRECTLY (no oss/legacy collapse). With the env-synthesized
@@ -54,7 +50,9 @@ async def chat_endpoint(
         target_lang=request.target_lang,
         channel=request.channel,
         user_id=request.user_id,
-        history=history,
+        # Loaded inside the turn, concurrently with farmer context and
+        # pretranslation (see the turn preamble in stream_chat_messages).
+        history=None,
         user_info=user_info,
         background_tasks=background_tasks,
         use_translation_pipeline=request.use_translation_pipeline if request.use_translation_pipeline is not None else True,
@@ -1,4 +1,6 @@
-from contextlib import nullcontext
+import asyncio
+import time
+from contextlib import aclosing, nullcontext
 from typing import AsyncGenerator
 from functools import lru_cache
 import os
@@ -12,15 +14,17 @@ from app.llm_core import resolver as _llm_resolver
 from app.llm_core.config_model import Step as _LlmStep
 from helpers.utils import get_logger
 from app.utils import (
+    _load_message_history,
     update_message_history,
     trim_history,
     format_message_pairs,
-    set_cache,
 )
 from app.tasks.suggestions import create_suggestions
 from app.config import settings
+from app.services.task_graph import TaskStep, run_task_graph
 from app.services.fallback import AGENT_ACTIVITY, execute_with_fallback, stream_with_fallback, with_first_token_deadline
-from app.core.cache import cache
+from app import metrics as _metrics
+from app.core.cache import CacheBatch, count_redis_round_trips
 from agents.deps import FarmerContext
 from agents.farmer_context import get_farmer_context_bundle_by_mobile
 from agents.tools.farmer import normalize_phone_to_mobile
@@ -66,6 +70,17 @@ class SentenceSegmenter:
 sentence_segmenter = SentenceSegmenter()
 
 
+def _chat_history_load_max_turns() -> int | None:
+    """Stored turns a chat turn loads (CHAT_HISTORY_MAX_TURNS, 0 = all).
+
+    trim_history then cuts them to the token budget; loading only the tail keeps
+    a long session from re-reading and re-validating turns trimming would drop.
+    """
+    raw = os.getenv("CHAT_HISTORY_MAX_TURNS", "50")
+    turns = int(raw) if raw.isdigit() else 50
+    return turns or None
+
+
 def _chat_history_trim_max_tokens(agent_provider: str, agent_model_name: str) -> int:
     """Keep fewer past turns for smaller-context vLLM gemma backends so
     system+tools+history+user fit.
@@ -113,6 +128,175 @@ def _batch_starts_new_line_or_list(text: str) -> bool:
     return False
 
 
+async def _segment_translation_batches(english_src):
+    """Cut the English agent stream into sentence batches for post-translation.
+
+    Yields ``(label, batch_text)`` at exactly the boundaries the serial loop used
+    to translate at: full batches as ``should_translate_batch`` accepts them, then
+    whatever sentences are left, then the unterminated tail fragment. ``label``
+    only names the batch in the degrade log line.
+    """
+    sentence_buffer = ""
+    translation_batch: list[str] = []
+    batch_word_count = 0
+    async with aclosing(english_src) as src:
+        async for chunk in src:
+            sentence_buffer += chunk
+            complete_sentences, remaining = extract_complete_sentences(sentence_buffer)
+            if complete_sentences:
+                for sentence in complete_sentences:
+                    translation_batch.append(sentence)
+                    batch_word_count += len(sentence.split())
+                batch_text = "".join(translation_batch)
+                if should_translate_batch(batch_text, batch_word_count):
+                    yield "Optimised batch", batch_text
+                    translation_batch = []
+                    batch_word_count = 0
+                sentence_buffer = remaining
+    if translation_batch:
+        yield "Final batch", "".join(translation_batch)
+    if sentence_buffer.strip():
+        yield "Tail fragment", sentence_buffer
+
+
+async def _pipelined_translations(batches, translate, max_in_flight: int):
+    """Translate batches concurrently while the agent is still generating.
+
+    A producer task keeps pulling ``batches`` (and therefore agent tokens) and
+    starts ``translate(batch_text)`` for each one, with at most ``max_in_flight``
+    translation requests open at once. Batches come back strictly in source
+    order as ``(label, batch_text, chunks)``, where ``chunks`` streams that
+    batch's translated output as it arrives and re-raises its translation error,
+    so the head batch still streams token by token while later batches finish
+    in the background.
+
+    The producer and translation tasks are owned here: the producer closes the
+    agent stream in its own task (the pydantic-ai run's cancel scope never
+    crosses tasks), and closing this generator (client disconnect) cancels
+    everything still in flight. An agent-stream failure surfaces only after
+    every batch cut before it has been emitted, matching the serial order.
+    """
+    _CHUNK, _END, _ERR = 0, 1, 2
+    slots = asyncio.Semaphore(max_in_flight)
+    # Bounded hand-off: the producer stops reading the agent once this many
+    # batches are waiting behind the one being emitted.
+    ready: asyncio.Queue = asyncio.Queue(maxsize=max_in_flight)
+    workers: list[asyncio.Task] = []
+
+    async def _translate_into(batch_text: str, out: asyncio.Queue) -> None:
+        async with slots:
+            try:
+                async for translated_chunk in translate(batch_text):
+                    out.put_nowait((_CHUNK, translated_chunk))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                out.put_nowait((_ERR, exc))
+                return
+        out.put_nowait((_END, None))
+
+    async def _produce() -> None:
+        try:
+            async with aclosing(batches) as src:
+                async for label, batch_text in src:
+                    out: asyncio.Queue = asyncio.Queue()
+                    workers.append(asyncio.create_task(_translate_into(batch_text, out)))
+                    await ready.put((label, batch_text, out))
+        except asyncio.CancelledError:
+            raise
+        except BaseException as exc:
+            await ready.put(exc)
+            return
+        await ready.put(None)
+
+    async def _drain(out: asyncio.Queue):
+        while True:
+            kind, val = await out.get()
+            if kind == _END:
+                return
+            if kind == _ERR:
+                raise val
+            yield val
+
+    producer = asyncio.create_task(_produce())
+    try:
+        while True:
+            item = await ready.get()
+            if item is None:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            label, batch_text, out = item
+            yield label, batch_text, _drain(out)
+    finally:
+        pending = [t for t in (producer, *workers) if not t.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+class _ModerationVerdict:
+    """Outcome of the per-turn moderation task the speculative agent gates on.
+
+    The task never raises: a moderation failure is carried as ``error`` and
+    counts as ``rejected``, so chat stays fail-closed (the turn declines) and a
+    side-effecting tool awaiting ``FarmerContext.ensure_in_scope`` refuses its
+    write instead of racing the cancellation.
+    """
+
+    def __init__(self, data=None, error: BaseException | None = None):
+        self.data = data
+        self.error = error
+
+    @property
+    def rejected(self) -> bool:
+        return self.error is not None or self.data.category != "valid_agricultural"
+
+
+class _SpeculativeStream:
+    """Run an agent text stream ahead of the moderation verdict.
+
+    The source is pumped in a task of its own from construction, so generation
+    (and tool calls) overlap moderation; everything it yields is buffered until
+    the caller reads ``stream()``. ``discard()`` cancels the pump and drops the
+    buffer. The pump task opens and closes the source, so the pydantic-ai run's
+    cancel scope never crosses tasks.
+    """
+
+    _ITEM, _END, _ERR = 0, 1, 2
+
+    def __init__(self, src):
+        self._buffer: asyncio.Queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._pump(src))
+
+    async def _pump(self, src) -> None:
+        try:
+            async with aclosing(src) as s:
+                async for item in s:
+                    self._buffer.put_nowait((self._ITEM, item))
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            self._buffer.put_nowait((self._ERR, exc))
+            return
+        self._buffer.put_nowait((self._END, None))
+
+    async def stream(self):
+        while True:
+            kind, val = await self._buffer.get()
+            if kind == self._END:
+                return
+            if kind == self._ERR:
+                raise val
+            yield val
+
+    async def discard(self) -> None:
+        if not self._task.done():
+            self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+
 def should_translate_batch(batch_text: str, word_count: int) -> bool:
     # Tuned for low-latency streaming while keeping reasonable batch size
     MIN_WORDS = 15
@@ -234,6 +418,22 @@ def _record_turn_outcome(outcome: str, session_id_safe: str) -> None:
         logger.debug("Langfuse: turn_outcome score failed: %s", e)
 
 
+def _record_redis_round_trips(outcome: str, count: int, session_id_safe: str) -> None:
+    """Emit the turn's Redis round-trip count; synchronous and never-raising
+    for the same reason as :func:`_record_turn_outcome`."""
+    logger.info("session=%s redis_round_trips=%d outcome=%s", session_id_safe, count, outcome)
+    _metrics.observe_redis_round_trips(outcome, count)
+
+
+async def _mark_suggestions_pending(suggestions_cache_key: str) -> None:
+    """Mark fresh suggestions pending and clear the stale ones, in one round
+    trip, so callers wait for fresh output."""
+    batch = CacheBatch()
+    batch.set(f"{suggestions_cache_key}:pending", True, ttl=SUGGESTIONS_PENDING_TTL)
+    batch.delete(suggestions_cache_key)
+    await batch.execute()
+
+
 async def stream_chat_messages(
     query: str,
     session_id: str,
@@ -241,7 +441,7 @@ async def stream_chat_messages(
     target_lang: str,
     channel: str,
     user_id: str,
-    history: list,
+    history: list | None,
     user_info: dict,
     background_tasks: BackgroundTasks,
     use_translation_pipeline: bool = True,
@@ -254,6 +454,9 @@ async def stream_chat_messages(
     active_agent = doctor_agent if persona == "doctor" else agrinet_agent
     active_moderation_agent = doctor_moderation_agent if persona == "doctor" else moderation_agent
     message_history_session_id = history_session_id or session_id
+    # What the turn loaded from the history store, handed back on write so only
+    # this turn's messages are appended. None when the caller supplied history.
+    loaded_history = None
     # The turn's channel profile: what differs between delivery channels, resolved
     # once here rather than re-derived at each use site.
     profile = _profile_for(channel)
@@ -350,7 +553,7 @@ async def stream_chat_messages(
         else nullcontext()
     )
 
-    with session_ctx, _root_ctx:
+    with session_ctx, _root_ctx, count_redis_round_trips() as _redis_trips:
         # ONE exit point for the turn. Without this, an outcome is recorded only
         # on normal completion: a client disconnect or an exception leaves the
         # trace with no output and no signal at all, which is #179's B2.
@@ -425,8 +628,6 @@ async def stream_chat_messages(
                 return text_en
 
             request_id = session_id
-            # Generate a unique content ID for this query
-            content_id = f"query_{session_id}_{len(history)//2 + 1}"
             logger.info("request_id=%s user_info=%s", request_id, user_info)
 
             if is_identity_query(query):
@@ -443,6 +644,11 @@ async def stream_chat_messages(
                     except Exception as e:
                         logger.warning("Langfuse: failed to record identity output: %s", e)
 
+                if history is None:
+                    loaded_history = await _load_message_history(
+                        message_history_session_id, _chat_history_load_max_turns()
+                    )
+                    history = loaded_history.messages
                 messages = [
                     *history,
                     ModelRequest(parts=[UserPromptPart(content=query)]),
@@ -453,15 +659,25 @@ async def stream_chat_messages(
                     request_id,
                     len(messages),
                 )
-                await update_message_history(message_history_session_id, messages)
+                await update_message_history(message_history_session_id, messages, loaded_history)
                 yield identity_response
                 return
 
-            # Extract farmer context from phone in JWT via cache-first fetch
-            farmer_data = ""
-            farmer_unions: list[str] = []
-            farmer_location: dict[str, str] = {}
-            if persona == "farmer" and user_info and user_info.get('phone'):
+            # ── Turn preamble ────────────────────────────────────────────────
+            # Stored history, farmer context and pretranslation do not depend on
+            # each other, so they run as one task graph (app.services.task_graph):
+            # the preamble costs its slowest step instead of the sum, a client
+            # disconnect cancels all of them, and each step's wall time lands on
+            # the PipelineTrace. Every step degrades on its own errors exactly as
+            # the sequential code did.
+            async def _load_history():
+                return await _load_message_history(message_history_session_id, _chat_history_load_max_turns())
+
+            async def _load_farmer_context():
+                # Extract farmer context from phone in JWT via cache-first fetch
+                farmer_data = ""
+                farmer_unions: list[str] = []
+                farmer_location: dict[str, str] = {}
                 try:
                     farmer_data, farmer_unions, farmer_location = await get_farmer_context_bundle_by_mobile(user_info['phone'])
                     logger.info(f"request_id={request_id} farmer_context_length={len(farmer_data)}")
@@ -469,6 +685,7 @@ async def stream_chat_messages(
                     logger.info("request_id=%s farmer_district=%s", request_id, farmer_location.get("district"))
                 except Exception as e:
                     logger.warning(f"request_id={request_id} farmer_context_fetch_failed={e}")
+                return farmer_data, farmer_unions, farmer_location
 
             # Hindi kill switch (HINDI_CHAT_ENABLED, default on). When disabled,
             # hi/hindi drop out of both the pretranslation (src->en) and output
@@ -480,14 +697,15 @@ async def stream_chat_messages(
                 else [lang for lang in INDIAN_LANGUAGES if lang not in {"hi", "hindi"}]
             )
 
-            processing_query = query
-            processing_lang = target_lang
             needs_output_translation = use_translation_pipeline and target_lang.lower() in output_translation_langs
 
             pretranslation_source_langs = {"gu", "gujarati"}
             if hindi_enabled:
                 pretranslation_source_langs |= {"hi", "hindi"}
-            if use_translation_pipeline and source_lang.lower() in pretranslation_source_langs:
+
+            async def _pretranslate():
+                processing_query = query
+                processing_lang = target_lang
                 # OSS sessions force pre-translation onto the self-hosted vLLM endpoint
                 # (provider="vllm"); legacy keeps the configured PRETRANSLATION_PROVIDER
                 # (None => default). Equivalent to the resolved PRE_TRANSLATION primary
@@ -575,6 +793,28 @@ async def stream_chat_messages(
                             )
                             processing_query = query
                             processing_lang = target_lang
+                return processing_query, processing_lang
+
+            preamble_steps = []
+            if history is None:
+                preamble_steps.append(TaskStep("history", _load_history))
+            if persona == "farmer" and user_info and user_info.get('phone'):
+                preamble_steps.append(TaskStep("farmer_context", _load_farmer_context))
+            if use_translation_pipeline and source_lang.lower() in pretranslation_source_langs:
+                preamble_steps.append(TaskStep("pretranslation", _pretranslate))
+            _preamble_started = time.perf_counter()
+            preamble = await run_task_graph(
+                preamble_steps,
+                on_step_done=lambda name, wall_ms: _pipeline_trace.record_step_timing(pt, name, wall_ms),
+            )
+            _pipeline_trace.record_step_timing(pt, "preamble", (time.perf_counter() - _preamble_started) * 1000.0)
+            logger.info("request_id=%s preamble_timings_ms=%s", request_id, _pipeline_trace.timings_summary(pt))
+            if history is None:
+                loaded_history = preamble["history"]
+                history = loaded_history.messages
+            farmer_data, farmer_unions, farmer_location = preamble.get("farmer_context", ("", [], {}))
+            processing_query, processing_lang = preamble.get("pretranslation", (query, target_lang))
+
             if use_translation_pipeline and needs_output_translation:
                 # Agent responds in English; response will be translated to target_lang downstream
                 processing_lang = "en"
@@ -609,90 +849,105 @@ async def stream_chat_messages(
             else:
                 last_response = ""
 
-            try:
-                user_message = f"{last_response}{deps.get_user_message()}"
-                _lf_mod = get_langfuse_client() if get_langfuse_client else None
-                _mod_obs_ctx = (
-                    _lf_mod.start_as_current_observation(
-                        # Distinct from Pydantic's "Moderation Agent run" OTEL span to avoid triple duplicate sidebar labels.
-                        name="Moderation",
-                        as_type="generation",
-                        input={
-                            # Actual model the moderation_agent.run uses below
-                            # (gemma for OSS, legacy model otherwise) — not LLM_MODEL_NAME,
-                            # which mislabeled OSS gemma moderation as gpt in dashboards.
-                            "model_name": request_model_name,
-                            "query": user_message,
-                            "session_id": session_id_safe,
-                            "use_translation_pipeline": bool(use_translation_pipeline),
-                        },
-                        model=request_model_name,
-                        metadata={"pipeline": pipeline_name},
-                    )
-                    if _lf_mod
-                    else nullcontext()
-                )
-                with _mod_obs_ctx as mod_obs:
-                    if settings.fallback_enabled:
-                        moderation_run = await execute_with_fallback(
-                            pipeline="moderation",
-                            session_id=session_id_safe,
-                            profile_name=pipeline_profile,
-                            run=lambda a: active_moderation_agent.run(user_message, model=a.model),
+            # Moderation runs CONCURRENTLY with the agent (speculative start, as on
+            # voice): the agent stream is started below without waiting for the
+            # verdict and its output is held until the verdict is known, taking a
+            # full moderation round-trip off time-to-first-token. A decline (or a
+            # moderation failure — chat stays fail-closed) discards the held output
+            # and cancels the run; side-effecting tools block on the verdict via
+            # deps.ensure_in_scope(), so a declined query can never produce a write.
+            moderation_user_message = f"{last_response}{deps.get_user_message()}"
+
+            async def _moderate() -> _ModerationVerdict:
+                try:
+                    _lf_mod = get_langfuse_client() if get_langfuse_client else None
+                    _mod_obs_ctx = (
+                        _lf_mod.start_as_current_observation(
+                            # Distinct from Pydantic's "Moderation Agent run" OTEL span to avoid triple duplicate sidebar labels.
+                            name="Moderation",
+                            as_type="generation",
+                            input={
+                                # Actual model the moderation_agent.run uses below
+                                # (gemma for OSS, legacy model otherwise) — not LLM_MODEL_NAME,
+                                # which mislabeled OSS gemma moderation as gpt in dashboards.
+                                "model_name": request_model_name,
+                                "query": moderation_user_message,
+                                "session_id": session_id_safe,
+                                "use_translation_pipeline": bool(use_translation_pipeline),
+                            },
+                            model=request_model_name,
+                            metadata={"pipeline": pipeline_name},
                         )
-                    else:
-                        moderation_run = await active_moderation_agent.run(user_message, model=moderation_model)
-                    moderation_data = moderation_run.output
+                        if _lf_mod
+                        else nullcontext()
+                    )
+                    with _mod_obs_ctx as mod_obs:
+                        if settings.fallback_enabled:
+                            moderation_run = await execute_with_fallback(
+                                pipeline="moderation",
+                                session_id=session_id_safe,
+                                profile_name=pipeline_profile,
+                                run=lambda a: active_moderation_agent.run(moderation_user_message, model=a.model),
+                            )
+                        else:
+                            moderation_run = await active_moderation_agent.run(moderation_user_message, model=moderation_model)
+                        moderation_data = moderation_run.output
+                        if mod_obs is not None:
+                            mod_obs.update(
+                                output={
+                                    "category": moderation_data.category,
+                                    "action": moderation_data.action,
+                                }
+                            )
+                    return _ModerationVerdict(moderation_data)
+                except Exception as e:
+                    return _ModerationVerdict(error=e)
+
+            moderation_task = asyncio.create_task(_moderate())
+            deps.set_moderation_task(moderation_task)
+
+            async def _settle_moderation(verdict: _ModerationVerdict):
+                """Act on the verdict; returns the decline text when the turn must stop."""
+                if verdict.error is not None:
+                    logger.error("request_id=%s moderation_error=%s", request_id, str(verdict.error))
+                    fail_closed_message = await localize_system_text(GENERIC_UNAVAILABLE_MESSAGE_EN)
                     logger.info(
-                        "request_id=%s moderation_category=%s moderation_action=%s",
+                        "request_id=%s moderation_blocked=True reason=moderation_error response_preview=%s",
                         request_id,
-                        moderation_data.category,
-                        moderation_data.action,
+                        fail_closed_message[:160],
                     )
-                    if mod_obs is not None:
-                        mod_obs.update(
-                            output={
-                                "category": moderation_data.category,
-                                "action": moderation_data.action,
-                            }
-                        )
-                    # Generate suggestions after moderation passes
-                    if moderation_data.category == "valid_agricultural" and persona == "farmer":
-                        logger.info(f"Triggering suggestions generation for session {session_id}")
-                        try:
-                            suggestions_cache_key = f"suggestions_{session_id}_{target_lang}"
-                            status_key = f"{suggestions_cache_key}:pending"
-                            # Mark pending and clear stale suggestions so callers wait for fresh output.
-                            await set_cache(status_key, True, ttl=SUGGESTIONS_PENDING_TTL)
-                            await cache.delete(suggestions_cache_key)
-                            background_tasks.add_task(create_suggestions, session_id, target_lang, pipeline_profile)
-                            logger.info("Successfully added suggestions task")
-                        except Exception as e:
-                            logger.error(f"Error adding suggestions task: {str(e)}")
-                    elif moderation_data.category != "valid_agricultural":
-                        # Hard gate: do not run retrieval/answer agent for moderated non-agricultural requests.
-                        decline_text = (moderation_data.action or "").strip() or (
-                            "I can only answer agriculture and livestock related questions."
-                        )
-                        decline_text = await localize_system_text(decline_text)
-                        logger.info(
-                            "request_id=%s moderation_blocked=True response_preview=%s",
-                            request_id,
-                            decline_text[:160],
-                        )
-                        yield decline_text
-                        return
-                    deps.update_moderation_str(str(moderation_data))
-            except Exception as e:
-                logger.error("request_id=%s moderation_error=%s", request_id, str(e))
-                fail_closed_message = await localize_system_text(GENERIC_UNAVAILABLE_MESSAGE_EN)
+                    return fail_closed_message
+                moderation_data = verdict.data
                 logger.info(
-                    "request_id=%s moderation_blocked=True reason=moderation_error response_preview=%s",
+                    "request_id=%s moderation_category=%s moderation_action=%s",
                     request_id,
-                    fail_closed_message[:160],
+                    moderation_data.category,
+                    moderation_data.action,
                 )
-                yield fail_closed_message
-                return
+                # Generate suggestions after moderation passes
+                if moderation_data.category == "valid_agricultural" and persona == "farmer":
+                    logger.info(f"Triggering suggestions generation for session {session_id}")
+                    try:
+                        suggestions_cache_key = f"suggestions_{session_id}_{target_lang}"
+                        await _mark_suggestions_pending(suggestions_cache_key)
+                        background_tasks.add_task(create_suggestions, session_id, target_lang, pipeline_profile)
+                        logger.info("Successfully added suggestions task")
+                    except Exception as e:
+                        logger.error(f"Error adding suggestions task: {str(e)}")
+                elif moderation_data.category != "valid_agricultural":
+                    # Hard gate: nothing the speculative agent produced reaches the farmer.
+                    decline_text = (moderation_data.action or "").strip() or (
+                        "I can only answer agriculture and livestock related questions."
+                    )
+                    decline_text = await localize_system_text(decline_text)
+                    logger.info(
+                        "request_id=%s moderation_blocked=True response_preview=%s",
+                        request_id,
+                        decline_text[:160],
+                    )
+                    return decline_text
+                deps.update_moderation_str(str(moderation_data))
+                return None
 
             user_message = deps.get_user_message()
             logger.info("request_id=%s running_agent=True user_message=%s", request_id, user_message)
@@ -724,8 +979,9 @@ async def stream_chat_messages(
                     # Distinct from Pydantic's "Amul AI Agent run" span; keeps gen_ai/tool children grouped under that name.
                     name=agent_observation_name,
                     as_type="generation",
+                    # The moderation "action" is added once the verdict lands: the
+                    # agent starts before it is known.
                     input={
-                        "action": moderation_data.action,
                         "model_name": request_model_name,
                         "persona": persona,
                     },
@@ -792,72 +1048,34 @@ async def stream_chat_messages(
 
                 async def _stream_to_client(english_src):
                     if needs_output_translation:
-                        sentence_buffer = ""
-                        translation_batch = []
-                        batch_word_count = 0
-                        async for chunk in english_src:
-                            sentence_buffer += chunk
-                            complete_sentences, remaining = extract_complete_sentences(sentence_buffer)
-                            if complete_sentences:
-                                for sentence in complete_sentences:
-                                    translation_batch.append(sentence)
-                                    batch_word_count += len(sentence.split())
-                                batch_text = "".join(translation_batch)
-                                if should_translate_batch(batch_text, batch_word_count):
-                                    if translated_output_chunks and _batch_starts_new_line_or_list(batch_text):
-                                        translated_output_chunks.append("\n")
-                                        yield "\n"
-                                    try:
-                                        async for translated_chunk in translate_text_stream_fast(
-                                            text=batch_text,
-                                            source_lang="english",
-                                            target_lang=target_lang,
-                                            max_output_chars=deps.response_max_chars,
-                                        ):
-                                            translated_output_chunks.append(translated_chunk)
-                                            yield translated_chunk
-                                    except Exception as e:
-                                        logger.error(f"Optimised batch translation failed, falling back to English batch: {e}")
-                                        translated_output_chunks.append(batch_text)
-                                        yield batch_text
-                                    translation_batch = []
-                                    batch_word_count = 0
-                                sentence_buffer = remaining
-                        if translation_batch:
-                            batch_text = "".join(translation_batch)
-                            if translated_output_chunks and _batch_starts_new_line_or_list(batch_text):
-                                translated_output_chunks.append("\n")
-                                yield "\n"
-                            try:
-                                async for translated_chunk in translate_text_stream_fast(
-                                    text=batch_text,
-                                    source_lang="english",
-                                    target_lang=target_lang,
-                                    max_output_chars=deps.response_max_chars,
-                                ):
-                                    translated_output_chunks.append(translated_chunk)
-                                    yield translated_chunk
-                            except Exception as e:
-                                logger.error(f"Final batch translation failed, falling back to English batch: {e}")
-                                translated_output_chunks.append(batch_text)
-                                yield batch_text
-                        if sentence_buffer.strip():
-                            if translated_output_chunks and _batch_starts_new_line_or_list(sentence_buffer):
-                                translated_output_chunks.append("\n")
-                                yield "\n"
-                            try:
-                                async for translated_chunk in translate_text_stream_fast(
-                                    text=sentence_buffer,
-                                    source_lang="english",
-                                    target_lang=target_lang,
-                                    max_output_chars=deps.response_max_chars,
-                                ):
-                                    translated_output_chunks.append(translated_chunk)
-                                    yield translated_chunk
-                            except Exception as e:
-                                logger.error(f"Tail fragment translation failed, falling back to English fragment: {e}")
-                                translated_output_chunks.append(sentence_buffer)
-                                yield sentence_buffer
+                        def _translate_batch(batch_text):
+                            return translate_text_stream_fast(
+                                text=batch_text,
+                                source_lang="english",
+                                target_lang=target_lang,
+                                max_output_chars=deps.response_max_chars,
+                            )
+
+                        # Translation of batch N overlaps generation of batch N+1
+                        # (and translation of up to CHAT_TRANSLATION_MAX_IN_FLIGHT
+                        # batches); output still reaches the client in order.
+                        async with aclosing(_pipelined_translations(
+                            _segment_translation_batches(english_src),
+                            _translate_batch,
+                            settings.chat_translation_max_in_flight,
+                        )) as batches:
+                            async for label, batch_text, translated in batches:
+                                if translated_output_chunks and _batch_starts_new_line_or_list(batch_text):
+                                    translated_output_chunks.append("\n")
+                                    yield "\n"
+                                try:
+                                    async for translated_chunk in translated:
+                                        translated_output_chunks.append(translated_chunk)
+                                        yield translated_chunk
+                                except Exception as e:
+                                    logger.error(f"{label} translation failed, falling back to English batch: {e}")
+                                    translated_output_chunks.append(batch_text)
+                                    yield batch_text
                     else:
                         async for chunk in english_src:
                             raw_output_chunks.append(chunk)
@@ -894,14 +1112,47 @@ async def stream_chat_messages(
                 if persona == "doctor":
                     english_src = _sanitize_doctor_stream(english_src)
 
-                client_src = _stream_to_client(english_src)
+                # Start the agent now, ahead of the verdict; its output is held in
+                # the speculative buffer and only released once moderation allows.
+                speculative = (
+                    _SpeculativeStream(english_src) if settings.chat_speculative_agent_enabled else None
+                )
+                try:
+                    decline_text = await _settle_moderation(await moderation_task)
+                except BaseException:
+                    moderation_task.cancel()
+                    if speculative is not None:
+                        await speculative.discard()
+                    raise
+                if decline_text is not None:
+                    if speculative is not None:
+                        await speculative.discard()
+                        logger.info("request_id=%s speculative_agent_discarded=True", request_id)
+                    yield decline_text
+                    return
+                if agrinet_obs is not None:
+                    agrinet_obs.update(
+                        input={
+                            "action": moderation_task.result().data.action,
+                            "model_name": request_model_name,
+                            "persona": persona,
+                        }
+                    )
+                if speculative is None:
+                    speculative = _SpeculativeStream(english_src)
+
+                client_src = _stream_to_client(speculative.stream())
                 if persona == "doctor":
                     # Defence in depth: also remove a provenance label invented by
                     # post-translation rather than present in the English answer.
                     client_src = _sanitize_doctor_stream(client_src)
 
-                async for _out in client_src:
-                    yield _out
+                try:
+                    async with aclosing(client_src):
+                        async for _out in client_src:
+                            yield _out
+                finally:
+                    await speculative.discard()
                 logger.info(f"Streaming complete for session {session_id}")
                 new_messages = _stream_holder.get("new_messages", [])
 
@@ -952,7 +1203,7 @@ async def stream_chat_messages(
             ]
 
             logger.info(f"Updating message history for session {session_id} with {len(messages)} messages")
-            await update_message_history(message_history_session_id, messages)
+            await update_message_history(message_history_session_id, messages, loaded_history)
             _turn_outcome = "success"
         except GeneratorExit:
             # Client hung up mid-stream. Re-raised so generator teardown is normal.
@@ -963,3 +1214,4 @@ async def stream_chat_messages(
             raise
         finally:
             _record_turn_outcome(_turn_outcome, session_id_safe)
+            _record_redis_round_trips(_turn_outcome, _redis_trips.count, session_id_safe)
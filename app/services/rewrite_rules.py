@@ -0,0 +1,167 @@
+"""Compile an ordered ``(pattern, replacement)`` table into as few passes as possible.
+
+``_post_normalize_gu_translation`` used to run ``re.sub`` once per table entry —
+~95 passes over every streamed chunk, most of them the plain-string forbidden
+terms from ``gu_term_policy.json``. :func:`compile_rules` keeps the table's
+exact sequential semantics but merges runs of *literal* rules into one pass:
+
+* A rule is literal when its pattern is a plain (``re.escape``-d) string with no
+  flags and its replacement has no backslash escapes or group references.
+* Consecutive literal rules are merged into one stage, matched by a single regex
+  built from a character trie of their keys (an Aho-Corasick-style scan: at each
+  position only the branch for the next character is followed, longest key
+  first), with the replacement looked up by the matched key.
+* A literal rule only joins the current stage when applying the stage in one
+  pass provably gives the same text as applying its rules one after another
+  (:func:`_interferes`); otherwise it starts a new stage. So reordering or
+  cascading in the source table can never change the output — at worst it costs
+  an extra pass.
+* Every other rule is compiled once and applied as its own pass, in order.
+
+The output is byte-identical to ``for pat, repl in rules: out = re.sub(pat, repl, out)``.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Optional, Pattern, Union
+
+RuleSpec = tuple[Union[str, Pattern[str]], str]
+
+
+def _literal_key(pattern: Union[str, Pattern[str]]) -> Optional[str]:
+    """The plain string ``pattern`` matches, or ``None`` if it is a real regex."""
+    if isinstance(pattern, re.Pattern):
+        if pattern.flags & ~re.UNICODE:
+            return None
+        pattern = pattern.pattern
+    if not pattern:
+        return None
+    # Undo re.escape (backslash before a non-alphanumeric char) and check the
+    # round trip, so anything that is not a pure escaped literal is rejected.
+    key = re.sub(r"\\(.)", r"\1", pattern, flags=re.DOTALL)
+    return key if re.escape(key) == pattern else None
+
+
+def _is_literal_replacement(repl: str) -> bool:
+    return "\\" not in repl
+
+
+def _overlaps(a: str, b: str) -> bool:
+    """A proper suffix of ``a`` equals a proper prefix of ``b``."""
+    for n in range(1, min(len(a), len(b))):
+        if a[-n:] == b[:n]:
+            return True
+    return False
+
+
+def _interferes(earlier: tuple[str, str], later: tuple[str, str]) -> bool:
+    """Could one pass over ``[earlier, later]`` differ from two sequential passes?
+
+    The single pass takes, at each position, the first rule whose key matches.
+    It diverges from running ``earlier`` to completion first when:
+
+    * ``later``'s key can consume text ``earlier`` would have rewritten — it
+      contains ``earlier``'s key, or starts before it and overlaps it; or
+    * ``earlier``'s replacement can create or complete a match for ``later``'s
+      key — the key occurs inside the replacement, the replacement inside the
+      key, or the two overlap at either edge (an empty replacement can join the
+      text around it, so it always interferes).
+    """
+    k1, v1 = earlier
+    k2, _ = later
+    if k1 != k2 and k1 in k2:
+        return True
+    if _overlaps(k2, k1):
+        return True
+    if not v1:
+        return True
+    return k2 in v1 or v1 in k2 or _overlaps(v1, k2) or _overlaps(k2, v1)
+
+
+def _trie_pattern(keys: list[str]) -> str:
+    """A regex matching any of ``keys``, longest first at each position, built
+    from their character trie so matching follows one branch per character."""
+    trie: dict = {}
+    for key in keys:
+        node = trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def _emit(node: dict) -> str:
+        ends_here = "" in node
+        branches = [re.escape(ch) + _emit(child) for ch, child in node.items() if ch != ""]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # An optional group is greedy, so the longer key is tried first.
+        return f"(?:{body})?" if ends_here else body
+
+    return _emit(trie)
+
+
+@dataclass(frozen=True)
+class _LiteralStage:
+    regex: Pattern[str]
+    table: dict[str, str]
+    size: int
+
+    def apply(self, text: str) -> str:
+        table = self.table
+        return self.regex.sub(lambda m: table[m.group(0)], text)
+
+
+@dataclass(frozen=True)
+class _RegexStage:
+    regex: Pattern[str]
+    repl: str
+
+    def apply(self, text: str) -> str:
+        return self.regex.sub(self.repl, text)
+
+
+class CompiledRules:
+    """An ordered replacement table compiled into stages; see the module docstring."""
+
+    def __init__(self, rules: list[RuleSpec]):
+        stages: list[Union[_LiteralStage, _RegexStage]] = []
+        run: list[tuple[str, str]] = []
+
+        def _close_run() -> None:
+            if not run:
+                return
+            table: dict[str, str] = {}
+            for key, value in run:
+                table.setdefault(key, value)
+            stages.append(_LiteralStage(re.compile(_trie_pattern(list(table))), table, len(run)))
+            run.clear()
+
+        for pattern, repl in rules:
+            key = _literal_key(pattern)
+            if key is None or not _is_literal_replacement(repl):
+                _close_run()
+                compiled = pattern if isinstance(pattern, re.Pattern) else re.compile(pattern)
+                stages.append(_RegexStage(compiled, repl))
+                continue
+            if any(_interferes(prior, (key, repl)) for prior in run):
+                _close_run()
+            run.append((key, repl))
+        _close_run()
+        self._stages = tuple(stages)
+
+    @property
+    def passes(self) -> int:
+        """Passes over the text per :meth:`apply` (one per stage)."""
+        return len(self._stages)
+
+    def apply(self, text: str) -> str:
+        for stage in self._stages:
+            text = stage.apply(text)
+        return text
+
+
+def compile_rules(rules: list[RuleSpec]) -> CompiledRules:
+    """Compile ``rules`` once (at import time) for repeated :meth:`CompiledRules.apply`."""
+    return CompiledRules(rules)
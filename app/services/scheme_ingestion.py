@@ -4,11 +4,17 @@ from __future__ import annotations
 
 import asyncio
 import base64
+import hashlib
 import json
+import multiprocessing
 import re
+import time
 import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import partial
 from html import unescape
 from html.parser import HTMLParser
 from typing import Any
@@ -16,7 +22,9 @@ from urllib.parse import urljoin
 
 import httpx
 
+from app import metrics as _metrics
 from app.config import settings
+from app.core import near_cache
 from app.models.union import UnionName
 from helpers.utils import get_logger
 
@@ -24,6 +32,8 @@ logger = get_logger(__name__)
 
 SCHEME_CACHE_NAMESPACE = "milk_producer_schemes"
 SCHEME_LOCK_NAMESPACE = "milk_producer_schemes_locks"
+SCHEME_PDF_NAMESPACE = "milk_producer_scheme_pdfs"
+SCHEME_NEAR_CACHE_NAMESPACE = "scheme_records"
 SCHEME_LOCK_TTL_SECONDS = settings.scheme_lock_ttl_seconds
 HTTP_TIMEOUT_SECONDS = settings.scheme_http_timeout_seconds
 SCHEME_PDF_MAX_RENDER_PAGES = settings.scheme_pdf_max_render_pages
@@ -31,6 +41,7 @@ SCHEME_OCR_PROMPT_TYPE = settings.scheme_ocr_prompt_type
 SCHEME_OCR_MAX_OUTPUT_TOKENS = settings.scheme_ocr_max_output_tokens
 SCHEME_OCR_MAX_FAILED_PAGE_RATIO = settings.scheme_ocr_max_failed_page_ratio
 SCHEME_BANAS_MIN_RECORD_COVERAGE_RATIO = settings.scheme_banas_min_record_coverage_ratio
+SCHEME_PDF_CACHE_TTL_SECONDS = settings.scheme_pdf_cache_ttl_seconds
 _redis_client = None
 
 
@@ -54,6 +65,25 @@ class SchemeParseError(SchemeIngestionError):
     """Raised when source content cannot be parsed into scheme records."""
 
 
+@dataclass(frozen=True)
+class PdfFetchResult:
+    """A conditional PDF download; ``content`` is None when the server answered
+    304 Not Modified to the validators we sent."""
+
+    content: bytes | None
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+@dataclass(frozen=True)
+class PdfOcrResult:
+    """OCR text of a PDF; ``failed_pages`` pages (within the allowed ratio)
+    returned nothing and are missing from ``text``."""
+
+    text: str
+    failed_pages: int = 0
+
+
 @dataclass(frozen=True)
 class SchemeSource:
     source_name: str
@@ -145,6 +175,10 @@ def build_scheme_lock_key(source_key: str) -> str:
     return _build_prefixed_key(SCHEME_LOCK_NAMESPACE, source_key)
 
 
+def build_scheme_pdf_cache_key(scheme_url: str) -> str:
+    return _build_prefixed_key(SCHEME_PDF_NAMESPACE, hashlib.sha256(scheme_url.encode("utf-8")).hexdigest())
+
+
 def _get_pymupdf_module():
     try:
         import fitz
@@ -208,11 +242,27 @@ async def cache_source_records(source_key: str, records: list[dict[str, Any]], r
     except Exception as exc:
         logger.exception("Failed to write scheme cache source_key=%s cache_key=%s", source_key, cache_key)
         raise SchemeCacheError(f"failed to write scheme cache for {source_key}") from exc
+    if redis_client is None:
+        await near_cache.publish_invalidation(SCHEME_NEAR_CACHE_NAMESPACE, source_key)
+    else:
+        near_cache.invalidate(SCHEME_NEAR_CACHE_NAMESPACE, source_key)
     logger.info("Scheme cache write completed source_key=%s", source_key)
 
 
 async def get_cached_source_records(source_key: str, redis_client=None) -> list[dict[str, Any]]:
-    client = redis_client or await get_redis_client()
+    """Scheme records of ``source_key``. Reads through the shared client are
+    served from the in-process near-cache (read-only; invalidated on write)."""
+    if redis_client is not None:
+        return await _read_source_records(source_key, redis_client)
+
+    async def _load():
+        # Empty results are not kept: the first refresh may still be running.
+        return await _read_source_records(source_key, await get_redis_client()) or None
+
+    return await near_cache.cached(SCHEME_NEAR_CACHE_NAMESPACE, source_key, _load) or []
+
+
+async def _read_source_records(source_key: str, client) -> list[dict[str, Any]]:
     cache_key = build_scheme_cache_key(source_key)
     logger.info("Reading scheme cache source_key=%s cache_key=%s", source_key, cache_key)
     try:
@@ -248,6 +298,44 @@ async def source_cache_exists(source_key: str, redis_client=None) -> bool:
     return exists
 
 
+def _ocr_fingerprint() -> str:
+    """The OCR settings a cached PDF text was produced with; a change re-OCRs."""
+    return f"{SCHEME_OCR_PROMPT_TYPE}:{SCHEME_OCR_MAX_OUTPUT_TOKENS}:{settings.scheme_pdf_render_dpi}:{SCHEME_PDF_MAX_RENDER_PAGES}"
+
+
+async def get_cached_pdf_entry(scheme_url: str, redis_client=None) -> dict[str, Any] | None:
+    """Validators, content hash and OCR text of the last ingestion of ``scheme_url``.
+    Best-effort: any cache failure reads as a miss."""
+    if SCHEME_PDF_CACHE_TTL_SECONDS <= 0:
+        return None
+    cache_key = build_scheme_pdf_cache_key(scheme_url)
+    try:
+        client = redis_client or await get_redis_client()
+        cached = await client.get(cache_key)
+        entry = json.loads(cached) if cached else None
+    except Exception as exc:
+        logger.warning("Failed to read scheme PDF cache url=%s error=%s", scheme_url, exc)
+        return None
+    if not isinstance(entry, dict) or entry.get("ocr") != _ocr_fingerprint() or not entry.get("content"):
+        return None
+    return entry
+
+
+async def cache_pdf_entry(scheme_url: str, entry: dict[str, Any], redis_client=None) -> None:
+    if SCHEME_PDF_CACHE_TTL_SECONDS <= 0:
+        return
+    cache_key = build_scheme_pdf_cache_key(scheme_url)
+    try:
+        client = redis_client or await get_redis_client()
+        await client.set(
+            cache_key,
+            json.dumps({**entry, "ocr": _ocr_fingerprint()}, ensure_ascii=False),
+            ex=SCHEME_PDF_CACHE_TTL_SECONDS,
+        )
+    except Exception as exc:
+        logger.warning("Failed to write scheme PDF cache url=%s error=%s", scheme_url, exc)
+
+
 async def get_cached_scheme_records_for_union(union_name: str, redis_client=None) -> list[dict[str, Any]]:
     normalized_union_name = (union_name or "").strip().lower()
     logger.info("Getting cached scheme records for union union_name=%s normalized_union_name=%s", union_name, normalized_union_name)
@@ -344,10 +432,24 @@ async def fetch_html(client: httpx.AsyncClient, url: str) -> str:
     return response.text
 
 
-async def fetch_bytes(client: httpx.AsyncClient, url: str) -> bytes:
-    logger.info("Fetching scheme bytes url=%s", url)
+async def fetch_pdf_bytes_if_changed(
+    client: httpx.AsyncClient,
+    url: str,
+    etag: str | None = None,
+    last_modified: str | None = None,
+) -> PdfFetchResult:
+    """GET ``url``, conditional on the validators of a previous download."""
+    headers: dict[str, str] = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    logger.info("Fetching scheme bytes url=%s conditional=%s", url, bool(headers))
     try:
-        response = await client.get(url, follow_redirects=True)
+        response = await client.get(url, follow_redirects=True, headers=headers or None)
+        if headers and response.status_code == 304:
+            logger.info("Scheme bytes not modified url=%s", url)
+            return PdfFetchResult(content=None, etag=etag, last_modified=last_modified)
         response.raise_for_status()
     except httpx.HTTPStatusError as exc:
         logger.warning("Scheme bytes fetch returned non-success status url=%s status_code=%s", url, exc.response.status_code)
@@ -359,7 +461,11 @@ async def fetch_bytes(client: httpx.AsyncClient, url: str) -> bytes:
         logger.exception("Unexpected error while fetching scheme bytes url=%s", url)
         raise SchemeFetchError(f"unexpected byte fetch failure for {url}") from exc
     logger.info("Fetched scheme bytes url=%s byte_count=%s", url, len(response.content))
-    return response.content
+    return PdfFetchResult(
+        content=response.content,
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+    )
 
 
 class _SarhadSchemeParser(HTMLParser):
@@ -702,103 +808,184 @@ def render_pdf_to_base64_images(pdf_bytes: bytes, dpi: int, max_pages: int = SCH
     return rendered_images
 
 
-async def extract_text_from_pdf_bytes(client: httpx.AsyncClient, pdf_bytes: bytes) -> str:
-    logger.info("Extracting text from scheme PDF via OCR byte_count=%s", len(pdf_bytes))
-    ocr_endpoint = (settings.scheme_ocr_endpoint_url or "").strip().rstrip("/")
-    if not ocr_endpoint:
-        raise SchemeDependencyError("SCHEME_OCR_ENDPOINT_URL is not configured")
+# Rasterizer worker processes (SCHEME_PDF_RENDER_PROCESSES), created on first use.
+# "spawn" so a child never inherits the event loop or locks of this process.
+_render_pool: ProcessPoolExecutor | None = None
+# OCR requests in flight per process, shared by every PDF being ingested.
+# Rebound per running loop (see app/services/fallback.py).
+_ocr_semaphore: tuple[asyncio.AbstractEventLoop, asyncio.Semaphore] | None = None
+
+
+def _get_render_pool() -> ProcessPoolExecutor | None:
+    global _render_pool
+    if settings.scheme_pdf_render_processes <= 0:
+        return None
+    if _render_pool is None:
+        _render_pool = ProcessPoolExecutor(
+            max_workers=settings.scheme_pdf_render_processes,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _render_pool
+
+
+def shutdown_render_pool() -> None:
+    global _render_pool
+    pool, _render_pool = _render_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _get_ocr_semaphore() -> asyncio.Semaphore:
+    global _ocr_semaphore
+    loop = asyncio.get_running_loop()
+    if _ocr_semaphore is None or _ocr_semaphore[0] is not loop:
+        _ocr_semaphore = (loop, asyncio.Semaphore(settings.scheme_ocr_concurrency))
+    return _ocr_semaphore[1]
+
 
+async def _render_pdf_pages(pdf_bytes: bytes) -> list[str]:
     # Rasterizing up to SCHEME_PDF_MAX_RENDER_PAGES pages is CPU-bound; run it off
-    # the event loop so it does not stall concurrent request handling during a refresh.
-    images = await asyncio.to_thread(
+    # the event loop (in a worker process, so concurrent PDFs render in parallel)
+    # so it does not stall concurrent request handling during a refresh.
+    render = partial(
         render_pdf_to_base64_images,
         pdf_bytes,
         dpi=settings.scheme_pdf_render_dpi,
         max_pages=SCHEME_PDF_MAX_RENDER_PAGES,
     )
-    page_texts: list[str] = []
-    failed_pages = 0
-    for index, image in enumerate(images):
-        payload = {
-            "images": [image],
-            "prompt_type": SCHEME_OCR_PROMPT_TYPE,
-            "max_output_tokens": SCHEME_OCR_MAX_OUTPUT_TOKENS,
-        }
+    pool = _get_render_pool()
+    if pool is None:
+        return await asyncio.to_thread(render)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, render)
+    except BrokenProcessPool as exc:
+        shutdown_render_pool()
+        raise SchemeParseError("PDF render worker process died") from exc
 
-        try:
+
+async def _ocr_pages(
+    client: httpx.AsyncClient,
+    ocr_endpoint: str,
+    first_index: int,
+    images: list[str],
+) -> list[str | None]:
+    """OCR one request's worth of page images; the markdown of each page, or
+    None for a page that failed."""
+    last_index = first_index + len(images) - 1
+    payload = {
+        "images": images,
+        "prompt_type": SCHEME_OCR_PROMPT_TYPE,
+        "max_output_tokens": SCHEME_OCR_MAX_OUTPUT_TOKENS,
+    }
+    failed: list[str | None] = [None] * len(images)
+
+    try:
+        async with _get_ocr_semaphore():
             response = await client.post(
                 f"{ocr_endpoint}/v1/ocr/pages",
                 json=payload,
                 timeout=settings.scheme_ocr_timeout_seconds,
             )
-            response.raise_for_status()
-        except httpx.HTTPStatusError as exc:
-            failed_pages += 1
-            logger.warning(
-                "Scheme OCR request returned non-success status endpoint=%s page_index=%s status_code=%s",
-                ocr_endpoint,
-                index,
-                exc.response.status_code,
-            )
-            continue
-        except httpx.RequestError as exc:
-            failed_pages += 1
-            logger.warning(
-                "Scheme OCR request failed endpoint=%s page_index=%s error_type=%s error_repr=%r",
-                ocr_endpoint,
-                index,
-                type(exc).__name__,
-                exc,
-            )
-            continue
-        except Exception as exc:
-            failed_pages += 1
-            logger.exception(
-                "Unexpected error while calling scheme OCR endpoint=%s page_index=%s",
-                ocr_endpoint,
-                index,
-            )
-            continue
-
-        try:
-            parsed = response.json()
-        except ValueError as exc:
-            failed_pages += 1
-            logger.warning(
-                "Scheme OCR response was not valid JSON endpoint=%s page_index=%s error_repr=%r",
-                ocr_endpoint,
-                index,
-                exc,
-            )
-            continue
+        response.raise_for_status()
+    except httpx.HTTPStatusError as exc:
+        logger.warning(
+            "Scheme OCR request returned non-success status endpoint=%s page_index=%s-%s status_code=%s",
+            ocr_endpoint,
+            first_index,
+            last_index,
+            exc.response.status_code,
+        )
+        return failed
+    except httpx.RequestError as exc:
+        logger.warning(
+            "Scheme OCR request failed endpoint=%s page_index=%s-%s error_type=%s error_repr=%r",
+            ocr_endpoint,
+            first_index,
+            last_index,
+            type(exc).__name__,
+            exc,
+        )
+        return failed
+    except Exception:
+        logger.exception(
+            "Unexpected error while calling scheme OCR endpoint=%s page_index=%s-%s",
+            ocr_endpoint,
+            first_index,
+            last_index,
+        )
+        return failed
 
-        pages = parsed.get("pages")
-        if not isinstance(pages, list):
-            failed_pages += 1
-            logger.warning("Scheme OCR response missing pages list endpoint=%s page_index=%s", ocr_endpoint, index)
-            continue
-        if not pages:
-            failed_pages += 1
-            logger.warning("Scheme OCR response had empty pages list endpoint=%s page_index=%s", ocr_endpoint, index)
-            continue
+    try:
+        parsed = response.json()
+    except ValueError as exc:
+        logger.warning(
+            "Scheme OCR response was not valid JSON endpoint=%s page_index=%s-%s error_repr=%r",
+            ocr_endpoint,
+            first_index,
+            last_index,
+            exc,
+        )
+        return failed
+
+    pages = parsed.get("pages")
+    if not isinstance(pages, list):
+        logger.warning("Scheme OCR response missing pages list endpoint=%s page_index=%s-%s", ocr_endpoint, first_index, last_index)
+        return failed
+    if not pages:
+        logger.warning("Scheme OCR response had empty pages list endpoint=%s page_index=%s-%s", ocr_endpoint, first_index, last_index)
+        return failed
+    if len(pages) < len(images):
+        logger.warning(
+            "Scheme OCR response had fewer pages than sent endpoint=%s page_index=%s-%s sent=%s received=%s",
+            ocr_endpoint,
+            first_index,
+            last_index,
+            len(images),
+            len(pages),
+        )
 
-        page_result = pages[0]
+    texts = list(failed)
+    for offset, page_result in enumerate(pages[: len(images)]):
+        index = first_index + offset
         if not isinstance(page_result, dict):
-            failed_pages += 1
             logger.warning(
                 "Skipping malformed OCR page result page_index=%s type=%s",
                 index,
                 type(page_result).__name__,
             )
             continue
-
         page_markdown = _normalize_text(str(page_result.get("markdown") or ""))
         page_error = bool(page_result.get("error"))
         logger.info("Received scheme OCR page result page_index=%s page_error=%s text_length=%s", index, page_error, len(page_markdown))
         if page_error or not page_markdown:
-            failed_pages += 1
             continue
-        page_texts.append(page_markdown)
+        texts[offset] = page_markdown
+    return texts
+
+
+async def extract_text_from_pdf_bytes(client: httpx.AsyncClient, pdf_bytes: bytes) -> str:
+    return (await ocr_pdf_bytes(client, pdf_bytes)).text
+
+
+async def ocr_pdf_bytes(client: httpx.AsyncClient, pdf_bytes: bytes) -> PdfOcrResult:
+    logger.info("Extracting text from scheme PDF via OCR byte_count=%s", len(pdf_bytes))
+    ocr_endpoint = (settings.scheme_ocr_endpoint_url or "").strip().rstrip("/")
+    if not ocr_endpoint:
+        raise SchemeDependencyError("SCHEME_OCR_ENDPOINT_URL is not configured")
+
+    images = await _render_pdf_pages(pdf_bytes)
+    # Pages go out SCHEME_OCR_BATCH_SIZE per request, requests concurrently
+    # (bounded by SCHEME_OCR_CONCURRENCY); text is reassembled in page order.
+    batch_size = max(settings.scheme_ocr_batch_size, 1)
+    batches = await asyncio.gather(
+        *(
+            _ocr_pages(client, ocr_endpoint, start, images[start : start + batch_size])
+            for start in range(0, len(images), batch_size)
+        )
+    )
+    page_results = [text for batch in batches for text in batch]
+    page_texts = [text for text in page_results if text]
+    failed_pages = len(page_results) - len(page_texts)
 
     combined_text = "\n\n".join(page_texts)
     total_pages = len(images)
@@ -818,7 +1005,7 @@ async def extract_text_from_pdf_bytes(client: httpx.AsyncClient, pdf_bytes: byte
             failed_ratio,
         )
     logger.info("Completed scheme OCR extraction page_count=%s content_length=%s", len(page_texts), len(combined_text))
-    return combined_text
+    return PdfOcrResult(combined_text, failed_pages)
 
 
 async def _build_pdf_record(
@@ -827,12 +1014,50 @@ async def _build_pdf_record(
     scheme_title: str,
     scheme_url: str,
     last_refreshed_at: str,
+    redis_client=None,
 ) -> dict[str, Any] | None:
-    """Download a single PDF, OCR it, and return a scheme record dict (or None on failure)."""
+    """Download a single PDF, OCR it, and return a scheme record dict (or None on failure).
+
+    Content-addressed: the last ingestion of each URL (validators, SHA-256 of
+    the bytes, OCR text) is kept in Redis. The download is a conditional GET,
+    and the OCR text is reused when the server answers 304 or the bytes hash
+    matches, so only new or changed PDFs are rendered and OCR'd. Text with
+    failed pages is never cached, so those pages are retried next refresh.
+    """
     logger.info("Building PDF scheme record source=%s title=%s url=%s", source.source_name, scheme_title, scheme_url)
+    failed_pages = 0
     try:
-        pdf_bytes = await fetch_bytes(client, scheme_url)
-        content = await extract_text_from_pdf_bytes(client, pdf_bytes)
+        cached = await get_cached_pdf_entry(scheme_url, redis_client=redis_client)
+        fetched = await fetch_pdf_bytes_if_changed(
+            client,
+            scheme_url,
+            etag=(cached or {}).get("etag"),
+            last_modified=(cached or {}).get("last_modified"),
+        )
+        if fetched.content is None and cached:
+            result = "not_modified"
+            content = cached["content"]
+        else:
+            pdf_bytes = fetched.content or b""
+            digest = hashlib.sha256(pdf_bytes).hexdigest()
+            if cached and cached.get("sha256") == digest:
+                result = "unchanged"
+                content = cached["content"]
+            else:
+                result = "extracted"
+                ocr = await ocr_pdf_bytes(client, pdf_bytes)
+                content, failed_pages = ocr.text, ocr.failed_pages
+            # Text with pages missing is served but not cached, so the next
+            # refresh OCRs the PDF again instead of reusing it for 30 days.
+            if content and not failed_pages:
+                await cache_pdf_entry(
+                    scheme_url,
+                    {"etag": fetched.etag, "last_modified": fetched.last_modified, "sha256": digest, "content": content},
+                    redis_client=redis_client,
+                )
+        _metrics.record_scheme_pdf(result)
+        if result != "extracted":
+            logger.info("Reused OCR text for unchanged scheme PDF source=%s title=%s reason=%s", source.source_name, scheme_title, result)
     except SchemeDependencyError:
         raise
     except SchemeFetchError as exc:
@@ -865,45 +1090,90 @@ async def _build_pdf_record(
 _build_banas_record = _build_pdf_record
 
 
-async def _ingest_banas_source(
+async def _build_pdf_records(
     source: SchemeSource,
+    link_records: list[dict[str, str]],
     client: httpx.AsyncClient,
+    build_record,
     lock_token: str | None = None,
     redis_client=None,
+    label: str | None = None,
 ) -> list[dict[str, Any]]:
-    logger.info("Starting Banas scheme ingestion source=%s url=%s", source.cache_key, source.source_url)
-    html = await fetch_html(client, source.source_url)
-    link_records = parse_banas_scheme_links(html)
-    if not link_records:
-        logger.warning("No Banas scheme links parsed source=%s", source.cache_key)
-        raise SchemeParseError("no Banas scheme links parsed")
+    """Build up to SCHEME_PDF_CONCURRENCY PDF records at once, in link order.
+
+    The refresh lock is heartbeated as each PDF finishes, so a long multi-PDF
+    batch does not outlive a single fixed TTL and let a concurrent refresh start.
+    """
     last_refreshed_at = _utcnow_iso()
     logger.info(
-        "Processing Banas PDFs sequentially source=%s record_count=%s",
+        "Processing %s PDFs source=%s record_count=%s concurrency=%s",
+        source.source_name,
         source.cache_key,
         len(link_records),
+        settings.scheme_pdf_concurrency,
     )
-    final_records: list[dict[str, Any]] = []
-    for record in link_records:
-        built_record = await _build_banas_record(
-            client=client,
-            source=source,
-            scheme_title=record["scheme_title"],
-            scheme_url=record["scheme_url"],
-            last_refreshed_at=last_refreshed_at,
-        )
-        if built_record:
-            final_records.append(built_record)
-        # Heartbeat the lock after each PDF so a long multi-PDF batch does not
-        # outlive a single fixed TTL and let a concurrent refresh start.
-        if lock_token is not None:
-            await extend_refresh_lock(source.cache_key, lock_token, redis_client=redis_client)
+    semaphore = asyncio.Semaphore(settings.scheme_pdf_concurrency)
+
+    async def _build(record: dict[str, str]) -> dict[str, Any] | None:
+        async with semaphore:
+            built_record = await build_record(
+                client=client,
+                source=source,
+                scheme_title=record["scheme_title"],
+                scheme_url=record["scheme_url"],
+                last_refreshed_at=last_refreshed_at,
+                redis_client=redis_client,
+            )
+            if lock_token is not None:
+                await extend_refresh_lock(source.cache_key, lock_token, redis_client=redis_client)
+            return built_record
+
+    # Like gather(), but the first failure cancels the builds still running or
+    # waiting on the semaphore instead of leaving them to download and OCR for
+    # a refresh that has already failed.
+    tasks = [asyncio.create_task(_build(record)) for record in link_records]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+        built = [task.result() for task in tasks]
+    finally:
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    final_records = [record for record in built if record]
     record_coverage_ratio = len(final_records) / len(link_records)
     if record_coverage_ratio < SCHEME_BANAS_MIN_RECORD_COVERAGE_RATIO:
         raise SchemeParseError(
-            "insufficient Banas ingestion coverage "
+            f"insufficient {label or source.source_name} ingestion coverage "
             f"built={len(final_records)}/{len(link_records)} ratio={record_coverage_ratio:.2f}"
         )
+    return final_records
+
+
+async def _ingest_banas_source(
+    source: SchemeSource,
+    client: httpx.AsyncClient,
+    lock_token: str | None = None,
+    redis_client=None,
+) -> list[dict[str, Any]]:
+    logger.info("Starting Banas scheme ingestion source=%s url=%s", source.cache_key, source.source_url)
+    html = await fetch_html(client, source.source_url)
+    link_records = parse_banas_scheme_links(html)
+    if not link_records:
+        logger.warning("No Banas scheme links parsed source=%s", source.cache_key)
+        raise SchemeParseError("no Banas scheme links parsed")
+    final_records = await _build_pdf_records(
+        source,
+        link_records,
+        client,
+        _build_banas_record,
+        lock_token=lock_token,
+        redis_client=redis_client,
+        label="Banas",
+    )
     logger.info("Completed Banas scheme ingestion source=%s record_count=%s", source.cache_key, len(final_records))
     return final_records
 
@@ -918,32 +1188,9 @@ async def _ingest_pdf_source(
     """Generic PDF-based ingestion shared by Sumul, Sursagar, and any future PDF source."""
     if not link_records:
         raise SchemeParseError(f"no {source.source_name} scheme links parsed")
-    last_refreshed_at = _utcnow_iso()
-    logger.info(
-        "Processing %s PDFs sequentially source=%s record_count=%s",
-        source.source_name,
-        source.cache_key,
-        len(link_records),
+    final_records = await _build_pdf_records(
+        source, link_records, client, _build_pdf_record, lock_token=lock_token, redis_client=redis_client
     )
-    final_records: list[dict[str, Any]] = []
-    for record in link_records:
-        built_record = await _build_pdf_record(
-            client=client,
-            source=source,
-            scheme_title=record["scheme_title"],
-            scheme_url=record["scheme_url"],
-            last_refreshed_at=last_refreshed_at,
-        )
-        if built_record:
-            final_records.append(built_record)
-        if lock_token is not None:
-            await extend_refresh_lock(source.cache_key, lock_token, redis_client=redis_client)
-    record_coverage_ratio = len(final_records) / len(link_records)
-    if record_coverage_ratio < SCHEME_BANAS_MIN_RECORD_COVERAGE_RATIO:
-        raise SchemeParseError(
-            f"insufficient {source.source_name} ingestion coverage "
-            f"built={len(final_records)}/{len(link_records)} ratio={record_coverage_ratio:.2f}"
-        )
     logger.info("Completed %s scheme ingestion source=%s record_count=%s", source.source_name, source.cache_key, len(final_records))
     return final_records
 
@@ -1008,6 +1255,8 @@ async def refresh_scheme_source(source: SchemeSource, redis_client=None, client:
         logger.info("Scheme refresh skipped because lock already held for source=%s", source.cache_key)
         return False
 
+    started = time.perf_counter()
+    outcome = "error"
     owns_client = client is None
     if client is None:
         logger.info("Creating dedicated HTTP client for scheme source refresh source=%s timeout=%s", source.cache_key, HTTP_TIMEOUT_SECONDS)
@@ -1026,10 +1275,12 @@ async def refresh_scheme_source(source: SchemeSource, redis_client=None, client:
             records = await _ingest_sarhad_source(source, client)
 
         if not records:
+            outcome = "empty"
             logger.warning("Scheme refresh produced no records for source=%s; keeping existing cache", source.cache_key)
             return False
 
         await cache_source_records(source.cache_key, records, redis_client=redis_client)
+        outcome = "refreshed"
         logger.info("Scheme refresh completed for source=%s records=%s", source.cache_key, len(records))
         return True
     except SchemeDependencyError as exc:
@@ -1048,6 +1299,9 @@ async def refresh_scheme_source(source: SchemeSource, redis_client=None, client:
         logger.exception("Scheme refresh failed due to unexpected error source=%s", source.cache_key)
         return False
     finally:
+        elapsed = time.perf_counter() - started
+        logger.info("Scheme refresh duration source=%s outcome=%s seconds=%.1f", source.cache_key, outcome, elapsed)
+        _metrics.observe_scheme_refresh(source.source_name, outcome, elapsed)
         if owns_client:
             logger.info("Closing dedicated HTTP client for scheme source refresh source=%s", source.cache_key)
             await client.aclose()
@@ -1058,11 +1312,14 @@ async def refresh_scheme_source(source: SchemeSource, redis_client=None, client:
 
 
 async def refresh_all_scheme_sources(redis_client=None) -> dict[str, bool]:
+    """Refresh every source concurrently; each holds its own lock, and the
+    PDF/OCR limits are shared, so this only overlaps independent work."""
     logger.info("Starting refresh for all scheme sources source_count=%s", len(get_scheme_sources()))
-    results: dict[str, bool] = {}
+    sources = get_scheme_sources()
     async with httpx.AsyncClient(timeout=HTTP_TIMEOUT_SECONDS) as client:
-        for source in get_scheme_sources():
-            logger.info("Refreshing scheme source as part of batch source=%s", source.cache_key)
-            results[source.cache_key] = await refresh_scheme_source(source, redis_client=redis_client, client=client)
+        outcomes = await asyncio.gather(
+            *(refresh_scheme_source(source, redis_client=redis_client, client=client) for source in sources)
+        )
+    results = {source.cache_key: outcome for source, outcome in zip(sources, outcomes)}
     logger.info("Completed refresh for all scheme sources results=%s", results)
     return results
@@ -0,0 +1,60 @@
+"""Incremental decoder for the ``data:`` lines of a server-sent-event stream.
+
+TranslateGemma streams its completion as one ``data: {json}`` line per token.
+The old reader accumulated the body with ``buffer += chunk`` and peeled lines
+off with ``buffer.split(b"\\n", 1)``, which re-copies the unread tail for every
+line — quadratic in the number of lines per read. :class:`SSEDataDecoder`
+splits each read once and carries over only the unterminated last line, and
+decodes just the payload of a ``data:`` line rather than the whole line.
+
+Line semantics are the old reader's: a line is decoded as UTF-8 and stripped,
+only lines starting with ``"data: "`` carry a payload, ``data: [DONE]`` ends the
+stream, and an unterminated final line is never emitted.
+"""
+
+from __future__ import annotations
+
+_DATA_PREFIX = "data: "
+_DATA_PREFIX_B = _DATA_PREFIX.encode()
+_PREFIX_LEN = len(_DATA_PREFIX)
+_DONE = "[DONE]"
+
+
+class SSEDataDecoder:
+    """Feed raw body chunks, get back the complete ``data:`` payloads in order."""
+
+    __slots__ = ("_tail", "done")
+
+    def __init__(self) -> None:
+        self._tail = b""
+        self.done = False
+
+    def feed(self, chunk: bytes) -> list[str]:
+        """Return the payloads completed by ``chunk`` (nothing once ``done``)."""
+        if self.done or not chunk:
+            return []
+        if b"\n" not in chunk:
+            self._tail += chunk
+            return []
+        # Only the unterminated tail is ever re-copied, never the whole buffer.
+        lines = (self._tail + chunk).split(b"\n")
+        self._tail = lines.pop()
+        out: list[str] = []
+        for raw in lines:
+            if raw.startswith(_DATA_PREFIX_B):
+                # Same result as decode().strip() + prefix test: the leading "d"
+                # leaves only trailing whitespace to strip.
+                data = raw[_PREFIX_LEN:].decode("utf-8").rstrip()
+                if not data:
+                    continue  # "data:" + whitespace strips to "data:", no payload
+            else:
+                line = raw.decode("utf-8").strip()
+                if not line.startswith(_DATA_PREFIX):
+                    continue
+                data = line[_PREFIX_LEN:]
+            if data == _DONE:
+                self.done = True
+                self._tail = b""
+                break
+            out.append(data)
+        return out
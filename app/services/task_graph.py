@@ -0,0 +1,110 @@
+"""Tiny dependency-graph runner for the independent steps of a turn preamble.
+
+A chat turn needs its stored history, the farmer's context and the English
+pretranslation of the query before moderation and the agent can start. None of
+those depend on each other, so running them one after another made the turn's
+preamble cost their SUM; run as a graph it costs the slowest path.
+
+Each :class:`TaskStep` starts as soon as every step it names in ``after`` has
+finished, and receives their results as keyword arguments. The first failing
+step cancels everything still running and its exception propagates; cancelling
+the caller (a client disconnect) cancels every step the same way. Steps that
+must degrade instead of failing the turn catch their own errors — the runner
+adds no policy of its own.
+
+Python 3.10 (the prod image) has no ``asyncio.TaskGroup``, hence the explicit
+``asyncio.wait`` loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from helpers.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class TaskStep:
+    """One node of the graph: ``run(**{dep: result for dep in after})``."""
+
+    name: str
+    run: Callable[..., Awaitable[Any]]
+    after: tuple[str, ...] = ()
+
+
+def _validate(steps: list[TaskStep]) -> None:
+    names = [s.name for s in steps]
+    if len(set(names)) != len(names):
+        raise ValueError(f"duplicate task-graph step names: {names}")
+    known = set(names)
+    for s in steps:
+        missing = [d for d in s.after if d not in known]
+        if missing:
+            raise ValueError(f"step {s.name!r} depends on unknown step(s) {missing}")
+    # Kahn's algorithm, only to reject cycles up front (a cycle would deadlock).
+    indegree = {s.name: len(s.after) for s in steps}
+    dependents: dict[str, list[str]] = {n: [] for n in names}
+    for s in steps:
+        for d in s.after:
+            dependents[d].append(s.name)
+    ready = [n for n, deg in indegree.items() if deg == 0]
+    seen = 0
+    while ready:
+        n = ready.pop()
+        seen += 1
+        for m in dependents[n]:
+            indegree[m] -= 1
+            if indegree[m] == 0:
+                ready.append(m)
+    if seen != len(steps):
+        raise ValueError("task graph has a dependency cycle")
+
+
+async def run_task_graph(
+    steps: list[TaskStep],
+    *,
+    on_step_done: Optional[Callable[[str, float], None]] = None,
+) -> dict[str, Any]:
+    """Run ``steps`` concurrently in dependency order; return ``{name: result}``.
+
+    ``on_step_done(name, wall_ms)`` is called as each step finishes successfully
+    (best-effort — a failing callback is logged and ignored).
+    """
+    _validate(steps)
+    by_name = {s.name: s for s in steps}
+    results: dict[str, Any] = {}
+    running: dict[asyncio.Task, tuple[str, float]] = {}
+    pending = list(steps)
+
+    def _launch_ready() -> None:
+        for s in list(pending):
+            if all(d in results for d in s.after):
+                pending.remove(s)
+                kwargs = {d: results[d] for d in s.after}
+                task = asyncio.create_task(s.run(**kwargs), name=f"task_graph:{s.name}")
+                running[task] = (s.name, time.perf_counter())
+
+    try:
+        _launch_ready()
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name, started = running.pop(task)
+                results[name] = task.result()  # re-raises the step's failure
+                if on_step_done is not None:
+                    try:
+                        on_step_done(name, (time.perf_counter() - started) * 1000.0)
+                    except Exception as e:  # pragma: no cover - defensive
+                        logger.debug("task_graph: on_step_done failed for %s: %s", name, e)
+            _launch_ready()
+    finally:
+        if running:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+    return {name: results[name] for name in by_name}
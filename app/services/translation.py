@@ -40,6 +40,8 @@ from app.llm_core.config_model import (
     StepClientKind as _StepClientKind,
 )
 from app.llm_core.factory import TGDescriptor as _TGDescriptor, build_handle as _build_handle
+from app.services.rewrite_rules import compile_rules as _compile_rules
+from app.services.sse import SSEDataDecoder as _SSEDataDecoder
 from app.services.fallback import (
     FALLBACKABLE as _FALLBACKABLE,
     FallbackEvent as _FallbackEvent,
@@ -289,6 +291,9 @@ GU_POST_REPLACEMENTS_BASE = [
 GU_TERM_POLICY = _load_gu_term_policy()
 GU_POLICY_REPLACEMENTS = _build_gu_policy_replacements(GU_TERM_POLICY)
 GU_POST_REPLACEMENTS = GU_POST_REPLACEMENTS_BASE + GU_POLICY_REPLACEMENTS
+# Compiled once: the policy's plain-string terms collapse into a few trie passes
+# instead of one re.sub per term (byte-identical; see app/services/rewrite_rules).
+_GU_POST_RULES = _compile_rules(GU_POST_REPLACEMENTS)
 
 
 # ── Protected proper nouns: pin a fixed Gujarati rendering ──────────────────────
@@ -539,6 +544,10 @@ def _fix_dandas(text: str, target_lang: str = "gu") -> str:
     return text.replace("।", ".")
 
 
+_GU_MULTI_SPACE_RE = re.compile(r"[ \t]{2,}")
+_GU_MULTI_NEWLINE_RE = re.compile(r"\n{3,}")
+
+
 def _post_normalize_gu_translation(
     text: str,
     target_lang: str,
@@ -552,11 +561,12 @@ def _post_normalize_gu_translation(
     # policy runs; chat keeps the uniform gu_term_policy.json mapping (-> શરીર).
     if _is_voice_channel():
         out = _normalize_gu_body_terms(out)
-    for pat, repl in GU_POST_REPLACEMENTS:
-        out = re.sub(pat, repl, out)
+    out = _GU_POST_RULES.apply(out)
     # Keep assistant first-person Gujarati conjugation feminine on all channels.
-    for pat, repl in GU_FEMININE_SELF_REFERENCE_REPLACEMENTS:
-        out = pat.sub(repl, out)
+    # Every rule is anchored on a literal હું, so most chunks skip them outright.
+    if "હું" in out:
+        for pat, repl in GU_FEMININE_SELF_REFERENCE_REPLACEMENTS:
+            out = pat.sub(repl, out)
     if _is_voice_channel():
         # Remove placeholder dashes without inventing a quantity (voice parity).
         out = re.sub(rf"([:：]\s*){_GU_PLACEHOLDER_RE}(?=\s|$)", r"\1", out)
@@ -578,8 +588,8 @@ def _post_normalize_gu_translation(
         out = normalize_voice_output(out, target_lang, replace_slash=False)
 
     # collapse extra spaces introduced by removals
-    out = re.sub(r"[ \t]{2,}", " ", out)
-    out = re.sub(r"\n{3,}", "\n\n", out)
+    out = _GU_MULTI_SPACE_RE.sub(" ", out)
+    out = _GU_MULTI_NEWLINE_RE.sub("\n\n", out)
     return out.strip() if strip_outer else out
 
 
@@ -870,15 +880,38 @@ def _post_translation_chain():
     return chain
 
 
+# Read size for the TG SSE body. ``iter_chunked(n)`` returns whatever is buffered
+# up to ``n`` bytes, so a large cap adds no latency — it only stops a burst of
+# tokens from being drained 64 bytes at a time.
+_TG_SSE_READ_BYTES = 16 * 1024
+
+
+async def _tg_sse_texts(response):
+    """Non-empty ``choices[0].text`` deltas of a TranslateGemma SSE body, in order.
+    Malformed ``data:`` payloads are skipped; ``[DONE]`` ends the read."""
+    decoder = _SSEDataDecoder()
+    async for chunk in response.content.iter_chunked(_TG_SSE_READ_BYTES):
+        for data in decoder.feed(chunk):
+            try:
+                content = json.loads(data)['choices'][0].get('text', '')
+            except json.JSONDecodeError:
+                continue
+            if content:
+                yield content
+        if decoder.done:
+            break
+
+
 async def _translategemma_stream(descriptor, prompt, source_lang, target_lang, text, temperature, max_tokens):
-    """VERBATIM TranslateGemma streaming SSE decode (aiohttp), incl. the
-    ``stream_translation`` Langfuse observation and its ``if not langfuse:`` branch.
-    Every yielded chunk passes ``_fix_dandas -> _post_normalize_gu_translation``."""
+    """TranslateGemma streaming SSE decode (aiohttp, via :func:`_tg_sse_texts` on
+    the descriptor's keep-alive session), incl. the ``stream_translation`` Langfuse
+    observation and its ``if not langfuse:`` branch. Every yielded chunk passes
+    ``_fix_dandas -> _post_normalize_gu_translation``."""
     translated_parts: list[str] = []
     langfuse = _get_langfuse()
 
     if not langfuse:
-        async with aiohttp.ClientSession() as session:
+        async with descriptor.session() as session:
             async with session.post(
                 descriptor.completions_url,
                 json={
@@ -895,28 +928,13 @@ async def _translategemma_stream(descriptor, prompt, source_lang, target_lang, t
                     logger.error(f"Translation API error {response.status}: {error_text}")
                     raise _TranslationHTTPError(response.status, error_text)
 
-                buffer = b''
-                async for chunk in response.content.iter_chunked(64):
-                    buffer += chunk
-                    while b'\n' in buffer:
-                        line, buffer = buffer.split(b'\n', 1)
-                        line = line.decode('utf-8').strip()
-                        if line.startswith('data: '):
-                            data = line[6:]
-                            if data == '[DONE]':
-                                break
-                            try:
-                                chunk_data = json.loads(data)
-                                content = chunk_data['choices'][0].get('text', '')
-                                if content:
-                                    content = _fix_dandas(content, target_lang)
-                                    content = _post_normalize_gu_translation(
-                                        content, target_lang, strip_outer=False,
-                                    )
-                                    translated_parts.append(content)
-                                    yield content
-                            except json.JSONDecodeError:
-                                continue
+                async for content in _tg_sse_texts(response):
+                    content = _fix_dandas(content, target_lang)
+                    content = _post_normalize_gu_translation(
+                        content, target_lang, strip_outer=False,
+                    )
+                    translated_parts.append(content)
+                    yield content
         return
 
     with langfuse.start_as_current_observation(
@@ -935,7 +953,7 @@ async def _translategemma_stream(descriptor, prompt, source_lang, target_lang, t
             "pipeline_stage": "stream_translation",
         },
     ) as observation:
-        async with aiohttp.ClientSession() as session:
+        async with descriptor.session() as session:
             async with session.post(
                 descriptor.completions_url,
                 json={
@@ -952,28 +970,13 @@ async def _translategemma_stream(descriptor, prompt, source_lang, target_lang, t
                     logger.error(f"Translation API error {response.status}: {error_text}")
                     raise _TranslationHTTPError(response.status, error_text)
 
-                buffer = b''
-                async for chunk in response.content.iter_chunked(64):
-                    buffer += chunk
-                    while b'\n' in buffer:
-                        line, buffer = buffer.split(b'\n', 1)
-                        line = line.decode('utf-8').strip()
-                        if line.startswith('data: '):
-                            data = line[6:]
-                            if data == '[DONE]':
-                                break
-                            try:
-                                chunk_data = json.loads(data)
-                                content = chunk_data['choices'][0].get('text', '')
-                                if content:
-                                    content = _fix_dandas(content, target_lang)
-                                    content = _post_normalize_gu_translation(
-                                        content, target_lang, strip_outer=False,
-                                    )
-                                    translated_parts.append(content)
-                                    yield content
-                            except json.JSONDecodeError:
-                                continue
+                async for content in _tg_sse_texts(response):
+                    content = _fix_dandas(content, target_lang)
+                    content = _post_normalize_gu_translation(
+                        content, target_lang, strip_outer=False,
+                    )
+                    translated_parts.append(content)
+                    yield content
         observation.update(output="".join(translated_parts))
 
 
@@ -1043,7 +1046,7 @@ async def _translategemma_unary(descriptor, prompt, source_lang, target_lang, te
     langfuse = _get_langfuse()
 
     if not langfuse:
-        async with aiohttp.ClientSession() as session:
+        async with descriptor.session() as session:
             async with session.post(
                 descriptor.completions_url,
                 json={
@@ -1081,7 +1084,7 @@ async def _translategemma_unary(descriptor, prompt, source_lang, target_lang, te
             "pipeline_stage": "text_translation",
         },
     ) as observation:
-        async with aiohttp.ClientSession() as session:
+        async with descriptor.session() as session:
             async with session.post(
                 descriptor.completions_url,
                 json={
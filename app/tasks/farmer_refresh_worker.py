@@ -1,11 +1,22 @@
-"""Background worker that drains the farmer-data refresh queue.
+"""Background worker pool that drains the farmer-data refresh queue.
 
 Stale-while-revalidate: the request path serves cached farmer data immediately
 and enqueues stale phones (see agents.services.farmer_cache.
-enqueue_farmer_refresh). This worker drains that Redis-backed queue off the
-request path and refreshes each record, so slow/unreliable upstream PashuGPT
-APIs never block a call. refresh_farmer_data self-dedupes via its NX lock, so
-running one worker per pod is safe.
+enqueue_farmer_refresh). This worker drains that Redis-backed priority queue
+off the request path and refreshes each record, so slow/unreliable upstream
+PashuGPT APIs never block a call.
+
+Up to FARMER_REFRESH_WORKER_CONCURRENCY refreshes run at once per pod; the
+dispatcher only takes as many phones off the queue as it has free slots, so
+the rest stay queued (and re-prioritizable) for any pod. An idle dispatcher
+blocks on the queue (BZPOPMIN) rather than polling. Upstream request rates are
+bounded by the per-host background token buckets in
+agents.tools.farmer_animal_backends. refresh_farmer_data self-dedupes via its
+NX lock, so running one pool per pod is safe.
+
+With FARMER_PREWARM_ENABLED a second loop runs a pre-warm pass every
+FARMER_PREWARM_INTERVAL_SECONDS (see farmer_cache.prewarm_farmer_cache_once),
+feeding the same queue.
 """
 from __future__ import annotations
 
@@ -17,51 +28,100 @@ from helpers.utils import get_logger
 
 logger = get_logger(__name__)
 
-# Seconds to wait before re-polling when the queue is empty.
-IDLE_SLEEP_SECONDS = 5.0
-# Phones to refresh per drain iteration.
+# Refreshes in flight per pod.
+WORKER_CONCURRENCY = settings.farmer_refresh_worker_concurrency
+# Most phones taken off the queue in one pop.
 DRAIN_BATCH = settings.farmer_refresh_queue_batch_size
+# How long an idle dispatcher blocks on the queue; kept under the Redis socket
+# timeout so a blocked BZPOPMIN never looks like a dead connection.
+BLOCK_SECONDS = min(settings.farmer_refresh_queue_block_seconds, max(settings.redis_socket_timeout - 1, 1))
+# Back-off after a failed dispatch iteration (e.g. Redis unavailable).
+ERROR_SLEEP_SECONDS = 5.0
 
 _worker_task: Optional[asyncio.Task] = None
+_prewarm_task: Optional[asyncio.Task] = None
 
 
 async def _run_loop() -> None:
     # Imported here (not at module scope) so importing this worker module is
     # side-effect-free and never triggers the farmer_cache <-> tools import
     # cycle at app startup (main.py imports the worker before the routers).
-    from agents.services.farmer_cache import drain_farmer_refresh_queue_once
+    from agents.services.farmer_cache import (
+        migrate_legacy_refresh_queue,
+        pop_farmer_refresh_batch,
+        refresh_queued_farmer,
+    )
+
+    logger.info("Farmer refresh worker started (concurrency=%d)", WORKER_CONCURRENCY)
+    await migrate_legacy_refresh_queue()
+    in_flight: set[asyncio.Task] = set()
+    try:
+        while True:
+            try:
+                free = WORKER_CONCURRENCY - len(in_flight)
+                if free <= 0:
+                    await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+                # Block only when nothing is running; otherwise come back to
+                # refill slots as soon as the queue has work.
+                block = BLOCK_SECONDS if not in_flight else 0.0
+                phones = await pop_farmer_refresh_batch(min(free, DRAIN_BATCH), block_seconds=block)
+                for phone in phones:
+                    task = asyncio.create_task(refresh_queued_farmer(phone))
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+                if not phones and in_flight:
+                    await asyncio.wait(in_flight, timeout=BLOCK_SECONDS, return_when=asyncio.FIRST_COMPLETED)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Farmer refresh worker iteration failed")
+                await asyncio.sleep(ERROR_SLEEP_SECONDS)
+    finally:
+        for task in in_flight:
+            task.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
+
 
-    logger.info("Farmer refresh worker started")
+async def _prewarm_loop() -> None:
+    from agents.services.farmer_cache import prewarm_farmer_cache_once
+
+    logger.info("Farmer cache pre-warm started")
     while True:
         try:
-            processed = await drain_farmer_refresh_queue_once(batch=DRAIN_BATCH)
-            if processed == 0:
-                await asyncio.sleep(IDLE_SLEEP_SECONDS)
+            await prewarm_farmer_cache_once()
         except asyncio.CancelledError:
             raise
         except Exception:
-            logger.exception("Farmer refresh worker iteration failed")
-            await asyncio.sleep(IDLE_SLEEP_SECONDS)
+            logger.exception("Farmer cache pre-warm pass failed")
+        await asyncio.sleep(settings.farmer_prewarm_interval_seconds)
 
 
 async def start_farmer_refresh_worker() -> None:
-    global _worker_task
-    if _worker_task is not None and not _worker_task.done():
-        return
-    _worker_task = asyncio.create_task(_run_loop())
+    global _worker_task, _prewarm_task
+    if _worker_task is None or _worker_task.done():
+        _worker_task = asyncio.create_task(_run_loop())
+    if settings.farmer_prewarm_enabled and (_prewarm_task is None or _prewarm_task.done()):
+        _prewarm_task = asyncio.create_task(_prewarm_loop())
 
 
-async def stop_farmer_refresh_worker() -> None:
-    global _worker_task
-    if _worker_task is None:
+async def _stop(task: Optional[asyncio.Task], name: str) -> None:
+    if task is None:
         return
-    _worker_task.cancel()
+    task.cancel()
     try:
-        await _worker_task
+        await task
     except asyncio.CancelledError:
         pass
     except Exception:
-        logger.exception("Farmer refresh worker failed during shutdown")
+        logger.exception("%s failed during shutdown", name)
     finally:
-        _worker_task = None
-        logger.info("Farmer refresh worker stopped")
+        logger.info("%s stopped", name)
+
+
+async def stop_farmer_refresh_worker() -> None:
+    global _worker_task, _prewarm_task
+    prewarm, worker = _prewarm_task, _worker_task
+    _prewarm_task = _worker_task = None
+    await _stop(prewarm, "Farmer cache pre-warm")
+    await _stop(worker, "Farmer refresh worker")
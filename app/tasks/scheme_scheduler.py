@@ -12,6 +12,7 @@ from app.services.scheme_ingestion import (
     get_scheme_sources,
     refresh_all_scheme_sources,
     refresh_scheme_source,
+    shutdown_render_pool,
     source_cache_exists,
 )
 
@@ -103,4 +104,5 @@ async def stop_scheme_scheduler() -> None:
         logger.exception("Scheme scheduler failed during shutdown")
     finally:
         _scheme_scheduler = None
+        shutdown_render_pool()
     logger.info("Scheme scheduler stopped")
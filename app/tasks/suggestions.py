@@ -16,6 +16,9 @@ from langcodes import Language
 logger = get_logger(__name__)
 
 SUGGESTIONS_CACHE_TTL = 60*30 # 30 minutes
+# Only the last 5 exchanges are shown to the model; stored history is one entry
+# per turn, so loading twice that many covers turns that ended without an answer.
+SUGGESTIONS_HISTORY_TURNS = 10
 
 try:
     from langfuse import propagate_attributes, get_client as get_langfuse_client
@@ -42,7 +45,7 @@ async def create_suggestions(session_id: str, target_lang: str = 'mr', profile_n
     status_key = f"suggestions_{session_id}_{target_lang}:pending"
     try:
         # Get message history
-        raw_history = await _get_message_history(session_id)
+        raw_history = await _get_message_history(session_id, max_turns=SUGGESTIONS_HISTORY_TURNS)
         history = trim_history(raw_history,
                           30_000,
                           include_tool_calls=False,
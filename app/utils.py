@@ -2,23 +2,23 @@ import uuid
 from dataclasses import dataclass
 from typing import List
 from app.core.cache import cache, redis_client, build_cache_key  # Import cache instance from core
+from app.core import history_store
 from app.config import settings
 from helpers.utils import get_logger, count_tokens_for_part
-from copy import deepcopy
+from copy import copy
 from pydantic_ai.messages import (
-    ModelMessagesTypeAdapter,
     ModelMessage,
     SystemPromptPart,
 )
-from pydantic_core import to_jsonable_python
+from redis.exceptions import RedisError
 
 HISTORY_SUFFIX = "_SVA"
 SESSION_OWNER_SUFFIX = "_active_request"
 SESSION_EPOCH_SUFFIX = "_request_epoch"
 
 # Conversation-history retention in Redis (env HISTORY_CACHE_TTL_SECONDS, default 2h).
-# Rolling inactivity window: update_message_history rewrites the key with this TTL
-# each turn, so history expires this long after the last turn. session_id is
+# Rolling inactivity window: update_message_history refreshes the history keys'
+# TTL each turn, so history expires this long after the last turn. session_id is
 # client-supplied and the backend enforces no session/call length, so the only
 # requirement is TTL > the gap between turns; exact value is non-load-bearing.
 DEFAULT_CACHE_TTL = settings.history_cache_ttl_seconds
@@ -41,15 +41,27 @@ def _session_epoch_key(session_id: str) -> str:
     return build_cache_key(f"{session_id}_{SESSION_EPOCH_SUFFIX}")
 
 
+# KEYS[1] epoch counter, KEYS[2] owner key. ARGV[1] request nonce, ARGV[2] ttl.
+# Bumps the epoch and records "<epoch>:<nonce>" as the owner in one round trip,
+# so no other claim can slip between the two. Returns the new epoch.
+_CLAIM_OWNERSHIP_SCRIPT = """
+local epoch = redis.call('incr', KEYS[1])
+redis.call('set', KEYS[2], epoch .. ':' .. ARGV[1], 'EX', tonumber(ARGV[2]))
+return epoch
+"""
+
+
 async def claim_session_request_ownership(session_id: str) -> SessionRequestOwner:
-    epoch = await redis_client.incr(_session_epoch_key(session_id))
-    request_token = f"{epoch}:{uuid.uuid4()}"
-    await redis_client.set(
+    nonce = str(uuid.uuid4())
+    epoch = await redis_client.eval(
+        _CLAIM_OWNERSHIP_SCRIPT,
+        2,
+        _session_epoch_key(session_id),
         _session_owner_key(session_id),
-        request_token,
-        ex=settings.session_owner_ttl_seconds,
+        nonce,
+        str(settings.session_owner_ttl_seconds),
     )
-    return SessionRequestOwner(session_id=session_id, request_token=request_token, epoch=int(epoch))
+    return SessionRequestOwner(session_id=session_id, request_token=f"{epoch}:{nonce}", epoch=int(epoch))
 
 
 async def is_session_request_owner(owner: SessionRequestOwner | None) -> bool:
@@ -161,14 +173,26 @@ def _sanitize_legacy_usage(message_history):
     return message_history
 
 
-async def _get_message_history(session_id: str) -> List[ModelMessage]:
-    """Get or initialize message history."""
-    message_history = await get_cache(f"{session_id}_{HISTORY_SUFFIX}")
-    if not message_history:
-        return []
-    message_history = _sanitize_legacy_usage(message_history)
+def _history_key(session_id: str) -> str:
+    return f"{session_id}_{HISTORY_SUFFIX}"
+
+
+async def _load_message_history(session_id: str, max_turns: int | None = None) -> history_store.LoadedHistory:
+    """Load stored message history, keeping what the next write needs.
+
+    ``max_turns`` loads only the most recent stored turns. Pass the result to
+    :func:`update_message_history` with the turn's messages.
+    """
+    key = _history_key(session_id)
     try:
-        return ModelMessagesTypeAdapter.validate_python(message_history)
+        return await history_store.load_history(
+            key,
+            build_cache_key(key),
+            sanitize=_sanitize_legacy_usage,
+            max_turns=max_turns,
+        )
+    except RedisError:
+        raise
     except Exception as exc:
         # Never 500 a live call on unreadable history (e.g. future format
         # drift). Drop it and proceed as a fresh turn — degraded, not broken.
@@ -176,11 +200,42 @@ async def _get_message_history(session_id: str) -> List[ModelMessage]:
             "Discarding unreadable message history for session %s: %s",
             session_id, exc,
         )
-        return []
+        return history_store.LoadedHistory([])
+
+
+async def _get_message_history(session_id: str, max_turns: int | None = None) -> List[ModelMessage]:
+    """Get or initialize message history.
+
+    ``max_turns`` loads only the most recent stored turns (for readers that
+    never write the history back, e.g. suggestions).
+    """
+    return (await _load_message_history(session_id, max_turns)).messages
+
+async def update_message_history(
+    session_id: str,
+    all_messages: List[ModelMessage],
+    loaded: history_store.LoadedHistory | None = None,
+):
+    """Update message history. ``loaded`` is what :func:`_load_message_history`
+    returned for this turn; the messages past it are appended, and without it
+    the history is rewritten whole."""
+    key = _history_key(session_id)
+    await history_store.save_history(key, build_cache_key(key), all_messages, DEFAULT_CACHE_TTL, loaded)
+
+def _with_parts(message: ModelMessage, parts: list) -> ModelMessage:
+    """``message`` with ``parts`` (a filtered subsequence of its parts).
+
+    Returns ``message`` itself when nothing was filtered out, otherwise a shallow
+    shell sharing every part by reference, so trimming and filtering never copy
+    part contents (tool returns can be large). Results share parts with their
+    input and are treated as read-only, as history messages already are.
+    """
+    if len(parts) == len(message.parts):
+        return message
+    shell = copy(message)
+    shell.parts = parts
+    return shell
 
-async def update_message_history(session_id: str, all_messages: List[ModelMessage]):
-    """Update message history."""
-    await set_cache(f"{session_id}_{HISTORY_SUFFIX}", to_jsonable_python(all_messages), ttl=DEFAULT_CACHE_TTL)
 
 def filter_out_tool_calls(messages: List[ModelMessage]) -> List[ModelMessage]:
     """Filter out tool calls and tool returns from the message history.
@@ -196,19 +251,16 @@ def filter_out_tool_calls(messages: List[ModelMessage]) -> List[ModelMessage]:
     
     filtered_messages = []
     for message in messages:
-        # Create a deep copy to avoid modifying the original
-        msg_copy = deepcopy(message)
         filtered_parts = []
         
-        for part in msg_copy.parts:
+        for part in message.parts:
             # Only keep non-tool parts
             if not hasattr(part, 'part_kind') or part.part_kind not in ['tool-call', 'tool-return']:
                 filtered_parts.append(part)
         
         # Only add messages that have non-tool parts
         if filtered_parts:
-            msg_copy.parts = filtered_parts
-            filtered_messages.append(msg_copy)            
+            filtered_messages.append(_with_parts(message, filtered_parts))
     return filtered_messages
 
 
@@ -263,7 +315,7 @@ def get_message_pairs(history: List[ModelMessage], limit: int = None) -> List[Li
             break  # No more user messages
             
         # Add the pair and continue searching from before this pair
-        pairs.append([deepcopy(user_part), deepcopy(text_part)])
+        pairs.append([user_part, text_part])
         i = user_idx - 1
         
     return pairs
@@ -350,9 +402,7 @@ def clean_message_history_for_openai(history: List[ModelMessage]) -> List[ModelM
         
         # Only keep messages with remaining parts
         if cleaned_parts:
-            cleaned_message = deepcopy(message)
-            cleaned_message.parts = cleaned_parts
-            cleaned_history.append(cleaned_message)
+            cleaned_history.append(_with_parts(message, cleaned_parts))
     
     if orphaned_calls:
         logger.warning(f"Removed {len(orphaned_calls)} orphaned tool calls: {orphaned_calls}")
@@ -377,9 +427,7 @@ def trim_history(
             # remove only the system parts, keep any other parts (like user-prompt)
             new_parts = [p for p in msg.parts if not isinstance(p, SystemPromptPart)]
             if new_parts:
-                m2 = deepcopy(msg)
-                m2.parts = new_parts
-                prepped.append(m2)
+                prepped.append(_with_parts(msg, new_parts))
 
     # 2. Split into "turns" at each user message
     turns: List[List[ModelMessage]] = []
@@ -432,17 +480,14 @@ def trim_history(
                         continue
                 kept.append(p)
             if kept:
-                m2 = deepcopy(m)
-                m2.parts = kept
-                filtered.append(m2)
+                filtered.append(_with_parts(m, kept))
         if filtered:
             clean_turns.append(filtered)
 
-    # 5. Compute token-count per turn
-    turn_tokens = [
-        sum(count_tokens_for_part(p) for m in t for p in m.parts)
-        for t in clean_turns
-    ]
+    # 5. Token-count per turn, counted lazily: only the system turn and the
+    # recent turns examined in step 7 are ever counted.
+    def _turn_tokens(turn: List[ModelMessage]) -> int:
+        return sum(count_tokens_for_part(p) for m in turn for p in m.parts)
 
     # 6. Identify system turn and calculate its token usage
     system_turn = None
@@ -459,10 +504,9 @@ def trim_history(
             )
             if has_system_part:
                 system_turn = turn
-                system_turn_tokens = turn_tokens[i]
-                # Remove this turn from clean_turns and turn_tokens
+                system_turn_tokens = _turn_tokens(turn)
+                # Remove this turn from clean_turns
                 clean_turns = clean_turns[:i] + clean_turns[i+1:]
-                turn_tokens = turn_tokens[:i] + turn_tokens[i+1:]
                 break
     
     # 7. Greedily pick most-recent turns until we hit max_tokens
@@ -478,12 +522,14 @@ def trim_history(
     selected_turns = []
     total_tokens = 0
     
-    for turn, tk in zip(reversed(clean_turns), reversed(turn_tokens)):
+    for turn in reversed(clean_turns):
+        tk = _turn_tokens(turn)
         if total_tokens + tk <= remaining_tokens:
-            selected_turns.insert(0, turn)
+            selected_turns.append(turn)
             total_tokens += tk
         else:
             break
+    selected_turns.reverse()
     
     # 8. Combine system turn (if any) with selected recent turns
     final_turns = []
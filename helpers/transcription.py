@@ -3,7 +3,6 @@ import os
 import base64
 import requests
 import json
-import httpx
 import logging
 from dotenv import load_dotenv
 # from tenacity import retry, stop_after_attempt, wait_exponential, wait_fixed
@@ -13,6 +12,8 @@ from openai import OpenAI
 from io import BytesIO
 from pydub import AudioSegment
 
+from app.core.http_clients import upstream_client
+
 load_dotenv()
 
 _transcription_logger = logging.getLogger(__name__)
@@ -249,7 +250,7 @@ async def transcribe_bhashini_async(audio_base64: str, source_lang: str = "mr")
         "inputData": {"audio": [{"audioContent": audio_base64}]},
     }
 
-    async with httpx.AsyncClient(timeout=TRANSCRIBE_TIMEOUT) as client:
+    async with upstream_client("bhashini_asr", timeout=TRANSCRIBE_TIMEOUT) as client:
         response = await client.post(
             BHASHINI_PIPELINE_URL,
             headers=headers,
@@ -1,9 +1,10 @@
 import os
 import base64
-import httpx
 from typing import Optional
 from dotenv import load_dotenv
 
+from app.core.http_clients import upstream_client
+
 load_dotenv()
 
 TTS_BHASHINI_URL = "https://dhruva-api.bhashini.gov.in/services/inference/pipeline"
@@ -79,7 +80,7 @@ async def text_to_speech_bhashini_async(
         ],
         "inputData": {"input": [{"source": text}]},
     }
-    async with httpx.AsyncClient(timeout=TTS_TIMEOUT) as client:
+    async with upstream_client("bhashini_tts", timeout=TTS_TIMEOUT) as client:
         response = await client.post(TTS_BHASHINI_URL, headers=headers, json=data)
     response.raise_for_status()
     response_json = response.json()
@@ -123,7 +124,7 @@ async def text_to_speech_raya_async(
     if voice_id:
         payload["voiceId"] = voice_id
 
-    async with httpx.AsyncClient(timeout=TTS_TIMEOUT) as client:
+    async with upstream_client("raya_tts", timeout=TTS_TIMEOUT) as client:
         response = await client.post(RAYA_TTS_URL, headers=headers, json=payload)
 
     response.raise_for_status()
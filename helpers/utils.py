@@ -1,7 +1,10 @@
 # sva/helpers/utils.py
 
+import hashlib
 import os
 import re
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import List, Dict, Optional
 import logging
@@ -12,6 +15,7 @@ import tiktoken
 import unicodedata as ud
 from datetime import datetime
 import simplejson as json
+from functools import lru_cache
 from jinja2 import Environment, FileSystemLoader, Template
 import pytz
 from helpers.gujarati_numbers import normalize_numbers_for_tts
@@ -22,6 +26,11 @@ load_dotenv()
 
 # In-memory prompt template cache (populated at app startup; no disk I/O at request time)
 PROMPT_TEMPLATES_CACHE: Dict[str, str] = {}
+# Compiled Jinja templates for PROMPT_TEMPLATES_CACHE, keyed by stem and paired
+# with the source they were compiled from (recompiled if that entry is replaced).
+_COMPILED_PROMPTS: Dict[str, tuple] = {}
+# Rendered prompts memoized per (template, context); see _render_prompt.
+_PROMPT_RENDER_MEMO_SIZE = 256
 
 
 def get_s3_client():
@@ -60,6 +69,21 @@ def get_logger(name):
     logger.addHandler(ch)
     return logger
 
+@lru_cache(maxsize=1)
+def _token_encoder():
+    """The cl100k_base encoder, loaded on first use (it may need a download) and reused."""
+    return tiktoken.get_encoding('cl100k_base')
+
+
+# Token counts per string. History parts are re-read from Redis every turn but
+# only the newest turn's text is new, so trimming tokenizes just that turn.
+# Keyed by length + digest, not the text: the memo must not keep large tool
+# returns and search results alive.
+_TOKEN_COUNTS: "OrderedDict[tuple[int, bytes], int]" = OrderedDict()
+_TOKEN_COUNTS_MAX = 4096
+_TOKEN_COUNTS_LOCK = threading.Lock()
+
+
 def count_tokens_str(doc: str) -> int:
     """Count tokens in a string.
 
@@ -69,8 +93,22 @@ def count_tokens_str(doc: str) -> int:
         int: number of tokens in the string
 
     """
-    encoder = tiktoken.get_encoding('cl100k_base')
-    return len(encoder.encode(doc, disallowed_special=()))
+    encoded = doc.encode("utf-8", "surrogatepass")
+    key = (len(encoded), hashlib.blake2b(encoded, digest_size=16).digest())
+    with _TOKEN_COUNTS_LOCK:
+        count = _TOKEN_COUNTS.get(key)
+        if count is not None:
+            _TOKEN_COUNTS.move_to_end(key)
+            return count
+    count = len(_token_encoder().encode(doc, disallowed_special=()))
+    with _TOKEN_COUNTS_LOCK:
+        _TOKEN_COUNTS[key] = count
+        while len(_TOKEN_COUNTS) > _TOKEN_COUNTS_MAX:
+            _TOKEN_COUNTS.popitem(last=False)
+    return count
+
+
+count_tokens_str.cache_clear = _TOKEN_COUNTS.clear  # type: ignore[attr-defined]
 
 
 def count_tokens_for_part(part) -> int:
@@ -340,8 +378,8 @@ def post_process_translation(translation: str) -> str:
 
 
 def load_prompt_templates(prompt_dir: Path) -> None:
-    """Load all .md prompt templates from the given directory into PROMPT_TEMPLATES_CACHE.
-    Call once at app startup (e.g. in FastAPI lifespan) to avoid disk I/O at request time.
+    """Load all .md prompt templates from the given directory into PROMPT_TEMPLATES_CACHE
+    and compile them. Call once at app startup (e.g. in FastAPI lifespan) to avoid disk I/O at request time.
     """
     prompt_dir = Path(prompt_dir)
     if not prompt_dir.is_dir():
@@ -350,11 +388,50 @@ def load_prompt_templates(prompt_dir: Path) -> None:
         key = path.stem  # e.g. voice_system_gu
         try:
             PROMPT_TEMPLATES_CACHE[key] = path.read_text(encoding="utf-8")
+            _compiled_prompt(key)
         except Exception as e:
             _log = logging.getLogger(__name__)
             _log.warning("Failed to load prompt template %s: %s", path, e)
 
 
+def _compiled_prompt(cache_key: str) -> Template:
+    """Compiled template for a PROMPT_TEMPLATES_CACHE entry, compiled once per source."""
+    source = PROMPT_TEMPLATES_CACHE[cache_key]
+    entry = _COMPILED_PROMPTS.get(cache_key)
+    if entry is None or entry[0] is not source:
+        entry = (source, Template(source, autoescape=False))
+        _COMPILED_PROMPTS[cache_key] = entry
+    return entry[1]
+
+
+@lru_cache(maxsize=8)
+def _prompt_env(prompt_dir: str) -> Environment:
+    """Disk-fallback environment per prompt dir (Jinja caches its templates, reloading on change)."""
+    return Environment(loader=FileSystemLoader(prompt_dir), autoescape=False)
+
+
+@lru_cache(maxsize=_PROMPT_RENDER_MEMO_SIZE)
+def _render_memo(template: Template, items: tuple) -> str:
+    return template.render(**dict(items))
+
+
+def _render_prompt(template: Template, context: Dict) -> str:
+    """Render ``template``, reusing the output for a context seen before.
+
+    Agent instructions are re-rendered on every model request of a run with the
+    same date, farmer context and hints, so all but the first render of a run
+    are a memo hit. Contexts with unhashable values are rendered directly.
+    """
+    if not context:
+        return template.render()
+    try:
+        items = tuple(sorted(context.items()))
+        hash(items)
+    except TypeError:
+        return template.render(**context)
+    return _render_memo(template, items)
+
+
 def get_prompt(prompt_file: str, context: Dict = {}, prompt_dir: str = "assets/prompts") -> str:
     """Load a prompt from in-memory cache (if populated at startup) or disk, and render with context.
 
@@ -371,16 +448,11 @@ def get_prompt(prompt_file: str, context: Dict = {}, prompt_dir: str = "assets/p
     cache_key = Path(prompt_file).stem  # e.g. voice_system_gu
 
     if cache_key in PROMPT_TEMPLATES_CACHE:
-        template = Template(PROMPT_TEMPLATES_CACHE[cache_key], autoescape=False)
-        return template.render(**context) if context else template.render()
+        return _render_prompt(_compiled_prompt(cache_key), context)
 
     # Fallback: load from disk (e.g. tests or if startup load was skipped)
-    env = Environment(
-        loader=FileSystemLoader(prompt_dir),
-        autoescape=False,
-    )
-    template = env.get_template(prompt_file)
-    return template.render(**context) if context else template.render()
+    template = _prompt_env(str(prompt_dir)).get_template(prompt_file)
+    return _render_prompt(template, context)
 
 
 def upload_audio_to_s3(audio_base64: str, session_id: str, bucket_name: str | None = None) -> Dict:
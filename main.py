@@ -11,6 +11,9 @@ from app.tasks.farmer_refresh_worker import start_farmer_refresh_worker, stop_fa
 # P2 health poller: active LB /health probe feeding the per-endpoint breaker.
 # start_/stop_ are no-ops unless HEALTH_POLLER_ENABLED (flag-off boot is untouched).
 from app.tasks.health_poller import start_health_poller, stop_health_poller
+from app.core.http_clients import publish_pool_stats, start_http_clients, stop_http_clients
+from app.core.near_cache import start_near_cache_listener, stop_near_cache_listener
+from app.llm_core.factory import close_tg_sessions, start_tg_sessions
 
 load_dotenv()
 
@@ -20,6 +23,10 @@ import app.observability  # noqa: F401, E402
 
 # Import all routers
 from app.routers import chat, transcribe, suggestions, tts, health, auth, user, telemetry
+# In-process vet-KB index; start_/stop_ are no-ops unless SEARCH_BACKEND=local.
+from agents.tools.local_index import start_local_index, stop_local_index
+# Marqo index capability warmup + background refresh (no-op off the Marqo backend).
+from agents.tools.search import start_index_capability_refresher, stop_index_capability_refresher
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -43,6 +50,12 @@ async def lifespan(app: FastAPI):
         raise
     except Exception as _llm_exc:  # pragma: no cover - defensive
         print(f"⚠️  llm_core configure skipped: {_llm_exc}")
+    # Shared keep-alive upstream HTTP pools first: the workers below call upstreams.
+    await start_http_clients()
+    await start_tg_sessions()
+    await start_near_cache_listener()
+    await start_local_index()
+    await start_index_capability_refresher()
     await start_telemetry_worker()
     await start_scheme_scheduler()
     await start_farmer_refresh_worker()
@@ -53,6 +66,11 @@ async def lifespan(app: FastAPI):
     await stop_farmer_refresh_worker()
     await stop_scheme_scheduler()
     await stop_telemetry_worker()
+    await stop_index_capability_refresher()
+    await stop_local_index()
+    await stop_near_cache_listener()
+    await close_tg_sessions()
+    await stop_http_clients()
     print(f"🛑 {settings.app_name} shutting down...")
 
 # Disable API docs in production to avoid exposing full API surface
@@ -95,6 +113,7 @@ async def metrics():
     scraped internally). render() is a no-op safe stub when prometheus_client is
     absent, so this route works whether or not the dependency is installed."""
     from app import metrics as _metrics
+    publish_pool_stats()
     body, content_type = _metrics.render()
     return Response(content=body, media_type=content_type)
 
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""Micro-benchmark: ``get_mini_glossary_for_text`` per translation batch.
+
+Runs the mini-glossary lookup over sentence batches of a typical advisory
+answer three ways:
+
+* full scan — every fuzzy lookup is ``process.extractOne`` over the whole
+  ``EN_TERMS`` / ``CANONICAL_ALIAS_TERMS`` list (the pre-index behaviour);
+* indexed, cold — the prebuilt ``_RatioIndex`` with its memo cleared each round;
+* indexed, warm — the memo populated (phrases recurring across batches/turns).
+
+All three must produce identical glossaries; that is asserted before timing.
+
+    python scripts/bench_glossary_match.py
+    python scripts/bench_glossary_match.py --rounds 50
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from rapidfuzz import fuzz, process  # noqa: E402
+
+from agents.tools import terms  # noqa: E402
+
+_BATCHES = [
+    "If your cow has mastitis, separate her milk and consult the veterinary doctor.",
+    "Give clean water, green fodder and mineral mixture every day to keep milk production steady.",
+    "Vaccinate against foot and mouth disease and lumpy skin disease before the monsoon.",
+    "Pregnant buffaloes need extra concentrate feed in the last three months of pregnancy.",
+    "Deworm calves every three months and check the herd for ticks after grazing.",
+    "Repeat breeder cows should be examined before the next artificial insemination.",
+    "Milk fever after calving needs calcium treatment from the veterinarian immediately.",
+    "Keep the shed dry and clean to prevent hoof problems and udder infection.",
+]
+_INDEXES = ("EN_TERMS_INDEX", "HI_EN_TERMS_INDEX", "CANONICAL_ALIAS_INDEX")
+
+
+class _FullScan:
+    def __init__(self, choices):
+        self.terms = choices
+
+    def extract_one(self, query, score_cutoff):
+        return process.extractOne(query, self.terms, score_cutoff=score_cutoff, scorer=fuzz.ratio)
+
+
+def _run() -> list[str]:
+    return [terms.get_mini_glossary_for_text(b) for b in _BATCHES]
+
+
+def _best(fn, rounds: int, before=None) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        if before:
+            before()
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _clear_memo() -> None:
+    for name in _INDEXES:
+        getattr(terms, name).extract_one.cache_clear()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rounds", type=int, default=20)
+    args = ap.parse_args()
+
+    indexed = {name: getattr(terms, name) for name in _INDEXES}
+    full = {name: _FullScan(index.terms) for name, index in indexed.items()}
+
+    def _use(which) -> None:
+        for name, index in which.items():
+            setattr(terms, name, index)
+
+    _use(full)
+    expected = _run()
+    scan = _best(_run, args.rounds)
+    _use(indexed)
+    _clear_memo()
+    assert _run() == expected, "indexed glossary differs from the full scan"
+    cold = _best(_run, args.rounds, before=_clear_memo)
+    warm = _best(_run, args.rounds)
+
+    per = len(_BATCHES)
+    print(f"{per} batches, {len(terms.EN_TERMS)} EN terms, {len(terms.CANONICAL_ALIAS_TERMS)} aliases, best of {args.rounds}")
+    for label, t in (("full scan", scan), ("indexed, cold", cold), ("indexed, warm", warm)):
+        print(f"  {label:<14} {t / per * 1000:7.3f} ms/batch  ({scan / t:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
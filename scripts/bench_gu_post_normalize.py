@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""Micro-benchmark: Gujarati post-normalization cost per streamed chunk.
+
+Times the replacement table ``_post_normalize_gu_translation`` applies to every
+TranslateGemma chunk, two ways:
+
+* legacy   — ``for pat, repl in GU_POST_REPLACEMENTS: out = re.sub(pat, repl, out)``
+* compiled — ``app.services.rewrite_rules.compile_rules(GU_POST_REPLACEMENTS).apply``
+
+at the current ``gu_term_policy.json`` size and with the forbidden-term table
+grown 10x by synthetic variants of the real terms (the growth the policy file
+has been seeing as feedback rounds land). Both outputs are checked equal on
+every chunk before timing.
+
+    python scripts/bench_gu_post_normalize.py
+    python scripts/bench_gu_post_normalize.py --rounds 50 --scale 20
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from app.services import translation as tr  # noqa: E402
+from app.services.rewrite_rules import compile_rules  # noqa: E402
+
+_ANSWER = (
+    "ગાય ગર્ભવતી હોય ત્યારે તેને દરરોજ સ્વચ્છ પાણી અને સંતુલિત દાણ આપો. "
+    "બાવલું અને આંચળ રોજ તપાસો; આંચળનો સોજો દેખાય તો પશુચિકિત્સકને બોલાવો. "
+    "દૂધમાં ફેટ અને એસ.એન.એફ. જાળવવા લીલો અને સૂકો ચારો બંને જરૂરી છે. "
+    "હું તમને વધુ માહિતી આપી શકું છું. ૧પ દિવસ પછી ફરી તપાસ કરાવો.\n"
+)
+_SUFFIXES = ["ઓ", "માં", "નો", "ની", "નું", "થી", "પર", "ને", "વાળા", "રૂપ", "કાર", "પણું"]
+
+
+def _chunks(text: str, size: int = 24) -> list[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _scaled_rules(scale: int) -> list[tuple[str, str]]:
+    if scale <= 1:
+        return list(tr.GU_POST_REPLACEMENTS)
+    forbidden = dict(tr.GU_TERM_POLICY.get("forbidden", {}))
+    base = list(forbidden.items())
+    extra: dict[str, str] = {}
+    for i in range((scale - 1) * len(base)):
+        key, value = base[i % len(base)]
+        suffix = _SUFFIXES[(i // len(base)) % len(_SUFFIXES)] * (1 + i // (len(base) * len(_SUFFIXES)))
+        extra.setdefault(f"{key}{suffix}", f"{value}{suffix}")
+    policy = tr._build_gu_policy_replacements({"forbidden": {**forbidden, **extra}})
+    return tr.GU_POST_REPLACEMENTS_BASE + policy
+
+
+def _legacy(rules, chunks):
+    for chunk in chunks:
+        out = chunk
+        for pat, repl in rules:
+            out = re.sub(pat, repl, out)
+
+
+def _compiled(compiled, chunks):
+    for chunk in chunks:
+        compiled.apply(chunk)
+
+
+def _best(fn, arg, chunks, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn(arg, chunks)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rounds", type=int, default=30)
+    ap.add_argument("--scale", type=int, default=10, help="policy growth factor for the second row")
+    args = ap.parse_args()
+
+    chunks = _chunks(_ANSWER * 4)
+    print(f"{len(chunks)} chunks of <=24 chars, best of {args.rounds}")
+    for label, scale in (("current policy", 1), (f"{args.scale}x policy", args.scale)):
+        rules = _scaled_rules(scale)
+        t0 = time.perf_counter()
+        compiled = compile_rules(rules)
+        compile_ms = (time.perf_counter() - t0) * 1000
+        for chunk in chunks:
+            expected = chunk
+            for pat, repl in rules:
+                expected = re.sub(pat, repl, expected)
+            assert compiled.apply(chunk) == expected, chunk
+
+        legacy = _best(_legacy, rules, chunks, args.rounds) / len(chunks) * 1e6
+        fast = _best(_compiled, compiled, chunks, args.rounds) / len(chunks) * 1e6
+        print(
+            f"  {label:<16} {len(rules):4d} rules -> {compiled.passes:3d} passes "
+            f"(compile {compile_ms:6.1f} ms)  legacy {legacy:8.2f} us/chunk  "
+            f"compiled {fast:7.2f} us/chunk  ({legacy / fast:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""Micro-benchmark: copying cost of history trimming and filtering.
+
+Builds a synthetic ``--turns``-turn session in which every other turn carries a
+``search_documents`` call whose return is a few KB of retrieved chunks, then
+times ``trim_history`` (as the chat turn and the suggestions task call it),
+``filter_out_tool_calls`` and ``clean_message_history_for_openai`` two ways:
+
+* deepcopy — every retained message deep-copied (the pre-sharing behaviour,
+  reproduced by swapping ``app.utils._with_parts`` for a deep-copying version);
+* shared   — new message shells only where parts were dropped, parts by reference.
+
+Reports best wall time and tracemalloc peak per call; outputs are checked equal.
+Token counting is memoized and warmed first so only copying is measured.
+
+    python scripts/bench_history_copy.py
+    python scripts/bench_history_copy.py --turns 100 --chunk-kb 8
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from copy import deepcopy
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from pydantic_ai.messages import (  # noqa: E402
+    ModelRequest,
+    ModelResponse,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+
+from app import utils as app_utils  # noqa: E402
+from helpers import utils  # noqa: E402
+
+
+class _Words:
+    def encode(self, doc, disallowed_special=()):
+        return doc.split()
+
+
+def _deepcopy_with_parts(message, parts):
+    shell = deepcopy(message)
+    shell.parts = parts
+    return shell
+
+
+def _history(turns: int, chunk_kb: int) -> list:
+    chunk = {"doc_id": "amul-faq", "text": "Feed the cow green fodder and clean water. " * (chunk_kb * 24)}
+    msgs = []
+    for i in range(turns):
+        msgs.append(ModelRequest(parts=[UserPromptPart(content=f"Question {i} about my buffalo's milk yield?")]))
+        if i % 2 == 0:
+            msgs.append(ModelResponse(parts=[ToolCallPart(tool_name="search_documents", args={"query": f"q{i}"}, tool_call_id=f"c{i}")]))
+            msgs.append(ModelRequest(parts=[ToolReturnPart(tool_name="search_documents", content=[chunk] * 5, tool_call_id=f"c{i}")]))
+        msgs.append(ModelResponse(parts=[TextPart(content=f"Answer {i}: give 2 kg concentrate per litre. " * 8)]))
+    return msgs
+
+
+_CASES = [
+    ("trim (chat)", lambda h: app_utils.trim_history(h, 28_000, include_system_prompts=False, include_tool_calls=False)),
+    ("trim (all parts)", lambda h: app_utils.trim_history(h, 10**9)),
+    ("filter_out_tool_calls", app_utils.filter_out_tool_calls),
+    ("clean_for_openai", app_utils.clean_message_history_for_openai),
+]
+
+
+def _measure(fn, history, rounds: int) -> tuple[float, int]:
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn(history)
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    fn(history)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--turns", type=int, default=50)
+    ap.add_argument("--chunk-kb", type=int, default=4, help="size of each retrieved chunk")
+    ap.add_argument("--rounds", type=int, default=10)
+    args = ap.parse_args()
+
+    utils._token_encoder = lambda: _Words()
+    app_utils.logger.setLevel(logging.WARNING)
+    history = _history(args.turns, args.chunk_kb)
+    shared_impl = app_utils._with_parts
+    print(f"{args.turns} turns, {len(history)} messages, {args.chunk_kb} KB chunks x5 per search, best of {args.rounds}")
+    for label, fn in _CASES:
+        fn(history)  # warm the token-count memo
+        app_utils._with_parts = _deepcopy_with_parts
+        expected = fn(history)
+        slow, slow_peak = _measure(fn, history, args.rounds)
+        app_utils._with_parts = shared_impl
+        assert fn(history) == expected, label
+        fast, fast_peak = _measure(fn, history, args.rounds)
+        print(
+            f"  {label:<22} deepcopy {slow * 1000:8.2f} ms {slow_peak / 1024:8.0f} KiB   "
+            f"shared {fast * 1000:6.2f} ms {fast_peak / 1024:6.0f} KiB  ({slow / fast:6.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""Micro-benchmark: history-trimming cost per turn as a session grows.
+
+Every chat turn trims the Redis history (and the suggestions task trims it
+again). Replays a session of ``--turns`` turns and times both trims per turn:
+
+* uncached — the token-count memo cleared before each trim, so every part of
+  the whole history is tokenized again (the pre-memo behaviour);
+* cached   — ``count_tokens_str`` memoized, so only the new turn is tokenized.
+
+Selections are checked equal on every turn. The remaining per-turn cost is
+the message copying in ``trim_history``, not tokenization. Uses cl100k_base when tiktoken can
+load it, otherwise a regex stand-in of similar cost shape (noted in the output).
+
+    python scripts/bench_history_trim.py
+    python scripts/bench_history_trim.py --turns 40 --words 120
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, UserPromptPart  # noqa: E402
+
+from app.utils import trim_history  # noqa: E402
+from helpers import utils  # noqa: E402
+
+_WORDS = "cow buffalo fodder milk fat vaccine mastitis calf heat deworm shed water".split()
+
+
+class _RegexEncoder:
+    _re = re.compile(r"\w+|[^\w\s]+|\s+")
+
+    def encode(self, doc, disallowed_special=()):
+        return self._re.findall(doc)
+
+
+def _encoder_label() -> str:
+    try:
+        utils._token_encoder()
+        return "cl100k_base"
+    except Exception:
+        utils._token_encoder = lambda: _RegexEncoder()
+        return "regex stand-in (cl100k_base not available offline)"
+
+
+def _turn(i: int, words: int) -> list:
+    text = " ".join(_WORDS[(i + k) % len(_WORDS)] for k in range(words))
+    return [
+        ModelRequest(parts=[UserPromptPart(content=f"Question {i}: {text}?")]),
+        ModelResponse(parts=[TextPart(content=f"Answer {i}. {text}. " * 3)]),
+    ]
+
+
+def _trims(history: list) -> list:
+    out = []
+    for budget in (28_000, 30_000):  # chat, then the suggestions task
+        out.append(trim_history(history, budget, include_system_prompts=False, include_tool_calls=False))
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--turns", type=int, default=30)
+    ap.add_argument("--words", type=int, default=80)
+    args = ap.parse_args()
+
+    label = _encoder_label()
+    history: list = []
+    rows = []
+    utils.count_tokens_str.cache_clear()
+    for i in range(args.turns):
+        history = history + _turn(i, args.words)
+        t0 = time.perf_counter()
+        cached = _trims(history)
+        t_cached = time.perf_counter() - t0
+
+        utils.count_tokens_str.cache_clear()
+        t0 = time.perf_counter()
+        uncached = _trims(history)
+        t_uncached = time.perf_counter() - t0
+        assert cached == uncached, f"selections differ at turn {i}"
+        # Restore the warm memo the next turn would really see.
+        utils.count_tokens_str.cache_clear()
+        _trims(history)
+        rows.append((i + 1, t_uncached, t_cached))
+
+    print(f"encoder: {label}; {args.words} words per message, chat + suggestions trims per turn")
+    for turn, slow, fast in rows:
+        if turn in (1, 5, 10) or turn % 10 == 0 or turn == args.turns:
+            print(f"  turn {turn:3d}  uncached {slow * 1000:7.2f} ms  cached {fast * 1000:7.2f} ms  ({slow / fast:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""Micro-benchmark: agent instruction render cost per model request.
+
+``get_agrinet_instructions`` renders ``agrinet_system.md`` (~20 KB) on every
+model request of an agent run (up to ``request_limit`` per turn) with the same
+context each time. Three ways, for one run of ``--steps`` requests:
+
+* legacy  — ``Template(source)`` compiled and rendered on every request;
+* compiled — the template compiled once at load time, rendered every request;
+* memoized — ``helpers.utils.get_prompt``: compiled once, rendered on the first
+  request of the run, memo hits after that.
+
+All three must return the same text; that is asserted before timing.
+
+    python scripts/bench_prompt_render.py
+    python scripts/bench_prompt_render.py --steps 10 --rounds 50
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from jinja2 import Template  # noqa: E402
+
+from helpers import utils  # noqa: E402
+
+_PROMPT_DIR = Path(__file__).resolve().parent.parent / "assets" / "prompts"
+_NAME = "agrinet_system"
+
+
+def _context(run: int) -> dict:
+    return {
+        "today_date": "Tuesday, 13 August 2026",
+        "today_datetime": "Tuesday, 13 August 2026 10:00 AM IST",
+        # A different farmer every run, so each run starts with a memo miss.
+        "farmer_context": f"Farmer code: {run}\nAnimals: 2 cows, 1 buffalo\nSociety: Anand",
+        "ambiguity_hints": None,
+        "response_max_chars": 600,
+        "loan_max_amount": "5,000",
+        "loan_interest_rate_pct": "7",
+        "network_tools_enabled": True,
+    }
+
+
+def _legacy(source: str, context: dict, steps: int) -> str:
+    for _ in range(steps):
+        out = Template(source, autoescape=False).render(**context)
+    return out
+
+
+def _compiled(template: Template, context: dict, steps: int) -> str:
+    for _ in range(steps):
+        out = template.render(**context)
+    return out
+
+
+def _memoized(_, context: dict, steps: int) -> str:
+    for _ in range(steps):
+        out = utils.get_prompt(_NAME, context=context)
+    return out
+
+
+def _best(fn, arg, steps: int, rounds: int) -> float:
+    best = float("inf")
+    for run in range(rounds):
+        context = _context(run)
+        t0 = time.perf_counter()
+        fn(arg, context, steps)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--steps", type=int, default=6, help="model requests per agent run")
+    ap.add_argument("--rounds", type=int, default=30)
+    args = ap.parse_args()
+
+    utils.load_prompt_templates(_PROMPT_DIR)
+    source = utils.PROMPT_TEMPLATES_CACHE[_NAME]
+    template = Template(source, autoescape=False)
+    probe = _context(-1)
+    assert _legacy(source, probe, 1) == _compiled(template, probe, 1) == _memoized(None, probe, 1)
+
+    print(f"{_NAME}.md ({len(source)} chars), {args.steps} requests per run, best of {args.rounds}")
+    baseline = None
+    for label, fn, arg in (("legacy", _legacy, source), ("compiled", _compiled, template), ("memoized", _memoized, None)):
+        per_step = _best(fn, arg, args.steps, args.rounds) / args.steps * 1e6
+        baseline = baseline or per_step
+        print(f"  {label:<9} {per_step:9.1f} us/request  ({baseline / per_step:6.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+"""Quality + latency benchmark: ``search_documents`` candidate reranking.
+
+Runs the fixture corpus (``tests/fixtures/rerank_corpus.json``: veterinary
+chunks, queries with judged relevant chunks, simulated Marqo scores) through:
+
+* marqo   — the candidates in Marqo score order (no rerank);
+* overlap — the original token-overlap reranker (MARQO_RERANK_MODE=overlap);
+* bm25    — the NumPy BM25 reranker, IDF from the candidate pool;
+* bm25+snapshot — the same with IDF from a snapshot of the whole corpus.
+
+Quality is nDCG@8 and MRR over the judged queries. Latency is per search for
+candidate pools of growing size (the fixture chunks repeated under distinct
+``_id``s), BM25 both cold (per-document stats cache cleared) and warm.
+
+The vectorized BM25 must match a plain scalar BM25 on every query; that is
+asserted before timing.
+
+    python scripts/bench_search_rerank.py
+    python scripts/bench_search_rerank.py --rounds 50 --pools 8,40,120,240
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+import numpy as np  # noqa: E402
+
+from agents.tools import search, search_rerank  # noqa: E402
+
+_FIXTURE = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "rerank_corpus.json"
+_K = 8
+
+
+def _candidates(corpus: dict, query: dict) -> list[dict]:
+    hits = [dict(doc, _score=query["marqo_scores"][doc["_id"]]) for doc in corpus["documents"]]
+    return sorted(hits, key=lambda h: h["_score"], reverse=True)
+
+
+def _scalar_bm25(terms, tfs, lengths, n_docs, df, avg_len) -> list[float]:
+    k1, b = search_rerank.K1, search_rerank.B
+    out = []
+    for tf, length in zip(tfs, lengths):
+        score = 0.0
+        for term in terms:
+            f = tf.get(term, 0)
+            idf = math.log1p((n_docs - df.get(term, 0) + 0.5) / (df.get(term, 0) + 0.5))
+            score += idf * f * (k1 + 1.0) / (f + k1 * (1.0 - b + b * length / avg_len))
+        out.append(score)
+    return out
+
+
+def _check_parity(corpus: dict) -> None:
+    for query in corpus["queries"]:
+        hits = _candidates(corpus, query)
+        terms = sorted(set(search_rerank.tokenize(query["query"])))
+        stats = [search_rerank.doc_stats(h) for h in hits]
+        tfs = [s.text_tf for s in stats]
+        lengths = [s.text_len for s in stats]
+        df = {t: sum(1 for tf in tfs if t in tf) for t in terms}
+        avg_len = sum(lengths) / len(lengths)
+        expected = _scalar_bm25(terms, tfs, lengths, len(hits), df, avg_len)
+
+        tf_matrix = np.array([[tf.get(t, 0) for t in terms] for tf in tfs], dtype=np.float64)
+        idf = search_rerank._idf(len(hits), np.array([df[t] for t in terms], dtype=np.float64))
+        got = search_rerank._bm25(tf_matrix, np.asarray(lengths, dtype=np.float64), avg_len, idf)
+        assert np.allclose(got, expected, rtol=1e-12, atol=1e-12), f"BM25 parity failed for {query['query']!r}"
+
+
+def _ndcg(ranked: list[str], relevant: set[str]) -> float:
+    dcg = sum(1.0 / math.log2(i + 2) for i, doc_id in enumerate(ranked[:_K]) if doc_id in relevant)
+    ideal = sum(1.0 / math.log2(i + 2) for i in range(min(len(relevant), _K)))
+    return dcg / ideal
+
+
+def _mrr(ranked: list[str], relevant: set[str]) -> float:
+    return next((1.0 / (i + 1) for i, doc_id in enumerate(ranked) if doc_id in relevant), 0.0)
+
+
+def _quality(corpus: dict, rerank) -> tuple[float, float]:
+    ndcg = mrr = 0.0
+    for query in corpus["queries"]:
+        ranked = [h["_id"] for h in rerank(query["query"], _candidates(corpus, query))]
+        relevant = set(query["relevant"])
+        ndcg += _ndcg(ranked, relevant)
+        mrr += _mrr(ranked, relevant)
+    n = len(corpus["queries"])
+    return ndcg / n, mrr / n
+
+
+def _pool(corpus: dict, size: int) -> list[dict]:
+    docs = corpus["documents"]
+    scores = corpus["queries"][0]["marqo_scores"]
+    return [
+        dict(docs[i % len(docs)], _id=f"{docs[i % len(docs)]['_id']}#{i}", _score=scores[docs[i % len(docs)]["_id"]])
+        for i in range(size)
+    ]
+
+
+def _best(fn, rounds: int, before=None) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        if before:
+            before()
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rounds", type=int, default=20)
+    ap.add_argument("--pools", default="8,40,120", help="comma-separated candidate pool sizes")
+    args = ap.parse_args()
+
+    corpus = json.loads(_FIXTURE.read_text(encoding="utf-8"))
+    search_rerank.settings.marqo_rerank_idf_path = ""
+    _check_parity(corpus)
+    snapshot = search_rerank.IdfSnapshot.from_documents(corpus["documents"])
+
+    print(f"{len(corpus['documents'])} chunks, {len(corpus['queries'])} judged queries")
+    print(f"  {'ranker':<14} nDCG@{_K}    MRR")
+    rankers = (
+        ("marqo", lambda q, hits: hits),
+        ("overlap", search._overlap_rerank_hits),
+        ("bm25", search_rerank.bm25_rerank),
+        ("bm25+snapshot", lambda q, hits: search_rerank.bm25_rerank(q, hits, snapshot)),
+    )
+    for label, rerank in rankers:
+        ndcg, mrr = _quality(corpus, rerank)
+        print(f"  {label:<14} {ndcg:6.3f}  {mrr:6.3f}")
+
+    query = corpus["queries"][0]["query"]
+    print(f"\nlatency per search, best of {args.rounds} (query {query!r})")
+    for size in (int(p) for p in args.pools.split(",")):
+        hits = _pool(corpus, size)
+        overlap = _best(lambda: search._overlap_rerank_hits(query, hits), args.rounds)
+        cold = _best(lambda: search_rerank.bm25_rerank(query, hits), args.rounds, before=search_rerank.clear_doc_stats)
+        search_rerank.bm25_rerank(query, hits)
+        warm = _best(lambda: search_rerank.bm25_rerank(query, hits), args.rounds)
+        print(
+            f"  {size:>4} candidates  overlap {overlap * 1000:7.3f} ms  "
+            f"bm25 cold {cold * 1000:7.3f} ms ({overlap / cold:4.1f}x)  "
+            f"bm25 warm {warm * 1000:7.3f} ms ({overlap / warm:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
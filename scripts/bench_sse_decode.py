@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""Micro-benchmark: per-token decode overhead of the TranslateGemma SSE reader.
+
+Compares the old reader (``iter_chunked(64)`` + ``buffer += chunk`` +
+``buffer.split(b"\\n", 1)``) with :class:`app.services.sse.SSEDataDecoder` fed
+16 KiB reads, on a synthetic Gujarati token stream shaped like a TG response
+(one ``data: {json}`` line per token). Two tables: line framing alone, and
+framing plus the ``json.loads`` of every event (the whole per-token decode cost).
+
+    python scripts/bench_sse_decode.py                 # 2000 tokens, 200 rounds
+    python scripts/bench_sse_decode.py --tokens 500 --rounds 200
+
+No network: the body is sliced in memory, so this measures decode CPU only.
+The connection-reuse half of the change (one keep-alive session per endpoint)
+saves a TCP/TLS handshake per sentence batch and is not modelled here.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.sse import SSEDataDecoder  # noqa: E402
+
+_TOKENS = ["ગાય", "ને", " દરરોજ", " સ્વચ્છ", " પાણી", " આપો", ".", " ગાભણ", " પશુ", "ને"]
+
+
+def _body(n_tokens: int) -> bytes:
+    lines = [
+        "data: " + json.dumps({"choices": [{"text": _TOKENS[i % len(_TOKENS)], "index": 0}]}) + "\n"
+        for i in range(n_tokens)
+    ]
+    return ("".join(lines) + "data: [DONE]\n").encode("utf-8")
+
+
+def _chunks(body: bytes, size: int) -> list[bytes]:
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+def _legacy(chunks: list[bytes], parse: bool = True) -> int:
+    n = 0
+    buffer = b""
+    for chunk in chunks:
+        buffer += chunk
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            line = line.decode("utf-8").strip()
+            if line.startswith("data: "):
+                data = line[6:]
+                if data == "[DONE]":
+                    break
+                if not parse:
+                    n += 1
+                    continue
+                try:
+                    if json.loads(data)["choices"][0].get("text", ""):
+                        n += 1
+                except json.JSONDecodeError:
+                    continue
+    return n
+
+
+def _incremental(chunks: list[bytes], parse: bool = True) -> int:
+    n = 0
+    decoder = SSEDataDecoder()
+    for chunk in chunks:
+        for data in decoder.feed(chunk):
+            if not parse:
+                n += 1
+                continue
+            try:
+                if json.loads(data)["choices"][0].get("text", ""):
+                    n += 1
+            except json.JSONDecodeError:
+                continue
+        if decoder.done:
+            break
+    return n
+
+
+def _time(fn, chunks, rounds: int, parse: bool) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn(chunks, parse)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--tokens", type=int, default=2000)
+    ap.add_argument("--rounds", type=int, default=200)
+    args = ap.parse_args()
+
+    body = _body(args.tokens)
+    cases = [
+        ("legacy   iter_chunked(64)", _legacy, _chunks(body, 64)),
+        ("legacy   16 KiB reads", _legacy, _chunks(body, 16 * 1024)),
+        ("decoder  iter_chunked(64)", _incremental, _chunks(body, 64)),
+        ("decoder  16 KiB reads", _incremental, _chunks(body, 16 * 1024)),
+    ]
+    assert len({fn(c) for _, fn, c in cases}) == 1, "readers disagree"
+
+    print(f"{args.tokens} tokens, {len(body)} bytes, best of {args.rounds}")
+    for title, parse in (("framing only", False), ("framing + json.loads", True)):
+        print(f"{title}:")
+        baseline = None
+        for label, fn, chunks in cases:
+            best = _time(fn, chunks, args.rounds, parse)
+            per_token_us = best / args.tokens * 1e6
+            baseline = baseline or per_token_us
+            print(f"  {label:<28} {per_token_us:7.3f} us/token  ({baseline / per_token_us:4.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""Build (and optionally publish) a local vet-KB index snapshot.
+
+The input is JSONL, one chunk per line: the fields ``search_documents`` serves
+(``_id``, ``doc_id``, ``name``, ``text``, ``is_reference``, ...) plus an
+``embedding`` list from the same model the queries will be embedded with. A
+Marqo export with ``--show-vectors`` carries these; take ``_tensor_facets``'s
+``text`` embedding as ``embedding``.
+
+The snapshot is written to a new directory under the root; ``--publish`` then
+points ``CURRENT`` at it, and workers with SEARCH_BACKEND=local and
+LOCAL_INDEX_PATH=<root> swap it in within LOCAL_INDEX_RELOAD_SECONDS.
+
+    python scripts/build_local_index.py chunks.jsonl /data/vet-index \\
+        --model intfloat/multilingual-e5-base --publish
+    python scripts/build_local_index.py chunks.jsonl /data/vet-index --nlist 64
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "build")
+
+import numpy as np  # noqa: E402
+
+from agents.tools import local_index  # noqa: E402
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("chunks", help="JSONL chunks, each with an 'embedding' list")
+    ap.add_argument("root", help="LOCAL_INDEX_PATH directory")
+    ap.add_argument("--model", required=True, help="query embedding model (sentence-transformers name)")
+    ap.add_argument("--nlist", type=int, default=None, help="IVF lists (default ~sqrt(n); 0 = exact scan)")
+    ap.add_argument("--lexical-fields", default="text", help="comma-separated fields in the BM25 index")
+    ap.add_argument("--name", default=None, help="snapshot directory name (default: timestamped)")
+    ap.add_argument("--publish", action="store_true", help="make the new snapshot live")
+    args = ap.parse_args()
+
+    documents, vectors = [], []
+    with open(args.chunks, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            doc = json.loads(line)
+            vectors.append(doc.pop("embedding"))
+            documents.append(doc)
+    Path(args.root).mkdir(parents=True, exist_ok=True)
+    path = local_index.build_snapshot(
+        args.root,
+        documents,
+        np.asarray(vectors, dtype=np.float32),
+        model=args.model,
+        lexical_fields=args.lexical_fields.split(","),
+        nlist=args.nlist,
+        name=args.name,
+    )
+    manifest = json.loads((path / "manifest.json").read_text(encoding="utf-8"))
+    print(f"built {path}: {manifest['n_docs']} chunks, dim {manifest['dim']}, {manifest['nlist']} IVF lists")
+    if args.publish:
+        local_index.publish_snapshot(args.root, path.name)
+        print(f"published {path.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,17 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 
+@pytest.fixture(autouse=True)
+def _fresh_near_cache():
+    """Tests swap the Redis-backed caches for fakes; a value kept in the
+    in-process near-cache by an earlier test must not answer for them. Only
+    touched if already imported, so import order stays with the test module."""
+    near_cache = sys.modules.get("app.core.near_cache")
+    if near_cache is not None:
+        near_cache._namespaces.clear()
+    yield
+
+
 def make_materialized_tier(kind, handle, *, model_name=None, provider=None,
                            endpoint=None, timeout=None):
     """Build a MaterializedTier for tests (lazy import so env-before-import test
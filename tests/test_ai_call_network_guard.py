@@ -473,7 +473,7 @@ def test_unparseable_200_is_not_success_and_holds_the_reservation(monkeypatch):
             posts["n"] += 1
             return _Resp()
 
-    monkeypatch.setattr(bn_mod.httpx, "AsyncClient", _Client)
+    monkeypatch.setattr(httpx, "AsyncClient", _Client)
 
     r1 = asyncio.run(ai_mod.create_ai_call(_ctx("s-net-empty"), "U", "S", "F", "t", SPECIES))
     r2 = asyncio.run(ai_mod.create_ai_call(_ctx("s-net-empty"), "U", "S", "F", "t", SPECIES))
@@ -82,3 +82,66 @@ def test_include_ask_false_is_the_chat_pretranslation_path():
     )
     assert isinstance(without_ask, str)
     assert len(without_ask) <= len(with_ask)
+
+
+# ── Compiled trigger index: same hints as the per-term scan, memoized ─────────
+import random
+
+from rapidfuzz import fuzz
+
+from agents.tools import terms as _terms
+
+
+def _legacy_hints(query, threshold, include_ask):
+    """The pre-index scan: substring, else partial_ratio, for every trigger."""
+    score_cutoff = int(threshold * 100)
+    matched, seen = [], set()
+    query_lower = query.lower().strip()
+    for entry in _terms._AMBIGUITY_TERMS:
+        gu_terms = entry.get("gu_terms", [])
+        rule = entry.get("rule", "").strip()
+        if not rule or not gu_terms or (not include_ask and entry.get("type") == "ask"):
+            continue
+        for term in gu_terms:
+            term_lower = term.lower().strip()
+            if not term_lower:
+                continue
+            if term_lower in query_lower or fuzz.partial_ratio(term_lower, query_lower) >= score_cutoff:
+                if rule not in seen:
+                    matched.append(f"- {rule}")
+                    seen.add(rule)
+                break
+    return "\n".join(matched)
+
+
+def _parity_queries(n=300, seed=11):
+    rng = random.Random(seed)
+    triggers = [t for e in _terms._AMBIGUITY_TERMS for t in e.get("gu_terms", [])]
+    filler = ["મારી ગાય", "ભેંસને", "શું કરવું", "દૂધ ઓછું", "છે", "?", "ડૉક્ટર", "ચારો"]
+    out = []
+    for _ in range(n):
+        parts = [rng.choice(filler) for _ in range(rng.randint(0, 3))]
+        trig = list(rng.choice(triggers))
+        for _ in range(rng.randint(0, 2)):  # STT-style damage
+            if trig:
+                del trig[rng.randrange(len(trig))]
+        parts.insert(rng.randint(0, len(parts)), "".join(trig))
+        out.append(" ".join(parts))
+    return out
+
+
+@pytest.mark.parametrize("threshold", [0.6, 0.8, 0.9])
+@pytest.mark.parametrize("include_ask", [True, False])
+def test_trigger_index_matches_the_per_term_scan(threshold, include_ask):
+    for query in _parity_queries():
+        assert get_ambiguity_hints_for_query(query, threshold, include_ask) == _legacy_hints(
+            query, threshold, include_ask
+        ), query
+
+
+def test_repeat_renders_are_served_from_the_memo(monkeypatch):
+    query = "મારી ગાય ઉથલા મારે છે અને ચારો ખાતી નથી"
+    first = get_ambiguity_hints_for_query(query)
+    monkeypatch.setattr(_terms.fuzz, "partial_ratio", lambda *a, **k: pytest.fail("re-scored"))
+    for _ in range(5):
+        assert get_ambiguity_hints_for_query(query) == first
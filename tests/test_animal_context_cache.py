@@ -0,0 +1,260 @@
+"""Per-tag animal context cache (SWR) and the bounded cross-farmer fan-out."""
+import asyncio
+import os
+from datetime import timedelta
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import pytest
+
+import agents.farmer_context as farmer_ctx
+from agents.services import animal_context_cache as acc
+from agents.tools import farmer_animal_backends as backends
+from app.core import cache as cache_mod
+from app.models.animal import AnimalModel
+from app.models.banas_visit import BanasOperatedVisitModel
+from app.models.cvcc import CvccHealthResponseModel
+from app.models.farmer import FarmerModel
+
+
+class _Pipeline:
+    def __init__(self, redis):
+        self.redis, self.ops = redis, []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def get(self, key):
+        self.ops.append(lambda: self.redis.store.get(key))
+
+    def set(self, key, value, ex=None):
+        self.ops.append(lambda: self.redis.store.__setitem__(key, value) or True)
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        return [op() for op in self.ops]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store, self.round_trips = {}, 0
+
+    def pipeline(self, transaction=True):
+        return _Pipeline(self)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    async def delete(self, key):
+        return int(self.store.pop(key, None) is not None)
+
+
+class Upstream:
+    """Fake per-tag fetchers; records calls and peak concurrency."""
+
+    def __init__(self, delay=0.0):
+        self.calls, self.delay = [], delay
+        self.in_flight = self.peak = 0
+        self.empty = False
+        self.failing = set()
+
+    def _result(self, kind, raise_errors, value):
+        if kind in self.failing:
+            if raise_errors:
+                raise TimeoutError(f"{kind} timed out")
+            return None
+        return None if self.empty else value
+
+    async def _hit(self, kind, tag, skip_cache):
+        self.calls.append((kind, tag, skip_cache))
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+
+    async def animal(self, tag, *, skip_cache=False, raise_errors=False):
+        await self._hit("animal", tag, skip_cache)
+        return self._result("animal", raise_errors, AnimalModel.model_validate(
+            {"tagNo": tag, "animalType": "Cow", "lactationNo": 2, "lastHealthActivity": {"d": "1"}}, by_alias=True
+        ))
+
+    async def banas(self, tag, *, skip_cache=False, raise_errors=False):
+        await self._hit("banas", tag, skip_cache)
+        return self._result("banas", raise_errors, [BanasOperatedVisitModel.model_validate(
+            {"VisitCode": f"V-{tag}", "MedicinesJson": '[{"medicinename": "Calcium"}]'}, by_alias=True
+        )])
+
+    async def cvcc(self, tag, *, union_name=None, skip_cache=False, raise_errors=False):
+        await self._hit("cvcc", tag, skip_cache)
+        return self._result("cvcc", raise_errors, CvccHealthResponseModel.model_validate({}, by_alias=True))
+
+
+@pytest.fixture
+def env(monkeypatch):
+    redis = FakeRedis()
+    upstream = Upstream()
+    monkeypatch.setattr(cache_mod, "redis_client", redis)
+    monkeypatch.setattr(acc, "redis_client", redis)
+    monkeypatch.setattr(acc, "get_animal_data_by_tag", upstream.animal)
+    monkeypatch.setattr(acc, "fetch_banas_operated_visit", upstream.banas)
+    monkeypatch.setattr(acc, "get_cvcc_health_data_by_tag", upstream.cvcc)
+    acc._refresh_tasks.clear()
+    return redis, upstream
+
+
+def _req(tag, banas=True, cvcc=False):
+    return acc.AnimalContextRequest(tag, include_banas_visit=banas, include_cvcc_health=cvcc, union_name="banas")
+
+
+def test_cold_then_warm_reads_are_identical_and_one_round_trip(env):
+    redis, upstream = env
+    requests = [_req("T1"), _req("T2", banas=False, cvcc=True), _req("T1")]
+
+    cold = asyncio.run(acc.get_animal_contexts(requests))
+    calls_after_cold = len(upstream.calls)
+    redis.round_trips = 0
+    warm = asyncio.run(acc.get_animal_contexts(requests))
+
+    assert calls_after_cold == 4  # T1 animal+banas, T2 animal+cvcc; duplicate T1 fetched once
+    assert len(upstream.calls) == calls_after_cold
+    assert redis.round_trips == 1
+    assert warm == cold
+    assert [c[0] for c in warm] == ["T1", "T2", "T1"]
+
+
+def test_stale_entry_is_served_and_refreshed_in_background(env, monkeypatch):
+    redis, upstream = env
+    request = _req("T1")
+    asyncio.run(acc.get_animal_contexts([request]))
+    first = len(upstream.calls)
+    monkeypatch.setattr(acc, "ANIMAL_CONTEXT_REFRESH_INTERVAL", -1)
+
+    async def _go():
+        served = await acc.get_animal_contexts([request])
+        assert len(acc._refresh_tasks) == 1
+        await asyncio.gather(*acc._refresh_tasks.values())
+        return served
+
+    served = asyncio.run(_go())
+    assert served[0][1].tag_number == "T1"
+    assert upstream.calls[first:] == [("animal", "T1", True), ("banas", "T1", True)]
+    assert not any("refresh" in key for key in redis.store)  # lock released
+
+
+def test_empty_refresh_keeps_the_entry_and_restamps_it(env, monkeypatch):
+    redis, upstream = env
+    request = _req("T1")
+    before = asyncio.run(acc.get_animal_contexts([request]))
+    key = cache_mod.build_cache_key(request.cache_key, namespace=acc.ANIMAL_CONTEXT_NAMESPACE)
+    stamp = redis.store[key]
+    upstream.empty = True
+
+    asyncio.run(acc.refresh_animal_context(request, before[0]))
+
+    assert redis.store[key] != stamp
+    monkeypatch.setattr(acc, "_now", lambda: acc.datetime.now(acc.timezone.utc) - timedelta(days=1))
+    assert asyncio.run(acc.get_animal_contexts([request])) == before
+
+
+def test_empty_cold_fetch_is_not_cached(env):
+    redis, upstream = env
+    upstream.empty = True
+    assert asyncio.run(acc.get_animal_contexts([_req("T9")])) == [("T9", None, None, None)]
+    assert redis.store == {}
+
+
+def test_failed_part_on_refresh_keeps_its_cached_value(env):
+    redis, upstream = env
+    request = _req("T1")
+    before = asyncio.run(acc.get_animal_contexts([request]))
+    upstream.failing = {"banas"}
+
+    asyncio.run(acc.refresh_animal_context(request, before[0]))
+
+    assert asyncio.run(acc.get_animal_contexts([request]))[0][2] == before[0][2]
+
+
+def test_cold_fetch_with_a_failed_part_is_served_but_not_cached(env):
+    redis, upstream = env
+    upstream.failing = {"banas"}
+
+    served = asyncio.run(acc.get_animal_contexts([_req("T3")]))
+
+    assert served[0][1].tag_number == "T3" and served[0][2] is None
+    assert redis.store == {}
+    upstream.failing = set()
+    assert asyncio.run(acc.get_animal_contexts([_req("T3")]))[0][2] is not None
+    assert len(redis.store) == 2  # entry + version
+
+
+def test_backend_requests_are_bounded_per_host(monkeypatch):
+    monkeypatch.setattr(backends.settings, "farmer_upstream_host_concurrency", 3)
+    backends._host_semaphores.clear()
+    peak = {"now": 0, "max": 0}
+
+    class _Client:
+        async def get(self, url, **_kw):
+            peak["now"] += 1
+            peak["max"] = max(peak["max"], peak["now"])
+            await asyncio.sleep(0.01)
+            peak["now"] -= 1
+            raise RuntimeError("offline")
+
+    class _Borrow:
+        async def __aenter__(self):
+            return _Client()
+
+        async def __aexit__(self, *exc):
+            return False
+
+    async def _miss(_key):
+        return False, None
+
+    monkeypatch.setattr(backends, "upstream_client", lambda *_a, **_kw: _Borrow())
+    monkeypatch.setattr(backends, "get_cached_api_response", _miss)
+
+    async def _go():
+        await asyncio.gather(*(backends.fetch_animal_amulpashudhan(f"T{i}", "tok") for i in range(12)))
+
+    asyncio.run(_go())
+    assert peak["max"] == 3
+
+
+def test_farmer_context_fans_out_across_accounts(env, monkeypatch):
+    redis, upstream = env
+    upstream.delay = 0.01
+    farmers = [
+        FarmerModel(unionName="banas", farmerName="A", tagNo="A1, A2"),
+        FarmerModel(unionName="kaira", farmerName="B", tagNo="B1"),
+        FarmerModel(unionName="banas", farmerName="C"),
+    ]
+
+    async def fake_farmers(_mobile):
+        return farmers
+
+    async def fake_schemes(lines, unions):
+        lines.append("SCHEMES")
+
+    async def fake_technicians(*_a, **_kw):
+        return []
+
+    monkeypatch.setattr(farmer_ctx, "get_farmer_data_by_mobile", fake_farmers)
+    monkeypatch.setattr(farmer_ctx, "_append_union_scheme_summary_markdown", fake_schemes)
+    monkeypatch.setattr(farmer_ctx, "get_ai_technicians_by_society_api", fake_technicians)
+
+    markdown, _, _ = asyncio.run(farmer_ctx.get_farmer_context_bundle_by_mobile("9876543210"))
+
+    # Both accounts' tags were in flight together.
+    assert upstream.peak == 6
+    order = [markdown.index(s) for s in ("SCHEMES", "### Animal A1", "### Animal A2", "### Animal B1")]
+    assert order == sorted(order)
+    assert markdown.count("No animal tags found for this farmer.") == 1
+    assert "V-A1" in markdown and "V-B1" not in markdown
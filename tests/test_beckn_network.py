@@ -11,6 +11,7 @@ import uuid
 from pathlib import Path
 from unittest.mock import patch
 
+import httpx
 import pytest
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -158,7 +159,7 @@ def _queries_by_leg(calls):
 @pytest.mark.asyncio
 async def test_vet_search_formats_items_with_source():
     fake = _FakeAsyncClient(_seeker_payload("amulvet", VET_ITEMS))
-    with patch.object(bn.httpx, "AsyncClient", return_value=fake):
+    with patch.object(httpx, "AsyncClient", return_value=fake):
         out = await bn.network_search_documents("mastitis", top_k=5)
     assert "Mastitis care" in out
     assert "intramammary antibiotics" in out
@@ -170,7 +171,7 @@ async def test_vet_search_formats_items_with_source():
 @pytest.mark.asyncio
 async def test_vet_search_empty():
     fake = _FakeAsyncClient(_seeker_payload("amulvet", []))
-    with patch.object(bn.httpx, "AsyncClient", return_value=fake):
+    with patch.object(httpx, "AsyncClient", return_value=fake):
         out = await bn.network_search_documents("nonsense")
     assert "No relevant documents" in out
 
@@ -180,7 +181,7 @@ async def test_vet_search_dead_leg_is_not_reported_as_no_documents():
     """Same failure/empty distinction as scheme discovery: a leg the seeker
     reports as failed must not read as an empty knowledge base."""
     fake = _FakeAsyncClient({"results": {"amulvet": None}, "errors": {"amulvet": "timeout"}})
-    with patch.object(bn.httpx, "AsyncClient", return_value=fake):
+    with patch.object(httpx, "AsyncClient", return_value=fake):
         out = await bn.network_search_documents("mastitis")
     assert "temporarily unavailable" in out.lower()
     assert "No relevant documents" not in out
@@ -189,7 +190,7 @@ async def test_vet_search_dead_leg_is_not_reported_as_no_documents():
 @pytest.mark.asyncio
 async def test_union_schemes_filters_by_union():
     fake = _FakeAsyncClient(_seeker_payload("amulschemes", SCHEME_ITEMS))
-    with patch.object(bn.httpx, "AsyncClient", return_value=fake):
+    with patch.object(httpx, "AsyncClient", return_value=fake):
         out = await bn.network_union_schemes("insurance", union="banas")
     parsed = json.loads(out)
     assert all(s["union"] == "banas" for s in parsed)
@@ -213,7 +214,7 @@ async def test_mock_reproduces_the_disjoint_leg_vocabularies():
 @pytest.mark.asyncio
 async def test_each_leg_gets_its_own_query_union_free_text_vistaar_code():
     fake = _RealisticSeekerClient()
-    with patch.object(bn.httpx, "AsyncClient", return_value=fake):
+    with patch.object(httpx, "AsyncClient", return_value=fake):
         await bn.network_union_schemes("Kisan Credit Card")
     sent = _queries_by_leg(fake.calls)
     # The union leg keeps the farmer's words; the central leg gets the CODE.
@@ -226,7 +227,7 @@ async def test_scheme_discovery_returns_union_and_central_in_one_call():
     single shared query string — the union leg needs "crop insurance", the
     central leg needs "pmfby"."""
     fake = _RealisticSeekerClient()
-    with patch.object(bn.httpx, "AsyncClient", return_value=fake):
+    with patch.object(httpx, "AsyncClient", return_value=fake):
         parsed = json.loads(await bn.network_union_schemes("crop insurance"))
     by_title = {s["scheme_title"]: s for s in parsed}
     assert by_title["Cattle Insurance"]["source_network"] == "amul-union"
@@ -239,7 +240,7 @@ async def test_scheme_discovery_returns_union_and_central_in_one_call():
 async def test_gujarati_phrasing_reaches_the_central_leg():
     """Production chat is mostly Gujarati; "પાક વીમો" must resolve to pmfby."""
     fake = _RealisticSeekerClient()
-    with patch.object(bn.httpx, "AsyncClient", return_value=fake):
+    with patch.object(httpx, "AsyncClient", return_value=fake):
         parsed = json.loads(await bn.network_union_schemes("પાક વીમો શું છે"))
     assert _queries_by_leg(fake.calls)[bn.VISTAAR_LEG] == "pmfby"
     assert any(s["source_network"] == "bharat-vistaar" for s in parsed)
@@ -251,7 +252,7 @@ async def test_central_leg_is_skipped_when_no_scheme_code_resolves():
     the central leg a word it can never match is a guaranteed-empty ~2.2s round
     trip, so it must not be sent at all."""
     fake = _RealisticSeekerClient()
-    with patch.object(bn.httpx, "AsyncClient", return_value=fake):
+    with patch.object(httpx, "AsyncClient", return_value=fake):
         parsed = json.loads(await bn.network_union_schemes(""))
     assert list(_queries_by_leg(fake.calls)) == [bn.SCHEMES_LEG]
     assert {s["source_network"] for s in parsed} == {"amul-union"}
@@ -260,7 +261,7 @@ async def test_central_leg_is_skipped_when_no_scheme_code_resolves():
 @pytest.mark.asyncio
 async def test_union_filter_does_not_drop_vistaar_schemes():
     fake = _RealisticSeekerClient()
-    with patch.object(bn.httpx, "AsyncClient", return_value=fake):
+    with patch.object(httpx, "AsyncClient", return_value=fake):
         parsed = json.loads(await bn.network_union_schemes("crop insurance", union="banas"))
     unions = [s.get("union") for s in parsed if s["source_network"] == "amul-union"]
     assert unions == ["banas"]
@@ -279,7 +280,7 @@ async def test_dead_central_leg_is_flagged_unavailable_not_silently_dropped():
     fake = _RealisticSeekerClient(
         errors={bn.VISTAAR_LEG: "timeout"}, dead_legs=[bn.VISTAAR_LEG]
     )
-    with patch.object(bn.httpx, "AsyncClient", return_value=fake):
+    with patch.object(httpx, "AsyncClient", return_value=fake):
         out = await bn.network_union_schemes("crop insurance")
     assert "Cattle Insurance" in out
     assert "temporarily unavailable" in out.lower()
@@ -291,7 +292,7 @@ async def test_dead_leg_with_no_error_entry_is_still_flagged():
     """The seeker omits `errors` for some failures and just nulls the result.
     A null on_search is not an empty catalogue."""
     fake = _RealisticSeekerClient(dead_legs=[bn.VISTAAR_LEG])
-    with patch.object(bn.httpx, "AsyncClient", return_value=fake):
+    with patch.object(httpx, "AsyncClient", return_value=fake):
         out = await bn.network_union_schemes("crop insurance")
     assert "temporarily unavailable" in out.lower()
 
@@ -302,7 +303,7 @@ async def test_all_legs_dead_never_claims_no_schemes_exist():
         errors={bn.SCHEMES_LEG: "timeout", bn.VISTAAR_LEG: "timeout"},
         dead_legs=[bn.SCHEMES_LEG, bn.VISTAAR_LEG],
     )
-    with patch.object(bn.httpx, "AsyncClient", return_value=fake):
+    with patch.object(httpx, "AsyncClient", return_value=fake):
         out = await bn.network_union_schemes("crop insurance")
     assert "temporarily unavailable" in out.lower()
     assert "No scheme data was found" not in out
@@ -313,7 +314,7 @@ async def test_scheme_discovery_empty_on_both_legs_is_reported_as_empty():
     """A genuinely empty catalogue on healthy legs still says "none found" —
     the unavailable message must not swallow real misses."""
     fake = _RealisticSeekerClient(union_items=[], vistaar_items=[])
-    with patch.object(bn.httpx, "AsyncClient", return_value=fake):
+    with patch.object(httpx, "AsyncClient", return_value=fake):
         out = await bn.network_union_schemes("crop insurance")
     assert "No scheme data was found" in out
     assert "temporarily unavailable" not in out.lower()
@@ -322,7 +323,7 @@ async def test_scheme_discovery_empty_on_both_legs_is_reported_as_empty():
 @pytest.mark.asyncio
 async def test_single_leg_wrapper_still_scopes_to_one_leg():
     fake = _FakeAsyncClient(_seeker_payload("amulvet", VET_ITEMS))
-    with patch.object(bn.httpx, "AsyncClient", return_value=fake):
+    with patch.object(httpx, "AsyncClient", return_value=fake):
         on_search = await bn._seeker_search("mastitis", bn.VET_LEG, user_id="u-1")
     assert fake.calls[0][1] == {"query": "mastitis", "legs": ["amulvet"], "user_id": "u-1"}
     assert bn._items(on_search)[0]["descriptor"]["name"] == "Mastitis care"
@@ -332,7 +333,7 @@ async def test_single_leg_wrapper_still_scopes_to_one_leg():
 async def test_ai_call_success_returns_ticket():
     payload = {"message": {"order": {"id": "AICALL-889231", "state": "ACTIVE"}}}
     fake = _FakeAsyncClient(payload)
-    with patch.object(bn.httpx, "AsyncClient", return_value=fake):
+    with patch.object(httpx, "AsyncClient", return_value=fake):
         out = await bn.network_create_ai_call("12", "S1", "F1", "AIT-1", "cow")
     assert "AICALL-889231" in out
     assert "booked successfully" in out
@@ -354,7 +355,7 @@ async def test_ai_call_confirm_ids_are_unique_per_attempt():
     """Same society + AIT must not reuse Beckn correlation IDs across confirms."""
     payload = {"message": {"order": {"id": "AICALL-1", "state": "ACTIVE"}}}
     fake = _FakeAsyncClient(payload)
-    with patch.object(bn.httpx, "AsyncClient", return_value=fake):
+    with patch.object(httpx, "AsyncClient", return_value=fake):
         await bn.network_create_ai_call_result("12", "S1", "F1", "AIT-1", "cow")
         await bn.network_create_ai_call_result("12", "S1", "F1", "AIT-1", "cow")
     assert len(fake.calls) == 2
@@ -368,7 +369,7 @@ async def test_ai_call_confirm_ids_are_unique_per_attempt():
 async def test_ai_call_nack_surfaces_error():
     payload = {"message": {"ack": {"status": "NACK"}}, "error": {"code": "40002", "message": "society not serviced"}}
     fake = _FakeAsyncClient(payload)
-    with patch.object(bn.httpx, "AsyncClient", return_value=fake):
+    with patch.object(httpx, "AsyncClient", return_value=fake):
         out = await bn.network_create_ai_call("12", "S1", "F1", "AIT-1", "cow")
     assert "failed" in out.lower()
     assert "society not serviced" in out
@@ -380,7 +381,7 @@ async def test_ai_call_nack_is_marked_authoritative_no_booking():
     reservation on it, so the flag must be set."""
     payload = {"message": {"ack": {"status": "NACK"}}, "error": {"code": "40002", "message": "society not serviced"}}
     fake = _FakeAsyncClient(payload)
-    with patch.object(bn.httpx, "AsyncClient", return_value=fake):
+    with patch.object(httpx, "AsyncClient", return_value=fake):
         res = await bn.network_create_ai_call_result("12", "S1", "F1", "AIT-1", "cow")
     assert res.ok is False
     assert res.authoritative_no_booking is True
@@ -393,7 +394,7 @@ async def test_ai_call_200_with_unparseable_body_is_not_success():
     with nothing booked. It is a failure, and the message must neither claim
     success nor print a None ticket."""
     fake = _FakeAsyncClient({})
-    with patch.object(bn.httpx, "AsyncClient", return_value=fake):
+    with patch.object(httpx, "AsyncClient", return_value=fake):
         res = await bn.network_create_ai_call_result("12", "S1", "F1", "AIT-1", "cow")
     assert res.ok is False, "a 200 with no order.id was reported as a successful booking"
     assert res.ticket is None
@@ -410,7 +411,7 @@ async def test_ai_call_200_with_unparseable_body_is_not_success():
 async def test_ai_call_200_with_order_but_no_id_is_not_success():
     """Same for a partially-filled order envelope."""
     fake = _FakeAsyncClient({"message": {"order": {"state": "ACTIVE"}}})
-    with patch.object(bn.httpx, "AsyncClient", return_value=fake):
+    with patch.object(httpx, "AsyncClient", return_value=fake):
         res = await bn.network_create_ai_call_result("12", "S1", "F1", "AIT-1", "cow")
     assert res.ok is False
     assert res.authoritative_no_booking is False
@@ -15,11 +15,6 @@ class _DummyModerationRun:
     output = _DummyModerationOutput()
 
 
-class _DummyCache:
-    async def delete(self, _key: str):
-        return None
-
-
 # chat.py dispatches on type(x).__name__, so these only need matching class names.
 _PartDeltaEvent = type("PartDeltaEvent", (), {})
 _TextPartDelta = type("TextPartDelta", (), {})
@@ -82,7 +77,6 @@ def test_hindi_source_uses_pretranslation_then_hindi_output(monkeypatch):
     monkeypatch.setattr(chat_service.settings, "fallback_enabled", False)
     monkeypatch.setattr(chat_service, "propagate_attributes", None)
     monkeypatch.setattr(chat_service, "get_langfuse_client", None)
-    monkeypatch.setattr(chat_service, "cache", _DummyCache())
     monkeypatch.setattr(chat_service, "trim_history", lambda *_args, **_kwargs: [])
     monkeypatch.setattr(chat_service, "format_message_pairs", lambda *_args, **_kwargs: "")
 
@@ -123,7 +117,7 @@ def test_hindi_source_uses_pretranslation_then_hindi_output(monkeypatch):
         )
         yield "अपनी गाय को रोज़ 40 से 60 लीटर साफ पानी पिलाएँ।"
 
-    monkeypatch.setattr(chat_service, "set_cache", _fake_set_cache)
+    monkeypatch.setattr(chat_service, "_mark_suggestions_pending", _fake_set_cache)
     monkeypatch.setattr(chat_service, "update_message_history", _fake_update_message_history)
     monkeypatch.setattr(chat_service, "translate_to_english_pretranslation", _fake_pretranslation)
     monkeypatch.setattr(chat_service.moderation_agent, "run", _fake_moderation_run)
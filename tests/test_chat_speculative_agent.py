@@ -0,0 +1,207 @@
+"""Speculative agent start in the chat path.
+
+Moderation runs as a task alongside the agent: the agent starts at once, its
+output is held until the verdict, a decline discards the held output and
+cancels the run, and side-effecting tools gate on deps.ensure_in_scope().
+"""
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from fastapi import BackgroundTasks
+
+from app.services import chat as chat_service
+from app.services.chat import _ModerationVerdict, _SpeculativeStream
+from tests.test_chat_turn_sequence import _delta
+
+
+class _BlockingRun:
+    """An agent run that yields its chunks, then optionally hangs until cancelled."""
+
+    def __init__(self, chunks, events, *, deps=None, hang=False, probe_scope=False):
+        self._chunks = chunks
+        self._events = events
+        self._deps = deps
+        self._hang = hang
+        self._probe_scope = probe_scope
+        self.ctx = object()
+        self.result = SimpleNamespace(new_messages=lambda: [])
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_e):
+        return False
+
+    async def __aiter__(self):
+        run = self
+
+        class _Node:
+            def stream(self, _ctx):
+                class _S:
+                    async def __aenter__(s):
+                        return s
+
+                    async def __aexit__(s, *_e):
+                        return False
+
+                    async def __aiter__(s):
+                        if run._probe_scope:
+                            # What a booking tool does before its write.
+                            run._events.append(f"in_scope={await run._deps.ensure_in_scope()}")
+                        for c in run._chunks:
+                            run._events.append(f"agent_chunk:{c}")
+                            yield _delta(c)
+                        if run._hang:
+                            try:
+                                await asyncio.sleep(10)
+                            except asyncio.CancelledError:
+                                run._events.append("agent_cancelled")
+                                raise
+
+                return _S()
+
+        _Node.__name__ = "ModelRequestNode"
+        yield _Node()
+
+
+def _drive(monkeypatch, *, category="valid_agricultural", action="allow",
+           moderation_delay=0.05, moderation_error=None, hang=False,
+           probe_scope=False, speculative=True):
+    events: list[str] = []
+
+    monkeypatch.setattr(chat_service.settings, "fallback_enabled", False)
+    monkeypatch.setattr(chat_service.settings, "chat_speculative_agent_enabled", speculative)
+    monkeypatch.setattr(chat_service, "propagate_attributes", None)
+    monkeypatch.setattr(chat_service, "get_langfuse_client", None)
+    monkeypatch.setattr(chat_service, "trim_history", lambda *_a, **_kw: [])
+    monkeypatch.setattr(chat_service, "format_message_pairs", lambda *_a, **_kw: "")
+
+    async def _moderate(user_message, model=None):
+        events.append("moderation_start")
+        await asyncio.sleep(moderation_delay)
+        events.append("moderation_done")
+        if moderation_error is not None:
+            raise moderation_error
+        return SimpleNamespace(output=SimpleNamespace(category=category, action=action))
+
+    def _agent_iter(**kw):
+        events.append("agent_start")
+        return _BlockingRun(
+            ["Give clean water daily."], events,
+            deps=kw["deps"], hang=hang, probe_scope=probe_scope,
+        )
+
+    async def _noop(*_a, **_kw):
+        return None
+
+    monkeypatch.setattr(chat_service.moderation_agent, "run", _moderate)
+    monkeypatch.setattr(chat_service.agrinet_agent, "iter", _agent_iter)
+    monkeypatch.setattr(chat_service, "update_message_history", _noop)
+    monkeypatch.setattr(chat_service, "_mark_suggestions_pending", _noop)
+    monkeypatch.setattr(chat_service, "create_suggestions", lambda *_a, **_kw: None)
+
+    async def _go():
+        out = []
+        async for chunk in chat_service.stream_chat_messages(
+            query="How much water should I give my cow?",
+            session_id="speculative",
+            source_lang="en",
+            target_lang="en",
+            channel="web",
+            user_id="+919876543210",
+            history=[],
+            user_info={},
+            background_tasks=BackgroundTasks(),
+            use_translation_pipeline=False,
+            pipeline_profile="managed",
+        ):
+            events.append(f"emit:{chunk}")
+            out.append(chunk)
+        return "".join(out)
+
+    return asyncio.run(asyncio.wait_for(_go(), 5)), events
+
+
+def test_agent_generates_while_moderation_is_still_running(monkeypatch):
+    output, events = _drive(monkeypatch)
+
+    assert output == "Give clean water daily."
+    # The agent produced its answer before the verdict landed...
+    assert events.index("agent_chunk:Give clean water daily.") < events.index("moderation_done")
+    # ...but nothing reached the client until it did.
+    assert events.index("moderation_done") < events.index("emit:Give clean water daily.")
+
+
+def test_decline_discards_buffered_output_and_cancels_the_run(monkeypatch):
+    output, events = _drive(monkeypatch, category="non_agricultural", action="Ask about dairy.", hang=True)
+
+    assert output == "Ask about dairy."
+    assert "agent_chunk:Give clean water daily." in events
+    assert "agent_cancelled" in events
+    assert not any(e.startswith("emit:Give") for e in events)
+
+
+def test_moderation_failure_fails_closed_and_discards_the_run(monkeypatch):
+    output, events = _drive(monkeypatch, moderation_error=RuntimeError("moderation down"), hang=True)
+
+    assert "Give clean water" not in output
+    assert output == chat_service.GENERIC_UNAVAILABLE_MESSAGE_EN
+    assert "agent_cancelled" in events
+
+
+def test_side_effecting_tools_wait_for_an_allow_verdict(monkeypatch):
+    _, events = _drive(monkeypatch, probe_scope=True)
+
+    # The gate blocked on the verdict rather than answering early.
+    assert events.index("moderation_done") < events.index("in_scope=True")
+
+
+@pytest.mark.parametrize(
+    "category,error",
+    [("non_agricultural", None), ("valid_agricultural", RuntimeError("moderation down"))],
+)
+def test_side_effecting_tools_never_proceed_on_a_decline(monkeypatch, category, error):
+    _, events = _drive(monkeypatch, category=category, moderation_error=error, probe_scope=True)
+
+    # Either the gate answered False or the run was cancelled while it waited;
+    # the write past it never happens.
+    assert "in_scope=True" not in events
+    assert not any(e.startswith("agent_chunk:") for e in events)
+
+
+def test_speculation_off_runs_moderation_to_completion_first(monkeypatch):
+    output, events = _drive(monkeypatch, speculative=False)
+
+    assert output == "Give clean water daily."
+    assert events.index("moderation_done") < events.index("agent_start")
+
+
+def test_moderation_verdict_rejects_declines_and_errors():
+    ok = SimpleNamespace(category="valid_agricultural", action="allow")
+    off = SimpleNamespace(category="non_agricultural", action="block")
+
+    assert _ModerationVerdict(ok).rejected is False
+    assert _ModerationVerdict(off).rejected is True
+    assert _ModerationVerdict(error=RuntimeError("x")).rejected is True
+
+
+def test_speculative_stream_propagates_source_errors_in_order():
+    async def _src():
+        yield "a"
+        raise ValueError("boom")
+
+    async def _go():
+        spec = _SpeculativeStream(_src())
+        seen = []
+        with pytest.raises(ValueError, match="boom"):
+            async for item in spec.stream():
+                seen.append(item)
+        await spec.discard()
+        return seen
+
+    assert asyncio.run(_go()) == ["a"]
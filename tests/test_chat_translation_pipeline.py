@@ -0,0 +1,216 @@
+"""Pipelined output translation in the chat path.
+
+The English agent stream is cut into sentence batches exactly as before, but a
+batch's translation no longer blocks reading the next English tokens: up to
+CHAT_TRANSLATION_MAX_IN_FLIGHT translations run at once and the client still
+receives batches strictly in source order.
+"""
+import asyncio
+
+import pytest
+
+from app.services import chat as chat_service
+from app.services.chat import _pipelined_translations, _segment_translation_batches
+
+
+async def _agen(items, *, delay=0.0, events=None, fail_after=None):
+    for i, item in enumerate(items):
+        if fail_after is not None and i == fail_after:
+            raise RuntimeError("agent exploded")
+        if delay:
+            await asyncio.sleep(delay)
+        yield item
+    if events is not None:
+        events.append("agent_done")
+
+
+async def _batches(texts):
+    for t in texts:
+        yield "Optimised batch", t
+
+
+async def _collect(pipeline):
+    out = []
+    async for label, batch_text, translated in pipeline:
+        try:
+            async for chunk in translated:
+                out.append(chunk)
+        except Exception:
+            out.append(f"<en:{batch_text}>")
+    return out
+
+
+def test_batches_are_cut_where_the_serial_loop_cut_them():
+    sentence = "Give your cow clean drinking water at least three times every day. "
+    src = [sentence, sentence, "Trailing words without a stop"]
+
+    async def _go():
+        return [b async for b in _segment_translation_batches(_agen(src))]
+
+    batches = asyncio.run(_go())
+    assert batches == [
+        ("Optimised batch", sentence),
+        ("Optimised batch", sentence),
+        ("Tail fragment", "Trailing words without a stop"),
+    ]
+
+
+def test_output_order_is_source_order_even_when_later_batches_finish_first():
+    delays = {"a": 0.05, "b": 0.0, "c": 0.01}
+
+    async def _translate(text):
+        await asyncio.sleep(delays[text])
+        yield text.upper() + "1"
+        yield text.upper() + "2"
+
+    out = asyncio.run(_collect(_pipelined_translations(_batches(["a", "b", "c"]), _translate, 3)))
+    assert out == ["A1", "A2", "B1", "B2", "C1", "C2"]
+
+
+@pytest.mark.parametrize("max_in_flight", [1, 2, 3])
+def test_concurrent_translations_never_exceed_the_cap(max_in_flight):
+    state = {"open": 0, "peak": 0}
+
+    async def _translate(text):
+        state["open"] += 1
+        state["peak"] = max(state["peak"], state["open"])
+        await asyncio.sleep(0.01)
+        state["open"] -= 1
+        yield text
+
+    texts = [str(i) for i in range(8)]
+    out = asyncio.run(_collect(_pipelined_translations(_batches(texts), _translate, max_in_flight)))
+    assert out == texts
+    assert state["peak"] == max_in_flight
+
+
+def test_translation_overlaps_agent_generation():
+    events: list[str] = []
+
+    async def _translate(text):
+        events.append(f"translate:{text}")
+        yield text
+
+    async def _go():
+        src = _agen(["one", "two", "three"], delay=0.01, events=events)
+
+        async def _per_chunk_batches():
+            async for chunk in src:
+                yield "Optimised batch", chunk
+
+        return await _collect(_pipelined_translations(_per_chunk_batches(), _translate, 2))
+
+    out = asyncio.run(_go())
+    assert out == ["one", "two", "three"]
+    assert events.index("translate:one") < events.index("agent_done")
+
+
+def test_failed_batch_degrades_in_place_without_reordering():
+    async def _translate(text):
+        if text == "b":
+            raise RuntimeError("translategemma down")
+        await asyncio.sleep(0.01)
+        yield text.upper()
+
+    out = asyncio.run(_collect(_pipelined_translations(_batches(["a", "b", "c"]), _translate, 3)))
+    assert out == ["A", "<en:b>", "C"]
+
+
+def test_agent_failure_surfaces_after_earlier_batches_are_emitted():
+    async def _translate(text):
+        await asyncio.sleep(0.01)
+        yield text.upper()
+
+    async def _failing_batches():
+        async for chunk in _agen(["a", "b", "c"], fail_after=2):
+            yield "Optimised batch", chunk
+
+    emitted: list[str] = []
+
+    async def _go():
+        async for _label, _text, translated in _pipelined_translations(_failing_batches(), _translate, 3):
+            async for chunk in translated:
+                emitted.append(chunk)
+
+    with pytest.raises(RuntimeError, match="agent exploded"):
+        asyncio.run(_go())
+    assert emitted == ["A", "B"]
+
+
+def test_closing_the_pipeline_cancels_in_flight_translations():
+    cancelled: list[str] = []
+    started: list[str] = []
+
+    async def _translate(text):
+        started.append(text)
+        try:
+            yield text
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(text)
+            raise
+
+    async def _go():
+        pipeline = _pipelined_translations(_batches(["a", "b"]), _translate, 2)
+        async for _label, _text, translated in pipeline:
+            async for _chunk in translated:
+                break
+            break
+        while len(started) < 2:
+            await asyncio.sleep(0)
+        await pipeline.aclose()
+
+    asyncio.run(asyncio.wait_for(_go(), 2))
+    assert sorted(cancelled) == ["a", "b"]
+
+
+def test_chat_turn_streams_translated_batches_in_order(monkeypatch):
+    from tests.test_chat_turn_sequence import _Run
+    from fastapi import BackgroundTasks
+    from types import SimpleNamespace
+
+    sentence_a = "Give your cow clean drinking water at least three times every day. "
+    sentence_b = "Keep the shed dry and clean so that the udder stays healthy always. "
+
+    monkeypatch.setattr(chat_service.settings, "fallback_enabled", False)
+    monkeypatch.setattr(chat_service.settings, "chat_translation_max_in_flight", 2)
+    monkeypatch.setattr(chat_service, "propagate_attributes", None)
+    monkeypatch.setattr(chat_service, "get_langfuse_client", None)
+    monkeypatch.setattr(chat_service, "trim_history", lambda *_a, **_k: [])
+    monkeypatch.setattr(chat_service, "format_message_pairs", lambda *_a, **_k: "")
+
+    async def _pre(text, *_a, **_k):
+        return "How much water?"
+
+    async def _mod(user_message, model=None):
+        return SimpleNamespace(output=SimpleNamespace(category="valid_agricultural", action="allow"))
+
+    async def _tr(text, *_a, **_k):
+        # The first batch is the slowest; it must still be emitted first.
+        await asyncio.sleep(0.05 if text == sentence_a else 0.0)
+        yield f"[{text.strip()[:4]}]"
+
+    async def _noop(*_a, **_k):
+        return None
+
+    monkeypatch.setattr(chat_service, "translate_to_english_pretranslation", _pre)
+    monkeypatch.setattr(chat_service.moderation_agent, "run", _mod)
+    monkeypatch.setattr(chat_service.agrinet_agent, "iter", lambda **_k: _Run([sentence_a, sentence_b]))
+    monkeypatch.setattr(chat_service, "translate_text_stream_fast", _tr)
+    monkeypatch.setattr(chat_service, "update_message_history", _noop)
+    monkeypatch.setattr(chat_service, "_mark_suggestions_pending", _noop)
+    monkeypatch.setattr(chat_service, "create_suggestions", lambda *_a, **_k: None)
+
+    async def _go():
+        out = []
+        async for chunk in chat_service.stream_chat_messages(
+            query="મારી ગાયને કેટલું પાણી આપવું?", session_id="pipelined",
+            source_lang="gu", target_lang="gu", channel="web",
+            user_id="+919876543210", history=[], user_info={},
+            background_tasks=BackgroundTasks(), use_translation_pipeline=True,
+            pipeline_profile="managed",
+        ):
+            out.append(chunk)
+        return out
+
+    assert asyncio.run(_go()) == ["[Give]", "[Keep]"]
@@ -16,20 +16,10 @@ os.environ.setdefault("OPENAI_API_KEY", "test-key")
 
 from fastapi import BackgroundTasks
 
+from app.core.history_store import LoadedHistory
 from app.services import chat as chat_service
 
 
-class _Cache:
-    async def delete(self, _key):
-        return None
-
-    async def get(self, _key):
-        return None
-
-    async def set(self, *_a, **_kw):
-        return None
-
-
 _PartDeltaEvent = type("PartDeltaEvent", (), {})
 _TextPartDelta = type("TextPartDelta", (), {})
 
@@ -85,7 +75,8 @@ class _Run:
 def _drive(monkeypatch, *, source_lang="gu", target_lang="gu",
            fallback_enabled=False, moderation_action="allow",
            moderation_category="valid_agricultural", user_info=None,
-           requested_persona=None):
+           requested_persona=None, speculative_agent=True, history=(),
+           extra_patches=None):
     """Run one turn with every stage instrumented, and return the stage order."""
     seen: list[str] = []
 
@@ -95,9 +86,9 @@ def _drive(monkeypatch, *, source_lang="gu", target_lang="gu",
         return _mark
 
     monkeypatch.setattr(chat_service.settings, "fallback_enabled", fallback_enabled)
+    monkeypatch.setattr(chat_service.settings, "chat_speculative_agent_enabled", speculative_agent)
     monkeypatch.setattr(chat_service, "propagate_attributes", None)
     monkeypatch.setattr(chat_service, "get_langfuse_client", None)
-    monkeypatch.setattr(chat_service, "cache", _Cache())
     monkeypatch.setattr(chat_service, "trim_history", lambda *_a, **_kw: [])
     monkeypatch.setattr(chat_service, "format_message_pairs", lambda *_a, **_kw: "")
 
@@ -150,8 +141,10 @@ def _drive(monkeypatch, *, source_lang="gu", target_lang="gu",
     monkeypatch.setattr(chat_service, "get_farmer_context_bundle_by_mobile", _farmer_context)
     monkeypatch.setattr(chat_service, "translate_text_stream_fast", _translate_stream)
     monkeypatch.setattr(chat_service, "update_message_history", _history)
-    monkeypatch.setattr(chat_service, "set_cache", _set_cache)
+    monkeypatch.setattr(chat_service, "_mark_suggestions_pending", _set_cache)
     monkeypatch.setattr(chat_service, "create_suggestions", record("suggestions"))
+    for name, value in (extra_patches or {}).items():
+        monkeypatch.setattr(chat_service, name, value)
 
     async def _go():
         out = []
@@ -162,7 +155,7 @@ def _drive(monkeypatch, *, source_lang="gu", target_lang="gu",
             target_lang=target_lang,
             channel="web",
             user_id="+919876543210",
-            history=[],
+            history=None if history is None else list(history),
             user_info=user_info or {},
             background_tasks=BackgroundTasks(),
             use_translation_pipeline=True,
@@ -208,12 +201,19 @@ def test_english_turn_skips_translation_stages(monkeypatch):
 
 
 @pytest.mark.parametrize("fallback_enabled", [False, True])
-def test_blocked_moderation_never_reaches_the_agent(monkeypatch, fallback_enabled):
-    """The hard gate. A blocked query must decline without running the agent.
-
-    Without this case the lock pins only the happy path, and deleting the gate at
-    the yield-decline/return in stream_chat_messages leaves the suite green.
+def test_blocked_moderation_never_reaches_the_farmer(monkeypatch, fallback_enabled):
+    """The hard gate. A blocked query must decline without emitting any answer.
+
+    The agent now starts speculatively alongside moderation (it may be entered),
+    so the gate is on OUTPUT: nothing it produced is translated or streamed, and
+    the farmer gets only the decline. Without this case the lock pins only the
+    happy path, and deleting the gate at the yield-decline/return in
+    stream_chat_messages leaves the suite green.
     """
+    async def _localize(text, *_a, **_kw):
+        return f"[gu] {text}"
+
+    monkeypatch.setattr(chat_service, "translate_text", _localize)
     output, stages = _drive(
         monkeypatch,
         fallback_enabled=fallback_enabled,
@@ -221,11 +221,34 @@ def test_blocked_moderation_never_reaches_the_agent(monkeypatch, fallback_enable
         moderation_category="non_agricultural",
     )
 
+    assert "moderation" in stages
+    assert "output_translation" not in stages, f"blocked answer was translated: {stages}"
+    assert "history_persist" not in stages
+    assert output == "[gu] block", f"blocked turn leaked agent output: {output!r}"
+
+
+@pytest.mark.parametrize("fallback_enabled", [False, True])
+def test_blocked_moderation_never_reaches_the_agent_when_not_speculative(monkeypatch, fallback_enabled):
+    """CHAT_SPECULATIVE_AGENT_ENABLED=false restores strict moderate-then-answer."""
+    output, stages = _drive(
+        monkeypatch,
+        fallback_enabled=fallback_enabled,
+        moderation_action="block",
+        moderation_category="non_agricultural",
+        speculative_agent=False,
+    )
+
     assert "moderation" in stages
     assert "agent" not in stages, f"blocked query reached the agent: {stages}"
     assert output, "a blocked turn must still say something to the farmer"
 
 
+@pytest.mark.parametrize("speculative_agent", [False, True])
+def test_allowed_turn_stage_order_is_independent_of_speculation(monkeypatch, speculative_agent):
+    _, stages = _drive(monkeypatch, speculative_agent=speculative_agent)
+    assert [s for s in stages if s in _TRACKED] == list(_TRACKED), f"stage order changed: {stages}"
+
+
 def test_doctor_jwt_routes_to_doctor_agent_without_farmer_context(monkeypatch):
     output, stages = _drive(
         monkeypatch,
@@ -244,3 +267,40 @@ def test_doctor_jwt_routes_to_doctor_agent_without_farmer_context(monkeypatch):
     assert "moderation" not in stages
     assert "agent" not in stages
     assert "farmer_context" not in stages
+
+
+def test_preamble_steps_overlap_and_are_timed(monkeypatch):
+    """History load, farmer context and pretranslation are independent: they run
+    as one task graph, so none waits for another, and each is timed on the trace."""
+    events: list[str] = []
+    traces = []
+    real_begin = chat_service._pipeline_trace.begin
+
+    def _begin(*a, **kw):
+        pt = real_begin(*a, **kw)
+        traces.append(pt)
+        return pt
+
+    def _slow(name, result):
+        async def _run(*_a, **_kw):
+            events.append(f"start:{name}")
+            await asyncio.sleep(0.05)
+            events.append(f"end:{name}")
+            return result
+        return _run
+
+    monkeypatch.setattr(chat_service._pipeline_trace, "begin", _begin)
+    output, stages = _drive(monkeypatch, user_info={"phone": "+919876543210"}, history=None,
+                            extra_patches={
+                                "_load_message_history": _slow("history", LoadedHistory([])),
+                                "get_farmer_context_bundle_by_mobile": _slow("farmer_context", ("farmer data", [], {})),
+                                "translate_to_english_pretranslation": _slow("pretranslation", "How much water?"),
+                            })
+
+    assert output
+    first_end = min(i for i, e in enumerate(events) if e.startswith("end:"))
+    assert {e for e in events[:first_end]} == {"start:history", "start:farmer_context", "start:pretranslation"}
+    timings = traces[-1].timings
+    assert set(timings) == {"history", "farmer_context", "pretranslation", "preamble"}
+    # The preamble costs the slowest step, not the sum of the three.
+    assert timings["preamble"] < 140
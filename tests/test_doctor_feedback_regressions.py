@@ -136,7 +136,7 @@ def test_doctor_identity_short_circuit_bypasses_both_moderation_and_rag(monkeypa
     monkeypatch.setattr(chat, "propagate_attributes", None)
     monkeypatch.setattr(chat, "get_langfuse_client", None)
 
-    async def update_history(key, _messages):
+    async def update_history(key, _messages, _loaded=None):
         recorded["history_key"] = key
 
     async def unexpected(*_args, **_kwargs):
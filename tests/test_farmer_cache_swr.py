@@ -10,12 +10,15 @@ import os
 os.environ.setdefault("OPENAI_API_KEY", "test-key")
 
 import asyncio
+import json
 import subprocess
 import sys
+import time
 from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, patch
 
 import agents.services.farmer_cache as fc
+from app.core import cache as cache_mod
 
 _REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -67,39 +70,244 @@ def test_interval_constants():
     assert fc.FARMER_CACHE_TTL == 60 * 60 * 24 * 7
 
 
-def test_enqueue_pushes_phone_to_redis_set():
-    fake_redis = AsyncMock()
+class _ZPipeline:
+    def __init__(self, redis):
+        self.redis, self.ops = redis, []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        method = getattr(self.redis, name)
+        return lambda *a, **kw: self.ops.append((method, a, kw))
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        return [await method(*a, **kw) for method, a, kw in self.ops]
+
+
+class ZSetRedis:
+    """Just enough of the sorted-set commands the refresh queue uses."""
+
+    def __init__(self):
+        self.zsets, self.sets, self.store, self.round_trips = {}, {}, {}, 0
+
+    def pipeline(self, transaction=True):
+        return _ZPipeline(self)
+
+    async def zadd(self, key, mapping, nx=False, lt=False):
+        zset = self.zsets.setdefault(key, {})
+        for member, score in mapping.items():
+            if member in zset and (nx or (lt and score >= zset[member])):
+                continue
+            zset[member] = score
+
+    async def zpopmin(self, key, count=1):
+        zset = self.zsets.get(key, {})
+        popped = sorted(zset.items(), key=lambda item: item[1])[:count]
+        for member, _ in popped:
+            del zset[member]
+        return popped
+
+    async def bzpopmin(self, key, timeout=0):
+        popped = await self.zpopmin(key)
+        return (key, *popped[0]) if popped else None
+
+    async def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    async def zmscore(self, key, members):
+        return [self.zsets.get(key, {}).get(member) for member in members]
+
+    async def zrem(self, key, *members):
+        return sum(self.zsets.get(key, {}).pop(member, None) is not None for member in members)
+
+    async def spop(self, key, count=None):
+        members = sorted(self.sets.get(key, set()))[:count]
+        self.sets[key] = self.sets.get(key, set()) - set(members)
+        return members
+
+    async def zremrangebyscore(self, key, low, high):
+        zset = self.zsets.get(key, {})
+        for member in [m for m, score in zset.items() if score <= high]:
+            del zset[member]
+
+    async def zrevrange(self, key, start, end):
+        ordered = sorted(self.zsets.get(key, {}).items(), key=lambda item: -item[1])
+        return [member for member, _ in ordered[start:end + 1]]
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    async def incrby(self, key, amount):
+        self.store[key] = int(self.store.get(key) or 0) + amount
+        return self.store[key]
+
+    async def expire(self, key, seconds):
+        return True
+
+
+def _queue(fake_redis):
+    return [m for m, _ in sorted(fake_redis.zsets.get(fc.FARMER_REFRESH_QUEUE_KEY, {}).items(), key=lambda i: i[1])]
+
+
+def test_enqueue_adds_phone_to_priority_queue():
+    fake_redis = ZSetRedis()
     with patch.object(fc, "redis_client", fake_redis):
         asyncio.run(fc.enqueue_farmer_refresh("9999999999"))
-    fake_redis.sadd.assert_awaited_once_with(fc.FARMER_REFRESH_QUEUE_KEY, "9999999999")
+        asyncio.run(fc.enqueue_farmer_refresh("9999999999"))
+    assert _queue(fake_redis) == ["9999999999"]
+    assert list(fake_redis.zsets[fc.FARMER_REFRESH_ENQUEUED_AT_KEY]) == ["9999999999"]
+    assert fake_redis.round_trips == 2
 
 
 def test_enqueue_ignores_empty_phone():
-    fake_redis = AsyncMock()
+    fake_redis = ZSetRedis()
     with patch.object(fc, "redis_client", fake_redis):
         asyncio.run(fc.enqueue_farmer_refresh(""))
-    fake_redis.sadd.assert_not_called()
+    assert fake_redis.round_trips == 0
 
 
-def test_drain_pops_batch_and_refreshes_each():
-    fake_redis = AsyncMock()
-    fake_redis.spop.return_value = ["111", "222", "333"]
-    with patch.object(fc, "redis_client", fake_redis), \
-         patch.object(fc, "refresh_farmer_data", new=AsyncMock()) as refresh:
-        processed = asyncio.run(fc.drain_farmer_refresh_queue_once(batch=10))
-    assert processed == 3
-    fake_redis.spop.assert_awaited_once_with(fc.FARMER_REFRESH_QUEUE_KEY, 10)
-    assert refresh.await_count == 3
+def test_queue_orders_by_activity_then_staleness():
+    fake_redis = ZSetRedis()
 
+    async def _go():
+        await fc.enqueue_farmer_refresh("idle-fresh", envelope=_Env("found", 13))
+        await fc.enqueue_farmer_refresh("idle-old", envelope=_Env("found", 100))
+        await fc.enqueue_farmer_refresh("active", envelope=_Env("found", 13), active=True)
+        await fc.enqueue_farmer_refresh("idle-fresh", envelope=_Env("found", 13))  # re-queue keeps its place
 
-def test_drain_empty_queue_returns_zero():
-    fake_redis = AsyncMock()
-    fake_redis.spop.return_value = None
+    with patch.object(fc, "redis_client", fake_redis):
+        asyncio.run(_go())
+    assert _queue(fake_redis) == ["active", "idle-old", "idle-fresh"]
+
+    with patch.object(fc, "redis_client", fake_redis):
+        asyncio.run(fc.enqueue_farmer_refresh("idle-fresh", active=True))  # ...but can move up
+    assert _queue(fake_redis)[0] == "idle-fresh"
+
+
+def test_pop_takes_highest_priority_and_reports_lag():
+    fake_redis = ZSetRedis()
+    depths, lags = [], []
     with patch.object(fc, "redis_client", fake_redis), \
-         patch.object(fc, "refresh_farmer_data", new=AsyncMock()) as refresh:
-        processed = asyncio.run(fc.drain_farmer_refresh_queue_once())
-    assert processed == 0
-    refresh.assert_not_called()
+         patch.object(fc._metrics, "set_farmer_refresh_queue_depth", new=depths.append), \
+         patch.object(fc._metrics, "observe_farmer_refresh_lag", new=lags.append):
+        for i, age in enumerate((13, 50, 20)):
+            asyncio.run(fc.enqueue_farmer_refresh(str(i), envelope=_Env("found", age)))
+        fake_redis.round_trips = 0
+        phones = asyncio.run(fc.pop_farmer_refresh_batch(2))
+    assert phones == ["1", "2"]
+    assert depths == [1]
+    assert len(lags) == 2 and all(0 <= lag < 5 for lag in lags)
+    assert fake_redis.round_trips == 2
+    assert list(fake_redis.zsets[fc.FARMER_REFRESH_ENQUEUED_AT_KEY]) == ["0"]
+
+
+def test_pop_blocks_only_when_empty():
+    fake_redis = ZSetRedis()
+    fake_redis.bzpopmin = AsyncMock(return_value=None)
+    with patch.object(fc, "redis_client", fake_redis):
+        assert asyncio.run(fc.pop_farmer_refresh_batch(5)) == []
+        fake_redis.bzpopmin.assert_not_called()
+        assert asyncio.run(fc.pop_farmer_refresh_batch(5, block_seconds=2.0)) == []
+    fake_redis.bzpopmin.assert_awaited_once_with(fc.FARMER_REFRESH_QUEUE_KEY, timeout=2.0)
+
+
+def test_legacy_set_is_moved_into_the_priority_queue():
+    fake_redis = ZSetRedis()
+    fake_redis.sets[fc.FARMER_REFRESH_LEGACY_QUEUE_KEY] = {"111", "222", "333"}
+    with patch.object(fc, "redis_client", fake_redis):
+        moved = asyncio.run(fc.migrate_legacy_refresh_queue(batch=2))
+    assert moved == 3
+    assert sorted(_queue(fake_redis)) == ["111", "222", "333"]
+    assert fake_redis.sets[fc.FARMER_REFRESH_LEGACY_QUEUE_KEY] == set()
+
+
+def test_refresh_queued_farmer_records_outcome():
+    outcomes = []
+    with patch.object(fc._metrics, "record_farmer_refresh", new=outcomes.append):
+        with patch.object(fc, "refresh_farmer_data", new=AsyncMock(return_value=_Env("found", 0))):
+            assert asyncio.run(fc.refresh_queued_farmer("111")) is True
+        with patch.object(fc, "refresh_farmer_data", new=AsyncMock(return_value=None)):
+            assert asyncio.run(fc.refresh_queued_farmer("111")) is False
+        with patch.object(fc, "refresh_farmer_data", new=AsyncMock(side_effect=RuntimeError("boom"))):
+            assert asyncio.run(fc.refresh_queued_farmer("111")) is False
+    assert outcomes == ["refreshed", "unavailable", "error"]
+
+
+def _cache_entry(fake_redis, phone, age_hours, status="found"):
+    fetched = (datetime.now(timezone.utc) - timedelta(hours=age_hours)).isoformat()
+    key = fc.build_cache_key(fc._cache_key(phone), namespace=fc.FARMER_CACHE_NAMESPACE)
+    fake_redis.store[key] = json.dumps(
+        {"farmers": [], "aiTechnicians": [], "lookupStatus": status, "fetchedAt": fetched}
+    )
+
+
+def test_prewarm_queues_active_phones_nearing_their_refresh(monkeypatch):
+    fake_redis = ZSetRedis()
+    monkeypatch.setattr(cache_mod, "redis_client", fake_redis)
+    monkeypatch.setattr(fc, "redis_client", fake_redis)
+    monkeypatch.setattr(fc.settings, "farmer_prewarm_hourly_budget", 3)
+    monkeypatch.setattr(fc.settings, "farmer_prewarm_lead_seconds", 3600)
+    now = time.time()
+    activity = {"fresh": 1, "nearing": 2, "stale": 3, "cold": 4, "queued": 5, "gone": 99, "last": 6}
+    fake_redis.zsets[fc.FARMER_ACTIVITY_KEY] = {p: now - h * 3600 for p, h in activity.items()}
+    _cache_entry(fake_redis, "fresh", 1)
+    _cache_entry(fake_redis, "nearing", 11.5)
+    _cache_entry(fake_redis, "stale", 13)
+    _cache_entry(fake_redis, "queued", 13)
+    fake_redis.zsets[fc.FARMER_REFRESH_QUEUE_KEY] = {"queued": 0.0}
+
+    assert asyncio.run(fc.prewarm_farmer_cache_once(now=now)) == 3
+    # Most recently active first; fresh and already-queued skipped; expired activity dropped.
+    assert sorted(_queue(fake_redis)) == ["cold", "nearing", "queued", "stale"]
+    assert "gone" not in fake_redis.zsets[fc.FARMER_ACTIVITY_KEY]
+    assert asyncio.run(fc.prewarm_farmer_cache_once(now=now)) == 0  # one pass per interval
+
+    del fake_redis.store[fc.FARMER_PREWARM_LOCK_KEY]
+    assert asyncio.run(fc.prewarm_farmer_cache_once(now=now)) == 0  # budget spent this hour
+    del fake_redis.store[fc.FARMER_PREWARM_LOCK_KEY]
+    assert asyncio.run(fc.prewarm_farmer_cache_once(now=now + 3600)) == 1
+    assert "last" in _queue(fake_redis)
+
+
+def test_reads_record_lookup_result_and_activity(monkeypatch):
+    fake_redis = ZSetRedis()
+    results = []
+    monkeypatch.setattr(fc, "redis_client", fake_redis)
+    monkeypatch.setattr(fc._metrics, "record_farmer_cache_lookup", results.append)
+    fresh, stale = _Env("found", 1), _Env("found", 13)
+    fresh.stale, stale.stale = False, True
+
+    monkeypatch.setattr(fc.settings, "farmer_prewarm_enabled", False)
+    asyncio.run(fc.note_farmer_read("111", fresh))
+    assert fake_redis.zsets == {}
+    monkeypatch.setattr(fc.settings, "farmer_prewarm_enabled", True)
+    asyncio.run(fc.note_farmer_read("222", stale))
+    asyncio.run(fc.note_farmer_read("333", None))
+
+    assert results == ["hit", "stale", "cold"]
+    assert sorted(fake_redis.zsets[fc.FARMER_ACTIVITY_KEY]) == ["222", "333"]
+
+
+def test_stale_cached_read_queues_an_active_refresh():
+    stale = _Env("found", 13)
+    stale.stale = True
+    enqueue = AsyncMock()
+    with patch.object(fc, "get_cached_farmer_data", new=AsyncMock(return_value=stale)), \
+         patch.object(fc, "note_farmer_read", new=AsyncMock()), \
+         patch.object(fc, "enqueue_farmer_refresh", new=enqueue):
+        assert asyncio.run(fc.get_or_fetch_farmer_data("111")) is stale
+    enqueue.assert_awaited_once_with("111", envelope=stale, active=True)
 
 
 def test_bounded_fetch_returns_envelope_on_success():
@@ -118,7 +326,7 @@ def test_bounded_fetch_times_out_and_enqueues():
          patch.object(fc, "enqueue_farmer_refresh", new=enqueue):
         result = asyncio.run(fc.refresh_farmer_data_bounded("111", timeout=0.05))
     assert result is None
-    enqueue.assert_awaited_once_with("111")
+    enqueue.assert_awaited_once_with("111", active=True)
 
 
 def test_exceeds_max_serve_stale():
@@ -0,0 +1,116 @@
+"""The rendered farmer context is reused while its inputs are unchanged."""
+import asyncio
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import pytest
+
+import agents.farmer_context as farmer_ctx
+from agents.services import animal_context_cache as acc
+from agents.services import farmer_context_cache as fcc
+from agents.tools.farmer_animal_backends import AITechnicianBySocietyRecord
+from app.core import cache as cache_mod
+from app.models.farmer import FarmerModel
+from tests.test_animal_context_cache import FakeRedis, Upstream
+
+
+@pytest.fixture
+def turn(monkeypatch):
+    redis, upstream = FakeRedis(), Upstream()
+    state = {
+        "farmers": [
+            FarmerModel(unionName="banas", unionCode="1", societyCode="S1", farmerName="A", tagNo="A1, A2"),
+            FarmerModel(unionName="kaira", unionCode="2", societyCode="S2", farmerName="B", tagNo="B1"),
+        ],
+        "technicians": [AITechnicianBySocietyRecord(userId="ait-1", fullName="Ramesh", mobileNumber="99")],
+        "technician_calls": 0,
+    }
+
+    async def fake_farmers(_mobile):
+        return state["farmers"]
+
+    async def fake_schemes(lines, unions):
+        lines.append("SCHEMES")
+
+    async def fake_technicians(*_a, **_kw):
+        state["technician_calls"] += 1
+        return state["technicians"]
+
+    monkeypatch.setattr(cache_mod, "redis_client", redis)
+    monkeypatch.setattr(acc, "redis_client", redis)
+    monkeypatch.setattr(acc, "get_animal_data_by_tag", upstream.animal)
+    monkeypatch.setattr(acc, "fetch_banas_operated_visit", upstream.banas)
+    monkeypatch.setattr(acc, "get_cvcc_health_data_by_tag", upstream.cvcc)
+    monkeypatch.setattr(farmer_ctx, "get_farmer_data_by_mobile", fake_farmers)
+    monkeypatch.setattr(farmer_ctx, "_append_union_scheme_summary_markdown", fake_schemes)
+    monkeypatch.setattr(farmer_ctx, "get_ai_technicians_by_society_api", fake_technicians)
+    monkeypatch.setattr(fcc.settings, "farmer_context_cache_ttl_seconds", 900)
+    acc._refresh_tasks.clear()
+
+    def _run():
+        return asyncio.run(farmer_ctx.get_farmer_context_bundle_by_mobile("9876543210"))
+
+    state["run"], state["redis"], state["upstream"] = _run, redis, upstream
+    return state
+
+
+def _bundle_keys(redis):
+    return [k for k in redis.store if f"{fcc.FARMER_CONTEXT_NAMESPACE}:" in k]
+
+
+def test_warm_turn_reuses_the_rendered_bundle(turn):
+    first = turn["run"]()
+    # Tags were cold on the first turn, so nothing was stored yet.
+    assert _bundle_keys(turn["redis"]) == []
+    second = turn["run"]()
+    assert len(_bundle_keys(turn["redis"])) == 1
+    calls = (turn["technician_calls"], len(turn["upstream"].calls))
+    turn["redis"].round_trips = 0
+
+    third = turn["run"]()
+
+    assert first == second == third
+    assert (turn["technician_calls"], len(turn["upstream"].calls)) == calls
+    assert turn["redis"].round_trips == 1
+    assert "Ramesh" in third[0] and "### Animal B1" in third[0]
+
+
+def test_changed_animal_data_rebuilds(turn):
+    turn["run"]()
+    turn["run"]()
+    calls = turn["technician_calls"]
+    request = acc.AnimalContextRequest("A1", include_banas_visit=True, include_cvcc_health=False, union_name="banas")
+    asyncio.run(acc.refresh_animal_context(request))
+
+    turn["run"]()
+
+    assert turn["technician_calls"] == calls + 2
+
+
+def test_changed_farmer_records_rebuild(turn):
+    turn["run"]()
+    turn["run"]()
+    turn["farmers"] = turn["farmers"][:1]
+
+    markdown, unions, _ = turn["run"]()
+
+    assert unions == ["banas"]
+    assert "### Animal B1" not in markdown
+
+
+def test_degraded_lookup_is_not_cached(turn):
+    turn["technicians"] = None
+    turn["run"]()
+    markdown, _, _ = turn["run"]()
+
+    assert farmer_ctx._AI_TECHNICIANS_UNAVAILABLE in markdown
+    assert _bundle_keys(turn["redis"]) == []
+
+
+def test_zero_ttl_disables_the_cache(turn, monkeypatch):
+    monkeypatch.setattr(fcc.settings, "farmer_context_cache_ttl_seconds", 0)
+    for _ in range(3):
+        turn["run"]()
+    assert _bundle_keys(turn["redis"]) == []
+    assert turn["technician_calls"] == 6
@@ -0,0 +1,79 @@
+"""Farmer refresh worker pool and the background per-host rate limit."""
+import asyncio
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import agents.services.farmer_cache as fc
+from agents.tools import farmer_animal_backends as backends
+from app.tasks import farmer_refresh_worker as worker
+
+
+def test_pool_runs_refreshes_concurrently_up_to_its_size(monkeypatch):
+    queue = [f"9{i:09d}" for i in range(10)]
+    pops, blocked = [], []
+    state = {"now": 0, "peak": 0, "done": 0}
+
+    async def _pop(count, *, block_seconds=0.0):
+        pops.append(count)
+        taken, queue[:] = queue[:count], queue[count:]
+        if not taken and block_seconds:
+            blocked.append(block_seconds)
+            await asyncio.sleep(0.01)
+        return taken
+
+    async def _refresh(_phone):
+        state["now"] += 1
+        state["peak"] = max(state["peak"], state["now"])
+        await asyncio.sleep(0.02)
+        state["now"] -= 1
+        state["done"] += 1
+        return True
+
+    async def _migrate():
+        return 0
+
+    monkeypatch.setattr(fc, "pop_farmer_refresh_batch", _pop)
+    monkeypatch.setattr(fc, "refresh_queued_farmer", _refresh)
+    monkeypatch.setattr(fc, "migrate_legacy_refresh_queue", _migrate)
+    monkeypatch.setattr(worker, "WORKER_CONCURRENCY", 3)
+    monkeypatch.setattr(worker, "BLOCK_SECONDS", 0.05)
+
+    async def _go():
+        await worker.start_farmer_refresh_worker()
+        while state["done"] < 10 or not blocked:
+            await asyncio.sleep(0.01)
+        await worker.stop_farmer_refresh_worker()
+
+    asyncio.run(asyncio.wait_for(_go(), timeout=5))
+    assert state["peak"] == 3
+    assert max(pops) == 3  # never takes more phones than it has free slots
+    assert blocked and set(blocked) == {0.05}  # idle waits block on the queue
+
+
+def test_background_refresh_calls_share_a_per_host_token_bucket(monkeypatch):
+    monkeypatch.setattr(backends.settings, "farmer_refresh_rate_per_host", 20.0)
+    monkeypatch.setattr(backends.settings, "farmer_refresh_rate_limits", "slow.example=0, bad=x")
+    backends._refresh_buckets.clear()
+    sleeps = []
+
+    async def _sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(backends.asyncio, "sleep", _sleep)
+
+    async def _go():
+        for _ in range(25):
+            await backends._throttle_background_refresh("api.example")  # request path: never throttled
+        with backends.fetch_reason("background_refresh"):
+            for _ in range(25):
+                await backends._throttle_background_refresh("api.example")
+            for _ in range(25):
+                await backends._throttle_background_refresh("slow.example")  # limit disabled for this host
+
+    asyncio.run(_go())
+    # A burst of one second's budget passes; the rest are spaced 1/20s apart.
+    assert len(sleeps) == 5
+    assert sleeps == sorted(sleeps)
+    assert 0.04 < sleeps[0] <= 0.05 and 0.24 < sleeps[-1] <= 0.25
+    assert list(backends._refresh_buckets) == ["api.example"]
@@ -0,0 +1,89 @@
+"""The prebuilt glossary ratio index returns exactly what a full
+``process.extractOne(..., scorer=fuzz.ratio)`` scan returns."""
+import os
+import random
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import pytest
+from rapidfuzz import fuzz, process
+
+from agents.tools import terms
+from agents.tools.terms import _RatioIndex, get_mini_glossary_for_text
+
+
+class _FullScan(_RatioIndex):
+    """The pre-index behaviour: score every term."""
+
+    def _extract_one(self, query, score_cutoff):
+        return process.extractOne(query, self.terms, score_cutoff=score_cutoff, scorer=fuzz.ratio)
+
+
+def _perturb(rng, text):
+    chars = list(text)
+    for _ in range(rng.randint(0, 3)):
+        op = rng.choice("dis")
+        pos = rng.randrange(len(chars) + (op == "i")) if chars else 0
+        if op == "d" and chars:
+            del chars[pos]
+        elif op == "i":
+            chars.insert(pos, rng.choice("aeiorst -"))
+        elif chars:
+            chars[min(pos, len(chars) - 1)] = rng.choice("aeiorst")
+    return "".join(chars)
+
+
+def _queries(terms_list, n=600, seed=7):
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        words = rng.choice(terms_list).split()
+        if rng.random() < 0.3:
+            words = words + rng.choice(terms_list).split()[:1]
+        out.append(_perturb(rng, " ".join(words[: rng.randint(1, 4)])))
+    return [q for q in out if q]
+
+
+@pytest.mark.parametrize("cutoff", [80, 90, 95, 97])
+@pytest.mark.parametrize("name", ["EN_TERMS", "HI_EN_TERMS", "CANONICAL_ALIAS_TERMS"])
+def test_index_matches_full_extract_one(name, cutoff):
+    choices = getattr(terms, name)
+    index = _RatioIndex(choices)
+    for query in _queries(choices):
+        expected = process.extractOne(query, choices, score_cutoff=cutoff, scorer=fuzz.ratio)
+        assert index.extract_one(query, score_cutoff=cutoff) == expected, query
+
+
+def test_index_keeps_matches_exactly_at_the_cutoff():
+    term = "abcdefghijklmnopqrstu"  # 21 chars
+    query = "abcdefghijklmnopqrs"  # 19 chars: InDel 2 over 40 -> exactly 95.0
+    index = _RatioIndex(["zzzzzzzzzzzzzzzzzzzzz", term])
+
+    assert fuzz.ratio(query, term) == 95.0
+    assert index.extract_one(query, score_cutoff=95) == (term, 95.0, 1)
+    assert index.extract_one(query, score_cutoff=95.1) is None
+
+
+_TEXTS = [
+    "If your cow has mastitis, give clean water and ensure proper milk production.",
+    "Consult the veterinary doctor about foot and mouth disease vaccination and deworming.",
+    "Pregnent buffalo needs mineral mixtre and green foder; check for milk fevr after calving.",
+    "Repeat breeder cows may need artificial insemenation at the right heat time.",
+    "Tick infestation and lumpy skin diseas spread fast in the herd during monsoon.",
+]
+
+
+@pytest.mark.parametrize("target_lang", ["gu", "hi"])
+@pytest.mark.parametrize("threshold", [0.9, 0.95])
+def test_mini_glossary_unchanged_by_the_index(monkeypatch, target_lang, threshold):
+    indexed = [get_mini_glossary_for_text(t, threshold=threshold, target_lang=target_lang) for t in _TEXTS]
+    for name, choices in [
+        ("EN_TERMS_INDEX", terms.EN_TERMS),
+        ("HI_EN_TERMS_INDEX", terms.HI_EN_TERMS),
+        ("CANONICAL_ALIAS_INDEX", terms.CANONICAL_ALIAS_TERMS),
+    ]:
+        monkeypatch.setattr(terms, name, _FullScan(choices))
+    full = [get_mini_glossary_for_text(t, threshold=threshold, target_lang=target_lang) for t in _TEXTS]
+
+    assert indexed == full
+    assert any(indexed)
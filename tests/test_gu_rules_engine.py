@@ -0,0 +1,154 @@
+"""The compiled Gujarati post-normalization table is byte-identical to the
+sequential ``re.sub`` loop it replaced.
+
+Parity is checked on every string literal of the existing Gujarati
+normalization test modules and the regression fixtures, on every policy key and
+value in context, and on a seeded fuzz of adjacent policy fragments (where
+cascading and overlapping rules would show up).
+"""
+import ast
+import json
+import os
+import random
+import re
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import pytest
+
+from app.services import translation as tr
+from app.services.rewrite_rules import compile_rules
+
+TESTS_DIR = Path(__file__).resolve().parent
+_CORPUS_MODULES = [
+    "test_translation_vocabulary.py",
+    "test_translation_gu_policy.py",
+    "test_gu_digit_glyph.py",
+    "test_voice_output_normalization.py",
+    "test_protected_proper_nouns.py",
+]
+
+
+def _sequential(rules, text):
+    for pat, repl in rules:
+        text = re.sub(pat, repl, text)
+    return text
+
+
+def _legacy_post_normalize(text, target_lang, *, strip_outer=False):
+    """``_post_normalize_gu_translation`` as it was before the rule compiler."""
+    if target_lang.lower() not in ("gujarati", "gu"):
+        return text
+    out = text
+    if tr._is_voice_channel():
+        out = tr._normalize_gu_body_terms(out)
+    for pat, repl in tr.GU_POST_REPLACEMENTS:
+        out = re.sub(pat, repl, out)
+    for pat, repl in tr.GU_FEMININE_SELF_REFERENCE_REPLACEMENTS:
+        out = pat.sub(repl, out)
+    if tr._is_voice_channel():
+        out = re.sub(rf"([:：]\s*){tr._GU_PLACEHOLDER_RE}(?=\s|$)", r"\1", out)
+        for pat, repl in tr.GU_GENDER_NEUTRAL_POST:
+            out = pat.sub(repl, out)
+        out = re.sub(r"(?m)^\s*[^\s:।.!?\n]{1,20}\s*:\s*", ", ", out)
+        out = re.sub(r"^\s*,\s*", "", out)
+        out = out.replace("\u00A0", " ").replace("\u200D", "").replace("\u200C", "")
+        out = re.sub(r"\s+([,।.!?])", r"\1", out)
+        out = tr.normalize_voice_output(out, target_lang, replace_slash=False)
+    out = re.sub(r"[ \t]{2,}", " ", out)
+    out = re.sub(r"\n{3,}", "\n\n", out)
+    return out.strip() if strip_outer else out
+
+
+def _fixture_strings():
+    out = set()
+    for name in _CORPUS_MODULES:
+        tree = ast.parse((TESTS_DIR / name).read_text(encoding="utf-8"))
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str) and node.value.strip():
+                out.add(node.value)
+
+    def _walk(value):
+        if isinstance(value, str):
+            out.add(value)
+        elif isinstance(value, dict):
+            for v in value.values():
+                _walk(v)
+        elif isinstance(value, list):
+            for v in value:
+                _walk(v)
+
+    for path in (TESTS_DIR / "fixtures").glob("*.json"):
+        _walk(json.loads(path.read_text(encoding="utf-8")))
+    return sorted(out)
+
+
+def _policy_strings():
+    out = []
+    for key, value in tr.GU_TERM_POLICY.get("forbidden", {}).items():
+        out += [key, value, f"આ {key} છે.", f"{key}{value}", f"{value} {key}"]
+    return out
+
+
+def _fuzz_strings(n=400, seed=1406):
+    rng = random.Random(seed)
+    pieces = []
+    for key, value in tr.GU_TERM_POLICY.get("forbidden", {}).items():
+        pieces += [key, value, key[: len(key) // 2], key[len(key) // 2:]]
+    pieces += ["ગર્ભવતી", "paho", "red colour", "૧", "પ", " ", "હું ", "કરું", ".", "\n"]
+    return ["".join(rng.choice(pieces) for _ in range(rng.randint(1, 8))) for _ in range(n)]
+
+
+_CORPUS = _fixture_strings() + _policy_strings() + _fuzz_strings()
+
+
+def test_corpus_is_substantial():
+    assert len(_CORPUS) > 1000
+
+
+def test_compiled_table_matches_sequential_substitution():
+    rules = compile_rules(tr.GU_POST_REPLACEMENTS)
+    mismatches = [t for t in _CORPUS if rules.apply(t) != _sequential(tr.GU_POST_REPLACEMENTS, t)]
+    assert mismatches == []
+    # The point of compiling: far fewer passes than rules.
+    assert rules.passes < len(tr.GU_POST_REPLACEMENTS) // 2
+
+
+@pytest.mark.parametrize("channel", ["chat", "voice"])
+@pytest.mark.parametrize("strip_outer", [False, True])
+def test_post_normalize_is_byte_identical_to_the_legacy_loop(channel, strip_outer):
+    with tr.translation_channel(channel):
+        for text in _CORPUS:
+            expected = _legacy_post_normalize(text, "gu", strip_outer=strip_outer)
+            assert tr._post_normalize_gu_translation(text, "gu", strip_outer=strip_outer) == expected, text
+
+
+@pytest.mark.parametrize(
+    "rules,text",
+    [
+        # A later key containing an earlier one.
+        ([("b", "X"), ("abc", "Y")], "abc"),
+        # A later key starting before, and overlapping, an earlier one.
+        ([("bc", "X"), ("ab", "Y")], "abc"),
+        # An earlier replacement feeding a later key, inside and across edges.
+        ([("a", "bc"), ("bc", "Z")], "a"),
+        ([("a", "xb"), ("bc", "Z")], "ac"),
+        ([("a", "bx"), ("cb", "Z")], "ca"),
+        # An empty replacement joining its neighbours.
+        ([("-", ""), ("ab", "Z")], "a-b"),
+        # Regex rules between literal runs keep their place in the order.
+        ([("a", "b"), (r"b+", "c"), ("c", "d")], "ab"),
+        ([(r"(?i)A", "x"), ("x", "y")], "Aa"),
+    ],
+)
+def test_interfering_rules_keep_sequential_semantics(rules, text):
+    assert compile_rules(rules).apply(text) == _sequential(rules, text)
+
+
+def test_non_interfering_literals_share_one_pass():
+    rules = [("ગર્ભવતી", "ગાભણ"), ("વોડકી", "પાડી"), ("ટીપાં", "ધાર")]
+    compiled = compile_rules([(re.escape(k), v) for k, v in rules])
+
+    assert compiled.passes == 1
+    assert compiled.apply("વોડકી ગર્ભવતી ટીપાં") == "પાડી ગાભણ ધાર"
@@ -0,0 +1,252 @@
+"""Append-only session history: one Redis list entry per turn, compare-and-append
+writes, tail reads, and transparent migration of the legacy JSON blob."""
+import asyncio
+import json
+import os
+from functools import lru_cache
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import pytest
+from pydantic_ai.messages import ModelRequest, ModelResponse, SystemPromptPart, TextPart, UserPromptPart
+from pydantic_core import to_jsonable_python
+
+from app import utils as app_utils
+from app.core import history_store as hs
+
+SESSION = "sess-1"
+KEY = app_utils._history_key(SESSION)
+TURNS, COUNT, LEGACY = hs._turns_key(KEY), hs._count_key(KEY), app_utils.build_cache_key(KEY)
+
+
+class FakeBinaryRedis:
+    """In-memory stand-in for the bytes Redis client (lists, strings, TTLs and
+    the append script), counting round trips."""
+
+    def __init__(self):
+        self.data: dict = {}
+        self.ttl: dict = {}
+        self.round_trips = 0
+
+    # commands
+    def lrange(self, key, start, end):
+        items = self.data.get(key, [])
+        start = max(len(items) + start, 0) if start < 0 else start
+        return list(items[start:] if end == -1 else items[start:end + 1])
+
+    def get(self, key):
+        value = self.data.get(key)
+        return value if value is None or isinstance(value, bytes) else str(value).encode()
+
+    def set(self, key, value, ex=None):
+        self.data[key] = str(value).encode() if not isinstance(value, bytes) else value
+        if ex is not None:
+            self.ttl[key] = ex
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+            self.ttl.pop(key, None)
+
+    def rpush(self, key, *values):
+        self.data.setdefault(key, []).extend(values)
+
+    def expire(self, key, ttl):
+        if key in self.data:
+            self.ttl[key] = ttl
+
+    async def eval(self, script, numkeys, turns_key, count_key, expected, added, ttl, entry):
+        assert script is hs._APPEND_SCRIPT
+        self.round_trips += 1
+        n = int(self.data.get(count_key, b"0"))
+        if int(expected) >= 0 and n != int(expected):
+            return -1
+        self.rpush(turns_key, entry)
+        self.set(count_key, n + int(added), ex=int(ttl))
+        self.expire(turns_key, int(ttl))
+        return n + int(added)
+
+    def pipeline(self, transaction=True):
+        return _Pipeline(self)
+
+
+class _Pipeline:
+    def __init__(self, redis):
+        self.redis, self.calls = redis, []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *a, **k: self.calls.append((name, a, k))
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        return [getattr(self.redis, name)(*a, **k) for name, a, k in self.calls]
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeBinaryRedis()
+    monkeypatch.setattr(hs, "redis_binary_client", fake)
+    return fake
+
+
+@lru_cache(maxsize=None)
+def _turn(i, answer="ok"):
+    return (ModelRequest(parts=[UserPromptPart(content=f"question {i}")]), ModelResponse(parts=[TextPart(content=f"{answer} {i}")]))
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def _take_turn(i, max_turns=None):
+    loaded = _run(app_utils._load_message_history(SESSION, max_turns))
+    _run(app_utils.update_message_history(SESSION, [*loaded.messages, *_turn(i)], loaded))
+
+
+def test_turns_are_appended_not_rewritten(redis):
+    for i in range(3):
+        _take_turn(i)
+    history = _run(app_utils._get_message_history(SESSION))
+
+    assert history == [*_turn(0), *_turn(1), *_turn(2)]
+    assert len(redis.data[TURNS]) == 3
+    assert hs.decode_turns(redis.data[TURNS][-1:], app_utils._sanitize_legacy_usage) == list(_turn(2))
+    assert redis.data[COUNT] == b"6"
+    assert redis.ttl[TURNS] == redis.ttl[COUNT] == app_utils.DEFAULT_CACHE_TTL
+
+
+def test_an_append_is_one_round_trip(redis):
+    _take_turn(0)
+    loaded = _run(app_utils._load_message_history(SESSION))
+    redis.round_trips = 0
+
+    _run(app_utils.update_message_history(SESSION, [*loaded.messages, *_turn(1)], loaded))
+
+    assert redis.round_trips == 1
+
+
+def test_large_turns_are_compressed(redis):
+    _run(app_utils.update_message_history(SESSION, list(_turn(0, answer="milk " * 500))))
+
+    entry = redis.data[TURNS][0]
+    assert entry[:1] == hs._TAG_ZLIB
+    assert len(entry) < 500
+    assert _run(app_utils._get_message_history(SESSION)) == list(_turn(0, answer="milk " * 500))
+
+
+def test_legacy_blob_is_read_then_migrated_on_write(redis):
+    legacy = to_jsonable_python(list(_turn(0)))
+    legacy[1]["usage"] = {"input_tokens": None, "output_tokens": None, "details": None}
+    redis.data[LEGACY] = json.dumps(legacy).encode()
+
+    loaded = _run(app_utils._load_message_history(SESSION))
+    history = loaded.messages
+    assert [m.parts for m in history] == [m.parts for m in _turn(0)]
+    assert history[1].usage.input_tokens == 0
+
+    _run(app_utils.update_message_history(SESSION, [*history, *_turn(1)], loaded))
+
+    assert LEGACY not in redis.data
+    assert len(redis.data[TURNS]) == 2  # one entry per turn
+    assert [m.parts for m in _run(app_utils._get_message_history(SESSION))] == [m.parts for m in [*_turn(0), *_turn(1)]]
+
+
+def test_a_concurrent_writer_forces_a_rewrite_not_a_duplicate(redis):
+    _run(app_utils.update_message_history(SESSION, list(_turn(0))))
+    mine = _run(app_utils._load_message_history(SESSION))
+    # Another worker appends a turn after we loaded.
+    redis.rpush(TURNS, hs.encode_turn(list(_turn(9))))
+    redis.set(COUNT, 4)
+
+    _run(app_utils.update_message_history(SESSION, [*mine.messages, *_turn(1)], mine))
+
+    assert _run(app_utils._get_message_history(SESSION)) == [*_turn(0), *_turn(1)]
+    assert redis.data[COUNT] == b"4"
+
+
+def test_unloaded_session_is_rewritten_whole(redis):
+    redis.rpush(TURNS, hs.encode_turn(list(_turn(0))))
+    redis.set(COUNT, 2)
+
+    _run(app_utils.update_message_history(SESSION, [*_turn(0), *_turn(1)]))
+
+    assert len(redis.data[TURNS]) == 2
+    assert _run(app_utils._get_message_history(SESSION)) == [*_turn(0), *_turn(1)]
+
+
+def test_a_migrated_legacy_blob_still_allows_tail_reads(redis):
+    redis.data[LEGACY] = json.dumps(to_jsonable_python([*_turn(0), *_turn(1), *_turn(2)])).encode()
+    loaded = _run(app_utils._load_message_history(SESSION, 2))
+    _run(app_utils.update_message_history(SESSION, [*loaded.messages, *_turn(3)], loaded))
+
+    tail = _run(app_utils._load_message_history(SESSION, 2))
+
+    assert len(redis.data[TURNS]) == 4
+    assert tail.messages == [*_turn(2), *_turn(3)] and not tail.complete
+
+
+def test_rewrite_splits_at_user_prompts():
+    preamble = ModelRequest(parts=[SystemPromptPart(content="system")])
+    messages = [preamble, *_turn(0), *_turn(1)]
+
+    assert hs.split_turns(messages) == [[preamble, *_turn(0)], list(_turn(1))]
+    assert hs.split_turns([]) == []
+
+
+def test_overlapping_turns_of_one_session_never_interleave(redis):
+    _take_turn(0)
+
+    async def _overlap():
+        # Both turns load before either saves; A then saves first.
+        a = await app_utils._load_message_history(SESSION)
+        b = await app_utils._load_message_history(SESSION)
+        await app_utils.update_message_history(SESSION, [*a.messages, *_turn(1, "A")], a)
+        await app_utils.update_message_history(SESSION, [*b.messages, *_turn(2, "B")], b)
+
+    _run(_overlap())
+
+    # Last writer wins, whole: B's turn right after the turn it was answering.
+    assert _run(app_utils._get_message_history(SESSION)) == [*_turn(0), *_turn(2, "B")]
+    assert redis.data[COUNT] == b"4"
+
+
+def test_max_turns_reads_only_the_tail(redis):
+    for i in range(6):
+        _take_turn(i)
+
+    tail = _run(app_utils._load_message_history(SESSION, max_turns=2))
+
+    assert tail.messages == [*_turn(4), *_turn(5)]
+    assert not tail.complete
+
+
+def test_a_tail_read_appends_and_keeps_the_older_turns(redis):
+    for i in range(4):
+        _take_turn(i, max_turns=2)
+
+    async def _overlap():
+        a = await app_utils._load_message_history(SESSION, 2)
+        b = await app_utils._load_message_history(SESSION, 2)
+        await app_utils.update_message_history(SESSION, [*a.messages, *_turn(4, "A")], a)
+        await app_utils.update_message_history(SESSION, [*b.messages, *_turn(5, "B")], b)
+
+    _run(_overlap())
+
+    # A rewrite would drop the unread turns; both turns are appended instead.
+    assert len(redis.data[TURNS]) == 6
+    assert _run(app_utils._get_message_history(SESSION)) == [
+        *_turn(0), *_turn(1), *_turn(2), *_turn(3), *_turn(4, "A"), *_turn(5, "B"),
+    ]
+
+
+def test_unreadable_history_is_discarded(redis):
+    redis.rpush(TURNS, b"?garbage")
+    redis.set(COUNT, 1)
+
+    assert _run(app_utils._get_message_history(SESSION)) == []
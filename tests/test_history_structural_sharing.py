@@ -0,0 +1,109 @@
+"""History trimming and filtering share messages and parts with their input
+instead of deep-copying them, and return the same values as before."""
+import os
+from copy import deepcopy
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import pytest
+from pydantic_ai.messages import (
+    ModelRequest,
+    ModelResponse,
+    SystemPromptPart,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+
+from app import utils as app_utils
+from helpers import utils
+
+
+@pytest.fixture(autouse=True)
+def _word_tokens(monkeypatch):
+    class _Words:
+        def encode(self, doc, disallowed_special=()):
+            return doc.split()
+
+    monkeypatch.setattr(utils, "_token_encoder", lambda: _Words())
+    utils.count_tokens_str.cache_clear()
+    yield
+    utils.count_tokens_str.cache_clear()
+
+
+def _legacy_with_parts(message, parts):
+    # What every filter did before: a deep copy of each retained message.
+    shell = deepcopy(message)
+    shell.parts = parts
+    return shell
+
+
+def _history(n=12):
+    msgs = [
+        ModelRequest(parts=[SystemPromptPart(content="You are Amul AI."), UserPromptPart(content="hello")]),
+        ModelResponse(parts=[TextPart(content="Namaste")]),
+    ]
+    for i in range(n):
+        msgs.append(ModelRequest(parts=[UserPromptPart(content=f"question {i} about milk")]))
+        if i % 2 == 0:
+            msgs.append(ModelResponse(parts=[
+                TextPart(content=f"looking up {i}"),
+                ToolCallPart(tool_name="search_documents", args={"q": i}, tool_call_id=f"c{i}"),
+            ]))
+            msgs.append(ModelRequest(parts=[
+                ToolReturnPart(tool_name="search_documents", content=[{"doc": "x" * 50}] * 20, tool_call_id=f"c{i}"),
+            ]))
+        if i == 5:
+            # An orphaned call: no return ever arrives.
+            msgs.append(ModelResponse(parts=[ToolCallPart(tool_name="get_weather", args={}, tool_call_id="orphan")]))
+        msgs.append(ModelResponse(parts=[TextPart(content=f"answer {i} " + "text " * 10)]))
+    return msgs
+
+
+_CALLS = [
+    ("trim_history", dict(max_tokens=10**6)),
+    ("trim_history", dict(max_tokens=150, include_system_prompts=False, include_tool_calls=False)),
+    ("trim_history", dict(max_tokens=400, include_system_prompts=True, include_tool_calls=True)),
+    ("filter_out_tool_calls", {}),
+    ("clean_message_history_for_openai", {}),
+]
+
+
+@pytest.mark.parametrize("name,kwargs", _CALLS)
+def test_same_values_as_deep_copying(monkeypatch, name, kwargs):
+    history = _history()
+    snapshot = deepcopy(history)
+    shared = getattr(app_utils, name)(history, **kwargs)
+    monkeypatch.setattr(app_utils, "_with_parts", _legacy_with_parts)
+
+    assert shared == getattr(app_utils, name)(history, **kwargs)
+    assert history == snapshot
+
+
+@pytest.mark.parametrize("name,kwargs", _CALLS)
+def test_parts_are_shared_and_unchanged_messages_reused(name, kwargs):
+    history = _history()
+    by_id = {id(m): m for m in history}
+    input_parts = {id(p) for m in history for p in m.parts}
+
+    out = getattr(app_utils, name)(history, **kwargs)
+
+    assert out
+    for msg in out:
+        assert all(id(p) in input_parts for p in msg.parts)
+        original = by_id.get(id(msg))
+        if original is None:
+            # A new shell only where parts were actually dropped.
+            assert any(len(m.parts) > len(msg.parts) and all(p in m.parts for p in msg.parts) for m in history)
+
+
+def test_message_pairs_reference_history_parts():
+    history = _history(4)
+
+    pairs = app_utils.get_message_pairs(history, limit=2)
+
+    parts = [p for m in history for p in m.parts]
+    assert len(pairs) == 2
+    assert all(any(p is q for q in parts) for pair in pairs for p in pair)
+    assert app_utils.format_message_pairs(history, 1)[0].endswith("answer 3 " + "text " * 10)
@@ -0,0 +1,155 @@
+"""History trimming tokenizes each distinct part once and only as far back as
+the budget reaches, and still selects exactly the turns it did before."""
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import pytest
+from pydantic_ai.messages import (
+    ModelRequest,
+    ModelResponse,
+    SystemPromptPart,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+
+from app import utils as app_utils
+from helpers import utils
+
+
+class _WordEncoder:
+    """Stand-in for cl100k_base (not downloadable offline): one token per word."""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, doc, disallowed_special=()):
+        self.calls.append(doc)
+        return doc.split()
+
+
+@pytest.fixture
+def encoder(monkeypatch):
+    enc = _WordEncoder()
+    monkeypatch.setattr(utils, "_token_encoder", lambda: enc)
+    utils.count_tokens_str.cache_clear()
+    yield enc
+    utils.count_tokens_str.cache_clear()
+
+
+def _turn(i, *, words=20, tool=False):
+    request = ModelRequest(parts=[UserPromptPart(content=f"question {i} " + "word " * words)])
+    msgs = [request]
+    if tool:
+        msgs.append(ModelResponse(parts=[ToolCallPart(tool_name="search_documents", args={"q": i}, tool_call_id=f"c{i}")]))
+        msgs.append(ModelRequest(parts=[ToolReturnPart(tool_name="search_documents", content=f"doc {i}", tool_call_id=f"c{i}")]))
+    msgs.append(ModelResponse(parts=[TextPart(content=f"answer {i} " + "text " * words)]))
+    return msgs
+
+
+def _history(n, **kwargs):
+    system = ModelRequest(parts=[SystemPromptPart(content="You are Amul AI."), UserPromptPart(content="hello")])
+    msgs = [system, ModelResponse(parts=[TextPart(content="Namaste")])]
+    for i in range(n):
+        msgs += _turn(i, tool=i % 3 == 0, **kwargs)
+    return msgs
+
+
+def _legacy_selection(history, max_tokens, include_system_prompts, include_tool_calls):
+    """Turn selection of trim_history as it was: every turn counted up front."""
+    trimmed = app_utils.trim_history(
+        history, max_tokens=10**9,
+        include_system_prompts=include_system_prompts, include_tool_calls=include_tool_calls,
+    )
+    turns, current = [], []
+    for msg in trimmed:
+        if any(getattr(p, "part_kind", "") == "user-prompt" for p in msg.parts) and current:
+            turns.append(current)
+            current = [msg]
+        else:
+            current.append(msg)
+    if current:
+        turns.append(current)
+    tokens = [sum(utils.count_tokens_for_part(p) for m in t for p in m.parts) for t in turns]
+    system, remaining = [], max_tokens
+    if include_system_prompts:
+        for i, t in enumerate(turns):
+            if any(isinstance(p, SystemPromptPart) for m in t for p in m.parts):
+                system = t
+                remaining = max(0, remaining - tokens[i])
+                turns, tokens = turns[:i] + turns[i + 1:], tokens[:i] + tokens[i + 1:]
+                break
+    selected, total = [], 0
+    for t, tk in zip(reversed(turns), reversed(tokens)):
+        if total + tk > remaining:
+            break
+        selected.insert(0, t)
+        total += tk
+    return [m for t in ([system] if system else []) + selected for m in t]
+
+
+@pytest.mark.parametrize("max_tokens", [0, 30, 200, 777, 10**6])
+@pytest.mark.parametrize("include_system_prompts", [True, False])
+@pytest.mark.parametrize("include_tool_calls", [True, False])
+def test_selection_matches_counting_every_turn(encoder, max_tokens, include_system_prompts, include_tool_calls):
+    history = _history(12)
+
+    got = app_utils.trim_history(
+        history, max_tokens=max_tokens,
+        include_system_prompts=include_system_prompts, include_tool_calls=include_tool_calls,
+    )
+
+    assert got == _legacy_selection(history, max_tokens, include_system_prompts, include_tool_calls)
+
+
+def test_next_turn_only_tokenizes_the_new_turn(encoder):
+    history = _history(10)
+    app_utils.trim_history(history, max_tokens=10**6, include_system_prompts=False, include_tool_calls=False)
+    encoder.calls.clear()
+
+    history = history + _turn(10)
+    app_utils.trim_history(history, max_tokens=10**6, include_system_prompts=False, include_tool_calls=False)
+
+    assert sorted(encoder.calls) == sorted(str(p.content) for m in _turn(10) for p in m.parts)
+
+
+def test_turns_past_the_budget_are_not_tokenized(encoder):
+    history = _history(50)
+
+    trimmed = app_utils.trim_history(history, max_tokens=100, include_system_prompts=False, include_tool_calls=False)
+
+    assert 0 < len(trimmed) < len(history)
+    assert not any(c.startswith("question 0 ") for c in encoder.calls)
+
+
+def test_encoder_is_loaded_once(monkeypatch):
+    loads = []
+
+    def _get_encoding(name):
+        loads.append(name)
+        return _WordEncoder()
+
+    monkeypatch.setattr(utils.tiktoken, "get_encoding", _get_encoding)
+    utils._token_encoder.cache_clear()
+    utils.count_tokens_str.cache_clear()
+    try:
+        assert utils.count_tokens_str("one two") == 2
+        assert utils.count_tokens_str("three four five") == 3
+    finally:
+        utils._token_encoder.cache_clear()
+        utils.count_tokens_str.cache_clear()
+
+    assert loads == ["cl100k_base"]
+
+
+def test_token_count_memo_does_not_keep_the_text(encoder):
+    doc = "milk fever " * 1000
+
+    assert utils.count_tokens_str(doc) == 2000
+    assert utils.count_tokens_str(doc) == 2000
+
+    assert encoder.calls == [doc]
+    assert all(isinstance(key[1], bytes) and len(key[1]) == 16 for key in utils._TOKEN_COUNTS)
+    assert not any(isinstance(part, str) for key in utils._TOKEN_COUNTS for part in key)
@@ -0,0 +1,126 @@
+"""Shared upstream HTTP pools (app/core/http_clients.py)."""
+import asyncio
+
+import pytest
+
+from app.core import http_clients
+
+
+async def _keepalive_server(connections: list):
+    """Minimal HTTP/1.1 keep-alive server; records every accepted connection."""
+
+    async def _handle(reader, writer):
+        connections.append(writer)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                if not head:
+                    break
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nContent-Type: text/plain\r\n\r\nok")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(_handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}/"
+
+
+@pytest.fixture(autouse=True)
+def _reset_registry():
+    yield
+    asyncio.run(http_clients.stop_http_clients())
+
+
+def test_unstarted_registry_hands_out_a_private_client_per_call():
+    async def _go():
+        async with http_clients.upstream_client("farmer_backends", timeout=5) as a:
+            pass
+        async with http_clients.upstream_client("farmer_backends", timeout=5) as b:
+            pass
+        return a, b
+
+    a, b = asyncio.run(_go())
+    assert a is not b
+    assert a.is_closed and b.is_closed
+
+
+def test_started_registry_reuses_one_keepalive_connection_per_upstream():
+    connections: list = []
+
+    async def _go():
+        server, url = await _keepalive_server(connections)
+        await http_clients.start_http_clients()
+        try:
+            clients = []
+            for _ in range(3):
+                async with http_clients.upstream_client("farmer_backends", timeout=5) as client:
+                    clients.append(client)
+                    assert (await client.get(url)).text == "ok"
+            stats = http_clients.pool_stats()["farmer_backends"]
+            return clients, stats
+        finally:
+            await http_clients.stop_http_clients()
+            server.close()
+            await server.wait_closed()
+
+    clients, stats = asyncio.run(_go())
+    assert clients[0] is clients[1] is clients[2]
+    assert len(connections) == 1, "every request paid a new TCP handshake"
+    assert stats == {"in_use": 0, "idle": 1, "in_flight": 0}
+    assert clients[0].is_closed  # closed by stop_http_clients
+
+
+def test_upstreams_get_separate_pools_with_their_own_timeouts():
+    async def _go():
+        await http_clients.start_http_clients()
+        async with http_clients.upstream_client("bhashini_asr", timeout=30.0) as asr:
+            pass
+        async with http_clients.upstream_client("amul_network", timeout=35.0) as network:
+            pass
+        return asr, network
+
+    asr, network = asyncio.run(_go())
+    assert asr is not network
+    assert asr.timeout.read == 30.0 and network.timeout.read == 35.0
+
+
+def test_per_upstream_connection_limits(monkeypatch):
+    monkeypatch.setattr(http_clients.settings, "http_pool_max_connections", 100)
+    monkeypatch.setattr(http_clients.settings, "http_pool_max_keepalive", 20)
+    monkeypatch.setattr(
+        http_clients.settings, "http_pool_upstream_limits", "farmer_backends=8, bad, bhashini_asr=x,raya_tts=0"
+    )
+
+    assert http_clients._limits_for("farmer_backends").max_connections == 8
+    assert http_clients._limits_for("farmer_backends").max_keepalive_connections == 8
+    assert http_clients._limits_for("bhashini_asr").max_connections == 100
+    assert http_clients._limits_for("raya_tts").max_connections == 100
+
+
+def test_pool_wait_and_connection_stats_reach_metrics(monkeypatch):
+    connections: list = []
+    seen: dict = {"wait": [], "conns": []}
+    monkeypatch.setattr(http_clients._metrics, "observe_http_pool_wait", lambda u, s: seen["wait"].append((u, s)))
+    monkeypatch.setattr(
+        http_clients._metrics, "set_http_pool_connections", lambda u, i, d: seen["conns"].append((u, i, d))
+    )
+
+    async def _go():
+        server, url = await _keepalive_server(connections)
+        await http_clients.start_http_clients()
+        try:
+            async with http_clients.upstream_client("amul_network", timeout=5) as client:
+                await client.get(url)
+            http_clients.publish_pool_stats()
+        finally:
+            await http_clients.stop_http_clients()
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(_go())
+    assert [u for u, _ in seen["wait"]] == ["amul_network"]
+    assert 0 <= seen["wait"][0][1] < 5
+    assert seen["conns"][-1] == ("amul_network", 0, 1)
@@ -64,7 +64,7 @@ def test_chat_identity_short_circuit_bypasses_moderation_and_translation(monkeyp
 
     recorded: dict = {"messages": None}
 
-    async def _fake_update_history(_session_id, messages):
+    async def _fake_update_history(_session_id, messages, _loaded=None):
         recorded["messages"] = messages
 
     async def _unexpected_moderation(*args, **kwargs):  # pragma: no cover - safety assertion
@@ -0,0 +1,177 @@
+"""In-process vet-KB index (agents/tools/local_index.py, SEARCH_BACKEND=local)."""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import numpy as np
+import pytest
+
+from agents.tools import local_index, search
+from agents.tools.search_rerank import tokenize
+
+_CORPUS = json.loads((Path(__file__).parent / "fixtures" / "rerank_corpus.json").read_text(encoding="utf-8"))
+_DOCS = _CORPUS["documents"]
+_DIM = 64
+
+
+def _embed(text: str) -> np.ndarray:
+    """Deterministic stand-in for a sentence model: hashed bag of tokens."""
+    vector = np.zeros(_DIM, dtype=np.float32)
+    for token in tokenize(text):
+        vector[int(hashlib.md5(token.encode()).hexdigest(), 16) % _DIM] += 1.0
+    return vector
+
+
+def _build(root, name, docs=_DOCS, nlist=None):
+    embeddings = np.stack([_embed(f"{d['name']} {d['text']}") for d in docs])
+    local_index.build_snapshot(root, docs, embeddings, model="hash-bow", nlist=nlist, name=name)
+
+
+@pytest.fixture
+def index_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(local_index.settings, "local_index_path", str(tmp_path))
+    monkeypatch.setattr(local_index.settings, "local_index_nprobe", 8)
+    local_index.set_query_embedder(_embed)
+    local_index.activate(None)
+    yield tmp_path
+    local_index.set_query_embedder(None)
+    local_index.activate(None)
+
+
+def test_lexical_search_is_bm25_over_matching_documents(index_root):
+    _build(index_root, "v1")
+    index = local_index.load_snapshot(index_root / "v1")
+
+    hits = index.search({"q": "mastitis udder", "limit": 10, "search_method": "lexical"}, None)
+
+    # Only documents containing a query term, the short reference chunk first.
+    matching = {d["_id"] for d in _DOCS if {"mastitis", "udder"} & set(tokenize(d["text"]))}
+    assert {h["_id"] for h in hits} == matching
+    assert [h["_id"] for h in hits][:3] == ["ref-01", "yield-02", "mastitis-01"]
+    assert [h["_score"] for h in hits] == sorted((h["_score"] for h in hits), reverse=True)
+    assert isinstance(index.embeddings, np.memmap)
+    assert isinstance(index.postings.doc_idx, np.memmap) and isinstance(index.postings.tf, np.memmap)
+
+
+def test_ivf_probing_every_list_matches_the_exact_scan(index_root, monkeypatch):
+    _build(index_root, "exact", nlist=0)
+    _build(index_root, "ivf", nlist=4)
+    exact = local_index.load_snapshot(index_root / "exact")
+    ivf = local_index.load_snapshot(index_root / "ivf")
+    assert ivf.centroids is not None and sum(len(l) for l in ivf.lists) == len(_DOCS)
+
+    monkeypatch.setattr(local_index.settings, "local_index_nprobe", 4)
+    for query in _CORPUS["queries"]:
+        params = {"q": query["query"], "limit": 5, "search_method": "tensor"}
+        assert [h["_id"] for h in ivf.search(params, _embed)] == [h["_id"] for h in exact.search(params, _embed)]
+
+    monkeypatch.setattr(local_index.settings, "local_index_nprobe", 1)
+    assert len(ivf.search({"q": "calf", "limit": 50, "search_method": "tensor"}, _embed)) < len(_DOCS)
+
+
+def test_hybrid_fuses_tensor_and_lexical_ranks_with_rrf(index_root):
+    _build(index_root, "v1")
+    index = local_index.load_snapshot(index_root / "v1")
+    query, limit = "milk fever calcium", 6
+    hybrid = {"retrievalMethod": "disjunction", "rankingMethod": "rrf", "alpha": 0.6, "rrfK": 60}
+
+    hits = index.search({"q": query, "limit": limit, "search_method": "hybrid", "hybrid_parameters": hybrid}, _embed)
+
+    tensor = [h["_id"] for h in index.search({"q": query, "limit": limit, "search_method": "tensor"}, _embed)]
+    lexical = [h["_id"] for h in index.search({"q": query, "limit": limit, "search_method": "lexical"}, None)]
+    expected = {}
+    for rank, doc_id in enumerate(tensor, start=1):
+        expected[doc_id] = expected.get(doc_id, 0.0) + 0.6 / (60 + rank)
+    for rank, doc_id in enumerate(lexical, start=1):
+        expected[doc_id] = expected.get(doc_id, 0.0) + 0.4 / (60 + rank)
+    assert len(hits) == limit
+    for hit in hits:
+        assert hit["_score"] == pytest.approx(expected[hit["_id"]])
+    assert [h["_id"] for h in hits] == sorted(expected, key=lambda d: -expected[d])[:limit]
+
+
+def test_filters_and_missing_embedder(index_root):
+    _build(index_root, "v1")
+    index = local_index.load_snapshot(index_root / "v1")
+    params = {"q": "mastitis milk", "limit": 50, "search_method": "hybrid", "filter_string": "is_reference:false"}
+
+    hits = index.search(params, _embed)
+    assert hits and not any(h["is_reference"] for h in hits)
+    assert {h["_id"] for h in index.search(dict(params, filter_string="is_reference:true"), _embed)} <= {"ref-01", "ref-02"}
+    assert all("_tensor_score" not in h for h in index.search(params, None))  # lexical-only
+    with pytest.raises(local_index.LocalIndexError):
+        index.search(dict(params, search_method="tensor"), None)
+    with pytest.raises(local_index.LocalIndexError):
+        index.search(dict(params, filter_string="is_reference IN (false)"), _embed)
+
+
+def test_published_snapshot_is_swapped_in(index_root):
+    _build(index_root, "v1", docs=[d for d in _DOCS if d["_id"] != "water-01"])
+    _build(index_root, "v2")
+    local_index.publish_snapshot(index_root, "v1")
+    params = {"q": "drinking water", "limit": 3, "search_method": "lexical"}
+
+    with pytest.raises(local_index.LocalIndexError):
+        local_index.active_index()  # never loaded on first use
+
+    async def _go():
+        assert await local_index.reload_local_index()
+        first = await local_index.search(params)
+        assert not await local_index.reload_local_index()  # CURRENT unchanged
+        local_index.publish_snapshot(index_root, "v2")
+        assert await local_index.reload_local_index()
+        return first, await local_index.search(params)
+
+    before, after = asyncio.run(_go())
+    assert "water-01" not in [h["_id"] for h in before]
+    assert after[0]["_id"] == "water-01" and local_index.active_index().snapshot_id == "v2"
+    assert sorted(p.name for p in index_root.iterdir()) == ["CURRENT", "v1", "v2"]
+
+
+def test_query_embedding_and_scoring_run_off_the_event_loop(index_root):
+    _build(index_root, "v1")
+    local_index.publish_snapshot(index_root, "v1")
+    threads = []
+
+    def _recording_embed(text):
+        threads.append(threading.get_ident())
+        return _embed(text)
+
+    local_index.set_query_embedder(_recording_embed)
+
+    async def _go():
+        await local_index.reload_local_index()
+        await local_index.search({"q": "milk fever", "limit": 3, "search_method": "hybrid"})
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(_go())
+    assert threads and loop_thread not in threads
+
+
+def test_search_documents_runs_on_the_local_backend(index_root, monkeypatch):
+    _build(index_root, "v1")
+    local_index.publish_snapshot(index_root, "v1")
+
+    async def _no_marqo(*_a, **_kw):
+        raise AssertionError("the local backend must not call Marqo")
+
+    monkeypatch.setattr(search, "_marqo_search", _no_marqo)
+    monkeypatch.setattr(search.settings, "enable_network", False)
+    monkeypatch.setattr(search.settings, "search_backend", "local")
+    monkeypatch.setattr(search.settings, "marqo_search_mode", "hybrid")
+    monkeypatch.setattr(search.settings, "search_cache_ttl_seconds", 0)
+
+    async def _go():
+        await local_index.reload_local_index()
+        return await search.search_documents("milk fever treatment")
+
+    result = asyncio.run(_go())
+
+    assert result.startswith("> Search Results for `milk fever treatment")
+    assert "Milk fever" in result
+    assert "Reference" not in result
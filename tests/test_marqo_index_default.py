@@ -130,16 +130,17 @@ def test_search_documents_consumes_settings_endpoint_and_index(monkeypatch):
     monkeypatch.setattr(search.settings, "marqo_endpoint_url", "http://marqo.test")
     monkeypatch.setattr(search.settings, "marqo_index_name", None)
 
-    def _fake_caps(endpoint_url: str, index_name: str):
+    async def _fake_caps(endpoint_url: str, index_name: str):
         captured["caps"] = (endpoint_url, index_name)
         return {"exists": False, "error": "not-found", "has_is_reference_filter": False}
 
-    def _fake_search(endpoint_url: str, index_name: str, search_params):
+    async def _fake_search(endpoint_url: str, index_name: str, search_params):
         captured["search"] = (endpoint_url, index_name, search_params)
         return []
 
-    monkeypatch.setattr(search, "_get_index_capabilities_sync", _fake_caps)
-    monkeypatch.setattr(search, "_marqo_search_sync", _fake_search)
+    monkeypatch.setattr(search, "_probe_index_capabilities", _fake_caps)
+    monkeypatch.setattr(search, "_index_capabilities_cache", {})
+    monkeypatch.setattr(search, "_marqo_search", _fake_search)
 
     out = asyncio.run(search.search_documents("mastitis", top_k=3))
     assert "No results found for" in out
@@ -0,0 +1,256 @@
+"""search_documents: Marqo over the pooled async HTTP client, its result cache
+and the index capability probe."""
+import asyncio
+import json
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import pytest
+
+from agents.services import search_cache
+from agents.tools import search
+from app.core import cache as cache_mod
+from app.core import http_clients
+from tests.test_animal_context_cache import FakeRedis
+
+_HIT = {"_id": "c1", "_score": 0.9, "doc_id": "d1", "name": "Milk fever", "text": "Give calcium borogluconate."}
+_SETTINGS = {
+    "type": "structured",
+    "tensorFields": ["text"],
+    "allFields": [{"name": "text", "type": "text"}, {"name": "is_reference", "type": "bool"}],
+}
+
+
+class CountingRedis(FakeRedis):
+    async def incr(self, key):
+        self.store[key] = str(int(self.store.get(key) or 0) + 1)
+        return int(self.store[key])
+
+
+async def _marqo_server(requests: list, connections: list, fail_methods=(), index_settings=None):
+    """Keep-alive stand-in for Marqo's search and index settings endpoints;
+    records every request. ``index_settings`` is a list of settings responses
+    served in turn (None: 404)."""
+    index_settings = list(index_settings or [_SETTINGS])
+
+    async def _handle(reader, writer):
+        connections.append(writer)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode().split("\r\n")
+                length = next((int(l.split(":", 1)[1]) for l in lines if l.lower().startswith("content-length")), 0)
+                body = json.loads(await reader.readexactly(length)) if length else {}
+                requests.append((lines[0], body))
+                if lines[0].startswith("GET "):
+                    served = index_settings.pop(0) if len(index_settings) > 1 else index_settings[0]
+                    if served is None:
+                        status, payload = "404 Not Found", b'{"message": "index not found"}'
+                    else:
+                        status, payload = "200 OK", json.dumps(served).encode()
+                elif body.get("searchMethod") in fail_methods:
+                    status, payload = "500 Internal Server Error", b'{"message": "boom"}'
+                else:
+                    status, payload = "200 OK", json.dumps({"hits": [_HIT]}).encode()
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(_handle, "127.0.0.1", 0)
+    return server, f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+
+
+@pytest.fixture
+def marqo(monkeypatch):
+    redis = CountingRedis()
+    state = {"observed": [], "lookups": [], "probes": []}
+
+    async def _no_executor(*_a, **_kw):
+        raise AssertionError("search must not use the default executor")
+
+    monkeypatch.setattr(search.settings, "enable_network", False)
+    monkeypatch.setattr(search.settings, "marqo_index_name", "vet-index")
+    monkeypatch.setattr(search.settings, "marqo_search_mode", "hybrid")
+    monkeypatch.setattr(search.asyncio, "to_thread", _no_executor)
+    monkeypatch.setattr(
+        search._metrics, "observe_marqo_search", lambda mode, outcome, _s: state["observed"].append((mode, outcome))
+    )
+    monkeypatch.setattr(
+        search._metrics, "record_search_cache_lookup", lambda result: state["lookups"].append(result)
+    )
+    monkeypatch.setattr(
+        search._metrics, "observe_marqo_capabilities_probe", lambda outcome, _s: state["probes"].append(outcome)
+    )
+    monkeypatch.setattr(cache_mod, "redis_client", redis)
+    monkeypatch.setattr(search_cache, "redis_client", redis)
+    monkeypatch.setattr(search_cache.settings, "search_cache_ttl_seconds", 600)
+    monkeypatch.setattr(search_cache.settings, "search_cache_near_duplicates", False)
+    search._index_capabilities_cache.clear()
+
+    def _run(fail_methods=(), queries=("milk fever",), index_settings=None, probe=False):
+        requests, connections = [], []
+
+        async def _go():
+            server, url = await _marqo_server(requests, connections, fail_methods, index_settings)
+            monkeypatch.setattr(search.settings, "marqo_endpoint_url", url)
+            if not probe:
+                search._index_capabilities_cache[f"{url}::vet-index"] = (
+                    {"exists": True, "has_is_reference_filter": True},
+                    float("inf"),
+                )
+            await http_clients.start_http_clients()
+            try:
+                results = []
+                for q in queries:
+                    if callable(q):
+                        await q()
+                    else:
+                        results.append(await search.search_documents(q))
+                return results
+            finally:
+                await search.stop_index_capability_refresher()
+                await http_clients.stop_http_clients()
+                server.close()
+                await server.wait_closed()
+
+        state["results"] = asyncio.run(_go())
+        state["requests"], state["connections"] = requests, connections
+        return state
+
+    _run.redis = redis
+    yield _run
+    search._index_capabilities_cache.clear()
+
+
+def test_hybrid_search_posts_the_marqo_client_body_on_one_pooled_connection(marqo):
+    state = marqo(queries=("milk fever", "calf scours"))
+
+    assert all("Milk fever" in result for result in state["results"])
+    assert len(state["connections"]) == 1
+    request_line, body = state["requests"][0]
+    assert request_line == "POST /indexes/vet-index/search HTTP/1.1"
+    assert body["searchMethod"] == "hybrid"
+    assert body["hybridParameters"]["rankingMethod"] == "rrf"
+    assert body["filter"] == "is_reference:false"
+    assert body["q"].startswith("query: milk fever") and body["showHighlights"] is True
+    assert state["observed"] == [("hybrid", "ok"), ("hybrid", "ok")]
+    assert search._marqo_searches_in_flight == 0
+
+
+def test_failed_hybrid_search_is_retried_as_tensor(marqo):
+    state = marqo(fail_methods=("hybrid",))
+
+    assert "Milk fever" in state["results"][0]
+    methods = [body["searchMethod"] for _, body in state["requests"]]
+    assert methods == ["hybrid", "tensor"]
+    assert "hybridParameters" not in state["requests"][1][1]
+    assert state["observed"] == [("hybrid", "error"), ("tensor", "ok")]
+
+
+def test_failed_lexical_search_is_not_retried(marqo, monkeypatch):
+    monkeypatch.setattr(search.settings, "marqo_search_mode", "lexical")
+
+    with pytest.raises(search.ModelRetry):
+        marqo(fail_methods=("lexical",))
+
+    assert search._marqo_searches_in_flight == 0
+
+
+def test_repeated_query_is_served_from_the_cache(marqo):
+    state = marqo(queries=("milk fever", "Milk   FEVER", "calf scours"))
+
+    assert len(state["requests"]) == 2  # the re-worded case/spacing hit the cache
+    assert state["results"][0] == state["results"][1].replace("Milk FEVER", "milk fever")
+    assert state["lookups"] == ["miss", "hit", "miss"]
+
+
+def test_near_duplicate_tier_maps_paraphrases_to_one_entry(marqo, monkeypatch):
+    paraphrases = ("treatment of mastitis in cow", "cow mastitis treatment")
+    assert len(marqo(queries=paraphrases)["requests"]) == 2
+
+    monkeypatch.setattr(search_cache.settings, "search_cache_near_duplicates", True)
+    marqo.redis.store.clear()
+    state = marqo(queries=paraphrases)
+
+    assert len(state["requests"]) == 1
+    assert state["lookups"][-2:] == ["miss", "near_hit"]
+
+
+def test_invalidating_the_index_retires_its_entries(marqo):
+    state = marqo(queries=("milk fever", lambda: search_cache.invalidate_search_cache("vet-index"), "milk fever"))
+
+    assert len(state["requests"]) == 2
+    assert state["lookups"] == ["miss", "miss"]
+
+
+def test_fallback_results_are_not_cached(marqo):
+    state = marqo(fail_methods=("hybrid",), queries=("milk fever", "milk fever"))
+
+    assert [body["searchMethod"] for _, body in state["requests"]] == ["hybrid", "tensor"] * 2
+
+
+def _searches(state):
+    return [body for line, body in state["requests"] if line.startswith("POST ")]
+
+
+def _probes(state):
+    return [line for line, _ in state["requests"] if line.startswith("GET ")]
+
+
+def test_startup_warmup_probes_capabilities_off_the_request_path(marqo):
+    async def _startup():
+        await search.start_index_capability_refresher()
+
+    state = marqo(probe=True, queries=(_startup, "milk fever", "calf scours"))
+
+    assert _probes(state) == ["GET /indexes/vet-index/settings HTTP/1.1"]
+    assert [body["filter"] for body in _searches(state)] == ["is_reference:false"] * 2
+    assert state["probes"] == ["ok"]
+    assert len(state["connections"]) == 1
+
+
+def test_failed_probe_is_retried_after_the_negative_ttl(marqo, monkeypatch):
+    monkeypatch.setattr(search.settings, "marqo_capabilities_negative_ttl_seconds", 0)
+
+    async def _settle():
+        await asyncio.sleep(0.05)
+
+    state = marqo(
+        probe=True,
+        index_settings=[None, _SETTINGS],
+        queries=("milk fever", "calf scours", _settle, "udder swelling"),
+    )
+
+    # The first search waited for the (failed) probe; the second was served the
+    # expired negative entry while it was re-probed in the background.
+    assert state["probes"] == ["error", "ok"]
+    assert [body.get("filter") for body in _searches(state)] == [None, None, "is_reference:false"]
+
+
+def test_expired_capabilities_are_served_while_they_refresh(marqo, monkeypatch):
+    lexical = dict(_SETTINGS, allFields=[{"name": "text", "type": "text"}])
+
+    async def _expire():
+        for key, (capabilities, _expires_at) in list(search._index_capabilities_cache.items()):
+            search._index_capabilities_cache[key] = (capabilities, 0.0)
+
+    async def _settle():
+        await asyncio.sleep(0.05)
+
+    state = marqo(
+        probe=True,
+        index_settings=[_SETTINGS, lexical],
+        queries=("milk fever", _expire, "calf scours", _settle, "udder swelling"),
+    )
+
+    assert len(_probes(state)) == 2
+    assert [body.get("filter") for body in _searches(state)] == ["is_reference:false", "is_reference:false", None]
+    # The schema change retired the index's cached results.
+    assert marqo.redis.store.get("sva-cache-search-results-generation:vet-index") == "1"
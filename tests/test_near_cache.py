@@ -0,0 +1,222 @@
+"""In-process near-cache in front of Redis: per-namespace TTL/size, race-safe
+loads, cross-worker invalidation, and the two hot read paths that use it."""
+import asyncio
+import json
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import pytest
+
+from app.core import near_cache as nc
+from app.llm_core import concurrency
+from app.services import scheme_ingestion as si
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(nc.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def policies(monkeypatch):
+    monkeypatch.setattr(nc, "DEFAULT_POLICIES", {"hot": nc.NearCachePolicy(ttl_seconds=10.0, max_entries=2)})
+    nc._namespaces.clear()
+
+
+def test_hit_miss_expiry_and_eviction(clock, policies):
+    assert nc.get("hot", "a") is None
+    nc.put("hot", "a", 1)
+    nc.put("hot", "b", 2)
+    assert nc.get("hot", "a") == 1      # a is now most recent
+    nc.put("hot", "c", 3)               # evicts b
+
+    assert nc.get("hot", "b") is None
+    clock[0] += 10.0
+    assert nc.get("hot", "a") is None   # expired
+
+    assert nc.stats()["hot"] == {"hit": 1, "miss": 3, "eviction": 1, "invalidation": 0, "entries": 1}
+
+
+def test_namespace_without_policy_passes_through(policies):
+    loads = []
+
+    async def _load():
+        loads.append(1)
+        return "v"
+
+    for _ in range(2):
+        assert asyncio.run(nc.cached("cold", "k", _load)) == "v"
+    assert len(loads) == 2
+    assert "cold" not in nc.stats()
+
+
+def test_disabled_passes_through(monkeypatch, policies):
+    monkeypatch.setattr(nc.settings, "near_cache_enabled", False)
+    nc.put("hot", "a", 1)
+    assert nc.get("hot", "a") is None
+
+
+def test_limit_overrides(monkeypatch):
+    monkeypatch.setattr(nc.settings, "near_cache_limits", "hot=0.5:8, bad=x:1,scheme_records=600:4,nosep")
+    assert nc._limit_overrides() == {
+        "hot": nc.NearCachePolicy(0.5, 8),
+        "scheme_records": nc.NearCachePolicy(600.0, 4),
+    }
+
+
+def test_load_racing_an_invalidation_is_not_stored(policies):
+    async def _load():
+        nc.invalidate("hot", "k")       # the value changed while we were reading it
+        return "old"
+
+    assert asyncio.run(nc.cached("hot", "k", _load)) == "old"
+    assert nc.get("hot", "k") is None
+
+
+def test_none_is_not_cached(policies):
+    async def _load():
+        return None
+
+    asyncio.run(nc.cached("hot", "k", _load))
+    assert nc.stats()["hot"]["entries"] == 0
+
+
+class _FakeRedis:
+    def __init__(self, fail=False):
+        self.published = []
+        self.fail = fail
+
+    async def publish(self, channel, message):
+        if self.fail:
+            raise RuntimeError("redis down")
+        self.published.append((channel, json.loads(message)))
+
+
+def test_publish_invalidates_locally_and_broadcasts(monkeypatch, policies):
+    fake = _FakeRedis()
+    monkeypatch.setattr(nc, "redis_client", fake)
+    nc.put("hot", "k", 1)
+
+    asyncio.run(nc.publish_invalidation("hot", "k"))
+
+    assert nc.get("hot", "k") is None
+    assert fake.published == [(nc._channel(), {"ns": "hot", "key": "k", "origin": nc._ORIGIN})]
+
+
+def test_publish_failure_is_swallowed(monkeypatch, policies):
+    monkeypatch.setattr(nc, "redis_client", _FakeRedis(fail=True))
+    nc.put("hot", "k", 1)
+    asyncio.run(nc.publish_invalidation("hot", "k"))
+    assert nc.get("hot", "k") is None
+
+
+def test_messages_from_other_workers_invalidate(policies):
+    nc.put("hot", "a", 1)
+    nc.put("hot", "b", 2)
+
+    nc._handle_message(json.dumps({"ns": "hot", "key": "a", "origin": "other"}))
+    assert nc.get("hot", "a") is None and nc.get("hot", "b") == 2
+
+    nc._handle_message(json.dumps({"ns": "hot", "key": None, "origin": "other"}))
+    assert nc.get("hot", "b") is None
+
+    nc._handle_message("not json")
+
+
+def test_listener_applies_invalidations(monkeypatch, policies):
+    class _PubSub:
+        def __init__(self):
+            self.queue = asyncio.Queue()
+
+        async def subscribe(self, channel):
+            self.channel = channel
+
+        async def listen(self):
+            while True:
+                yield await self.queue.get()
+
+        async def aclose(self):
+            pass
+
+    pubsub = _PubSub()
+
+    class _Redis:
+        def pubsub(self, **kw):
+            return pubsub
+
+    monkeypatch.setattr(nc, "redis_client", _Redis())
+
+    async def _run():
+        await nc.start_near_cache_listener()
+        await asyncio.sleep(0)
+        nc.put("hot", "k", 1)
+        await pubsub.queue.put({"type": "message", "data": json.dumps({"ns": "hot", "key": "k", "origin": "w2"})})
+        for _ in range(5):
+            await asyncio.sleep(0)
+        value = nc.get("hot", "k")
+        await nc.stop_near_cache_listener()
+        return value
+
+    assert asyncio.run(_run()) is None
+    assert pubsub.channel == nc._channel()
+
+
+def test_concurrency_gauge_is_read_from_the_near_cache(monkeypatch):
+    reads = []
+
+    class _Cache:
+        async def get(self, key):
+            reads.append(key)
+            return 7
+
+        async def set(self, key, value, ttl=None):
+            pass
+
+    monkeypatch.setattr(concurrency, "cache", _Cache())
+    url = "http://oss:8020/metrics"
+
+    assert asyncio.run(concurrency.get_concurrency(url)) == 7
+    assert asyncio.run(concurrency.get_concurrency(url)) == 7
+    assert len(reads) == 1
+
+
+def test_scheme_records_are_near_cached_and_invalidated_on_write(monkeypatch):
+    class _Redis:
+        def __init__(self):
+            self.store, self.gets = {}, 0
+
+        async def get(self, key):
+            self.gets += 1
+            return self.store.get(key)
+
+        async def set(self, key, value):
+            self.store[key] = value
+
+        async def publish(self, channel, message):
+            pass
+
+    fake = _Redis()
+
+    async def _client():
+        return fake
+
+    monkeypatch.setattr(si, "get_redis_client", _client)
+    monkeypatch.setattr(nc, "redis_client", fake)
+    records = [{"union_name": "kheda", "scheme_name": "A"}]
+
+    async def _run():
+        assert await si.get_cached_source_records("src") == []      # empty: not kept
+        await si.cache_source_records("src", records)
+        first = await si.get_cached_source_records("src")
+        second = await si.get_cached_source_records("src")
+        await si.cache_source_records("src", records + records)
+        third = await si.get_cached_source_records("src")
+        return first, second, third
+
+    first, second, third = asyncio.run(_run())
+    assert first == second == records
+    assert third == records + records
+    assert fake.gets == 3
@@ -323,3 +323,19 @@ def test_recorders_noop_without_context():
     # split resolving with no context is still a clean no-op for tracing.
     asyncio.run(split.resolve_chain("", Step.AGENT, _cfg(100)))
     assert trace.current() is None
+
+
+def test_step_timings_land_in_metadata_and_summary():
+    """Preamble wall times are recorded on the explicit pt and summarized compactly."""
+    pt = trace.PipelineTrace(profile_name="managed")
+    assert trace.timings_summary(pt) is None
+    assert "timings_ms" not in pt.to_metadata()
+
+    trace.record_step_timing(pt, "pretranslation", 812.6)
+    trace.record_step_timing(pt, "history", 11.2)
+    trace.record_step_timing(pt, "preamble", 815.0)
+    trace.record_step_timing(None, "history", 1.0)  # no pt -> no-op
+
+    assert pt.to_metadata()["timings_ms"] == {"pretranslation": 813, "history": 11, "preamble": 815}
+    assert trace.timings_summary(pt) == "history=11,preamble=815,pretranslation=813"
+    assert trace.timings_summary(None) is None
@@ -162,10 +162,12 @@ class _FakeOpenAIClient:
         )
 
 
-class _FakeTGDescriptor:
-    completions_url = "http://lb/v1/completions"
-    model_id = "translategemma-27b-base"
-    endpoint = "http://lb/v1"
+def _FakeTGDescriptor():
+    return tr._TGDescriptor(
+        completions_url="http://lb/v1/completions",
+        model_id="translategemma-27b-base",
+        endpoint="http://lb/v1",
+    )
 
 
 class _FakeTier:
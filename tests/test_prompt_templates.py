@@ -0,0 +1,82 @@
+"""Prompt templates are compiled once and renders are memoized per context,
+without changing what ``get_prompt`` returns."""
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import pytest
+from jinja2 import Template
+
+from app.config import settings
+from helpers import utils
+
+PROMPT_DIR = settings.base_dir / "assets" / "prompts"
+_CONTEXT = {
+    "today_date": "Tuesday, 13 August 2026",
+    "today_datetime": "Tuesday, 13 August 2026 10:00 AM IST",
+    "farmer_context": "Name: Ramesh\nAnimals: 2 cows, 1 buffalo",
+    "ambiguity_hints": None,
+    "response_max_chars": 600,
+    "loan_max_amount": "5,000",
+    "loan_interest_rate_pct": "7",
+    "network_tools_enabled": True,
+}
+
+
+@pytest.fixture
+def loaded_prompts(monkeypatch):
+    monkeypatch.setattr(utils, "PROMPT_TEMPLATES_CACHE", {})
+    monkeypatch.setattr(utils, "_COMPILED_PROMPTS", {})
+    utils._render_memo.cache_clear()
+    utils.load_prompt_templates(PROMPT_DIR)
+    yield utils.PROMPT_TEMPLATES_CACHE
+    utils._render_memo.cache_clear()
+
+
+def _fresh(name, context):
+    source = (PROMPT_DIR / f"{name}.md").read_text(encoding="utf-8")
+    return Template(source, autoescape=False).render(**context)
+
+
+def test_templates_are_compiled_at_load_time(loaded_prompts):
+    assert set(utils._COMPILED_PROMPTS) == set(loaded_prompts)
+    compiled = utils._COMPILED_PROMPTS["agrinet_system"][1]
+
+    utils.get_prompt("agrinet_system.md", context=_CONTEXT)
+
+    assert utils._COMPILED_PROMPTS["agrinet_system"][1] is compiled
+
+
+@pytest.mark.parametrize("name", ["agrinet_system", "agrinet_system_translation_pipeline"])
+def test_memoized_render_matches_a_fresh_render(loaded_prompts, name):
+    expected = _fresh(name, _CONTEXT)
+
+    assert utils.get_prompt(name, context=_CONTEXT) == expected
+    assert utils.get_prompt(name, context=dict(reversed(list(_CONTEXT.items())))) == expected
+    assert utils._render_memo.cache_info().hits == 1
+    other = {**_CONTEXT, "farmer_context": None}
+    assert utils.get_prompt(name, context=other) == _fresh(name, other)
+
+
+def test_replacing_a_cached_source_recompiles(loaded_prompts):
+    utils.get_prompt("suggestions_system")
+    loaded_prompts["suggestions_system"] = "Hello {{ name }}"
+
+    assert utils.get_prompt("suggestions_system", context={"name": "Amul"}) == "Hello Amul"
+
+
+def test_unhashable_context_is_rendered_without_the_memo(loaded_prompts):
+    loaded_prompts["list_prompt"] = "{% for x in items %}{{ x }};{% endfor %}"
+
+    assert utils.get_prompt("list_prompt", context={"items": ["a", "b"]}) == "a;b;"
+    assert utils._render_memo.cache_info().currsize == 0
+
+
+def test_disk_fallback_matches_a_fresh_render(monkeypatch):
+    monkeypatch.setattr(utils, "PROMPT_TEMPLATES_CACHE", {})
+    context = {"today_date": "Tuesday, 13 August 2026"}
+
+    rendered = utils.get_prompt("doctor_system_translation_pipeline.md", context=context, prompt_dir=str(PROMPT_DIR))
+
+    assert rendered == _fresh("doctor_system_translation_pipeline", context)
+    assert utils._prompt_env(str(PROMPT_DIR)) is utils._prompt_env(str(PROMPT_DIR))
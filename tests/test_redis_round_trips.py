@@ -0,0 +1,145 @@
+"""Batched Redis operations and the per-turn round-trip counter."""
+import asyncio
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import pytest
+from aiocache.serializers import JsonSerializer
+from redis.asyncio.connection import Connection
+
+from app import utils as app_utils
+from app.core import cache as cache_mod
+from app.core.cache import CacheBatch, build_cache_key, count_redis_round_trips
+from app.services import chat as chat_service
+
+
+class _Pipeline:
+    def __init__(self, store, log):
+        self.store, self.log, self.ops = store, log, []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def get(self, key):
+        self.ops.append(lambda: self.store.get(key))
+
+    def set(self, key, value, ex=None):
+        def _set():
+            self.store[key] = value
+            self.log.append(("ttl", key, ex))
+            return True
+        self.ops.append(_set)
+
+    def delete(self, key):
+        self.ops.append(lambda: int(self.store.pop(key, None) is not None))
+
+    async def execute(self):
+        self.log.append(("execute", len(self.ops)))
+        return [op() for op in self.ops]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store, self.log = {}, []
+
+    def pipeline(self, transaction=True):
+        return _Pipeline(self.store, self.log)
+
+
+@pytest.fixture
+def no_socket(monkeypatch):
+    sent = []
+
+    async def _send(self, command, check_health=True):
+        sent.append(command)
+
+    monkeypatch.setattr(Connection, "send_packed_command", _send)
+    return sent
+
+
+def test_shared_clients_count_round_trips():
+    for client in (cache_mod.redis_client, cache_mod.redis_binary_client, cache_mod.cache.client):
+        assert client.connection_pool.connection_class is cache_mod._CountingConnection
+
+
+def test_counter_sees_sends_in_its_context_and_child_tasks(no_socket):
+    conn = cache_mod._CountingConnection()
+
+    async def _go():
+        await conn.send_packed_command(b"PING")  # outside any counter
+        with count_redis_round_trips() as outer:
+            await conn.send_packed_command(b"GET a")
+            with count_redis_round_trips() as inner:
+                await asyncio.gather(*(conn.send_packed_command(b"GET b") for _ in range(2)))
+            await asyncio.create_task(conn.send_packed_command(b"GET c"))
+        await conn.send_packed_command(b"PING")
+        return outer.count, inner.count
+
+    assert asyncio.run(_go()) == (4, 2)
+    assert len(no_socket) == 6
+
+
+def test_batch_is_one_pipeline_in_aiocache_format(monkeypatch):
+    monkeypatch.setattr(cache_mod.settings, "default_cache_ttl", 77)
+    fake = FakeRedis()
+    fake.store[build_cache_key("old")] = JsonSerializer().dumps(["x"])
+
+    async def _go():
+        batch = CacheBatch(fake)
+        batch.set("k", {"a": [1, 2]}, ttl=30).set("d", True).get("old").delete("old").get("old")
+        assert len(batch) == 5
+        return await batch.execute(), await batch.execute()
+
+    results, again = asyncio.run(_go())
+    assert results == [True, True, ["x"], 1, None]
+    assert again == []
+    assert [e for e in fake.log if e[0] == "execute"] == [("execute", 5)]
+    assert ("ttl", build_cache_key("k"), 30) in fake.log
+    assert ("ttl", build_cache_key("d"), 77) in fake.log
+    # Readable by aiocache's own serializer.
+    assert JsonSerializer().loads(fake.store[build_cache_key("k")]) == {"a": [1, 2]}
+
+
+def test_mark_suggestions_pending_is_one_round_trip(monkeypatch):
+    fake = FakeRedis()
+    key = "suggestions_s1_gu"
+    fake.store[build_cache_key(key)] = JsonSerializer().dumps(["stale"])
+    monkeypatch.setattr(cache_mod, "redis_client", fake)
+
+    asyncio.run(chat_service._mark_suggestions_pending(key))
+
+    assert fake.store == {build_cache_key(f"{key}:pending"): "true"}
+    assert [e for e in fake.log if e[0] == "execute"] == [("execute", 2)]
+    assert ("ttl", build_cache_key(f"{key}:pending"), chat_service.SUGGESTIONS_PENDING_TTL) in fake.log
+
+
+def test_claim_ownership_is_a_single_script(monkeypatch):
+    calls = []
+    epochs = {}
+
+    class _ScriptRedis:
+        async def eval(self, script, numkeys, *args):
+            calls.append((script, numkeys, args))
+            epoch_key, owner_key, nonce, ttl = args
+            epochs[epoch_key] = epochs.get(epoch_key, 0) + 1
+            epochs[owner_key] = f"{epochs[epoch_key]}:{nonce}"
+            return epochs[epoch_key]
+
+    monkeypatch.setattr(app_utils, "redis_client", _ScriptRedis())
+    monkeypatch.setattr(app_utils.settings, "session_owner_ttl_seconds", 45)
+
+    first = asyncio.run(app_utils.claim_session_request_ownership("s1"))
+    second = asyncio.run(app_utils.claim_session_request_ownership("s1"))
+
+    assert len(calls) == 2
+    script, numkeys, args = calls[0]
+    assert script == app_utils._CLAIM_OWNERSHIP_SCRIPT and numkeys == 2
+    assert args[:2] == (app_utils._session_epoch_key("s1"), app_utils._session_owner_key("s1"))
+    assert args[3] == "45"
+    assert (first.epoch, second.epoch) == (1, 2)
+    assert first.request_token.startswith("1:") and second.request_token.startswith("2:")
+    assert epochs[app_utils._session_owner_key("s1")] == second.request_token
@@ -7,6 +7,36 @@ import pytest
 import app.services.scheme_ingestion as si
 
 
+@pytest.fixture(autouse=True)
+def _render_on_thread(monkeypatch):
+    # The tests below stub the renderer with lambdas, which a worker process
+    # cannot unpickle; test_render_runs_in_worker_process covers the pool.
+    monkeypatch.setattr(si.settings, "scheme_pdf_render_processes", 0)
+
+
+class _PdfCacheRedis:
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value
+        return True
+
+
+@pytest.fixture(autouse=True)
+def pdf_cache(monkeypatch):
+    redis = _PdfCacheRedis()
+
+    async def _client():
+        return redis
+
+    monkeypatch.setattr(si, "get_redis_client", _client)
+    return redis
+
+
 class _FakePixmap:
     def __init__(self, payload: bytes) -> None:
         self._payload = payload
@@ -115,15 +145,15 @@ def test_extract_text_from_pdf_bytes_calls_ocr_and_merges_pages(monkeypatch):
 
 
 def test_build_banas_record_returns_expected_schema(monkeypatch):
-    async def fake_fetch_bytes(_client, _url):
-        return b"pdf"
+    async def fake_fetch(_client, _url, etag=None, last_modified=None):
+        return si.PdfFetchResult(content=b"pdf")
 
-    monkeypatch.setattr(si, "fetch_bytes", fake_fetch_bytes)
+    monkeypatch.setattr(si, "fetch_pdf_bytes_if_changed", fake_fetch)
 
     async def fake_extract(_client, _pdf_bytes):
-        return "OCR text"
+        return si.PdfOcrResult("OCR text")
 
-    monkeypatch.setattr(si, "extract_text_from_pdf_bytes", fake_extract)
+    monkeypatch.setattr(si, "ocr_pdf_bytes", fake_extract)
 
     record = asyncio.run(
         si._build_banas_record(
@@ -221,15 +251,15 @@ def test_extract_text_from_pdf_bytes_raises_when_failed_page_ratio_too_high(monk
 
 
 def test_build_banas_record_returns_none_on_parse_error(monkeypatch):
-    async def fake_fetch_bytes(_client, _url):
-        return b"pdf"
+    async def fake_fetch(_client, _url, etag=None, last_modified=None):
+        return si.PdfFetchResult(content=b"pdf")
 
-    monkeypatch.setattr(si, "fetch_bytes", fake_fetch_bytes)
+    monkeypatch.setattr(si, "fetch_pdf_bytes_if_changed", fake_fetch)
 
     async def fake_extract(_client, _pdf_bytes):
         raise si.SchemeParseError("ocr failure")
 
-    monkeypatch.setattr(si, "extract_text_from_pdf_bytes", fake_extract)
+    monkeypatch.setattr(si, "ocr_pdf_bytes", fake_extract)
 
     record = asyncio.run(
         si._build_banas_record(
@@ -602,3 +632,267 @@ def test_ingest_sursagar_source_raises_when_coverage_too_low(monkeypatch):
 
     with pytest.raises(si.SchemeParseError, match="insufficient sursagar ingestion coverage"):
         asyncio.run(si._ingest_sursagar_source(si.SURSAGAR_SOURCE, SimpleNamespace()))
+
+
+class _OcrResponse:
+    def __init__(self, pages):
+        self.pages = pages
+
+    def raise_for_status(self) -> None:
+        return None
+
+    def json(self):
+        return {"pages": self.pages}
+
+
+def test_render_runs_in_worker_process(monkeypatch):
+    fitz = pytest.importorskip("fitz")
+    doc = fitz.open()
+    for _ in range(2):
+        doc.new_page(width=72, height=72)
+    pdf_bytes = doc.tobytes()
+    monkeypatch.setattr(si.settings, "scheme_pdf_render_processes", 1)
+    monkeypatch.setattr(si.settings, "scheme_pdf_render_dpi", 36)
+    try:
+        images = asyncio.run(si._render_pdf_pages(pdf_bytes))
+        assert si._render_pool is not None
+    finally:
+        si.shutdown_render_pool()
+    assert len(images) == 2
+    assert base64.b64decode(images[0]).startswith(b"\x89PNG")
+
+
+def test_ocr_batches_pages_concurrently_and_keeps_page_order(monkeypatch):
+    monkeypatch.setattr(si.settings, "scheme_ocr_endpoint_url", "http://ocr-host:8010")
+    monkeypatch.setattr(si.settings, "scheme_ocr_batch_size", 2)
+    monkeypatch.setattr(si.settings, "scheme_ocr_concurrency", 2)
+    monkeypatch.setattr(si, "SCHEME_OCR_MAX_FAILED_PAGE_RATIO", 0.5)
+    images = [f"img-{i}" for i in range(7)]
+    monkeypatch.setattr(si, "render_pdf_to_base64_images", lambda *_a, **_kw: images)
+    state = {"now": 0, "peak": 0, "sent": []}
+
+    class _Client:
+        async def post(self, url, json, timeout):
+            state["sent"].append(list(json["images"]))
+            state["now"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+            # Later batches finish first.
+            await asyncio.sleep(0.01 * (10 - len(state["sent"])))
+            state["now"] -= 1
+            batch = json["images"]
+            if batch == ["img-6"]:
+                return _OcrResponse([])  # last page lost
+            return _OcrResponse([{"markdown": f"text {image}"} for image in batch])
+
+    text = asyncio.run(si.extract_text_from_pdf_bytes(_Client(), b"pdf"))
+
+    assert sorted(state["sent"]) == [["img-0", "img-1"], ["img-2", "img-3"], ["img-4", "img-5"], ["img-6"]]
+    assert state["peak"] == 2
+    assert text == "\n\n".join(f"text img-{i}" for i in range(6))
+
+
+def test_short_batch_response_counts_missing_pages_as_failed(monkeypatch):
+    monkeypatch.setattr(si.settings, "scheme_ocr_endpoint_url", "http://ocr-host:8010")
+    monkeypatch.setattr(si.settings, "scheme_ocr_batch_size", 4)
+    monkeypatch.setattr(si, "render_pdf_to_base64_images", lambda *_a, **_kw: ["a", "b", "c", "d"])
+
+    class _Client:
+        async def post(self, url, json, timeout):
+            return _OcrResponse([{"markdown": "A"}, {"markdown": "B"}])
+
+    with pytest.raises(si.SchemeParseError, match="failed=2/4"):
+        asyncio.run(si.extract_text_from_pdf_bytes(_Client(), b"pdf"))
+
+
+def test_pdfs_build_concurrently_in_link_order(monkeypatch):
+    monkeypatch.setattr(si.settings, "scheme_pdf_concurrency", 3)
+    links = [{"scheme_title": f"S{i}", "scheme_url": f"https://example.com/{i}.pdf"} for i in range(8)]
+    state = {"now": 0, "peak": 0, "heartbeats": 0}
+
+    async def fake_build(**kwargs):
+        state["now"] += 1
+        state["peak"] = max(state["peak"], state["now"])
+        await asyncio.sleep(0.01 * (8 - int(kwargs["scheme_title"][1:])))
+        state["now"] -= 1
+        return {"scheme_title": kwargs["scheme_title"]}
+
+    async def fake_extend(source_key, lock_token, redis_client=None):
+        state["heartbeats"] += 1
+        return True
+
+    monkeypatch.setattr(si, "_build_pdf_record", fake_build)
+    monkeypatch.setattr(si, "extend_refresh_lock", fake_extend)
+
+    records = asyncio.run(si._ingest_pdf_source(si.SUMUL_SOURCE, links, SimpleNamespace(), lock_token="tok"))
+
+    assert [r["scheme_title"] for r in records] == [f"S{i}" for i in range(8)]
+    assert state["peak"] == 3
+    assert state["heartbeats"] == 8
+
+
+def test_failed_pdf_build_cancels_the_remaining_builds(monkeypatch):
+    monkeypatch.setattr(si.settings, "scheme_pdf_concurrency", 2)
+    links = [{"scheme_title": f"S{i}", "scheme_url": f"https://example.com/{i}.pdf"} for i in range(6)]
+    started, finished = [], []
+
+    async def fake_build(**kwargs):
+        started.append(kwargs["scheme_title"])
+        if kwargs["scheme_title"] == "S0":
+            raise si.SchemeDependencyError("ocr down")
+        await asyncio.sleep(0.05)
+        finished.append(kwargs["scheme_title"])
+        return {"scheme_title": kwargs["scheme_title"]}
+
+    async def _run():
+        with pytest.raises(si.SchemeDependencyError):
+            await si._ingest_pdf_source(si.SUMUL_SOURCE, links, SimpleNamespace())
+        await asyncio.sleep(0.1)  # anything left running would finish here
+
+    monkeypatch.setattr(si, "_build_pdf_record", fake_build)
+    asyncio.run(_run())
+
+    # S0's slot may pass to S2 before the failure is seen; the rest never start.
+    assert started[:2] == ["S0", "S1"] and len(started) <= 3
+    assert finished == []
+
+
+def test_refresh_reports_duration_per_source(monkeypatch):
+    observed = []
+
+    async def fake_acquire(source_key, redis_client=None):
+        return "tok"
+
+    async def fake_release(source_key, lock_token, redis_client=None):
+        return None
+
+    async def fake_ingest(source, client):
+        return [{"scheme_title": "A"}]
+
+    async def fake_cache(source_key, records, redis_client=None):
+        return None
+
+    monkeypatch.setattr(si, "acquire_refresh_lock", fake_acquire)
+    monkeypatch.setattr(si, "release_refresh_lock", fake_release)
+    monkeypatch.setattr(si, "_ingest_sarhad_source", fake_ingest)
+    monkeypatch.setattr(si, "cache_source_records", fake_cache)
+    monkeypatch.setattr(si._metrics, "observe_scheme_refresh", lambda *args: observed.append(args))
+
+    assert asyncio.run(si.refresh_scheme_source(si.SARHAD_SOURCE, client=SimpleNamespace())) is True
+    assert len(observed) == 1
+    source, outcome, seconds = observed[0]
+    assert (source, outcome) == (si.SARHAD_SOURCE.source_name, "refreshed")
+    assert seconds >= 0
+
+
+class _PdfResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code, self.content, self.headers = status_code, content, headers or {}
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise si.httpx.HTTPStatusError("bad", request=None, response=self)
+
+
+class _PdfServer:
+    """Serves one PDF with an ETag; honours If-None-Match."""
+
+    def __init__(self, content=b"%PDF-1", etag='"v1"'):
+        self.content, self.etag, self.requests = content, etag, []
+
+    async def get(self, url, follow_redirects=True, headers=None):
+        self.requests.append(dict(headers or {}))
+        if (headers or {}).get("If-None-Match") == self.etag:
+            return _PdfResponse(304)
+        return _PdfResponse(200, self.content, {"ETag": self.etag, "Last-Modified": "Wed, 01 Jul 2026 00:00:00 GMT"})
+
+
+def _build(server, redis=None):
+    return asyncio.run(
+        si._build_pdf_record(
+            client=server,
+            source=si.SUMUL_SOURCE,
+            scheme_title="Scheme",
+            scheme_url="https://example.com/scheme.pdf",
+            last_refreshed_at="2026-07-01T00:00:00Z",
+            redis_client=redis,
+        )
+    )
+
+
+def test_unchanged_pdf_is_not_ocred_again(monkeypatch, pdf_cache):
+    ocr_calls = []
+    results = []
+
+    async def fake_extract(_client, pdf_bytes):
+        ocr_calls.append(pdf_bytes)
+        return si.PdfOcrResult(f"text of {pdf_bytes.decode()}")
+
+    monkeypatch.setattr(si, "ocr_pdf_bytes", fake_extract)
+    monkeypatch.setattr(si._metrics, "record_scheme_pdf", results.append)
+    server = _PdfServer()
+
+    first = _build(server)
+    second = _build(server)  # 304 Not Modified
+    server.etag = '"v2"'  # new validator, same bytes
+    third = _build(server)
+    server.content, server.etag = b"%PDF-2", '"v3"'
+    fourth = _build(server)
+
+    assert first["content"] == second["content"] == third["content"] == "text of %PDF-1"
+    assert fourth["content"] == "text of %PDF-2"
+    assert ocr_calls == [b"%PDF-1", b"%PDF-2"]
+    assert results == ["extracted", "not_modified", "unchanged", "extracted"]
+    assert server.requests[0] == {}
+    assert server.requests[1] == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Wed, 01 Jul 2026 00:00:00 GMT",
+    }
+    entry = si.json.loads(pdf_cache.store[si.build_scheme_pdf_cache_key("https://example.com/scheme.pdf")])
+    assert entry["etag"] == '"v3"' and entry["sha256"] == si.hashlib.sha256(b"%PDF-2").hexdigest()
+
+
+def test_changed_ocr_settings_invalidate_cached_text(monkeypatch, pdf_cache):
+    ocr_calls = []
+
+    async def fake_extract(_client, pdf_bytes):
+        ocr_calls.append(pdf_bytes)
+        return si.PdfOcrResult("text")
+
+    monkeypatch.setattr(si, "ocr_pdf_bytes", fake_extract)
+    server = _PdfServer()
+    _build(server)
+    monkeypatch.setattr(si, "SCHEME_OCR_PROMPT_TYPE", "ocr_plain")
+
+    _build(server)
+
+    assert len(ocr_calls) == 2
+    assert server.requests[1] == {}  # no validators sent for an unusable entry
+
+
+def test_failed_ocr_is_not_cached(monkeypatch, pdf_cache):
+    async def fake_extract(_client, _pdf_bytes):
+        raise si.SchemeParseError("ocr failure")
+
+    monkeypatch.setattr(si, "ocr_pdf_bytes", fake_extract)
+
+    assert _build(_PdfServer()) is None
+    assert pdf_cache.store == {}
+
+
+def test_partial_ocr_text_is_served_but_not_cached(monkeypatch, pdf_cache):
+    ocr_calls = []
+
+    async def fake_extract(_client, pdf_bytes):
+        ocr_calls.append(pdf_bytes)
+        return si.PdfOcrResult("pages 1-9", failed_pages=1 if len(ocr_calls) == 1 else 0)
+
+    monkeypatch.setattr(si, "ocr_pdf_bytes", fake_extract)
+    server = _PdfServer()
+
+    assert _build(server)["content"] == "pages 1-9"
+    assert pdf_cache.store == {}
+    _build(server)  # same bytes: OCR'd again, now complete and cached
+    _build(server)
+
+    assert len(ocr_calls) == 2
+    assert server.requests[1] == {}
@@ -0,0 +1,92 @@
+"""BM25 reranking of search_documents candidates (agents/tools/search_rerank.py)."""
+import json
+import math
+import os
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import pytest
+
+from agents.tools import search, search_rerank
+
+_CORPUS = json.loads((Path(__file__).parent / "fixtures" / "rerank_corpus.json").read_text(encoding="utf-8"))
+
+
+@pytest.fixture(autouse=True)
+def _fresh(monkeypatch):
+    monkeypatch.setattr(search_rerank.settings, "marqo_rerank_idf_path", "")
+    monkeypatch.setattr(search_rerank.settings, "marqo_rerank_doc_cache_size", 4096)
+    search_rerank.clear_doc_stats()
+    yield
+    search_rerank.clear_doc_stats()
+
+
+def _hit(doc_id, text, score=0.5, **extra):
+    return {"_id": doc_id, "text": text, "_score": score, **extra}
+
+
+def test_lexical_score_is_bm25_over_the_candidate_pool():
+    hits = [_hit("a", "mastitis mastitis udder"), _hit("b", "udder care"), _hit("c", "fodder")]
+    ranked = search_rerank.bm25_rerank("mastitis", hits)
+
+    # Pool IDF for "mastitis" (df=1 of 3); doc a: tf=2, len 3, avgdl 2.
+    idf = math.log1p((3 - 1 + 0.5) / (1 + 0.5))
+    bm25 = idf * 2 * 2.2 / (2 + 1.2 * (0.25 + 0.75 * 3 / 2))
+    expected = search_rerank.LEXICAL_WEIGHT * bm25 / max(bm25, idf)
+    assert [h["_id"] for h in ranked] == ["a", "b", "c"]
+    assert ranked[0]["_rerank_score"] == pytest.approx(expected)
+    assert ranked[1]["_rerank_score"] == ranked[2]["_rerank_score"] == 0.0
+
+
+def test_blend_keeps_semantic_metadata_and_reference_terms():
+    hits = [
+        _hit("ref", "mastitis treatment", 0.9, is_reference=True),
+        _hit("doc", "mastitis treatment", 0.9),
+        _hit("meta", "unrelated", 0.5, name="Mastitis treatment"),
+    ]
+    ranked = search_rerank.bm25_rerank("mastitis treatment", hits)
+
+    assert [h["_id"] for h in ranked] == ["doc", "ref", "meta"]
+    assert ranked[0]["_rerank_score"] - ranked[1]["_rerank_score"] == pytest.approx(0.12)
+    # Only "meta" has metadata tokens: 2 vs an average of 2/3 per candidate.
+    meta_bm25 = 2.2 / (1 + 1.2 * (0.25 + 0.75 * 3))
+    assert ranked[2]["_rerank_score"] == pytest.approx((0.30 + 0.08) * meta_bm25)
+    assert "_rerank_score" not in hits[0]  # input hits are not mutated
+
+
+def test_doc_stats_are_cached_by_id_and_content(monkeypatch):
+    calls = []
+    compute = search_rerank._compute_stats
+    monkeypatch.setattr(search_rerank, "_compute_stats", lambda *a: calls.append(a) or compute(*a))
+
+    for _ in range(3):
+        search_rerank.bm25_rerank("milk", [_hit("a", "milk yield"), _hit("b", "milk")])
+    assert len(calls) == 2
+
+    search_rerank.bm25_rerank("milk", [_hit("a", "milk yield drop"), _hit("", "milk")])
+    assert len(calls) == 4  # edited text under the same _id, and a hit without _id
+
+
+def test_idf_snapshot_round_trips_and_bad_files_fall_back(tmp_path):
+    snapshot = search_rerank.IdfSnapshot.from_documents(_CORPUS["documents"])
+    path = tmp_path / "idf.json"
+    path.write_text(json.dumps(snapshot.to_json()))
+    bad = tmp_path / "bad.json"
+    bad.write_text("{}")
+
+    assert search_rerank.load_idf_snapshot(str(path)) == snapshot
+    assert search_rerank.load_idf_snapshot(str(bad)) is None
+    assert snapshot.n_docs == len(_CORPUS["documents"]) and snapshot.text_df["mastitis"] >= 3
+
+
+def test_bm25_ranks_the_fixture_corpus_at_least_as_well_as_token_overlap():
+    def _mrr(rerank):
+        total = 0.0
+        for query in _CORPUS["queries"]:
+            hits = [dict(doc, _score=query["marqo_scores"][doc["_id"]]) for doc in _CORPUS["documents"]]
+            ranked = [h["_id"] for h in rerank(query["query"], hits)]
+            total += next(1.0 / (i + 1) for i, doc_id in enumerate(ranked) if doc_id in query["relevant"])
+        return total / len(_CORPUS["queries"])
+
+    assert _mrr(search._rerank_hits) >= _mrr(search._overlap_rerank_hits)
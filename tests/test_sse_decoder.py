@@ -0,0 +1,129 @@
+"""TranslateGemma SSE decoding and the descriptor-owned keep-alive session."""
+import asyncio
+import json
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import pytest
+from aiohttp import web
+
+from app.llm_core import factory
+from app.llm_core.factory import TGDescriptor
+from app.services.sse import SSEDataDecoder
+
+
+def _body(*texts) -> bytes:
+    lines = [f"data: {json.dumps({'choices': [{'text': t}]})}\n" for t in texts]
+    return ("".join(lines) + "data: [DONE]\n").encode("utf-8")
+
+
+def _legacy_decode(chunks) -> list[str]:
+    """The reader SSEDataDecoder replaced, for parity."""
+    out, buffer = [], b""
+    for chunk in chunks:
+        buffer += chunk
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            line = line.decode("utf-8").strip()
+            if line.startswith("data: "):
+                data = line[6:]
+                if data == "[DONE]":
+                    return out
+                out.append(data)
+    return out
+
+
+def _decode(chunks) -> list[str]:
+    decoder = SSEDataDecoder()
+    out = []
+    for chunk in chunks:
+        out.extend(decoder.feed(chunk))
+    return out
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 4096])
+def test_decoder_matches_legacy_reader_for_any_chunking(size):
+    # Gujarati is 3 bytes/char in UTF-8, so small sizes split characters too.
+    body = b": keep-alive\n\nevent: x\n" + _body("ગાભણ", " ગાય.", "", "ok\r")
+    chunks = [body[i:i + size] for i in range(0, len(body), size)]
+
+    assert _decode(chunks) == _legacy_decode(chunks)
+    assert [json.loads(d)["choices"][0]["text"] for d in _decode(chunks)] == ["ગાભણ", " ગાય.", "", "ok\r"]
+
+
+def test_decoder_stops_at_done_and_ignores_later_bytes():
+    decoder = SSEDataDecoder()
+    assert decoder.feed(b"data: a\ndata: [DONE]\ndata: b\n") == ["a"]
+    assert decoder.done
+    assert decoder.feed(b"data: c\n") == []
+
+
+def test_decoder_never_emits_an_unterminated_line():
+    decoder = SSEDataDecoder()
+    assert decoder.feed(b"data: a\ndata: partial") == ["a"]
+    assert decoder.feed(b"") == []
+    assert decoder.feed(b"-rest\n") == ["partial-rest"]
+
+
+def test_descriptor_session_is_private_when_not_started():
+    d = TGDescriptor(completions_url="http://tg/v1/completions", model_id="m", endpoint="http://tg/v1")
+
+    async def _go():
+        async with d.session() as s1:
+            pass
+        async with d.session() as s2:
+            pass
+        return s1, s2
+
+    s1, s2 = asyncio.run(_go())
+    assert s1 is not s2
+    assert s1.closed and s2.closed
+
+
+def test_started_descriptor_streams_over_one_keepalive_connection(monkeypatch):
+    async def _go():
+        peers = []
+
+        async def _completions(request):
+            peers.append(request.transport.get_extra_info("peername"))
+            resp = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+            await resp.prepare(request)
+            body = _body("ગાભણ", " ગાય.")
+            for i in range(0, len(body), 5):
+                await resp.write(body[i:i + 5])
+            await resp.write_eof()
+            return resp
+
+        app = web.Application()
+        app.router.add_post("/v1/completions", _completions)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        endpoint = f"http://127.0.0.1:{port}/v1"
+        d = TGDescriptor(completions_url=f"{endpoint}/completions", model_id="m", endpoint=endpoint)
+
+        from app.services import translation as tr
+
+        await factory.start_tg_sessions()
+        try:
+            outs = []
+            for _ in range(3):
+                outs.append([
+                    c async for c in tr._translategemma_stream(d, "p", "english", "gujarati", "src", 0.0, 64)
+                ])
+            shared = factory._tg_sessions[endpoint]
+        finally:
+            await factory.close_tg_sessions()
+            await runner.cleanup()
+        return outs, peers, shared
+
+    monkeypatch.setattr("app.services.translation._get_langfuse", lambda: None)
+    outs, peers, shared = asyncio.run(_go())
+
+    assert outs == [["ગાભણ", " ગાય."]] * 3
+    assert len(peers) == 3 and len(set(peers)) == 1
+    assert shared.closed
+    assert factory._tg_sessions == {}
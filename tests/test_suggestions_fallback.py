@@ -24,7 +24,7 @@ def oss_on(monkeypatch, install_chain):
     monkeypatch.setattr(fb, "emit", events.append)
 
     # neutralize history / cache I/O so we isolate the fallback wiring
-    async def fake_hist(session_id):
+    async def fake_hist(session_id, **_kw):
         return []
 
     async def fake_set_cache(*a, **k):
@@ -0,0 +1,143 @@
+"""The turn-preamble task-graph runner (app/services/task_graph.py)."""
+import asyncio
+
+import pytest
+
+from app.services.task_graph import TaskStep, run_task_graph
+
+
+def test_independent_steps_run_concurrently():
+    events: list[str] = []
+
+    def _step(name, delay):
+        async def _run():
+            events.append(f"start:{name}")
+            await asyncio.sleep(delay)
+            events.append(f"end:{name}")
+            return name
+        return _run
+
+    steps = [TaskStep("a", _step("a", 0.05)), TaskStep("b", _step("b", 0.05)), TaskStep("c", _step("c", 0.05))]
+    loop_time = {}
+
+    async def _go():
+        t0 = asyncio.get_running_loop().time()
+        out = await run_task_graph(steps)
+        loop_time["elapsed"] = asyncio.get_running_loop().time() - t0
+        return out
+
+    assert asyncio.run(_go()) == {"a": "a", "b": "b", "c": "c"}
+    assert events[:3] == ["start:a", "start:b", "start:c"]
+    assert loop_time["elapsed"] < 0.12  # ~max, not sum
+
+
+def test_dependents_receive_upstream_results_and_wait_for_them():
+    order: list[str] = []
+
+    async def _history():
+        await asyncio.sleep(0.02)
+        order.append("history")
+        return ["m1", "m2"]
+
+    async def _pretranslate():
+        order.append("pretranslation")
+        return "How much water?"
+
+    async def _moderate(history, pretranslation):
+        order.append("moderation")
+        return f"{len(history)}:{pretranslation}"
+
+    steps = [
+        TaskStep("moderation", _moderate, after=("history", "pretranslation")),
+        TaskStep("history", _history),
+        TaskStep("pretranslation", _pretranslate),
+    ]
+    out = asyncio.run(run_task_graph(steps))
+
+    assert out["moderation"] == "2:How much water?"
+    assert order.index("moderation") > order.index("history")
+    assert list(out) == ["moderation", "history", "pretranslation"]
+
+
+def test_first_failure_cancels_running_siblings_and_propagates():
+    cancelled: list[str] = []
+
+    async def _slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append("slow")
+            raise
+
+    async def _boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("redis down")
+
+    never_started: list[str] = []
+
+    async def _after(boom):
+        never_started.append("after")
+
+    steps = [TaskStep("slow", _slow), TaskStep("boom", _boom), TaskStep("after", _after, after=("boom",))]
+    with pytest.raises(RuntimeError, match="redis down"):
+        asyncio.run(asyncio.wait_for(run_task_graph(steps), 2))
+    assert cancelled == ["slow"]
+    assert never_started == []
+
+
+def test_cancelling_the_caller_cancels_every_step():
+    cancelled: list[str] = []
+
+    def _hang(name):
+        async def _run():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(name)
+                raise
+        return _run
+
+    async def _go():
+        task = asyncio.create_task(run_task_graph([TaskStep("a", _hang("a")), TaskStep("b", _hang("b"))]))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(_go())
+    assert sorted(cancelled) == ["a", "b"]
+
+
+def test_step_wall_times_are_reported():
+    seen: dict[str, float] = {}
+
+    async def _fast():
+        return 1
+
+    async def _slow():
+        await asyncio.sleep(0.03)
+        return 2
+
+    asyncio.run(run_task_graph(
+        [TaskStep("fast", _fast), TaskStep("slow", _slow)],
+        on_step_done=lambda name, ms: seen.__setitem__(name, ms),
+    ))
+    assert set(seen) == {"fast", "slow"}
+    assert seen["slow"] >= 25 > seen["fast"]
+
+
+@pytest.mark.parametrize(
+    "steps,message",
+    [
+        ([TaskStep("a", None), TaskStep("a", None)], "duplicate"),
+        ([TaskStep("a", None, after=("missing",))], "unknown"),
+        ([TaskStep("a", None, after=("b",)), TaskStep("b", None, after=("a",))], "cycle"),
+    ],
+)
+def test_malformed_graphs_are_rejected_before_anything_runs(steps, message):
+    with pytest.raises(ValueError, match=message):
+        asyncio.run(run_task_graph(steps))
+
+
+def test_empty_graph_is_a_no_op():
+    assert asyncio.run(run_task_graph([])) == {}
@@ -66,15 +66,12 @@ def test_no_langfuse_client_is_a_noop(monkeypatch):
 
 def _drive(monkeypatch, *, agent_raises=False, stop_after=None):
     """Drive a real turn through stream_chat_messages and return emitted outcomes."""
-    from tests.test_chat_turn_sequence import (
-        _Cache, _Run, _delta,
-    )
+    from tests.test_chat_turn_sequence import _Run, _delta
     from fastapi import BackgroundTasks
 
     scored = _capture(monkeypatch)
     monkeypatch.setattr(chat_service.settings, "fallback_enabled", False)
     monkeypatch.setattr(chat_service, "propagate_attributes", None)
-    monkeypatch.setattr(chat_service, "cache", _Cache())
     monkeypatch.setattr(chat_service, "trim_history", lambda *_a, **_k: [])
     monkeypatch.setattr(chat_service, "format_message_pairs", lambda *_a, **_k: "")
 
@@ -100,7 +97,7 @@ def _drive(monkeypatch, *, agent_raises=False, stop_after=None):
     monkeypatch.setattr(chat_service.agrinet_agent, "iter", _iter)
     monkeypatch.setattr(chat_service, "translate_text_stream_fast", _tr)
     monkeypatch.setattr(chat_service, "update_message_history", _noop)
-    monkeypatch.setattr(chat_service, "set_cache", _noop)
+    monkeypatch.setattr(chat_service, "_mark_suggestions_pending", _noop)
     monkeypatch.setattr(chat_service, "create_suggestions", lambda *_a, **_k: None)
 
     async def _go():
@@ -32,6 +32,7 @@ from pathlib import Path
 from types import SimpleNamespace
 from unittest.mock import patch
 
+import httpx
 import pytest
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -180,7 +181,7 @@ class _FakeCache:
 @pytest.fixture
 def bpp():
     fake = _FakeBpp()
-    with patch.object(vistaar.httpx, "AsyncClient", return_value=fake):
+    with patch.object(httpx, "AsyncClient", return_value=fake):
         yield fake
 
 
@@ -432,7 +433,7 @@ class TestCandidateFallback:
                      "errors": {vistaar.VISTAAR_LEG: "timeout"}}
                 )
 
-        with patch.object(vistaar.httpx, "AsyncClient", return_value=_DeadLeg()):
+        with patch.object(httpx, "AsyncClient", return_value=_DeadLeg()):
             out = await vistaar.get_vistaar_mandi_prices(ctx(district="kutch"), "Wheat")
         assert "temporarily unavailable" in out.lower()
         assert "No mandi prices were found" not in out
@@ -465,7 +466,7 @@ class TestProvenance:
                     item["descriptor"]["name"] = "Onion Green"
                 return response
 
-        with patch.object(vistaar.httpx, "AsyncClient", return_value=_Fuzzy()):
+        with patch.object(httpx, "AsyncClient", return_value=_Fuzzy()):
             out = await vistaar.get_vistaar_mandi_prices(ctx(district="anand"), "Onion")
         assert "Onion Green" in out, "a fuzzy BPP match must not be invisible"
 
@@ -21,6 +21,7 @@ from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from unittest.mock import patch
 
+import httpx
 import pytest
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -340,7 +341,7 @@ class TestMandiIntent:
     @pytest.mark.asyncio
     async def test_intent_carries_flat_from_and_to_date_tags(self):
         fake = _FakeAsyncClient(_seeker_payload([_mandi_item(_days_ago_str(1))]))
-        with patch.object(vistaar.httpx, "AsyncClient", return_value=fake):
+        with patch.object(httpx, "AsyncClient", return_value=fake):
             await vistaar.get_vistaar_mandi_prices(
                 None, "Onion", None, _days_ago_str(9), _days_ago_str(2)
             )
@@ -360,7 +361,7 @@ class TestMandiIntent:
     async def test_intent_always_sends_a_window_even_with_no_dates(self):
         # Sending no window is the original bug: one row from Padra APMC.
         fake = _FakeAsyncClient(_seeker_payload([_mandi_item(_days_ago_str(1))]))
-        with patch.object(vistaar.httpx, "AsyncClient", return_value=fake):
+        with patch.object(httpx, "AsyncClient", return_value=fake):
             await vistaar.get_vistaar_mandi_prices(None, "Onion")
         codes = {t["code"]: t["value"] for t in fake.calls[0][1]["intent"]["tags"]}
         assert codes["from_date"] == _days_ago_str(DEFAULT_DAYS)
@@ -369,7 +370,7 @@ class TestMandiIntent:
     @pytest.mark.asyncio
     async def test_intent_keeps_commodity_category_and_anand_location(self):
         fake = _FakeAsyncClient(_seeker_payload([]))
-        with patch.object(vistaar.httpx, "AsyncClient", return_value=fake):
+        with patch.object(httpx, "AsyncClient", return_value=fake):
             await vistaar.get_vistaar_mandi_prices(None, "Tomato")
         intent = fake.calls[0][1]["intent"]
         assert intent["category"]["descriptor"]["code"] == "price-discovery"
@@ -383,7 +384,7 @@ class TestMandiIntent:
         # selects a market, so dropping it would silently answer from the
         # BPP's fallback market with no error anywhere.
         fake = _FakeAsyncClient(_seeker_payload([]))
-        with patch.object(vistaar.httpx, "AsyncClient", return_value=fake):
+        with patch.object(httpx, "AsyncClient", return_value=fake):
             await vistaar.get_vistaar_mandi_prices(None, "Tomato")
         gps = fake.calls[0][1]["intent"]["fulfillment"]["end"]["location"]["gps"]
         lat, lon = (float(v) for v in gps.split(","))
@@ -393,7 +394,7 @@ class TestMandiIntent:
     async def test_returns_the_series_with_the_window_in_the_header(self):
         items = [_mandi_item(_days_ago_str(d)) for d in (1, 3, 5)]
         fake = _FakeAsyncClient(_seeker_payload(items))
-        with patch.object(vistaar.httpx, "AsyncClient", return_value=fake):
+        with patch.object(httpx, "AsyncClient", return_value=fake):
             out = await vistaar.get_vistaar_mandi_prices(None, "Onion", None, _days_ago_str(9))
         assert out.startswith(
             f"Mandi prices for Onion near Anand ({_days_ago_str(9)} to {_today_ist_str()}):"
@@ -406,7 +407,7 @@ class TestMandiIntent:
         # caps at 20 items, which would silently eat a third of the window.
         items = [_mandi_item(_days_ago_str(d)) for d in range(28)]
         fake = _FakeAsyncClient(_seeker_payload(items))
-        with patch.object(vistaar.httpx, "AsyncClient", return_value=fake):
+        with patch.object(httpx, "AsyncClient", return_value=fake):
             out = await vistaar.get_vistaar_mandi_prices(None, "Onion")
         rows = [l for l in out.splitlines() if l.startswith("- ")]
         assert len(rows) == 28, f"expected all 28 dated rows, got {len(rows)}"
@@ -415,7 +416,7 @@ class TestMandiIntent:
     @pytest.mark.asyncio
     async def test_empty_result_names_the_window_searched(self):
         fake = _FakeAsyncClient(_seeker_payload([]))
-        with patch.object(vistaar.httpx, "AsyncClient", return_value=fake):
+        with patch.object(httpx, "AsyncClient", return_value=fake):
             out = await vistaar.get_vistaar_mandi_prices(None, "Onion")
         assert "No mandi prices were found" in out
         assert _days_ago_str(DEFAULT_DAYS) in out and _today_ist_str() in out
@@ -426,7 +427,7 @@ class TestMandiIntent:
             async def post(self, url, json=None):
                 raise RuntimeError("connection reset")
 
-        with patch.object(vistaar.httpx, "AsyncClient", return_value=_Boom(None)):
+        with patch.object(httpx, "AsyncClient", return_value=_Boom(None)):
             out = await vistaar.get_vistaar_mandi_prices(None, "Onion")
         assert "temporarily unavailable" in out
 
@@ -21,6 +21,7 @@ import sys
 from pathlib import Path
 from unittest.mock import patch
 
+import httpx
 import pytest
 from pydantic_ai import Tool
 
@@ -123,7 +124,7 @@ async def test_unresolvable_scheme_never_leaks_the_code_list():
 async def test_free_phrasing_is_resolved_rather_than_rejected():
     """The merged discovery path calls this with the farmer's own words."""
     clients = []
-    with patch.object(vistaar.httpx, "AsyncClient",
+    with patch.object(httpx, "AsyncClient",
                       _client_factory(_seeker_ok([SCHEME_ITEM]), clients)):
         out = await vistaar.get_vistaar_scheme_info("Kisan Credit Card")
     sent = clients[0].calls[0][1]["intent"]["item"]["descriptor"]["name"]
@@ -134,7 +135,7 @@ async def test_free_phrasing_is_resolved_rather_than_rejected():
 @pytest.mark.asyncio
 async def test_empty_catalogue_message_names_the_scheme_not_the_code():
     clients = []
-    with patch.object(vistaar.httpx, "AsyncClient", _client_factory(_seeker_ok([]), clients)):
+    with patch.object(httpx, "AsyncClient", _client_factory(_seeker_ok([]), clients)):
         out = await vistaar.get_vistaar_scheme_info("kcc")
     assert "Kisan Credit Card" in out
     assert "'kcc'" not in out
@@ -147,7 +148,7 @@ async def test_seeker_error_raises_rather_than_returning_no_items():
     leg = vistaar.VISTAAR_LEG
     payload = {"results": {leg: None}, "errors": {leg: "timeout"}}
     clients = []
-    with patch.object(vistaar.httpx, "AsyncClient", _client_factory(payload, clients)):
+    with patch.object(httpx, "AsyncClient", _client_factory(payload, clients)):
         with pytest.raises(vistaar.VistaarLegUnavailable):
             await vistaar._vistaar_search({"category": {"descriptor": {"code": "schemes-agri"}}})
 
@@ -159,7 +160,7 @@ async def test_dead_leg_reports_mandi_prices_unavailable_not_none_found():
     leg = vistaar.VISTAAR_LEG
     payload = {"results": {leg: None}, "errors": {leg: "timeout"}}
     clients = []
-    with patch.object(vistaar.httpx, "AsyncClient", _client_factory(payload, clients)):
+    with patch.object(httpx, "AsyncClient", _client_factory(payload, clients)):
         out = await vistaar.get_vistaar_mandi_prices(None, "Tomato")
     assert "temporarily unavailable" in out.lower()
     assert "No mandi prices were found" not in out
@@ -170,7 +171,7 @@ async def test_dead_leg_reports_scheme_info_unavailable_not_not_found():
     leg = vistaar.VISTAAR_LEG
     payload = {"results": {leg: None}, "errors": {leg: "timeout"}}
     clients = []
-    with patch.object(vistaar.httpx, "AsyncClient", _client_factory(payload, clients)):
+    with patch.object(httpx, "AsyncClient", _client_factory(payload, clients)):
         out = await vistaar.get_vistaar_scheme_info("kcc")
     assert "temporarily unavailable" in out.lower()
     assert "No information was found" not in out
@@ -182,7 +183,7 @@ async def test_null_leg_without_an_errors_entry_is_still_a_failure():
     no error entry is still not a catalogue."""
     payload = {"results": {vistaar.VISTAAR_LEG: None}}
     clients = []
-    with patch.object(vistaar.httpx, "AsyncClient", _client_factory(payload, clients)):
+    with patch.object(httpx, "AsyncClient", _client_factory(payload, clients)):
         out = await vistaar.get_vistaar_mandi_prices(None, "Tomato")
     assert "temporarily unavailable" in out.lower()
 
@@ -191,7 +192,7 @@ async def test_null_leg_without_an_errors_entry_is_still_a_failure():
 async def test_direct_bap_with_no_on_search_is_a_failure_not_an_empty_catalogue():
     clients = []
     with patch.object(vistaar, "VISTAAR_SEEKER_URL", ""):
-        with patch.object(vistaar.httpx, "AsyncClient", _client_factory({"responses": []}, clients)):
+        with patch.object(httpx, "AsyncClient", _client_factory({"responses": []}, clients)):
             with pytest.raises(vistaar.VistaarLegUnavailable):
                 await vistaar._vistaar_search(
                     {"category": {"descriptor": {"code": "price-discovery"}}}
@@ -203,7 +204,7 @@ async def test_direct_bap_with_an_empty_catalogue_remains_a_genuine_miss():
     payload = {"responses": [{"message": {"catalog": {"providers": []}}}]}
     clients = []
     with patch.object(vistaar, "VISTAAR_SEEKER_URL", ""):
-        with patch.object(vistaar.httpx, "AsyncClient", _client_factory(payload, clients)):
+        with patch.object(httpx, "AsyncClient", _client_factory(payload, clients)):
             assert await vistaar._vistaar_search(
                 {"category": {"descriptor": {"code": "price-discovery"}}}
             ) == []
@@ -213,7 +214,7 @@ async def test_direct_bap_with_an_empty_catalogue_remains_a_genuine_miss():
 async def test_healthy_but_empty_leg_still_says_none_found():
     """The unavailable message must not swallow genuine misses."""
     clients = []
-    with patch.object(vistaar.httpx, "AsyncClient", _client_factory(_seeker_ok([]), clients)):
+    with patch.object(httpx, "AsyncClient", _client_factory(_seeker_ok([]), clients)):
         out = await vistaar.get_vistaar_mandi_prices(None, "Tomato")
     assert "No mandi prices were found" in out
     assert "temporarily unavailable" not in out.lower()
@@ -232,7 +233,7 @@ def test_the_duplicate_vistaar_timeout_knob_is_gone():
 async def test_calls_run_under_the_shared_network_budget():
     from app.config import settings
     clients = []
-    with patch.object(vistaar.httpx, "AsyncClient", _client_factory(_seeker_ok([]), clients)):
+    with patch.object(httpx, "AsyncClient", _client_factory(_seeker_ok([]), clients)):
         await vistaar.get_vistaar_mandi_prices(None, "Tomato")
     assert clients[0].timeout == settings.amul_network_timeout_s
     assert clients[0].timeout <= 35